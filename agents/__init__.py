@@ -7,6 +7,12 @@ Multi-agent system for elite learning design.
 from .base.agent import BaseAgent, ChiefAgent, SpecialistAgent, ExecutionAgent
 from .base.memory import MemoryManager, ShortTermMemory, LongTermMemory
 from .base.messaging import Message, MessageBus, MessageType, get_message_bus
+from .base.transport import AgentNotFoundError, MessageTransport, create_transport
+from .base.inbox import AgentInbox, InboxFullError
+from .base.coalescing import RequestCoalescer
+from .base.journal import MessageJournal
+from .base.consolidation import ConsolidationScheduler, MemoryConsolidator
+from .base.knowledge import KnowledgeCache, SharedKnowledgeStore, get_knowledge_store
 from .base.context import ContextBuilder
 
 __all__ = [
@@ -21,5 +27,17 @@ __all__ = [
     'MessageBus',
     'MessageType',
     'get_message_bus',
+    'MessageTransport',
+    'AgentNotFoundError',
+    'create_transport',
+    'AgentInbox',
+    'InboxFullError',
+    'RequestCoalescer',
+    'MessageJournal',
+    'SharedKnowledgeStore',
+    'KnowledgeCache',
+    'get_knowledge_store',
+    'MemoryConsolidator',
+    'ConsolidationScheduler',
     'ContextBuilder',
 ]
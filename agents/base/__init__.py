@@ -5,6 +5,12 @@ Base agent framework components
 from .agent import BaseAgent, ChiefAgent, SpecialistAgent, ExecutionAgent
 from .memory import MemoryManager, ShortTermMemory, LongTermMemory
 from .messaging import Message, MessageBus, MessageType, get_message_bus
+from .transport import AgentNotFoundError, MessageTransport, create_transport
+from .inbox import AgentInbox, InboxFullError
+from .coalescing import RequestCoalescer
+from .journal import MessageJournal
+from .consolidation import ConsolidationScheduler, MemoryConsolidator
+from .knowledge import KnowledgeCache, SharedKnowledgeStore, get_knowledge_store
 from .context import ContextBuilder
 
 __all__ = [
@@ -19,5 +25,17 @@ __all__ = [
     'MessageBus',
     'MessageType',
     'get_message_bus',
+    'MessageTransport',
+    'AgentNotFoundError',
+    'create_transport',
+    'AgentInbox',
+    'InboxFullError',
+    'RequestCoalescer',
+    'MessageJournal',
+    'SharedKnowledgeStore',
+    'KnowledgeCache',
+    'get_knowledge_store',
+    'MemoryConsolidator',
+    'ConsolidationScheduler',
     'ContextBuilder',
 ]
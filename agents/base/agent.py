@@ -4,16 +4,46 @@ Provides the foundation that all 10 agents inherit from
 """
 
 import os
-import yaml
-import anthropic
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import json
 
 from .context import ContextBuilder
+from .consolidation import get_consolidation_scheduler
+from .knowledge import KnowledgeCache, get_knowledge_store
 from .memory import MemoryManager
-from .messaging import Message, MessageBus
+from .messaging import Message, get_message_bus
+
+AGENCY_ROOT = Path(__file__).parent.parent.parent
+
+
+@lru_cache(maxsize=None)
+def load_definition(config_path: str) -> Dict[str, Any]:
+    """
+    Parse an agent definition YAML file (relative to the agency root).
+
+    Parsed once per process; every agent built from the same file shares
+    the result, so treat it as read-only.
+    """
+    import yaml
+
+    full_path = AGENCY_ROOT / config_path
+    if not full_path.exists():
+        raise FileNotFoundError(f"Agent config not found: {config_path}")
+
+    with open(full_path, 'r') as f:
+        # libyaml's loader when available: same result, several times faster
+        return yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+
+
+@lru_cache(maxsize=None)
+def _anthropic_client(api_key: Optional[str]):
+    """One Claude API client per API key, shared by the agents in a process."""
+    import anthropic
+
+    return anthropic.Anthropic(api_key=api_key)
 
 
 class BaseAgent:
@@ -43,12 +73,13 @@ class BaseAgent:
         # Initialize core components
         self.memory = MemoryManager(agent_id=agent_id)
         self.context_builder = ContextBuilder(agent_id=agent_id, config=self.config)
-        self.message_bus = MessageBus()
+        # Shared by every agent in the process; reaches agents in other
+        # processes when MESSAGE_TRANSPORT is unix or amqp
+        self.message_bus = get_message_bus()
 
-        # Claude API client
-        self.client = anthropic.Anthropic(
-            api_key=os.environ.get("ANTHROPIC_API_KEY")
-        )
+        # Claude API client and shared-knowledge cache, created on first use
+        self._client = None
+        self._knowledge: Optional[KnowledgeCache] = None
 
         # Agent state
         self.active = False
@@ -57,25 +88,46 @@ class BaseAgent:
         print(f"✅ {self.config['name']} initialized")
 
     def _load_config(self, config_path: str) -> Dict[str, Any]:
-        """Load agent configuration from YAML file."""
-        full_path = Path(__file__).parent.parent.parent / config_path
-
-        if not full_path.exists():
-            raise FileNotFoundError(f"Agent config not found: {config_path}")
-
-        with open(full_path, 'r') as f:
-            return yaml.safe_load(f)
+        """Load agent configuration from YAML file (shared, read-only)."""
+        return load_definition(config_path)
+
+    @property
+    def client(self):
+        """Claude API client (importing anthropic is deferred to first use)."""
+        if self._client is None:
+            self._client = _anthropic_client(os.environ.get("ANTHROPIC_API_KEY"))
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
+    @property
+    def knowledge(self) -> KnowledgeCache:
+        """Read-through cache of the decisions and patterns agents have shared."""
+        if self._knowledge is None:
+            self._knowledge = KnowledgeCache(get_knowledge_store())
+        return self._knowledge
 
     def start(self):
         """Start the agent (make it active and ready to receive messages)."""
         self.active = True
-        self.message_bus.subscribe(self.agent_id, self.handle_message)
+        # Inbox sizing (workers, capacity, overflow) from the agent definition
+        self.message_bus.subscribe(self.agent_id, self.handle_message,
+                                   has_history=self.memory.has_conversation,
+                                   **self.config.get('inbox', {}))
+        # Event streams this agent follows (e.g. "cohort.*.health_changed")
+        for pattern in self.config.get('topics', []):
+            self.message_bus.subscribe_topic(self.agent_id, pattern)
+        # Summarize, dedupe and prune memory in the background
+        get_consolidation_scheduler().register(self.memory)
         print(f"🟢 {self.config['name']} is now active")
 
     def stop(self):
         """Stop the agent."""
         self.active = False
         self.message_bus.unsubscribe(self.agent_id)
+        get_consolidation_scheduler().unregister(self.agent_id)
         print(f"🔴 {self.config['name']} stopped")
 
     def handle_message(self, message: Message) -> Message:
@@ -296,6 +348,25 @@ class BaseAgent:
 
         return self.message_bus.send(message)
 
+    def publish_event(self,
+                      topic: str,
+                      content: str,
+                      metadata: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Publish an INFORM on a topic without waiting for anyone to reply.
+
+        Args:
+            topic: Event topic (e.g. "cohort.q4-2025.health_changed")
+            content: Event description
+            metadata: Optional event data
+
+        Returns:
+            Number of subscribers notified
+        """
+        message = Message.inform(sender=self.agent_id, receiver=topic, content=content,
+                                 metadata=metadata or {})
+        return self.message_bus.publish(topic, message)
+
     def _generate_conversation_id(self) -> str:
         """Generate a unique conversation ID."""
         timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
@@ -335,7 +406,10 @@ class ChiefAgent(BaseAgent):
 
     def __init__(self, agent_id: str, config_path: Optional[str] = None):
         super().__init__(agent_id, config_path)
-        self.coordinated_agents = self.config.get('coordinates', [])
+        # Definitions list agents by file name (data_analyst); the bus uses ids (data-analyst)
+        self.coordinated_agents = [
+            agent.replace('_', '-') for agent in self.config.get('coordinates', [])
+        ]
 
     def coordinate_agents(self, agents: List[str], task: str) -> List[Message]:
         """
@@ -364,6 +438,81 @@ class ChiefAgent(BaseAgent):
 
         return responses
 
+    def notify(self,
+               content: str,
+               agents: Optional[List[str]] = None,
+               metadata: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Send one INFORM to agents without waiting for their replies.
+
+        Unlike coordinate_agents(), this is a single multicast rather than
+        a round-trip per agent; use it for updates that need no answer.
+
+        Args:
+            content: The update
+            agents: Agent IDs to notify (default: every coordinated agent)
+            metadata: Optional additional data
+
+        Returns:
+            Number of agents the update was queued for
+        """
+        receivers = agents if agents is not None else self.coordinated_agents
+        message = Message.inform(
+            sender=self.agent_id,
+            receiver="coordinated-agents",
+            content=content,
+            conversation_id=self._generate_conversation_id(),
+            metadata={"coordinated_by": self.agent_id, **(metadata or {})}
+        )
+        print(f"📣 {self.config['name']} notifying: {', '.join(receivers)}")
+        return self.message_bus.multicast(message, receivers)
+
+    def search_team_memory(self,
+                           query: str,
+                           agents: Optional[List[str]] = None,
+                           limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Semantic search over the memories of the agents this chief coordinates.
+
+        One query against the shared vector store, not one per agent.
+
+        Args:
+            query: Search query
+            agents: Agent IDs to search (default: every coordinated agent)
+            limit: Number of results to return
+
+        Returns:
+            Matching memories, each with the 'agent_id' it belongs to
+        """
+        agent_ids = agents if agents is not None else self.coordinated_agents
+        return self.memory.search_agents(query, agent_ids, limit=limit)
+
+    def query_specialists(self,
+                          kind: Optional[str] = None,
+                          topic: Optional[str] = None,
+                          agents: Optional[List[str]] = None,
+                          min_confidence: Optional[float] = None,
+                          limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Decisions and patterns the coordinated agents have shared.
+
+        Read from the shared knowledge store (through this agent's cache),
+        so no message or LLM turn is needed.
+
+        Args:
+            kind: 'decision' or 'pattern' (default: both)
+            topic: Decision/pattern type
+            agents: Agent IDs to include (default: every coordinated agent)
+            min_confidence: Lowest pattern confidence
+            limit: Most entries to return
+
+        Returns:
+            Shared entries, newest first
+        """
+        agent_ids = agents if agents is not None else self.coordinated_agents
+        return self.knowledge.query(kind=kind, topic=topic, agent_ids=agent_ids,
+                                    min_confidence=min_confidence, limit=limit)
+
 
 class SpecialistAgent(BaseAgent):
     """
@@ -0,0 +1,187 @@
+"""
+Request Coalescing - One computation for identical concurrent requests
+
+When several agents ask the same agent the same question at the same
+time, each request would otherwise run its own LLM turn. A
+RequestCoalescer sits in front of an agent's inbox and:
+
+1. Coalesces identical in-flight REQUESTs: the first runs, later ones
+   wait for it, and every waiter gets the reply addressed to them.
+   Requests are identical when receiver, conversation, message type,
+   content (with whitespace normalized) and metadata (minus routing-only
+   keys such as coordinated_by) match. The sender doesn't matter. The
+   conversation only matters once the receiver has history for it: an
+   answer depends on the conversation so far, so a follow-up never
+   shares a reply with another conversation, but the first request of a
+   conversation (e.g. a chief's send_message(), which starts a new one
+   each time) coalesces with identical requests from any other
+   conversation the receiver knows nothing about either.
+2. Drops duplicate deliveries: a message_id seen recently (e.g. a
+   broker redelivery or a client retry) gets the original reply instead
+   of being handled again. Failed requests are forgotten so they can be
+   retried.
+
+Enabled per agent by MessageBus.subscribe(coalesce=...), defaulting to
+AGENT_COALESCE_REQUESTS (default: true).
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+HistoryCheck = Callable[[str], bool]
+
+from .messaging import Message, MessageType
+
+
+# Metadata that says who is asking rather than what is asked
+IGNORED_METADATA_KEYS = frozenset({'coordinated_by'})
+
+_canonical_json = json.JSONEncoder(sort_keys=True, separators=(',', ':'), default=str).encode
+
+
+def coalescing_key(
+    message: Message,
+    has_history: Optional[HistoryCheck] = None
+) -> Optional[Tuple[str, Optional[str], str, str, str]]:
+    """
+    Key under which identical requests coalesce (None: never coalesce).
+
+    Args:
+        message: The request
+        has_history: has_history(conversation_id) tells whether the
+            receiver has history for the conversation; without it every
+            conversation is kept apart
+    """
+    if message.message_type != MessageType.REQUEST.value:
+        return None
+    metadata = message.metadata
+    if metadata and not IGNORED_METADATA_KEYS.isdisjoint(metadata):
+        metadata = {k: v for k, v in metadata.items() if k not in IGNORED_METADATA_KEYS}
+    conversation_id = message.conversation_id
+    if conversation_id is not None and has_history is not None and not has_history(conversation_id):
+        # Nothing earlier in the conversation can change the answer
+        conversation_id = None
+    return (
+        message.receiver,
+        conversation_id,
+        message.message_type,
+        ' '.join(message.content.split()),
+        _canonical_json(metadata) if metadata else '',
+    )
+
+
+class RequestCoalescer:
+    """
+    Message handler wrapper that coalesces identical in-flight requests
+    and answers duplicate deliveries from an LRU of recent message ids.
+
+    Usage:
+        handler = RequestCoalescer('data-analyst', inbox.call,
+                                   has_history=agent.memory.has_conversation)
+        reply = handler(message)
+    """
+
+    def __init__(
+        self,
+        agent_id: str,
+        handler: Callable[[Message], Message],
+        idempotency_size: int = 1000,
+        has_history: Optional[HistoryCheck] = None
+    ):
+        """
+        Args:
+            agent_id: Agent whose requests are coalesced
+            handler: The wrapped handler (usually the agent's inbox)
+            idempotency_size: Recent message ids remembered for deduplication
+            has_history: Whether the agent has history for a conversation;
+                requests in conversations without any coalesce across
+                conversations (None: only within a conversation)
+        """
+        if idempotency_size < 1:
+            raise ValueError("idempotency_size must be at least 1")
+        self.agent_id = agent_id
+        self.handler = handler
+        self.idempotency_size = idempotency_size
+        self.has_history = has_history
+
+        self._lock = threading.Lock()
+        # coalescing key -> (future, leading message)
+        self._in_flight: Dict[Tuple, Tuple[Future, Message]] = {}
+        # message_id -> (future, leading message), least recently seen first
+        self._recent: "OrderedDict[str, Tuple[Future, Message]]" = OrderedDict()
+        self._counters = {'handled': 0, 'coalesced': 0, 'duplicates': 0}
+
+    def __call__(self, message: Message) -> Message:
+        key = coalescing_key(message, self.has_history)
+        with self._lock:
+            entry = self._recent.get(message.message_id)
+            if entry is not None:
+                self._recent.move_to_end(message.message_id)
+                self._counters['duplicates'] += 1
+            else:
+                entry = self._in_flight.get(key) if key is not None else None
+                if entry is not None:
+                    self._counters['coalesced'] += 1
+                    self._remember(message.message_id, entry)
+                else:
+                    leading = (Future(), message)
+                    if key is not None:
+                        self._in_flight[key] = leading
+                    self._remember(message.message_id, leading)
+                    self._counters['handled'] += 1
+
+        if entry is not None:
+            future, leader = entry
+            return self._address(future.result(), leader, message)
+
+        future = leading[0]
+        try:
+            reply = self.handler(message)
+        except BaseException as e:
+            self._finish(key, leading, failed=True)
+            future.set_exception(e)
+            raise
+        self._finish(key, leading, failed=False)
+        future.set_result(reply)
+        return reply
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Handled, coalesced and duplicate request counts."""
+        with self._lock:
+            return {
+                'agent_id': self.agent_id,
+                'in_flight': len(self._in_flight),
+                **self._counters,
+            }
+
+    def _finish(self, key: Optional[Tuple], entry: Tuple[Future, Message], failed: bool):
+        with self._lock:
+            if key is not None and self._in_flight.get(key) is entry:
+                del self._in_flight[key]
+            if failed:
+                # Let a retry with the same message_id run again
+                for message_id in [i for i, e in self._recent.items() if e is entry]:
+                    del self._recent[message_id]
+
+    def _remember(self, message_id: str, entry: Tuple[Future, Message]):
+        self._recent[message_id] = entry
+        if len(self._recent) > self.idempotency_size:
+            self._recent.popitem(last=False)
+
+    @staticmethod
+    def _address(reply: Message, leader: Message, message: Message) -> Message:
+        """The leader's reply, readdressed to another waiter."""
+        if message.message_id == leader.message_id:
+            return reply
+        return Message(
+            sender=reply.sender,
+            receiver=message.sender,
+            content=reply.content,
+            message_type=reply.message_type,
+            conversation_id=message.conversation_id,
+            in_reply_to=message.message_id,
+            metadata=reply.metadata
+        )
@@ -0,0 +1,559 @@
+"""
+Memory Consolidation - Keeps long-lived agents' memory small and useful
+
+A consolidation pass over one agent's long-term memory:
+
+1. Summarize: conversations that have gone quiet get a `conversations`
+   summary (participants, key insights) built from their interactions.
+2. Extract patterns: requests that recur across conversations become
+   'recurring-request' patterns. Which conversations asked each request
+   is kept in memory_store, so support accumulates across passes and a
+   re-summarized conversation isn't counted twice; later passes update
+   the pattern in place.
+3. Dedupe patterns: patterns with the same type and description merge
+   into one. Their confidences combine (1 - Π(1 - c)) and their
+   examples are unioned. Merged-away patterns are retracted from the
+   shared knowledge store, and the survivor is republished if any of
+   them had been shared.
+4. Prune: raw interactions older than the retention window that a
+   summary already covers are deleted, along with their vectors and any
+   expired memory_store rows.
+
+Every step works in chunks of chunk_size rows, each in its own short
+transaction on a separate connection, so a pass never holds the database
+for long while the agent is handling messages.
+
+ConsolidationScheduler runs passes in a background thread for every
+started agent, as often as AGENT_MEMORY_CONSOLIDATION_FREQUENCY says
+(hourly, daily, weekly or off). The retention window comes from
+AGENT_MEMORY_RETENTION_DAYS. When several worker processes serve one
+agent, each pass is claimed atomically in the agent's database, so only
+one of them consolidates it.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+FREQUENCIES = {'hourly': 3600, 'daily': 86400, 'weekly': 7 * 86400}
+DEFAULT_RETENTION_DAYS = 90
+LAST_RUN_KEY = 'consolidation:last_run'
+REQUEST_SUPPORT_PREFIX = 'consolidation:request:'
+RECURRING_REQUEST = 'recurring-request'
+MAX_EXAMPLES = 20
+
+# (interactions, oldest first) -> (summary, key insights)
+Summarizer = Callable[[List[Dict[str, Any]]], Tuple[str, List[str]]]
+
+
+def _clip(text: Optional[str], limit: int = 200) -> str:
+    text = ' '.join((text or '').split())
+    return text if len(text) <= limit else text[:limit - 1] + '…'
+
+
+def _first_sentence(text: Optional[str]) -> str:
+    text = ' '.join((text or '').split())
+    for end in ('. ', '! ', '? ', '\n'):
+        if end in text:
+            text = text.split(end, 1)[0] + end.strip()
+            break
+    return _clip(text)
+
+
+def _normalize(text: str) -> str:
+    return ' '.join(text.lower().split())
+
+
+def summarize_interactions(interactions: List[Dict[str, Any]]) -> Tuple[str, List[str]]:
+    """
+    Default summarizer: extractive, no LLM call.
+
+    The summary names the participants, the span and how the conversation
+    opened and closed; key insights are the first sentence of each distinct
+    response.
+    """
+    first, last = interactions[0], interactions[-1]
+    participants = sorted({i['message_from'] for i in interactions} | {i['message_to'] for i in interactions})
+    summary = (
+        f"{len(interactions)} exchange(s) between {', '.join(participants)} "
+        f"from {first['timestamp']} to {last['timestamp']}. "
+        f"Opened with: {_clip(first['content'])} "
+        f"Closed with: {_clip(last['response'])}"
+    )
+    insights = []
+    for interaction in interactions:
+        insight = _first_sentence(interaction['response'])
+        if insight and insight not in insights:
+            insights.append(insight)
+    return summary, insights[:5]
+
+
+def combine_confidence(confidences: List[float]) -> float:
+    """Independent evidence for one pattern: 1 - Π(1 - c)."""
+    remaining = 1.0
+    for confidence in confidences:
+        remaining *= 1.0 - min(max(confidence or 0.0, 0.0), 1.0)
+    return round(1.0 - remaining, 4)
+
+
+class MemoryConsolidator:
+    """
+    One consolidation pass over an agent's long-term memory.
+
+    Usage:
+        report = MemoryConsolidator(memory.long_term).run()
+
+        # Or interleave with other work, one chunk at a time
+        for step in MemoryConsolidator(memory.long_term).steps():
+            time.sleep(0.05)
+    """
+
+    def __init__(
+        self,
+        long_term,
+        retention_days: Optional[int] = None,
+        idle_minutes: float = 30,
+        chunk_size: int = 50,
+        min_support: int = 2,
+        summarizer: Optional[Summarizer] = None,
+        now: Optional[datetime] = None
+    ):
+        """
+        Args:
+            long_term: The agent's LongTermMemory
+            retention_days: Days raw interactions are kept once summarized
+                (default: AGENT_MEMORY_RETENTION_DAYS or 90)
+            idle_minutes: Minutes without interactions before a conversation
+                is summarized
+            chunk_size: Rows handled per transaction
+            min_support: Conversations a request must recur in to become a pattern
+            summarizer: Builds (summary, key insights) from interactions
+                (default: summarize_interactions)
+            now: Current time (for tests)
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.long_term = long_term
+        self.retention_days = retention_days if retention_days is not None else int(
+            os.environ.get("AGENT_MEMORY_RETENTION_DAYS", DEFAULT_RETENTION_DAYS)
+        )
+        self.idle_minutes = idle_minutes
+        self.chunk_size = chunk_size
+        self.min_support = min_support
+        self.summarizer = summarizer or summarize_interactions
+        self.now = now
+
+        self.report = {
+            'conversations_summarized': 0,
+            'patterns_extracted': 0,
+            'patterns_updated': 0,
+            'patterns_merged': 0,
+            'patterns_republished': 0,
+            'interactions_pruned': 0,
+            'vectors_pruned': 0,
+            'expired_pruned': 0,
+        }
+        # Normalized requests seen in conversations summarized this pass
+        self._requests: set = set()
+
+    def run(self, pause: float = 0.0) -> Dict[str, int]:
+        """Run every step to completion, sleeping pause seconds between chunks."""
+        for _ in self.steps():
+            if pause:
+                time.sleep(pause)
+        return self.report
+
+    def steps(self) -> Iterator[str]:
+        """Run the pass, yielding the step name after each chunk."""
+        now = self.now or datetime.now()
+        # A separate connection: our transactions don't interleave with the agent's
+        self.long_term.conn  # Opening it creates the schema
+        conn = sqlite3.connect(str(self.long_term.db_file), timeout=5.0)
+        try:
+            yield from self._summarize(conn, now)
+            yield from self._extract_patterns(conn, now)
+            yield from self._dedupe_patterns(conn)
+            yield from self._prune(conn, now)
+            conn.execute('''
+                INSERT OR REPLACE INTO memory_store (key, value, category, timestamp)
+                VALUES (?, ?, 'consolidation', ?)
+            ''', (LAST_RUN_KEY, json.dumps(self.report), now))
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+
+    def _summarize(self, conn: sqlite3.Connection, now: datetime) -> Iterator[str]:
+        idle_cutoff = now - timedelta(minutes=self.idle_minutes)
+        while True:
+            # Conversations with interactions newer than their summary, gone quiet
+            rows = conn.execute('''
+                SELECT i.conversation_id, MAX(i.timestamp) AS last_at
+                FROM interactions i
+                LEFT JOIN conversations c ON c.conversation_id = i.conversation_id
+                GROUP BY i.conversation_id
+                HAVING last_at < ? AND last_at > COALESCE(MAX(c.completed_at), '')
+                LIMIT ?
+            ''', (idle_cutoff, self.chunk_size)).fetchall()
+            if not rows:
+                return
+            for conversation_id, _ in rows:
+                self._summarize_conversation(conn, conversation_id, now)
+            yield 'summarize'
+
+    def _summarize_conversation(self, conn: sqlite3.Connection, conversation_id: str, now: datetime):
+        columns = ('timestamp', 'message_from', 'message_to', 'message_type', 'content', 'response')
+        interactions = [dict(zip(columns, row)) for row in conn.execute(f'''
+            SELECT {', '.join(columns)} FROM interactions
+            WHERE conversation_id = ? ORDER BY timestamp ASC
+        ''', (conversation_id,))]
+        previous = conn.execute(
+            'SELECT participants, key_insights, started_at, outcome FROM conversations WHERE conversation_id = ?',
+            (conversation_id,)
+        ).fetchone()
+
+        summary, insights = self.summarizer(interactions)
+        participants = sorted({i['message_from'] for i in interactions} | {i['message_to'] for i in interactions})
+        started_at = interactions[0]['timestamp']
+        outcome = None
+        if previous:
+            # Earlier interactions may already be pruned; keep what their summary knew
+            participants = sorted(set(participants) | set(json.loads(previous[0] or '[]')))
+            insights = list(dict.fromkeys(json.loads(previous[1] or '[]') + insights))
+            started_at = previous[2] or started_at
+            outcome = previous[3]
+
+        self.long_term.store_conversation(
+            conversation_id, summary, participants, insights, outcome=outcome,
+            started_at=started_at, completed_at=interactions[-1]['timestamp']
+        )
+        self.report['conversations_summarized'] += 1
+
+        with conn:
+            for interaction in interactions:
+                if interaction['message_type'] == 'request' and interaction['content']:
+                    text = _clip(interaction['content'])
+                    key = _normalize(text)
+                    # One statement, so a concurrent pass can't lose a conversation
+                    conn.execute('''
+                        INSERT INTO memory_store (key, value, category, timestamp)
+                        VALUES (?, json_object('text', ?, 'conversations', json_array(?)), 'consolidation', ?)
+                        ON CONFLICT (key) DO UPDATE SET
+                            value = json_insert(memory_store.value, '$.conversations[#]', ?),
+                            timestamp = excluded.timestamp
+                        WHERE NOT EXISTS (
+                            SELECT 1 FROM json_each(memory_store.value, '$.conversations') AS c
+                            WHERE c.value = ?
+                        )
+                    ''', (REQUEST_SUPPORT_PREFIX + key, text, conversation_id, now,
+                          conversation_id, conversation_id))
+                    self._requests.add(key)
+
+    def _extract_patterns(self, conn: sqlite3.Connection, now: datetime) -> Iterator[str]:
+        # Existing recurring-request patterns, by normalized description
+        existing = {
+            _normalize(description): pattern_id
+            for pattern_id, description in conn.execute('''
+                SELECT pattern_id, description FROM patterns
+                WHERE pattern_type = ? ORDER BY last_validated ASC
+            ''', (RECURRING_REQUEST,))
+        }
+        keys = sorted(self._requests)
+        for start in range(0, len(keys), self.chunk_size):
+            new = []
+            with conn:
+                for key in keys[start:start + self.chunk_size]:
+                    support = _request_support(conn, key)
+                    conversations = support['conversations']
+                    if len(conversations) < self.min_support:
+                        continue
+                    description = f"Recurring request: {support['text']}"
+                    confidence = round(len(conversations) / (len(conversations) + 1), 4)
+                    examples = conversations[-MAX_EXAMPLES:]
+                    pattern_id = existing.get(_normalize(description))
+                    if pattern_id is None:
+                        new.append((description, confidence, examples))
+                    else:
+                        conn.execute('''
+                            UPDATE patterns SET confidence = ?, examples = ?, last_validated = ?
+                            WHERE pattern_id = ?
+                        ''', (confidence, json.dumps(examples), now, pattern_id))
+                        self.report['patterns_updated'] += 1
+            # Through the agent's own connection, once ours has committed
+            for description, confidence, examples in new:
+                existing[_normalize(description)] = self.long_term.store_pattern(
+                    RECURRING_REQUEST, description, confidence=confidence, examples=examples
+                )
+                self.report['patterns_extracted'] += 1
+            yield 'extract_patterns'
+
+    def _dedupe_patterns(self, conn: sqlite3.Connection) -> Iterator[str]:
+        groups: Dict[Tuple[str, str], List[Tuple]] = defaultdict(list)
+        for row in conn.execute('''
+            SELECT pattern_id, pattern_type, description, confidence, examples, last_validated
+            FROM patterns ORDER BY last_validated DESC
+        '''):
+            groups[(row[1], _normalize(row[2] or ''))].append(row)
+        duplicates = [rows for rows in groups.values() if len(rows) > 1]
+
+        for start in range(0, len(duplicates), self.chunk_size):
+            merged = []
+            with conn:
+                for rows in duplicates[start:start + self.chunk_size]:
+                    keep = rows[0]  # Most recently validated
+                    examples = []
+                    for row in rows:
+                        for example in json.loads(row[4] or '[]'):
+                            if example not in examples:
+                                examples.append(example)
+                    confidence = combine_confidence([row[3] for row in rows])
+                    conn.execute('''
+                        UPDATE patterns SET confidence = ?, examples = ?, last_validated = ?
+                        WHERE pattern_id = ?
+                    ''', (confidence, json.dumps(examples[:MAX_EXAMPLES]), keep[5], keep[0]))
+                    conn.executemany('DELETE FROM patterns WHERE pattern_id = ?',
+                                     [(row[0],) for row in rows[1:]])
+                    self.report['patterns_merged'] += len(rows) - 1
+                    merged.append((keep, rows[1:], confidence, examples[:MAX_EXAMPLES]))
+            self._sync_knowledge(merged)
+            yield 'dedupe_patterns'
+
+    def _sync_knowledge(self, merged: List[Tuple]):
+        """Retract merged-away patterns; republish survivors that were shared."""
+        if not merged:
+            return
+        store = self.long_term._knowledge_store()
+        for keep, removed, confidence, examples in merged:
+            # Not short-circuited: every removed id must be retracted
+            retracted = [store.retract(row[0]) for row in removed]
+            if any(retracted) or store.get(keep[0]) is not None:
+                store.publish(
+                    self.long_term.agent_id, 'pattern', keep[1], keep[2],
+                    details={'examples': examples}, confidence=confidence, entry_id=keep[0]
+                )
+                self.report['patterns_republished'] += 1
+
+    def _prune(self, conn: sqlite3.Connection, now: datetime) -> Iterator[str]:
+        cutoff = now - timedelta(days=self.retention_days)
+        while True:
+            # Only interactions a summary already covers
+            with conn:
+                deleted = conn.execute('''
+                    DELETE FROM interactions WHERE rowid IN (
+                        SELECT i.rowid FROM interactions i
+                        JOIN conversations c ON c.conversation_id = i.conversation_id
+                        WHERE i.timestamp < ? AND i.timestamp <= c.completed_at
+                        LIMIT ?
+                    )
+                ''', (cutoff, self.chunk_size)).rowcount
+            self.report['interactions_pruned'] += deleted
+            yield 'prune_interactions'
+            if deleted < self.chunk_size:
+                break
+
+        with conn:
+            self.report['expired_pruned'] += conn.execute(
+                'DELETE FROM memory_store WHERE expires_at IS NOT NULL AND expires_at < ?', (now,)
+            ).rowcount
+
+        collection = self.long_term.collection
+        if collection is None:
+            return
+        where = {'$and': [
+            {'agent_id': self.long_term.agent_id},
+            {'type': 'interaction'},
+            {'created_at': {'$lt': cutoff.timestamp()}},
+        ]}
+        while True:
+            try:
+                ids = collection.get(where=where, limit=self.chunk_size, include=[])['ids']
+                if ids:
+                    collection.delete(ids=ids)
+                    with conn:
+                        conn.executemany('DELETE FROM vector_ids WHERE doc_id = ?', [(i,) for i in ids])
+            except Exception as e:
+                print(f"⚠️  Error pruning semantic memory: {e}")
+                return
+            self.report['vectors_pruned'] += len(ids)
+            yield 'prune_vectors'
+            if len(ids) < self.chunk_size:
+                return
+
+
+def _request_support(conn: sqlite3.Connection, key: str) -> Optional[Dict[str, Any]]:
+    """{'text', 'conversations'} recorded for a normalized request, if any."""
+    row = conn.execute(
+        'SELECT value FROM memory_store WHERE key = ?', (REQUEST_SUPPORT_PREFIX + key,)
+    ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def claim_pass(long_term, now: datetime, interval: float) -> bool:
+    """
+    Claim a consolidation pass over an agent's memory if one is due.
+
+    Worker processes of the same agent share its database. Whichever
+    first finds the pass due moves LAST_RUN_KEY to now inside one
+    BEGIN IMMEDIATE transaction, so the others find it not due. A pass
+    that dies after claiming is retried after the next interval.
+
+    Returns:
+        True if this caller should run the pass
+    """
+    long_term.conn  # Opening it creates the schema
+    conn = sqlite3.connect(str(long_term.db_file), timeout=5.0, isolation_level=None)
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT timestamp FROM memory_store WHERE key = ?', (LAST_RUN_KEY,)
+            ).fetchone()
+            previous = row[0] if row else None
+            if previous and (now - datetime.fromisoformat(previous)).total_seconds() < interval:
+                claimed = False
+            elif row is None:
+                claimed = conn.execute('''
+                    INSERT OR IGNORE INTO memory_store (key, value, category, timestamp)
+                    VALUES (?, '{}', 'consolidation', ?)
+                ''', (LAST_RUN_KEY, now)).rowcount == 1
+            else:
+                claimed = conn.execute(
+                    'UPDATE memory_store SET timestamp = ? WHERE key = ? AND timestamp IS ?',
+                    (now, LAST_RUN_KEY, previous)
+                ).rowcount == 1
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return claimed
+    finally:
+        conn.close()
+
+
+def last_run(long_term) -> Optional[datetime]:
+    """When the agent's memory was last consolidated (None: never)."""
+    row = long_term.conn.execute(
+        'SELECT timestamp FROM memory_store WHERE key = ?', (LAST_RUN_KEY,)
+    ).fetchone()
+    return datetime.fromisoformat(row[0]) if row and row[0] else None
+
+
+class ConsolidationScheduler:
+    """
+    Background thread that consolidates registered agents' memory when due.
+
+    One thread per process serves every agent. It works one chunk at a
+    time with a pause between chunks, and records each run in the agent's
+    memory_store, so restarts don't reset the schedule.
+
+    Usage:
+        scheduler = get_consolidation_scheduler()
+        scheduler.register(agent.memory)   # BaseAgent.start() does this
+    """
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        check_interval: float = 60.0,
+        pause: float = 0.05,
+        **consolidator_options
+    ):
+        """
+        Args:
+            interval: Seconds between passes per agent (default from
+                AGENT_MEMORY_CONSOLIDATION_FREQUENCY; 0 disables)
+            check_interval: Seconds between checks for due agents
+            pause: Seconds to sleep between chunks
+            **consolidator_options: Passed to MemoryConsolidator
+        """
+        if interval is None:
+            frequency = os.environ.get("AGENT_MEMORY_CONSOLIDATION_FREQUENCY", "daily").lower()
+            if frequency != 'off' and frequency not in FREQUENCIES:
+                raise ValueError(
+                    f"Unknown AGENT_MEMORY_CONSOLIDATION_FREQUENCY '{frequency}'. "
+                    f"Expected one of {', '.join(FREQUENCIES)} or off"
+                )
+            interval = FREQUENCIES.get(frequency, 0)
+        self.interval = interval
+        self.check_interval = check_interval
+        self.pause = pause
+        self.consolidator_options = consolidator_options
+
+        self._lock = threading.Lock()
+        self._memories: Dict[str, Any] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.reports: Dict[str, Dict[str, int]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def register(self, memory):
+        """Consolidate a MemoryManager's long-term memory on schedule."""
+        with self._lock:
+            self._memories[memory.agent_id] = memory
+            if self.enabled and self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="memory-consolidation", daemon=True)
+                self._thread.start()
+
+    def unregister(self, agent_id: str):
+        """Stop consolidating an agent's memory."""
+        with self._lock:
+            self._memories.pop(agent_id, None)
+
+    def run_pending(self, now: Optional[datetime] = None) -> Dict[str, Dict[str, int]]:
+        """Consolidate every registered agent that is due; returns their reports."""
+        now = now or datetime.now()
+        with self._lock:
+            memories = list(self._memories.values())
+        reports = {}
+        for memory in memories:
+            if self._stop.is_set():
+                break
+            if not claim_pass(memory.long_term, now, self.interval):
+                continue
+            consolidator = MemoryConsolidator(memory.long_term, now=now, **self.consolidator_options)
+            for _ in consolidator.steps():
+                if self._stop.wait(self.pause):
+                    break
+            reports[memory.agent_id] = consolidator.report
+            self.reports[memory.agent_id] = consolidator.report
+        return reports
+
+    def stop(self):
+        """Stop the background thread (finishing at most the current chunk)."""
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=10)
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            try:
+                self.run_pending()
+            except Exception as e:
+                print(f"⚠️  Memory consolidation failed: {e}")
+
+
+# Global scheduler (singleton per process)
+_global_scheduler = None
+_global_lock = threading.Lock()
+
+
+def get_consolidation_scheduler() -> ConsolidationScheduler:
+    """Get the process-wide consolidation scheduler."""
+    global _global_scheduler
+    with _global_lock:
+        if _global_scheduler is None:
+            _global_scheduler = ConsolidationScheduler()
+        return _global_scheduler
@@ -0,0 +1,321 @@
+"""
+Agent Inbox - Per-agent priority queue and worker pool
+
+Messages to an agent wait in its inbox and are handled by a fixed pool
+of worker threads, most urgent first:
+
+1. ERROR / STATUS messages
+2. Requests from a human
+3. Coordination between agents (everything else)
+
+Messages of equal priority are handled in arrival order. The inbox is
+bounded: when it's full, a new message is either rejected outright
+('reject') or, if it's more urgent than the least urgent queued message,
+takes that message's place ('shed'). Either way the loser's sender gets
+an InboxFullError straight away instead of waiting.
+
+A handler may message an agent that is already handling a message
+further up the same chain of calls (A asks B, B asks A back). A's
+workers may all be busy waiting for that very chain, so such re-entrant
+calls run straight away on the calling thread instead of queueing.
+
+Defaults come from the environment:
+    AGENT_MAX_CONCURRENT_TASKS   Workers per agent (default: 1)
+    AGENT_INBOX_CAPACITY         Queued messages per agent (default: 100)
+    AGENT_INBOX_OVERFLOW         reject | shed (default: shed)
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
+from .messaging import Message, MessageType
+
+
+PRIORITY_URGENT = 0          # ERROR / STATUS
+PRIORITY_HUMAN = 1           # Requests from a human
+PRIORITY_COORDINATION = 2    # Agent-to-agent traffic
+
+PRIORITY_NAMES = {
+    PRIORITY_URGENT: 'urgent',
+    PRIORITY_HUMAN: 'human',
+    PRIORITY_COORDINATION: 'coordination',
+}
+
+OVERFLOW_POLICIES = ('reject', 'shed')
+
+_URGENT_TYPES = frozenset({MessageType.ERROR.value, MessageType.STATUS.value})
+
+# Agents whose handlers are running further up this thread's chain of calls
+_chain = threading.local()
+
+
+def _active_agents() -> frozenset:
+    return getattr(_chain, 'agents', frozenset())
+
+
+class InboxFullError(RuntimeError):
+    """The receiving agent's inbox is full (or the message was shed)."""
+
+
+class InboxClosedError(RuntimeError):
+    """The receiving agent stopped before handling the message."""
+
+
+def message_priority(message: Message) -> int:
+    """Priority class of a message (lower is handled first)."""
+    if message.message_type in _URGENT_TYPES:
+        return PRIORITY_URGENT
+    if message.sender == 'human':
+        return PRIORITY_HUMAN
+    return PRIORITY_COORDINATION
+
+
+class _Item:
+    __slots__ = ('priority', 'sequence', 'message', 'future', 'enqueued', 'cancelled', 'chain')
+
+    def __init__(self, priority: int, sequence: int, message: Message, chain: frozenset = frozenset()):
+        self.priority = priority
+        self.sequence = sequence
+        self.message = message
+        self.future: Future = Future()
+        self.enqueued = time.perf_counter()
+        self.cancelled = False
+        self.chain = chain
+
+    def __lt__(self, other: "_Item") -> bool:
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+
+class AgentInbox:
+    """
+    Bounded priority queue plus worker pool in front of one agent's handler.
+
+    Usage:
+        inbox = AgentInbox('data-analyst', agent.handle_message, workers=3)
+        reply = inbox.call(message)          # waits for a worker
+        future = inbox.submit(message)       # doesn't
+    """
+
+    def __init__(
+        self,
+        agent_id: str,
+        handler: Callable[[Message], Message],
+        workers: Optional[int] = None,
+        capacity: Optional[int] = None,
+        overflow: Optional[str] = None,
+        timeout: Optional[float] = None
+    ):
+        """
+        Args:
+            agent_id: Agent the inbox belongs to
+            handler: Function handling one message (agent.handle_message)
+            workers: Messages handled concurrently (default: AGENT_MAX_CONCURRENT_TASKS or 1)
+            capacity: Messages allowed to wait (default: AGENT_INBOX_CAPACITY or 100)
+            overflow: 'reject' or 'shed' when full (default: AGENT_INBOX_OVERFLOW or 'shed')
+            timeout: Longest call() waits for a reply (None: no limit)
+        """
+        self.agent_id = agent_id
+        self.handler = handler
+        self.workers = workers if workers is not None else int(os.environ.get("AGENT_MAX_CONCURRENT_TASKS", 1))
+        self.capacity = capacity if capacity is not None else int(os.environ.get("AGENT_INBOX_CAPACITY", 100))
+        self.overflow = overflow or os.environ.get("AGENT_INBOX_OVERFLOW", "shed")
+        self.timeout = timeout
+
+        if self.workers < 1:
+            raise ValueError("workers must be at least 1")
+        if self.capacity < 0:
+            raise ValueError("capacity must be at least 0")
+        if self.overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown overflow policy '{self.overflow}'. Expected one of: {', '.join(OVERFLOW_POLICIES)}"
+            )
+
+        self._heap: List[_Item] = []
+        self._depth = {priority: 0 for priority in PRIORITY_NAMES}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._busy = 0
+        self._counters = {
+            'submitted': 0, 'handled': 0, 'reentrant': 0, 'rejected': 0, 'shed': 0, 'expired': 0,
+            'max_depth': 0
+        }
+        self._wait_ms = {'total': 0.0, 'max': 0.0}
+        self._handle_ms = {'total': 0.0, 'max': 0.0}
+
+        self._threads = [
+            threading.Thread(target=self._work, name=f"inbox-{agent_id}-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, message: Message) -> Future:
+        """
+        Queue a message without waiting for it to be handled.
+
+        Returns:
+            Future resolving to the handler's reply
+
+        Raises:
+            InboxFullError: The inbox is full and the message wasn't urgent enough to shed another
+            InboxClosedError: The inbox has been closed
+        """
+        item = _Item(message_priority(message), 0, message, _active_agents())
+        shed: Optional[_Item] = None
+
+        with self._condition:
+            if self._closed:
+                raise InboxClosedError(f"{self.agent_id} is not accepting messages")
+
+            if self.depth >= self.capacity:
+                victim = self._least_urgent() if self.overflow == 'shed' else None
+                if victim is None or victim.priority <= item.priority:
+                    self._counters['rejected'] += 1
+                    raise InboxFullError(
+                        f"{self.agent_id} inbox full ({self.capacity} messages waiting)"
+                    )
+                victim.cancelled = True
+                self._depth[victim.priority] -= 1
+                self._counters['shed'] += 1
+                shed = victim
+
+            item.sequence = next(self._sequence)
+            heapq.heappush(self._heap, item)
+            self._depth[item.priority] += 1
+            self._counters['submitted'] += 1
+            self._counters['max_depth'] = max(self._counters['max_depth'], self.depth)
+            self._condition.notify()
+
+        if shed is not None:
+            shed.future.set_exception(InboxFullError(
+                f"{self.agent_id} inbox full: message shed for more urgent work"
+            ))
+        return item.future
+
+    def call(self, message: Message) -> Message:
+        """
+        Queue a message and wait for the reply (a drop-in message handler).
+
+        Re-entrant calls (this agent is already handling a message further
+        up the calling chain) are handled on the calling thread.
+
+        Raises:
+            InboxFullError, InboxClosedError: As for submit()
+            TimeoutError: No reply within the inbox timeout (the message is
+                dropped if no worker has started on it yet)
+        """
+        if self.agent_id in _active_agents():
+            with self._condition:
+                self._counters['reentrant'] += 1
+            return self.handler(message)
+
+        future = self.submit(message)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            with self._condition:
+                for item in self._heap:
+                    if item.future is future and not item.cancelled:
+                        item.cancelled = True
+                        self._depth[item.priority] -= 1
+                        self._counters['expired'] += 1
+            raise TimeoutError(
+                f"{self.agent_id} did not reply within {self.timeout}s"
+            ) from None
+
+    __call__ = call
+
+    @property
+    def depth(self) -> int:
+        """Messages waiting for a worker."""
+        return sum(self._depth.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, throughput, shedding and latency metrics."""
+        with self._condition:
+            handled = self._counters['handled']
+            return {
+                'agent_id': self.agent_id,
+                'workers': self.workers,
+                'busy_workers': self._busy,
+                'capacity': self.capacity,
+                'overflow': self.overflow,
+                'depth': self.depth,
+                'depth_by_priority': {
+                    PRIORITY_NAMES[priority]: count for priority, count in self._depth.items()
+                },
+                **self._counters,
+                'avg_wait_ms': round(self._wait_ms['total'] / handled, 2) if handled else 0.0,
+                'max_wait_ms': round(self._wait_ms['max'], 2),
+                'avg_handle_ms': round(self._handle_ms['total'] / handled, 2) if handled else 0.0,
+                'max_handle_ms': round(self._handle_ms['max'], 2),
+            }
+
+    def close(self, wait: bool = True):
+        """
+        Stop accepting messages; queued ones fail with InboxClosedError.
+
+        Args:
+            wait: Wait for messages already being handled to finish
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            queued = [item for item in self._heap if not item.cancelled]
+            self._heap = []
+            self._depth = {priority: 0 for priority in PRIORITY_NAMES}
+            self._condition.notify_all()
+
+        for item in queued:
+            item.future.set_exception(InboxClosedError(f"{self.agent_id} stopped"))
+        if wait:
+            for thread in self._threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+
+    def _least_urgent(self) -> Optional[_Item]:
+        """The queued message that would be handled last."""
+        live = [item for item in self._heap if not item.cancelled]
+        return max(live) if live else None
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._closed and not self._heap:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                item = heapq.heappop(self._heap)
+                if item.cancelled:
+                    continue
+                self._depth[item.priority] -= 1
+                self._busy += 1
+
+            started = time.perf_counter()
+            if item.future.set_running_or_notify_cancel():
+                _chain.agents = item.chain | {self.agent_id}
+                try:
+                    item.future.set_result(self.handler(item.message))
+                except BaseException as e:
+                    item.future.set_exception(e)
+                finally:
+                    _chain.agents = frozenset()
+            finished = time.perf_counter()
+
+            with self._condition:
+                self._busy -= 1
+                self._counters['handled'] += 1
+                wait_ms = (started - item.enqueued) * 1000
+                handle_ms = (finished - started) * 1000
+                self._wait_ms['total'] += wait_ms
+                self._wait_ms['max'] = max(self._wait_ms['max'], wait_ms)
+                self._handle_ms['total'] += handle_ms
+                self._handle_ms['max'] = max(self._handle_ms['max'], handle_ms)
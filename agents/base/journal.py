@@ -0,0 +1,458 @@
+"""
+Message Journal - Durable, append-only record of message bus traffic
+
+The MessageBus keeps only its newest messages in memory. A journal also
+writes every message to disk, so multi-agent sessions can be audited
+after a restart, replayed to rebuild bus state, or fed to offline
+benchmarks.
+
+Layout: a directory of segments, each named after the offset (global
+record number) of its first record:
+
+    00000000000000000000.log    Records 0 .. n-1 (sealed)
+    00000000000000000000.idx    Conversation index of the sealed segment
+    0000000000000000000n.log    Active segment
+
+Each record is a 4-byte big-endian payload length, a 4-byte CRC32 of the
+payload, then the payload: the message's compact binary encoding
+(Message.to_bytes). Writes are
+buffered and fsynced in batches, after sync_every records or
+sync_interval seconds, whichever comes first. A crash can lose at most
+the last unsynced batch. On reopen, a torn record at the end of the
+active segment is truncated away.
+
+Configured from the environment by get_message_bus():
+    MESSAGE_JOURNAL_DIR          Journal directory (unset: no journal)
+    MESSAGE_JOURNAL_SEGMENT_MB   Segment size before rotation (default: 64)
+    MESSAGE_JOURNAL_SYNC_MS      Longest a write waits for fsync (default: 50)
+
+Usage:
+    journal = MessageJournal('./data/journal')
+    bus = MessageBus(journal=journal)
+    for offset, message in journal.replay(conversation_id='conv-1'):
+        ...
+
+    # Audit a running agency's journal from another process
+    python -m agents.base.journal stats --dir ./data/journal
+    python -m agents.base.journal replay --dir ./data/journal --conversation conv-1
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import struct
+import sys
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from .messaging import Message
+
+
+DEFAULT_SEGMENT_MB = 64
+DEFAULT_SYNC_MS = 50
+
+_HEADER = struct.Struct(">II")  # Payload length, CRC32
+_NAME_WIDTH = 20
+
+
+class JournalCorruptError(RuntimeError):
+    """A sealed journal segment failed its length or checksum check."""
+
+    def __init__(self, path: Path, position: int, reason: str):
+        super().__init__(f"Corrupt journal record in {path.name} at byte {position}: {reason}")
+        self.path = path
+        self.position = position
+
+
+def _segment_path(directory: Path, base: int, suffix: str = ".log") -> Path:
+    return directory / f"{base:0{_NAME_WIDTH}d}{suffix}"
+
+
+def _encode(message: Message) -> bytes:
+    payload = message.to_bytes()
+    return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _read_record(file: BinaryIO, path: Path, position: int) -> Optional[bytes]:
+    """Read the record at the file's current position (None at a clean end)."""
+    header = file.read(_HEADER.size)
+    if not header:
+        return None
+    if len(header) < _HEADER.size:
+        raise JournalCorruptError(path, position, "truncated header")
+    length, checksum = _HEADER.unpack(header)
+    payload = file.read(length)
+    if len(payload) < length:
+        raise JournalCorruptError(path, position, "truncated payload")
+    if zlib.crc32(payload) != checksum:
+        raise JournalCorruptError(path, position, "checksum mismatch")
+    return payload
+
+
+def _iter_segment(path: Path, end: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+    """Yield (byte position, payload) for each record, up to byte end."""
+    with open(path, "rb", buffering=1024 * 1024) as file:
+        position = 0
+        while end is None or position < end:
+            payload = _read_record(file, path, position)
+            if payload is None:
+                return
+            yield position, payload
+            position += _HEADER.size + len(payload)
+
+
+class MessageJournal:
+    """
+    Segmented, checksummed, append-only log of Messages.
+
+    append() is thread-safe and returns the message's offset. Offsets
+    count records from the start of the journal and never change.
+    Conversation lookups seek straight to their records through an
+    in-memory index (persisted per sealed segment in .idx files).
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: Optional[int] = None,
+        sync_interval: Optional[float] = None,
+        sync_every: int = 1000,
+        read_only: bool = False
+    ):
+        """
+        Args:
+            directory: Journal directory (created if missing)
+            segment_bytes: Rotate to a new segment past this size
+                (default: MESSAGE_JOURNAL_SEGMENT_MB or 64 MB)
+            sync_interval: Seconds between background fsyncs; 0 syncs
+                on every append (default: MESSAGE_JOURNAL_SYNC_MS or 50ms)
+            sync_every: Also fsync once this many records are unsynced
+            read_only: Open for replay only, alongside a running writer
+                (sees the records written before it was opened)
+        """
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes or int(
+            float(os.environ.get("MESSAGE_JOURNAL_SEGMENT_MB", DEFAULT_SEGMENT_MB)) * 1024 * 1024
+        )
+        if sync_interval is None:
+            sync_interval = float(os.environ.get("MESSAGE_JOURNAL_SYNC_MS", DEFAULT_SYNC_MS)) / 1000
+        self.sync_interval = sync_interval
+        self.sync_every = 1 if sync_interval == 0 else sync_every
+        self.read_only = read_only
+
+        if self.segment_bytes < 1:
+            raise ValueError("segment_bytes must be at least 1")
+        if self.sync_interval < 0:
+            raise ValueError("sync_interval must be at least 0")
+        if self.sync_every < 1:
+            raise ValueError("sync_every must be at least 1")
+
+        self._lock_file = None
+        if read_only:
+            if not self.directory.is_dir():
+                raise FileNotFoundError(f"No journal at {self.directory}")
+        else:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._lock_file = open(self.directory / "journal.lock", "a")
+            try:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self._lock_file.close()
+                raise RuntimeError(
+                    f"Journal {self.directory} is open in another process (one writer per journal)"
+                ) from None
+
+        self._lock = threading.Lock()
+        self._segments: List[int] = []          # Base offsets, oldest first
+        self._segment_records: Dict[int, int] = {}
+        # conversation_id -> [(offset, segment base, byte position)]
+        self._index: Dict[str, List[Tuple[int, int, int]]] = {}
+        self._active_index: Dict[str, List[Tuple[int, int]]] = {}
+        self._unsynced = 0
+        self._closed = False
+        self._load()
+
+        self._stop = threading.Event()
+        self._flusher = None
+        if self.sync_interval > 0 and not read_only:
+            self._flusher = threading.Thread(target=self._flush_loop, name="journal-fsync", daemon=True)
+            self._flusher.start()
+
+    def append(self, message: Message) -> int:
+        """Write a message; returns its offset."""
+        record = _encode(message)
+        with self._lock:
+            if self._closed or self._file is None:
+                raise RuntimeError("Journal is closed" if self._closed else "Journal is read-only")
+            if self._position and self._position + len(record) > self.segment_bytes:
+                self._rotate()
+
+            offset = self._next_offset
+            self._file.write(record)
+            if message.conversation_id is not None:
+                self._add_to_index(message.conversation_id, offset, self._active, self._position)
+            self._position += len(record)
+            self._next_offset += 1
+            self._segment_records[self._active] += 1
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every:
+                self._sync()
+        return offset
+
+    def replay(
+        self,
+        start: int = 0,
+        conversation_id: Optional[str] = None
+    ) -> Iterator[Tuple[int, Message]]:
+        """
+        Stream (offset, message) pairs in journal order.
+
+        Only records written before the call are yielded, so it's safe to
+        replay while other threads keep appending.
+
+        Args:
+            start: First offset to yield
+            conversation_id: Only yield this conversation's messages
+        """
+        for offset, payload in self._payloads(start, conversation_id):
+            yield offset, Message.from_bytes(payload)
+
+    def conversation(self, conversation_id: str) -> List[Message]:
+        """All journaled messages in a conversation, oldest first."""
+        return [message for _, message in self.replay(conversation_id=conversation_id)]
+
+    def tail(self, limit: int) -> List[Message]:
+        """The newest limit messages, oldest first."""
+        start = max(len(self) - max(limit, 0), 0)
+        return [message for _, message in self.replay(start=start)] if limit > 0 else []
+
+    def flush(self):
+        """Write buffered records and fsync them."""
+        with self._lock:
+            if not self._closed:
+                self._sync()
+
+    def close(self):
+        """Fsync outstanding records and release the journal."""
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._lock:
+            if self._closed:
+                return
+            self._sync()
+            if self._file is not None:
+                self._file.close()
+            self._closed = True
+        if self._lock_file is not None:
+            self._lock_file.close()
+
+    def __len__(self) -> int:
+        return self._next_offset
+
+    def __enter__(self) -> "MessageJournal":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Record, segment and size counts."""
+        with self._lock:
+            sealed_bytes = sum(
+                _segment_path(self.directory, base).stat().st_size for base in self._segments[:-1]
+            )
+            return {
+                'directory': str(self.directory),
+                'records': self._next_offset,
+                'segments': len(self._segments),
+                'bytes': sealed_bytes + self._position,
+                'conversations': len(self._index),
+                'unsynced': self._unsynced,
+            }
+
+    # ------------------------------------------------------------------
+    # Reading
+
+    def _payloads(self, start: int, conversation_id: Optional[str]) -> Iterator[Tuple[int, bytes]]:
+        with self._lock:
+            if not self._closed and self._file is not None:
+                self._file.flush()  # Make buffered records visible to readers
+            segments = list(self._segments)
+            records = dict(self._segment_records)
+            active, active_end = self._active, self._position
+            entries = list(self._index.get(conversation_id, ())) if conversation_id is not None else None
+
+        if entries is not None:
+            yield from self._indexed_payloads([entry for entry in entries if entry[0] >= start])
+            return
+
+        for base in segments:
+            if base + records[base] <= start:
+                continue
+            end = active_end if base == active else None
+            path = _segment_path(self.directory, base)
+            for offset, (_, payload) in enumerate(_iter_segment(path, end), start=base):
+                if offset >= start:
+                    yield offset, payload
+
+    def _indexed_payloads(self, entries: List[Tuple[int, int, int]]) -> Iterator[Tuple[int, bytes]]:
+        file, file_base = None, None
+        try:
+            for offset, base, position in entries:
+                if base != file_base:
+                    if file is not None:
+                        file.close()
+                    path, file_base = _segment_path(self.directory, base), base
+                    file = open(path, "rb")
+                file.seek(position)
+                yield offset, _read_record(file, path, position)
+        finally:
+            if file is not None:
+                file.close()
+
+    # ------------------------------------------------------------------
+    # Writing
+
+    def _add_to_index(self, conversation_id: str, offset: int, base: int, position: int):
+        self._index.setdefault(conversation_id, []).append((offset, base, position))
+        self._active_index.setdefault(conversation_id, []).append((offset, position))
+
+    def _sync(self):
+        if self._unsynced and self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def _rotate(self):
+        """Seal the active segment (writing its index) and start a new one."""
+        self._sync()
+        self._file.close()
+        self._write_segment_index(self._active, self._segment_records[self._active], self._active_index)
+
+        self._active = self._next_offset
+        self._segments.append(self._active)
+        self._segment_records[self._active] = 0
+        self._active_index = {}
+        self._position = 0
+        self._file = open(_segment_path(self.directory, self._active), "ab", buffering=1024 * 1024)
+        self._sync_directory()
+
+    def _write_segment_index(self, base: int, records: int, index: Dict[str, List[Tuple[int, int]]]):
+        path = _segment_path(self.directory, base, ".idx")
+        temporary = path.with_suffix(".idx.tmp")
+        with open(temporary, "w") as file:
+            json.dump({'records': records, 'conversations': index}, file, separators=(",", ":"))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+
+    def _sync_directory(self):
+        descriptor = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.sync_interval):
+            with self._lock:
+                if self._closed:
+                    return
+                self._sync()
+
+    # ------------------------------------------------------------------
+    # Opening
+
+    def _load(self):
+        """Index sealed segments and recover the active one."""
+        bases = sorted(int(path.stem) for path in self.directory.glob("*.log"))
+        self._segments = bases or [0]
+        for base in self._segments[:-1]:
+            self._load_sealed(base)
+
+        self._active = self._segments[-1]
+        self._segment_records[self._active] = 0
+        path = _segment_path(self.directory, self._active)
+        self._position = 0
+        try:
+            for position, payload in _iter_segment(path) if path.exists() else ():
+                self._index_record(self._active, position, payload, self._active_index)
+                self._position = position + _HEADER.size + len(payload)
+        except JournalCorruptError as e:
+            # Torn write from a crash: drop the partial record
+            if not self.read_only:
+                print(f"⚠️  {e}; truncating the active segment there")
+        self._next_offset = self._active + self._segment_records[self._active]
+
+        if self.read_only:
+            self._file = None
+        else:
+            self._file = open(path, "ab", buffering=1024 * 1024)
+            self._file.truncate(self._position)
+
+    def _load_sealed(self, base: int):
+        index_path = _segment_path(self.directory, base, ".idx")
+        if index_path.exists():
+            with open(index_path) as file:
+                data = json.load(file)
+            self._segment_records[base] = data['records']
+            for conversation_id, entries in data['conversations'].items():
+                self._index.setdefault(conversation_id, []).extend(
+                    (offset, base, position) for offset, position in entries
+                )
+            return
+
+        # No index (e.g. crashed mid-rotation): rebuild it from the records
+        index: Dict[str, List[Tuple[int, int]]] = {}
+        self._segment_records[base] = 0
+        for position, payload in _iter_segment(_segment_path(self.directory, base)):
+            self._index_record(base, position, payload, index)
+        if not self.read_only:
+            self._write_segment_index(base, self._segment_records[base], index)
+
+    def _index_record(self, base: int, position: int, payload: bytes,
+                      segment_index: Dict[str, List[Tuple[int, int]]]):
+        offset = base + self._segment_records[base]
+        conversation_id = Message.from_bytes(payload).conversation_id
+        if conversation_id is not None:
+            self._index.setdefault(conversation_id, []).append((offset, base, position))
+            segment_index.setdefault(conversation_id, []).append((offset, position))
+        self._segment_records[base] += 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point.
+
+    Usage:
+        python -m agents.base.journal stats [--dir PATH]
+        python -m agents.base.journal replay [--dir PATH] [--start N] [--conversation ID]
+    """
+    parser = argparse.ArgumentParser(description="AI Flywheel message journal")
+    parser.add_argument(
+        "--dir",
+        default=os.environ.get("MESSAGE_JOURNAL_DIR", "./data/journal"),
+        help="Journal directory"
+    )
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    subcommands.add_parser("stats", help="Show record and segment counts")
+    replay_parser = subcommands.add_parser("replay", help="Print journaled messages as JSON lines")
+    replay_parser.add_argument("--start", type=int, default=0, help="First offset")
+    replay_parser.add_argument("--conversation", help="Only this conversation")
+    args = parser.parse_args(argv)
+
+    with MessageJournal(args.dir, read_only=True) as journal:
+        if args.command == "stats":
+            print(json.dumps(journal.get_stats(), indent=2))
+        else:
+            for offset, message in journal.replay(start=args.start, conversation_id=args.conversation):
+                sys.stdout.write(json.dumps({'offset': offset, **message.to_dict()}) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,318 @@
+"""
+Shared Knowledge Store - Decisions and patterns every agent can read
+
+Each agent's long-term memory is private (data/memory/<agent_id>.db). To
+learn what a specialist decided, a chief would have to message it and
+pay for an LLM turn. Instead, agents publish selected decisions and
+patterns (LongTermMemory.store_decision/store_pattern with publish=True)
+to one indexed SQLite store that every agent and process can read:
+
+    data/memory/knowledge.db   (KNOWLEDGE_DB_PATH)
+
+Reads go through a per-agent KnowledgeCache. It answers repeated queries
+from memory and drops its entries whenever the store changes, whether
+the change was made in this process or another one (SQLite's
+data_version).
+
+Usage:
+    store = get_knowledge_store()
+    store.publish('data-analyst', 'pattern', 'student-success',
+                  'Week 1 completers finish 90% of the time', confidence=0.87)
+
+    cache = KnowledgeCache(store)
+    cache.query(kind='pattern', agent_ids=['data-analyst'], min_confidence=0.8)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+DEFAULT_KNOWLEDGE_PATH = "./data/memory/knowledge.db"
+KINDS = ('decision', 'pattern')
+
+_COLUMNS = ('entry_id', 'agent_id', 'kind', 'topic', 'summary', 'details',
+            'confidence', 'outcome_value', 'published_at')
+
+
+class SharedKnowledgeStore:
+    """
+    Indexed store of the decisions and patterns agents chose to share.
+
+    Safe to use from several threads and processes (WAL mode). The
+    connection is opened on first use.
+    """
+
+    def __init__(self, path: str = DEFAULT_KNOWLEDGE_PATH):
+        """
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes = 0  # data_version doesn't count this connection's own commits
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """SQLite connection, opened (and the schema created) on first use."""
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=5.0)
+                    conn.execute('PRAGMA journal_mode=WAL')
+                    conn.execute('PRAGMA synchronous=NORMAL')
+                    self._init_database(conn)
+                    self._conn = conn
+        return self._conn
+
+    def _init_database(self, conn: sqlite3.Connection):
+        """Initialize the knowledge schema."""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS knowledge (
+                entry_id TEXT PRIMARY KEY,
+                agent_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                topic TEXT,
+                summary TEXT NOT NULL,
+                details TEXT,
+                confidence REAL,
+                outcome_value REAL,
+                published_at REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS knowledge_kind_topic '
+                     'ON knowledge (kind, topic, published_at)')
+        conn.execute('CREATE INDEX IF NOT EXISTS knowledge_agent '
+                     'ON knowledge (agent_id, kind, published_at)')
+        conn.commit()
+
+    def publish(self,
+                agent_id: str,
+                kind: str,
+                topic: Optional[str],
+                summary: str,
+                details: Optional[Dict[str, Any]] = None,
+                confidence: Optional[float] = None,
+                outcome_value: Optional[float] = None,
+                entry_id: Optional[str] = None) -> str:
+        """
+        Share a decision or pattern. Publishing an existing entry_id again
+        replaces it (e.g. once a decision's outcome is known).
+
+        Args:
+            agent_id: Agent the knowledge comes from
+            kind: 'decision' or 'pattern'
+            topic: Decision type or pattern type
+            summary: The decision or pattern itself
+            details: Context, rationale, examples...
+            confidence: Pattern confidence (0-1)
+            outcome_value: Measured outcome of a decision
+            entry_id: The decision_id/pattern_id in the agent's own memory
+
+        Returns:
+            The entry id
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown knowledge kind: {kind}. Expected one of {KINDS}")
+        entry_id = entry_id or f"{agent_id}:{time.time_ns()}"
+
+        conn = self.conn
+        with self._lock:
+            conn.execute('''
+                INSERT OR REPLACE INTO knowledge
+                (entry_id, agent_id, kind, topic, summary, details,
+                 confidence, outcome_value, published_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                entry_id, agent_id, kind, topic, summary,
+                json.dumps(details) if details else None,
+                confidence, outcome_value, time.time()
+            ))
+            conn.commit()
+            self._writes += 1
+        return entry_id
+
+    def retract(self, entry_id: str) -> bool:
+        """Stop sharing an entry. Returns whether it existed."""
+        conn = self.conn
+        with self._lock:
+            deleted = conn.execute('DELETE FROM knowledge WHERE entry_id = ?', (entry_id,)).rowcount
+            conn.commit()
+            self._writes += 1
+        return deleted > 0
+
+    def query(self,
+              kind: Optional[str] = None,
+              topic: Optional[str] = None,
+              agent_ids: Optional[List[str]] = None,
+              min_confidence: Optional[float] = None,
+              text: Optional[str] = None,
+              limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Shared knowledge, newest first.
+
+        Args:
+            kind: 'decision' or 'pattern' (default: both)
+            topic: Decision/pattern type
+            agent_ids: Agents it comes from (default: all)
+            min_confidence: Lowest pattern confidence
+            text: Substring of the summary
+            limit: Most entries to return
+        """
+        clauses, params = [], []
+        if kind is not None:
+            clauses.append('kind = ?')
+            params.append(kind)
+        if topic is not None:
+            clauses.append('topic = ?')
+            params.append(topic)
+        if agent_ids is not None:
+            if not agent_ids:
+                return []
+            clauses.append(f"agent_id IN ({','.join('?' * len(agent_ids))})")
+            params.extend(agent_ids)
+        if min_confidence is not None:
+            clauses.append('confidence >= ?')
+            params.append(min_confidence)
+        if text:
+            clauses.append('summary LIKE ?')
+            params.append(f"%{text}%")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+
+        conn = self.conn
+        with self._lock:
+            rows = conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM knowledge {where} "
+                "ORDER BY published_at DESC LIMIT ?",
+                (*params, limit)
+            ).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def get(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        """One entry by id."""
+        conn = self.conn
+        with self._lock:
+            row = conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM knowledge WHERE entry_id = ?", (entry_id,)
+            ).fetchone()
+        return self._entry(row) if row else None
+
+    def version(self) -> Tuple[int, int]:
+        """Changes whenever any connection, in any process, modifies the store."""
+        conn = self.conn
+        with self._lock:
+            return conn.execute('PRAGMA data_version').fetchone()[0], self._writes
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Entry counts by kind and by agent."""
+        conn = self.conn
+        with self._lock:
+            by_kind = dict(conn.execute('SELECT kind, COUNT(*) FROM knowledge GROUP BY kind'))
+            by_agent = dict(conn.execute('SELECT agent_id, COUNT(*) FROM knowledge GROUP BY agent_id'))
+        return {
+            'path': str(self.path),
+            'total_entries': sum(by_kind.values()),
+            'by_kind': by_kind,
+            'by_agent': by_agent,
+        }
+
+    def close(self):
+        """Close the connection (reopened on next use)."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @staticmethod
+    def _entry(row: Tuple) -> Dict[str, Any]:
+        entry = dict(zip(_COLUMNS, row))
+        entry['details'] = json.loads(entry['details']) if entry['details'] else {}
+        return entry
+
+
+class KnowledgeCache:
+    """
+    Read-through cache in front of the shared knowledge store.
+
+    Query results are kept (LRU) until the store changes. Results are
+    shared between callers, so treat them as read-only.
+
+    Usage:
+        cache = KnowledgeCache(get_knowledge_store())
+        patterns = cache.query(kind='pattern', min_confidence=0.8)
+    """
+
+    def __init__(self, store: SharedKnowledgeStore, max_entries: int = 256):
+        """
+        Args:
+            store: The shared knowledge store
+            max_entries: Distinct queries kept
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.store = store
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._results: "OrderedDict[Tuple, List[Dict[str, Any]]]" = OrderedDict()
+        self._version: Optional[Tuple[int, int]] = None
+        self._counters = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    def query(self,
+              kind: Optional[str] = None,
+              topic: Optional[str] = None,
+              agent_ids: Optional[List[str]] = None,
+              min_confidence: Optional[float] = None,
+              text: Optional[str] = None,
+              limit: int = 20) -> List[Dict[str, Any]]:
+        """SharedKnowledgeStore.query(), answered from cache when unchanged."""
+        key = (kind, topic, tuple(agent_ids) if agent_ids is not None else None,
+               min_confidence, text, limit)
+        version = self.store.version()
+        with self._lock:
+            if version != self._version:
+                if self._results:
+                    self._counters['invalidations'] += 1
+                self._results.clear()
+                self._version = version
+            cached = self._results.get(key)
+            if cached is not None:
+                self._results.move_to_end(key)
+                self._counters['hits'] += 1
+                return cached
+            self._counters['misses'] += 1
+
+        results = self.store.query(kind, topic, agent_ids, min_confidence, text, limit)
+        with self._lock:
+            if self._version == version:
+                self._results[key] = results
+                if len(self._results) > self.max_entries:
+                    self._results.popitem(last=False)
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit, miss and invalidation counts."""
+        with self._lock:
+            return {'cached_queries': len(self._results), **self._counters}
+
+
+# Global knowledge store (singleton per process)
+_global_knowledge_store = None
+_global_lock = threading.Lock()
+
+
+def get_knowledge_store() -> SharedKnowledgeStore:
+    """Get the process-wide knowledge store (KNOWLEDGE_DB_PATH)."""
+    global _global_knowledge_store
+    with _global_lock:
+        if _global_knowledge_store is None:
+            _global_knowledge_store = SharedKnowledgeStore(
+                os.environ.get("KNOWLEDGE_DB_PATH", DEFAULT_KNOWLEDGE_PATH)
+            )
+        return _global_knowledge_store
@@ -5,6 +5,17 @@ Two-tier memory system:
 1. Short-term: In-memory (volatile, current session)
 2. Long-term: Persistent (PostgreSQL + ChromaDB for semantic search)
 
+Semantic memories of every agent live in one ChromaDB store
+(<CHROMA_PERSIST_DIRECTORY>/agency, default data/memory/vector/agency;
+collection CHROMA_COLLECTION_NAME, default "agency_memories"), tagged
+with the owning agent_id. A process opens the store once for all its
+agents. The embedded store supports a single writer process, so with
+CHROMA_HOST set every process goes through that Chroma server instead
+(the supervisor starts one for its workers). Agents search their own memories by default;
+chiefs can search several agents' memories in a single query. An agent's
+store from the old one-store-per-agent layout (vector/<agent_id>) is
+copied into the shared collection the first time it is opened.
+
 Following Anthropic's best practices:
 - Just-in-time retrieval (don't load everything)
 - Semantic search for relevant context
@@ -14,19 +25,103 @@ Following Anthropic's best practices:
 import os
 import json
 import sqlite3
+import importlib.util
+import threading
+import time
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from collections import defaultdict
 import uuid
 
-try:
+from .consolidation import MemoryConsolidator
+from .knowledge import SharedKnowledgeStore, get_knowledge_store
+
+# chromadb is slow to import, so it is only imported when an agent first
+# touches its vector store
+CHROMA_AVAILABLE = importlib.util.find_spec("chromadb") is not None
+_chroma_warned = False
+
+
+def _import_chromadb():
+    """The chromadb module, or None (warning once) if it isn't installed."""
+    global _chroma_warned
+    if not CHROMA_AVAILABLE:
+        if not _chroma_warned:
+            _chroma_warned = True
+            print("⚠️  ChromaDB not available. Semantic search will be limited.")
+        return None
     import chromadb
-    from chromadb.config import Settings
-    CHROMA_AVAILABLE = True
-except ImportError:
-    CHROMA_AVAILABLE = False
-    print("⚠️  ChromaDB not available. Semantic search will be limited.")
+    return chromadb
+
+
+AGENCY_COLLECTION = "agency_memories"
+
+# (vector store path, collection name) -> (client, collection), shared by
+# every agent in the process
+_vector_stores: Dict[Any, Any] = {}
+_vector_stores_lock = threading.Lock()
+
+
+def vector_store_path(db_path: str = "./data/memory") -> Path:
+    """Directory of the shared store (<CHROMA_PERSIST_DIRECTORY or db_path/vector>/agency)."""
+    return Path(os.environ.get("CHROMA_PERSIST_DIRECTORY") or Path(db_path) / "vector") / "agency"
+
+
+def get_vector_store(vector_path: Path, collection_name: Optional[str] = None):
+    """
+    The process-wide ChromaDB client and agency collection.
+
+    With CHROMA_HOST set (port CHROMA_PORT, default 8000) this is an HTTP
+    client of that server; otherwise the embedded store at vector_path,
+    which only one process may write.
+
+    Args:
+        vector_path: Store directory (embedded store only)
+        collection_name: Collection (default: CHROMA_COLLECTION_NAME or "agency_memories")
+
+    Returns:
+        (client, collection), or (None, None) without chromadb
+    """
+    host = os.environ.get("CHROMA_HOST")
+    port = int(os.environ.get("CHROMA_PORT", 8000))
+    location = f"http://{host}:{port}" if host else str(Path(vector_path).resolve())
+    name = collection_name or os.environ.get("CHROMA_COLLECTION_NAME") or AGENCY_COLLECTION
+    with _vector_stores_lock:
+        if (location, name) not in _vector_stores:
+            chromadb = _import_chromadb()
+            if chromadb is None:
+                return None, None
+            from chromadb.config import Settings
+
+            settings = Settings(anonymized_telemetry=False)
+            if host:
+                client = chromadb.HttpClient(host=host, port=port, settings=settings)
+            else:
+                Path(location).mkdir(parents=True, exist_ok=True)
+                client = chromadb.PersistentClient(path=location, settings=settings)
+            collection = client.get_or_create_collection(
+                name=name,
+                metadata={"hnsw:space": "cosine"}
+            )
+            _vector_stores[(location, name)] = (client, collection)
+        return _vector_stores[(location, name)]
+
+
+def _agent_filter(agent_ids: Optional[List[str]],
+                  filters: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """Chroma where-clause for memories of agent_ids (None: all agents) matching filters."""
+    clauses = []
+    if agent_ids is not None:
+        if len(agent_ids) == 1:
+            clauses.append({'agent_id': agent_ids[0]})
+        else:
+            clauses.append({'agent_id': {'$in': list(agent_ids)}})
+    for key, value in (filters or {}).items():
+        clauses.append({key: value})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {'$and': clauses}
 
 
 class ShortTermMemory:
@@ -172,37 +267,124 @@ class LongTermMemory:
     - Semantic memory (for similarity search)
     """
 
-    def __init__(self, agent_id: str, db_path: str = "./data/memory"):
+    def __init__(self, agent_id: str, db_path: str = "./data/memory",
+                 knowledge: Optional[SharedKnowledgeStore] = None):
         self.agent_id = agent_id
         self.db_path = Path(db_path)
-        self.db_path.mkdir(parents=True, exist_ok=True)
-
-        # SQLite for structured data
+        # Where published decisions/patterns go (default: get_knowledge_store())
+        self.knowledge = knowledge
         self.db_file = self.db_path / f"{agent_id}.db"
-        self.conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
-        self._init_database()
-
-        # ChromaDB for semantic search
-        if CHROMA_AVAILABLE:
-            self.chroma_path = self.db_path / "vector" / agent_id
-            self.chroma_path.mkdir(parents=True, exist_ok=True)
+        self.chroma_path = vector_store_path(db_path)
+        # Where this agent's own store lived before the store was shared
+        self.legacy_chroma_path = self.db_path / "vector" / agent_id
+
+        # SQLite (structured data) and ChromaDB (semantic search) are
+        # opened on first use, not when the agent is constructed
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._vector_ready = False
+        self._chroma_client = None
+        self._collection = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """SQLite connection, opened (and the schema created) on first use."""
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    self.db_path.mkdir(parents=True, exist_ok=True)
+                    conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+                    self._init_database(conn)
+                    self._conn = conn
+        return self._conn
+
+    @property
+    def chroma_client(self):
+        """Shared ChromaDB client, created on first use (None without chromadb)."""
+        self._init_vector_store()
+        return self._chroma_client
+
+    @property
+    def collection(self):
+        """Shared agency memory collection (None without chromadb)."""
+        self._init_vector_store()
+        return self._collection
+
+    def _init_vector_store(self):
+        if self._vector_ready:
+            return
+        self.conn  # vector_ids lives in SQLite; open it before taking the lock
+        with self._lock:
+            if not self._vector_ready:
+                self._chroma_client, self._collection = get_vector_store(self.chroma_path)
+                if self._collection is not None:
+                    if self.legacy_chroma_path.is_dir():
+                        self._migrate_legacy_vectors()
+                    self._backfill_vector_ids()
+                self._vector_ready = True
+
+    def _backfill_vector_ids(self, batch_size: int = 1000):
+        """
+        Record the ids of this agent's vectors stored before vector_ids
+        was kept (one cheap probe when there is nothing to do).
+        """
+        try:
+            if self.conn.execute('SELECT 1 FROM vector_ids LIMIT 1').fetchone() is not None:
+                return
+            where = {'agent_id': self.agent_id}
+            offset = 0
+            while True:
+                ids = self._collection.get(where=where, limit=batch_size, offset=offset, include=[])['ids']
+                if not ids:
+                    break
+                self._record_vector_ids(ids)
+                offset += len(ids)
+        except Exception as e:
+            print(f"⚠️  Could not count {self.agent_id}'s semantic memories: {e}")
 
-            self.chroma_client = chromadb.PersistentClient(
-                path=str(self.chroma_path),
-                settings=Settings(anonymized_telemetry=False)
-            )
+    def _record_vector_ids(self, ids: List[str]):
+        self.conn.executemany('INSERT OR IGNORE INTO vector_ids (doc_id) VALUES (?)', [(i,) for i in ids])
+        self.conn.commit()
 
-            self.collection = self.chroma_client.get_or_create_collection(
-                name=f"{agent_id}_memories",
-                metadata={"hnsw:space": "cosine"}
-            )
-        else:
-            self.chroma_client = None
-            self.collection = None
+    def _migrate_legacy_vectors(self, batch_size: int = 500):
+        """
+        Copy this agent's old vector/<agent_id> store into the shared
+        collection (embeddings included, so nothing is re-embedded), then
+        rename it to vector/<agent_id>.migrated so it's only done once.
+        """
+        legacy = self.legacy_chroma_path
+        try:
+            import chromadb
+            from chromadb.config import Settings
+
+            client = chromadb.PersistentClient(path=str(legacy), settings=Settings(anonymized_telemetry=False))
+            old = client.get_or_create_collection(name=f"{self.agent_id}_memories")
+            migrated = 0
+            while True:
+                batch = old.get(limit=batch_size, offset=migrated,
+                                include=['documents', 'metadatas', 'embeddings'])
+                if not batch['ids']:
+                    break
+                metadatas = []
+                for metadata in batch['metadatas']:
+                    metadata = dict(metadata or {})
+                    try:
+                        created_at = datetime.fromisoformat(metadata['timestamp']).timestamp()
+                    except (KeyError, TypeError, ValueError):
+                        created_at = time.time()
+                    metadatas.append({**metadata, 'agent_id': self.agent_id, 'created_at': created_at})
+                self._collection.upsert(ids=batch['ids'], documents=batch['documents'],
+                                        embeddings=batch['embeddings'], metadatas=metadatas)
+                self._record_vector_ids(batch['ids'])
+                migrated += len(batch['ids'])
+            legacy.rename(legacy.with_name(f"{legacy.name}.migrated"))
+            print(f"📦 Migrated {migrated} semantic memories of {self.agent_id} into the shared store")
+        except Exception as e:
+            print(f"⚠️  Could not migrate {legacy} into the shared vector store: {e}")
 
-    def _init_database(self):
+    def _init_database(self, conn: sqlite3.Connection):
         """Initialize SQLite database schema."""
-        cursor = self.conn.cursor()
+        cursor = conn.cursor()
 
         # Conversation history
         cursor.execute('''
@@ -273,7 +455,25 @@ class LongTermMemory:
             )
         ''')
 
-        self.conn.commit()
+        # Ids of this agent's documents in the shared vector store, so
+        # get_stats() can count them without listing the collection
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS vector_ids (
+                doc_id TEXT PRIMARY KEY
+            )
+        ''')
+
+        # Conversation history lookups and consolidation/pruning scans
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS interactions_conversation
+            ON interactions (conversation_id, timestamp)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS interactions_timestamp
+            ON interactions (timestamp)
+        ''')
+
+        conn.commit()
 
     def store_interaction(self,
                          message: Any,
@@ -326,8 +526,10 @@ class LongTermMemory:
                           summary: str,
                           participants: List[str],
                           key_insights: List[str],
-                          outcome: Optional[str] = None):
-        """Store conversation summary."""
+                          outcome: Optional[str] = None,
+                          started_at: Optional[datetime] = None,
+                          completed_at: Optional[datetime] = None):
+        """Store (or replace) a conversation summary."""
         cursor = self.conn.cursor()
         cursor.execute('''
             INSERT OR REPLACE INTO conversations
@@ -336,8 +538,8 @@ class LongTermMemory:
             VALUES (?, ?, ?, ?, ?, ?, ?)
         ''', (
             conversation_id,
-            datetime.now(),
-            datetime.now(),
+            started_at or datetime.now(),
+            completed_at or datetime.now(),
             json.dumps(participants),
             summary,
             outcome,
@@ -354,7 +556,8 @@ class LongTermMemory:
                     'type': 'conversation',
                     'conversation_id': conversation_id,
                     'timestamp': datetime.now().isoformat()
-                }
+                },
+                doc_id=f"{self.agent_id}_conversation_{conversation_id}"
             )
 
     def store_decision(self,
@@ -363,8 +566,14 @@ class LongTermMemory:
                       decision: str,
                       rationale: str,
                       outcome_metric: Optional[str] = None,
-                      outcome_value: Optional[float] = None):
-        """Store a decision made by the agent."""
+                      outcome_value: Optional[float] = None,
+                      publish: bool = False):
+        """
+        Store a decision made by the agent.
+
+        With publish=True it is also shared with every agent through the
+        knowledge store.
+        """
         decision_id = str(uuid.uuid4())
 
         cursor = self.conn.cursor()
@@ -397,14 +606,28 @@ class LongTermMemory:
                 }
             )
 
+        if publish:
+            self._knowledge_store().publish(
+                self.agent_id, 'decision', decision_type, decision,
+                details={'context': context, 'rationale': rationale, 'outcome_metric': outcome_metric},
+                outcome_value=outcome_value,
+                entry_id=decision_id
+            )
+
         return decision_id
 
     def store_pattern(self,
                      pattern_type: str,
                      description: str,
                      confidence: float,
-                     examples: List[str]):
-        """Store a learned pattern."""
+                     examples: List[str],
+                     publish: bool = False):
+        """
+        Store a learned pattern.
+
+        With publish=True it is also shared with every agent through the
+        knowledge store.
+        """
         pattern_id = str(uuid.uuid4())
 
         cursor = self.conn.cursor()
@@ -423,21 +646,40 @@ class LongTermMemory:
 
         self.conn.commit()
 
+        if publish:
+            self._knowledge_store().publish(
+                self.agent_id, 'pattern', pattern_type, description,
+                details={'examples': examples},
+                confidence=confidence,
+                entry_id=pattern_id
+            )
+
         return pattern_id
 
-    def _store_semantic(self, text: str, metadata: Dict[str, Any]):
-        """Store text in vector database for semantic search."""
+    def _knowledge_store(self) -> SharedKnowledgeStore:
+        if self.knowledge is None:
+            self.knowledge = get_knowledge_store()
+        return self.knowledge
+
+    def _store_semantic(self, text: str, metadata: Dict[str, Any], doc_id: Optional[str] = None):
+        """
+        Store text in vector database for semantic search.
+
+        A given doc_id replaces the earlier document with that id.
+        """
         if self.collection is None:
             return
 
-        doc_id = f"{self.agent_id}_{datetime.now().timestamp()}_{uuid.uuid4().hex[:8]}"
+        doc_id = doc_id or f"{self.agent_id}_{datetime.now().timestamp()}_{uuid.uuid4().hex[:8]}"
 
         try:
-            self.collection.add(
+            # created_at is numeric so retention can prune with $lt
+            self.collection.upsert(
                 documents=[text],
-                metadatas=[metadata],
+                metadatas=[{**metadata, 'agent_id': self.agent_id, 'created_at': time.time()}],
                 ids=[doc_id]
             )
+            self._record_vector_ids([doc_id])
         except Exception as e:
             print(f"⚠️  Error storing in ChromaDB: {e}")
 
@@ -456,6 +698,31 @@ class LongTermMemory:
         Returns:
             List of relevant memories
         """
+        return self._query(query, n_results, _agent_filter([self.agent_id], filters))
+
+    def search_agents(self,
+                      query: str,
+                      agent_ids: Optional[List[str]] = None,
+                      n_results: int = 5,
+                      filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Semantic search across several agents' memories in one query.
+
+        Args:
+            query: Search query
+            agent_ids: Agents whose memories to search (default: all agents)
+            n_results: Number of results to return
+            filters: Optional metadata filters
+
+        Returns:
+            List of relevant memories, each with the 'agent_id' it belongs to
+        """
+        if agent_ids is not None and not agent_ids:
+            return []
+        return self._query(query, n_results, _agent_filter(agent_ids, filters))
+
+    def _query(self, query: str, n_results: int,
+               where: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
         if self.collection is None:
             return []
 
@@ -463,16 +730,18 @@ class LongTermMemory:
             results = self.collection.query(
                 query_texts=[query],
                 n_results=n_results,
-                where=filters if filters else None
+                where=where
             )
 
             # Format results
             memories = []
             if results and results['documents']:
                 for i, doc in enumerate(results['documents'][0]):
+                    metadata = results['metadatas'][0][i] if results['metadatas'] else {}
                     memories.append({
                         'content': doc,
-                        'metadata': results['metadatas'][0][i] if results['metadatas'] else {},
+                        'agent_id': metadata.get('agent_id'),
+                        'metadata': metadata,
                         'distance': results['distances'][0][i] if results['distances'] else None
                     })
 
@@ -584,14 +853,13 @@ class LongTermMemory:
         cursor.execute('DELETE FROM decisions')
         cursor.execute('DELETE FROM patterns')
         cursor.execute('DELETE FROM memory_store')
+        cursor.execute('DELETE FROM vector_ids')
         self.conn.commit()
 
         if self.collection is not None:
             try:
-                self.chroma_client.delete_collection(f"{self.agent_id}_memories")
-                self.collection = self.chroma_client.create_collection(
-                    name=f"{self.agent_id}_memories"
-                )
+                # The collection is shared; remove only this agent's memories
+                self.collection.delete(where={'agent_id': self.agent_id})
             except:
                 pass
 
@@ -614,13 +882,21 @@ class LongTermMemory:
         stats['total_patterns'] = cursor.fetchone()[0]
 
         if self.collection is not None:
-            try:
-                stats['semantic_memories'] = self.collection.count()
-            except:
-                stats['semantic_memories'] = 0
+            cursor.execute('SELECT COUNT(*) FROM vector_ids')
+            stats['semantic_memories'] = cursor.fetchone()[0]
 
         return stats
 
+    def count_interactions(self) -> int:
+        """Number of stored interactions (without opening the vector store)."""
+        return self.conn.execute('SELECT COUNT(*) FROM interactions').fetchone()[0]
+
+    def has_conversation(self, conversation_id: str) -> bool:
+        """Whether any interaction of the conversation is stored."""
+        return self.conn.execute(
+            'SELECT 1 FROM interactions WHERE conversation_id = ? LIMIT 1', (conversation_id,)
+        ).fetchone() is not None
+
 
 class MemoryManager:
     """
@@ -675,6 +951,17 @@ class MemoryManager:
 
         return "\n".join(context_parts)
 
+    def search_agents(self,
+                      query: str,
+                      agent_ids: Optional[List[str]] = None,
+                      limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Semantic search across agents' memories (default: all agents).
+
+        Each result carries the 'agent_id' whose memory it is.
+        """
+        return self.long_term.search_agents(query, agent_ids=agent_ids, n_results=limit)
+
     def get_conversation_history(self, conversation_id: str) -> str:
         """Get full conversation history."""
         # Check short-term first
@@ -685,25 +972,31 @@ class MemoryManager:
         # Fall back to long-term
         return self.long_term.get_conversation_history(conversation_id)
 
-    def consolidate(self):
-        """
-        Consolidate short-term memories to long-term.
+    def has_conversation(self, conversation_id: str) -> bool:
+        """Whether the agent has any history for a conversation."""
+        if self.short_term.retrieve(f"conversation_{conversation_id}") is not None:
+            return True
+        return self.long_term.has_conversation(conversation_id)
 
-        Called periodically (e.g., end of day) to:
-        - Move completed conversations to long-term
-        - Extract patterns from recent data
-        - Summarize and archive
+    def consolidate(self, **options) -> Dict[str, int]:
         """
-        # Get all conversations from short-term
-        conversations = self.short_term.get_all_conversations()
+        Consolidate memory now (see consolidation.py).
 
-        for conv_id, conv_data in conversations.items():
-            # TODO: Implement summarization logic
-            # For now, just mark as consolidated
-            pass
+        Summarizes quiet conversations, extracts and dedupes patterns, and
+        prunes interactions and vectors past the retention window. Runs in
+        the background on schedule once the agent is started.
+
+        Args:
+            **options: Passed to MemoryConsolidator (retention_days, chunk_size...)
+
+        Returns:
+            Counts of what was summarized, merged and pruned
+        """
+        report = MemoryConsolidator(self.long_term, **options).run()
 
         # Clear old short-term data (older than 1 day)
         self.short_term.clear_old_data(datetime.now() - timedelta(days=1))
+        return report
 
     def get_stats(self) -> Dict[str, Any]:
         """Get combined memory statistics."""
@@ -719,7 +1012,7 @@ class MemoryManager:
 
     def get_interaction_count(self) -> int:
         """Get total number of interactions stored."""
-        return self.long_term.get_stats().get('total_interactions', 0)
+        return self.long_term.count_interactions()
 
     def clear(self):
         """Clear all memory (use with caution!)."""
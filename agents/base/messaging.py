@@ -2,13 +2,20 @@
 Messaging System - Agent-to-agent communication
 
 Simplified version of FIPA ACL for agent coordination.
-Agents can send messages to each other asynchronously.
+Agents can send messages to each other asynchronously, or publish
+INFORM events on topics that other agents subscribe to.
 """
 
-from dataclasses import dataclass, field
-from typing import Dict, Any, Optional, Callable, List
+from collections import Counter, deque
+from itertools import islice
+from typing import Dict, Any, Optional, Callable, Iterator, List
 from datetime import datetime
 from enum import Enum
+import json
+import os
+import struct
+import threading
+import time
 import uuid
 
 
@@ -24,22 +31,96 @@ class MessageType(Enum):
     STATUS = "status"            # Status update
 
 
-@dataclass
+# Binary codec (Message.to_bytes): version, flags, one uint32 length per
+# field, then the fields' bytes back to back
+_CODEC_VERSION = 1
+_PREFIX = struct.Struct(">BB")
+_FLOAT = struct.Struct(">d")
+_HAS_CONVERSATION = 0x01
+_HAS_REPLY_TO = 0x02
+_HAS_METADATA = 0x04
+_RAW_TIMESTAMP = 0x08
+_LENGTHS = {count: struct.Struct(f">{count}I") for count in range(6, 10)}
+_encode_metadata = json.JSONEncoder(separators=(',', ':'), default=str).encode
+_decode_metadata = json.JSONDecoder().decode
+
+
 class Message:
     """
     A message between agents (or human).
 
     Simplified FIPA ACL structure optimized for our use case.
+
+    Slotted to keep per-message overhead low. A new message records only
+    time.time(); the ISO timestamp and the uuid4 message_id are built the
+    first time they're read.
     """
-    sender: str                                    # Agent ID or 'human'
-    receiver: str                                  # Agent ID or 'human'
-    content: str                                   # The actual message
-    message_type: str = "request"                  # Type of message
-    conversation_id: Optional[str] = None          # Group related messages
-    in_reply_to: Optional[str] = None             # Message this responds to
-    metadata: Dict[str, Any] = field(default_factory=dict)  # Additional data
-    timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
-    message_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+
+    __slots__ = (
+        'sender', 'receiver', 'content', 'message_type', 'conversation_id',
+        'in_reply_to', 'metadata', '_timestamp', '_message_id'
+    )
+    _FIELDS = (
+        'sender', 'receiver', 'content', 'message_type', 'conversation_id',
+        'in_reply_to', 'metadata', 'timestamp', 'message_id'
+    )
+    __hash__ = None  # Mutable, like the dataclass it replaced
+
+    def __init__(self,
+                 sender: str,
+                 receiver: str,
+                 content: str,
+                 message_type: str = "request",
+                 conversation_id: Optional[str] = None,
+                 in_reply_to: Optional[str] = None,
+                 metadata: Optional[Dict[str, Any]] = None,
+                 timestamp: Optional[str] = None,
+                 message_id: Optional[str] = None):
+        self.sender = sender                        # Agent ID or 'human'
+        self.receiver = receiver                    # Agent ID or 'human'
+        self.content = content                      # The actual message
+        self.message_type = message_type            # Type of message
+        self.conversation_id = conversation_id      # Group related messages
+        self.in_reply_to = in_reply_to              # Message this responds to
+        self.metadata = metadata if metadata is not None else {}  # Additional data
+        self._timestamp = timestamp if timestamp is not None else time.time()
+        self._message_id = message_id
+
+    @property
+    def timestamp(self) -> str:
+        """ISO-format creation time."""
+        timestamp = self._timestamp
+        if timestamp.__class__ is float:
+            timestamp = self._timestamp = datetime.fromtimestamp(timestamp).isoformat()
+        return timestamp
+
+    @timestamp.setter
+    def timestamp(self, value: str):
+        self._timestamp = value
+
+    @property
+    def message_id(self) -> str:
+        """Unique id (uuid4), generated on first use."""
+        if self._message_id is None:
+            self._message_id = str(uuid.uuid4())
+        return self._message_id
+
+    @message_id.setter
+    def message_id(self, value: str):
+        self._message_id = value
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._FIELDS)
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self._FIELDS)
+        return f"Message({fields})"
+
+    def __reduce__(self):
+        # Fix the lazy id and timestamp so copies and pickles keep them
+        return (self.__class__, tuple(getattr(self, name) for name in self._FIELDS))
 
     @classmethod
     def request(cls,
@@ -111,6 +192,16 @@ class Message:
             **kwargs
         )
 
+    def copy_to(self, receiver: str) -> 'Message':
+        """
+        The same message addressed to another receiver (e.g. for broadcast).
+
+        The copy gets its own id and timestamp; content and metadata are
+        shared with the original, not copied.
+        """
+        return Message(self.sender, receiver, self.content, self.message_type,
+                       self.conversation_id, None, self.metadata)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert message to dictionary."""
         return {
@@ -125,73 +216,462 @@ class Message:
             'timestamp': self.timestamp
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Message':
+        """Rebuild a message from to_dict() output (e.g. received over a transport)."""
+        return cls(
+            sender=data['sender'],
+            receiver=data['receiver'],
+            content=data['content'],
+            message_type=data.get('message_type', MessageType.REQUEST.value),
+            conversation_id=data.get('conversation_id'),
+            in_reply_to=data.get('in_reply_to'),
+            metadata=data.get('metadata') or {},
+            timestamp=data.get('timestamp') or None,
+            message_id=data.get('message_id') or None
+        )
+
+    def to_bytes(self) -> bytes:
+        """Compact binary encoding (see from_bytes); smaller and faster than JSON."""
+        flags = 0
+        timestamp = self._timestamp
+        if timestamp.__class__ is float:
+            flags |= _RAW_TIMESTAMP
+            timestamp = _FLOAT.pack(timestamp)
+        else:
+            timestamp = timestamp.encode()
+        fields = [
+            self.message_id.encode(), self.sender.encode(), self.receiver.encode(),
+            self.content.encode(), self.message_type.encode(), timestamp
+        ]
+        if self.conversation_id is not None:
+            flags |= _HAS_CONVERSATION
+            fields.append(self.conversation_id.encode())
+        if self.in_reply_to is not None:
+            flags |= _HAS_REPLY_TO
+            fields.append(self.in_reply_to.encode())
+        if self.metadata:
+            flags |= _HAS_METADATA
+            fields.append(_encode_metadata(self.metadata).encode())
+
+        return b''.join((
+            _PREFIX.pack(_CODEC_VERSION, flags),
+            _LENGTHS[len(fields)].pack(*map(len, fields)),
+            *fields
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Message':
+        """
+        Rebuild a message from to_bytes() output.
+
+        Raises:
+            ValueError: data isn't a message encoded by to_bytes()
+        """
+        try:
+            version, flags = _PREFIX.unpack_from(data)
+            if version != _CODEC_VERSION:
+                raise ValueError(f"Unsupported message encoding version {version}")
+            lengths = _LENGTHS[
+                6 + bool(flags & _HAS_CONVERSATION) + bool(flags & _HAS_REPLY_TO) + bool(flags & _HAS_METADATA)
+            ]
+            position = _PREFIX.size + lengths.size
+            fields = []
+            for length in lengths.unpack_from(data, _PREFIX.size):
+                fields.append(data[position:position + length])
+                position += length
+            if position != len(data):
+                raise ValueError(f"Expected {position} bytes, got {len(data)}")
+
+            message_id, sender, receiver, content, message_type, timestamp, *optional = fields
+            optional.reverse()
+            return cls(
+                sender.decode(), receiver.decode(), content.decode(), message_type.decode(),
+                optional.pop().decode() if flags & _HAS_CONVERSATION else None,
+                optional.pop().decode() if flags & _HAS_REPLY_TO else None,
+                _decode_metadata(optional.pop().decode()) if flags & _HAS_METADATA else {},
+                _FLOAT.unpack(timestamp)[0] if flags & _RAW_TIMESTAMP else timestamp.decode(),
+                message_id.decode()
+            )
+        except (struct.error, UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError(f"Malformed message bytes: {e}") from None
+
+
+class MessageLog:
+    """
+    Fixed-capacity message history with a conversation index.
+
+    A deque holds the newest max_size messages; the oldest is evicted
+    in O(1) as each new one arrives. Each conversation keeps its own
+    deque of messages (in log order), and per-type counts are updated on
+    append and eviction, so lookups never scan the whole log.
+    """
+
+    def __init__(self, max_size: int = 1000):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self._messages: deque = deque()
+        self._conversations: Dict[str, deque] = {}
+        self._type_counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def append(self, message: Message):
+        """Add a message, evicting the oldest if the log is full."""
+        with self._lock:
+            if len(self._messages) == self.max_size:
+                self._evict()
+            self._messages.append(message)
+            self._type_counts[message.message_type] += 1
+            if message.conversation_id is not None:
+                conversation = self._conversations.get(message.conversation_id)
+                if conversation is None:
+                    conversation = self._conversations[message.conversation_id] = deque()
+                conversation.append(message)
+
+    def conversation(self, conversation_id: str) -> List[Message]:
+        """Logged messages in a conversation, oldest first (O(k))."""
+        with self._lock:
+            return list(self._conversations.get(conversation_id, ()))
+
+    def recent(self, limit: int = 50) -> List[Message]:
+        """The newest limit messages, oldest first (O(limit))."""
+        with self._lock:
+            newest = list(islice(reversed(self._messages), max(limit, 0)))
+        newest.reverse()
+        return newest
+
+    def type_counts(self) -> Dict[str, int]:
+        """Logged messages per message type."""
+        with self._lock:
+            return {message_type: n for message_type, n in self._type_counts.items() if n}
+
+    @property
+    def conversation_count(self) -> int:
+        return len(self._conversations)
+
+    def clear(self):
+        with self._lock:
+            self._messages.clear()
+            self._conversations.clear()
+            self._type_counts.clear()
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __iter__(self) -> Iterator[Message]:
+        with self._lock:
+            return iter(list(self._messages))
+
+    def _evict(self):
+        oldest = self._messages.popleft()
+        self._type_counts[oldest.message_type] -= 1
+        if oldest.conversation_id is not None:
+            # The oldest logged message is also the oldest in its conversation
+            conversation = self._conversations[oldest.conversation_id]
+            conversation.popleft()
+            if not conversation:
+                del self._conversations[oldest.conversation_id]
+
+
+def topic_matches(pattern: str, topic: str) -> bool:
+    """
+    Whether a topic matches a subscription pattern.
+
+    Topics are dot-separated words ("cohort.q4-2025.health_changed").
+    In patterns, '*' matches exactly one word and '#' zero or more
+    ("cohort.*.health_changed", "cohort.#").
+    """
+    return _match_words(pattern.split('.'), topic.split('.'))
+
+
+def _match_words(pattern: List[str], topic: List[str]) -> bool:
+    if not pattern:
+        return not topic
+    head, rest = pattern[0], pattern[1:]
+    if head == '#':
+        return any(_match_words(rest, topic[i:]) for i in range(len(topic) + 1))
+    return bool(topic) and head in ('*', topic[0]) and _match_words(rest, topic[1:])
+
+
+def _check_topic(topic: str, wildcards: bool):
+    words = topic.split('.')
+    if not all(words):
+        raise ValueError(f"Invalid topic '{topic}': expected dot-separated words")
+    if not wildcards and any(word in ('*', '#') for word in words):
+        raise ValueError(f"Invalid topic '{topic}': wildcards are only allowed in subscriptions")
+
+
+class TopicRouter:
+    """
+    Topic subscriptions: which agents receive a published topic.
+
+    Matches are cached per topic (and the cache dropped whenever
+    subscriptions change), so routing a busy topic is a dict lookup.
+    """
+
+    def __init__(self):
+        self._subscriptions: Dict[str, set] = {}   # pattern -> agent ids
+        self._cache: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, agent_id: str, pattern: str):
+        _check_topic(pattern, wildcards=True)
+        with self._lock:
+            self._subscriptions.setdefault(pattern, set()).add(agent_id)
+            self._cache.clear()
+
+    def unsubscribe(self, agent_id: str, pattern: Optional[str] = None):
+        """Drop one subscription, or all of an agent's (pattern=None)."""
+        with self._lock:
+            patterns = [pattern] if pattern is not None else list(self._subscriptions)
+            for name in patterns:
+                agents = self._subscriptions.get(name)
+                if agents is not None:
+                    agents.discard(agent_id)
+                    if not agents:
+                        del self._subscriptions[name]
+            self._cache.clear()
+
+    def route(self, topic: str) -> tuple:
+        """Agent ids subscribed to a topic, in a stable order."""
+        agents = self._cache.get(topic)
+        if agents is None:
+            _check_topic(topic, wildcards=False)
+            with self._lock:
+                matched = set()
+                for pattern, subscribers in self._subscriptions.items():
+                    if topic_matches(pattern, topic):
+                        matched |= subscribers
+                agents = self._cache[topic] = tuple(sorted(matched))
+        return agents
+
+    def subscriptions(self) -> Dict[str, List[str]]:
+        with self._lock:
+            return {pattern: sorted(agents) for pattern, agents in self._subscriptions.items()}
+
 
 class MessageBus:
     """
     Central message routing system.
 
     Agents register with the bus and can send messages to each other.
-    The bus routes messages to the appropriate agent's handler.
+    The bus routes messages to the appropriate agent's handler through a
+    transport (see transport.py): in-process by default, or a Unix socket
+    router / AMQP broker when agents run in separate processes.
     """
 
-    def __init__(self):
+    def __init__(self, transport=None, timeout: Optional[float] = None, journal=None):
+        """
+        Args:
+            transport: MessageTransport to route through (default: in-process)
+            timeout: Seconds to wait for a reply from an out-of-process agent
+            journal: MessageJournal recording every logged message to disk
+        """
+        from .transport import InProcessTransport
+
+        self.transport = transport or InProcessTransport()
+        self.timeout = timeout
         self.handlers: Dict[str, Callable] = {}
-        self.message_log: List[Message] = []
+        self.inboxes: Dict[str, Any] = {}
+        self.coalescers: Dict[str, Any] = {}
         self.max_log_size = 1000
-
-    def subscribe(self, agent_id: str, handler: Callable):
+        self.message_log = MessageLog(max_size=self.max_log_size)
+        self.journal = journal
+        self.topics = TopicRouter()
+        self._notifier = None
+        self._notifier_lock = threading.Lock()
+        self._notifications = {'delivered': 0, 'dropped': 0}
+
+    def subscribe(self,
+                  agent_id: str,
+                  handler: Callable,
+                  workers: Optional[int] = None,
+                  capacity: Optional[int] = None,
+                  overflow: Optional[str] = None,
+                  coalesce: Optional[bool] = None,
+                  has_history: Optional[Callable[[str], bool]] = None):
         """
         Register an agent to receive messages.
 
+        Messages wait in the agent's inbox (see inbox.py) and are handled
+        by its own worker pool, most urgent first. Identical concurrent
+        requests and duplicate deliveries are answered from a single
+        computation (see coalescing.py).
+
         Args:
             agent_id: Unique agent identifier
             handler: Function to call when message arrives (agent.handle_message)
+            workers: Messages the agent handles concurrently
+            capacity: Messages allowed to wait in the inbox
+            overflow: 'reject' or 'shed' when the inbox is full
+            coalesce: Coalesce identical requests (default: AGENT_COALESCE_REQUESTS or true)
+            has_history: has_history(conversation_id) -> whether the agent has
+                history for a conversation; lets identical requests from
+                conversations it has none for coalesce (agent.memory.has_conversation)
         """
+        from .coalescing import RequestCoalescer
+        from .inbox import AgentInbox
+
+        inbox = AgentInbox(
+            agent_id, handler,
+            workers=workers, capacity=capacity, overflow=overflow, timeout=self.timeout
+        )
+        if coalesce is None:
+            coalesce = os.environ.get("AGENT_COALESCE_REQUESTS", "true").lower() in ("1", "true", "yes")
+        entry = inbox.call
+        if coalesce:
+            entry = self.coalescers[agent_id] = RequestCoalescer(
+                agent_id, inbox.call, has_history=has_history
+            )
         self.handlers[agent_id] = handler
+        self.inboxes[agent_id] = inbox
+        self.transport.register(agent_id, entry)
         print(f"📡 {agent_id} subscribed to message bus")
 
     def unsubscribe(self, agent_id: str):
         """Unregister an agent."""
         if agent_id in self.handlers:
             del self.handlers[agent_id]
+            self.transport.unregister(agent_id)
+            self.inboxes.pop(agent_id).close(wait=False)
+            self.coalescers.pop(agent_id, None)
+            self.topics.unsubscribe(agent_id)
             print(f"📡 {agent_id} unsubscribed from message bus")
 
-    def send(self, message: Message) -> Message:
+    def subscribe_topic(self, agent_id: str, pattern: str):
+        """
+        Deliver messages published on matching topics to an agent.
+
+        Args:
+            agent_id: Subscribing agent (in this process, or reachable
+                through the transport)
+            pattern: Topic pattern; '*' matches one word, '#' any number
+                (e.g. "cohort.*.health_changed")
+        """
+        self.topics.subscribe(agent_id, pattern)
+
+    def unsubscribe_topic(self, agent_id: str, pattern: Optional[str] = None):
+        """Stop topic deliveries to an agent (one pattern, or all of them)."""
+        self.topics.unsubscribe(agent_id, pattern)
+
+    def publish(self, topic: str, message: Message) -> int:
+        """
+        Fire-and-forget delivery to every agent subscribed to a topic.
+
+        Returns as soon as the message is queued; replies are discarded.
+        All local subscribers receive the same Message object, so
+        handlers must treat it as read-only.
+
+        Args:
+            topic: Dot-separated topic, no wildcards (e.g. "cohort.q4-2025.health_changed")
+            message: The message (usually an INFORM with receiver=topic)
+
+        Returns:
+            Number of subscribers the message was queued for
+        """
+        return self.multicast(message, self.topics.route(topic))
+
+    def multicast(self, message: Message, receivers: List[str]) -> int:
+        """
+        Fire-and-forget delivery of one message to several agents.
+
+        Unlike broadcast(), nothing waits for replies: the message goes
+        straight into each local agent's inbox, and to remote agents
+        from a background pool. It's logged once.
+
+        Returns:
+            Number of receivers the message was queued for (receivers
+            whose inbox is full or closed are skipped)
+        """
+        from .inbox import InboxClosedError, InboxFullError
+
+        self._log_message(message)
+        queued = 0
+        for receiver in receivers:
+            inbox = self.inboxes.get(receiver)
+            if inbox is None:
+                self._get_notifier().submit(self._notify_remote, receiver, message)
+                queued += 1
+                continue
+            try:
+                inbox.submit(message).add_done_callback(self._notification_done)
+                queued += 1
+            except (InboxFullError, InboxClosedError) as e:
+                self._count_notification('dropped')
+                print(f"⚠️  Notification to {receiver} dropped: {e}")
+        return queued
+
+    def send(self, message: Message, timeout: Optional[float] = None) -> Message:
         """
         Send a message to its receiver.
 
         Args:
             message: The message to send
+            timeout: Seconds to wait for the reply (default: the bus timeout)
 
         Returns:
-            Response message from the receiver
+            Response message from the receiver (in_reply_to is message.message_id)
         """
+        from .transport import AgentNotFoundError
+
         # Log the message
         self._log_message(message)
 
-        # Find the handler for the receiver
-        if message.receiver not in self.handlers:
-            error_msg = f"Agent '{message.receiver}' not found or not active"
+        try:
+            response = self.transport.request(
+                message, timeout=timeout if timeout is not None else self.timeout
+            )
+        except AgentNotFoundError as e:
+            error_msg = str(e)
             print(f"❌ {error_msg}")
             return Message.error(
                 content=error_msg,
-                conversation_id=message.conversation_id
+                conversation_id=message.conversation_id,
+                in_reply_to=message.message_id
             )
-
-        # Route to handler (synchronous for now)
-        try:
-            response = self.handlers[message.receiver](message)
-            self._log_message(response)
-            return response
-
         except Exception as e:
             error_msg = f"Error delivering message to {message.receiver}: {str(e)}"
             print(f"❌ {error_msg}")
             return Message.error(
                 content=error_msg,
-                conversation_id=message.conversation_id
+                conversation_id=message.conversation_id,
+                in_reply_to=message.message_id
             )
 
+        self._log_message(response)
+        return response
+
+    def _get_notifier(self):
+        with self._notifier_lock:
+            if self._notifier is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._notifier = ThreadPoolExecutor(max_workers=4, thread_name_prefix="bus-notify")
+            return self._notifier
+
+    def _notify_remote(self, receiver: str, message: Message):
+        # Remote transports route on message.receiver, so address a copy
+        if message.receiver != receiver:
+            message = message.copy_to(receiver)
+        try:
+            reply = self.transport.request(message, timeout=self.timeout)
+        except Exception as e:
+            self._count_notification('dropped')
+            print(f"⚠️  Notification to {receiver} not delivered: {e}")
+            return
+        self._count_notification('dropped' if reply.message_type == MessageType.ERROR.value else 'delivered')
+
+    def _notification_done(self, future):
+        failed = (
+            future.exception() is not None
+            or getattr(future.result(), 'message_type', None) == MessageType.ERROR.value
+        )
+        self._count_notification('dropped' if failed else 'delivered')
+
+    def _count_notification(self, outcome: str):
+        with self._notifier_lock:
+            self._notifications[outcome] += 1
+
     def broadcast(self, message: Message, receivers: List[str]) -> List[Message]:
         """
         Send a message to multiple receivers.
@@ -206,16 +686,8 @@ class MessageBus:
         responses = []
 
         for receiver in receivers:
-            # Create a copy of the message for each receiver
-            msg = Message(
-                sender=message.sender,
-                receiver=receiver,
-                content=message.content,
-                message_type=message.message_type,
-                conversation_id=message.conversation_id,
-                metadata=message.metadata
-            )
-            response = self.send(msg)
+            # A cheap copy for each receiver (content and metadata are shared)
+            response = self.send(message.copy_to(receiver))
             responses.append(response)
 
         return responses
@@ -230,26 +702,35 @@ class MessageBus:
         Returns:
             List of messages in chronological order
         """
-        return [
-            msg for msg in self.message_log
-            if msg.conversation_id == conversation_id
-        ]
+        return self.message_log.conversation(conversation_id)
 
     def get_recent_messages(self, limit: int = 50) -> List[Message]:
         """Get recent messages (for debugging/monitoring)."""
-        return self.message_log[-limit:]
+        return self.message_log.recent(limit)
 
     def _log_message(self, message: Message):
-        """Log a message to the message history."""
+        """Log a message to the message history (and the journal, if any)."""
         self.message_log.append(message)
+        if self.journal is not None:
+            self.journal.append(message)
 
-        # Trim log if too large
-        if len(self.message_log) > self.max_log_size:
-            self.message_log = self.message_log[-self.max_log_size:]
+    def restore_log(self) -> int:
+        """
+        Refill the in-memory log with the journal's newest messages.
+
+        Returns:
+            Number of messages restored
+        """
+        if self.journal is None:
+            return 0
+        self.message_log.clear()
+        for message in self.journal.tail(self.max_log_size):
+            self.message_log.append(message)
+        return len(self.message_log)
 
     def clear_log(self):
-        """Clear message log (use with caution!)."""
-        self.message_log = []
+        """Clear message log (use with caution!). The journal is kept."""
+        self.message_log.clear()
         print("🧹 Message log cleared")
 
     def get_stats(self) -> Dict[str, Any]:
@@ -258,24 +739,43 @@ class MessageBus:
             "total_agents": len(self.handlers),
             "active_agents": list(self.handlers.keys()),
             "total_messages": len(self.message_log),
-            "message_types": self._count_message_types()
+            "active_conversations": self.message_log.conversation_count,
+            "message_types": self.message_log.type_counts(),
+            "inboxes": {agent_id: inbox.get_stats() for agent_id, inbox in self.inboxes.items()},
+            "coalescing": {agent_id: c.get_stats() for agent_id, c in self.coalescers.items()},
+            "journal": self.journal.get_stats() if self.journal is not None else None,
+            "topics": self.topics.subscriptions(),
+            "notifications": dict(self._notifications)
         }
 
-    def _count_message_types(self) -> Dict[str, int]:
-        """Count messages by type."""
-        counts = {}
-        for msg in self.message_log:
-            counts[msg.message_type] = counts.get(msg.message_type, 0) + 1
-        return counts
-
 
 # Global message bus instance (singleton pattern)
 _global_message_bus = None
 
 
 def get_message_bus() -> MessageBus:
-    """Get the global message bus instance."""
+    """
+    Get the global message bus instance.
+
+    The transport comes from MESSAGE_TRANSPORT (see transport.create_transport)
+    and the reply timeout from MESSAGE_TIMEOUT_SECONDS. If MESSAGE_JOURNAL_DIR
+    is set, messages are journaled there and the log is restored from it.
+    """
     global _global_message_bus
     if _global_message_bus is None:
-        _global_message_bus = MessageBus()
+        from .transport import create_transport
+
+        timeout = os.environ.get("MESSAGE_TIMEOUT_SECONDS")
+        journal_dir = os.environ.get("MESSAGE_JOURNAL_DIR")
+        journal = None
+        if journal_dir:
+            from .journal import MessageJournal
+            journal = MessageJournal(journal_dir)
+
+        _global_message_bus = MessageBus(
+            transport=create_transport(),
+            timeout=float(timeout) if timeout else None,
+            journal=journal
+        )
+        _global_message_bus.restore_log()
     return _global_message_bus
@@ -0,0 +1,516 @@
+"""
+Agent Supervisor - Runs the agency's agents as supervised worker processes
+
+Launches one or more worker processes per agent definition in
+agents/definitions/*.yaml and keeps them healthy:
+
+- Warm starts: workers are forked from a forkserver that has already
+  imported the shared modules (anthropic, yaml, the agent framework), so
+  a new or restarted worker skips those imports.
+- Health checks: each worker answers STATUS messages on its own control
+  id ("<agent-id>#<n>") with BaseAgent.get_status() plus its inbox depth.
+  A worker that exits or misses max_failures checks in a row is restarted,
+  with exponential backoff for workers that keep failing.
+- Scaling: the processes per agent move one step per check towards
+  ceil(queue depth / scale_depth), between min_workers and max_workers.
+  The message router spreads an agent's messages over its processes; under
+  AMQP they consume one shared queue per agent and compete for messages.
+
+Agents in separate processes talk over the Unix socket router (or AMQP).
+With MESSAGE_TRANSPORT=inprocess the supervisor switches to unix and runs
+the router itself. Likewise, the embedded ChromaDB store allows a single
+writer process, so unless CHROMA_HOST points at a Chroma server the
+supervisor runs one on the shared store and the workers connect to it.
+
+Configured from the environment:
+    AGENT_MIN_PROCESSES          Worker processes per agent (default: 1)
+    AGENT_MAX_PROCESSES          Upper bound when scaling (default: 3)
+    AGENT_SCALE_QUEUE_DEPTH      Queued messages per process before scaling up (default: 10)
+    AGENT_HEALTH_INTERVAL        Seconds between health checks (default: 10)
+
+Usage:
+    python -m agents.supervisor run [--agents data-analyst,qa...]
+    python -m agents.supervisor status
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .base.agent import load_definition
+from .base.memory import CHROMA_AVAILABLE, vector_store_path
+from .base.messaging import Message, MessageType
+from .base.transport import DEFAULT_SOCKET_PATH, MessageRouter, create_transport
+
+
+AGENCY_ROOT = Path(__file__).resolve().parent.parent
+DEFINITIONS_DIR = AGENCY_ROOT / "agents" / "definitions"
+DEFAULT_STATUS_FILE = "./data/supervisor-status.json"
+
+# Imported once in the forkserver, inherited by every worker. Agents
+# import these lazily; preloading makes that free in the workers.
+# Modules that aren't installed (chromadb is optional) are skipped.
+PRELOAD_MODULES = [
+    'yaml',
+    'anthropic',
+    'chromadb',
+    'agents.base.agent',
+    'agents.base.transport',
+    'agents.base.inbox',
+    'agents.base.coalescing',
+]
+
+HEALTHY = 'healthy'
+STARTING = 'starting'
+UNHEALTHY = 'unhealthy'
+RESTARTING = 'restarting'
+
+
+def desired_workers(queue_depth: int, current: int, min_workers: int,
+                    max_workers: int, scale_depth: int) -> int:
+    """
+    Worker processes to run after this check: one step from current
+    towards ceil(queue_depth / scale_depth), within [min_workers, max_workers].
+    """
+    target = max(min_workers, min(max_workers, math.ceil(queue_depth / scale_depth)))
+    if target > current:
+        return current + 1
+    if target < current:
+        return current - 1
+    return current
+
+
+def load_definitions(definitions_dir: Path = DEFINITIONS_DIR,
+                     agents: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """agent_id -> {'path', 'type', 'name'} for each agent definition."""
+    definitions = {}
+    for path in sorted(Path(definitions_dir).resolve().glob("*.yaml")):
+        config = load_definition(os.path.relpath(path, AGENCY_ROOT))
+        agent_id = config['agent_id']
+        if agents is None or agent_id in agents:
+            definitions[agent_id] = {'path': path, 'type': config['type'], 'name': config['name']}
+    if agents is not None:
+        missing = set(agents) - set(definitions)
+        if missing:
+            raise ValueError(f"No agent definition for: {', '.join(sorted(missing))}")
+    return definitions
+
+
+def _agent_class(agent_type: str):
+    from .base.agent import ChiefAgent, ExecutionAgent, SpecialistAgent
+
+    if agent_type.startswith('chief'):
+        return ChiefAgent
+    if agent_type.startswith('execution'):
+        return ExecutionAgent
+    return SpecialistAgent
+
+
+def _run_worker(agent_id: str, definition_path: str, agent_type: str, control_id: str,
+                drain_timeout: float):
+    """Worker process: run one agent until SIGTERM, answering health checks."""
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # The supervisor decides when we stop
+    journal_dir = os.environ.get("MESSAGE_JOURNAL_DIR")
+    if journal_dir:
+        # A journal has one writer, so each worker keeps its own
+        os.environ["MESSAGE_JOURNAL_DIR"] = str(Path(journal_dir) / control_id.replace('#', '-'))
+
+    agent = _agent_class(agent_type)(agent_id, os.path.relpath(definition_path, AGENCY_ROOT))
+    agent.start()
+    bus = agent.message_bus
+
+    def status(message: Message) -> Message:
+        inbox = bus.inboxes.get(agent_id)
+        report = {
+            'pid': os.getpid(),
+            'agent': agent.get_status(),
+            'queue_depth': inbox.depth if inbox is not None else 0,
+            'inbox': inbox.get_stats() if inbox is not None else None,
+        }
+        return Message(sender=control_id, receiver=message.sender, content=json.dumps(report),
+                       message_type=MessageType.STATUS.value, in_reply_to=message.message_id)
+
+    bus.transport.register(control_id, status)
+    while not stop.wait(1.0):
+        pass
+
+    # Take no new messages, let queued ones finish, then stop
+    bus.transport.unregister(agent_id)
+    inbox = bus.inboxes.get(agent_id)
+    deadline = time.monotonic() + drain_timeout
+    while inbox is not None and time.monotonic() < deadline:
+        stats = inbox.get_stats()
+        if stats['depth'] == 0 and stats['busy_workers'] == 0:
+            break
+        time.sleep(0.1)
+    bus.transport.unregister(control_id)
+    agent.stop()
+    bus.transport.close()
+
+
+class _Worker:
+    """One worker process and its health record."""
+
+    def __init__(self, agent_id: str, index: int):
+        self.agent_id = agent_id
+        self.index = index
+        self.control_id = f"{agent_id}#{index}"
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.state = STARTING
+        self.failures = 0          # Consecutive missed health checks
+        self.restarts = 0          # Restarts since it was last stable
+        self.started_at = 0.0
+        self.restart_at = 0.0
+        self.queue_depth = 0
+        self.last_status: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'control_id': self.control_id,
+            'pid': self.process.pid if self.process is not None else None,
+            'state': self.state,
+            'restarts': self.restarts,
+            'queue_depth': self.queue_depth,
+            'uptime_seconds': round(time.monotonic() - self.started_at, 1) if self.started_at else 0,
+        }
+
+
+class AgentSupervisor:
+    """
+    Starts, health-checks, restarts and scales agent worker processes.
+
+    Usage:
+        supervisor = AgentSupervisor()
+        supervisor.run()          # Until SIGTERM / Ctrl+C
+
+        supervisor.start()        # Or drive it yourself
+        supervisor.check()
+        supervisor.stop()
+    """
+
+    def __init__(
+        self,
+        agents: Optional[List[str]] = None,
+        definitions_dir: Path = DEFINITIONS_DIR,
+        min_workers: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        scale_depth: Optional[int] = None,
+        health_interval: Optional[float] = None,
+        health_timeout: float = 5.0,
+        max_failures: int = 3,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        stable_after: float = 60.0,
+        drain_timeout: float = 30.0,
+        status_file: Optional[str] = DEFAULT_STATUS_FILE
+    ):
+        """
+        Args:
+            agents: Agent ids to run (default: every definition)
+            definitions_dir: Directory of agent definition YAML files
+            min_workers: Processes per agent (default: AGENT_MIN_PROCESSES or 1)
+            max_workers: Most processes per agent (default: AGENT_MAX_PROCESSES or 3)
+            scale_depth: Queued messages per process before scaling up
+                (default: AGENT_SCALE_QUEUE_DEPTH or 10)
+            health_interval: Seconds between checks (default: AGENT_HEALTH_INTERVAL or 10)
+            health_timeout: Seconds a worker has to answer a health check
+            max_failures: Missed checks in a row before a restart
+            backoff: First restart delay; doubles per restart, up to max_backoff
+            max_backoff: Longest restart delay
+            stable_after: Seconds healthy before the backoff resets
+            drain_timeout: Seconds a stopping worker gets to finish queued messages
+            status_file: Where each check writes the supervisor status (None: nowhere)
+        """
+        self.definitions = load_definitions(definitions_dir, agents)
+        self.min_workers = min_workers if min_workers is not None else int(os.environ.get("AGENT_MIN_PROCESSES", 1))
+        self.max_workers = max_workers if max_workers is not None else int(os.environ.get("AGENT_MAX_PROCESSES", 3))
+        self.scale_depth = scale_depth or int(os.environ.get("AGENT_SCALE_QUEUE_DEPTH", 10))
+        self.health_interval = health_interval or float(os.environ.get("AGENT_HEALTH_INTERVAL", 10))
+        self.health_timeout = health_timeout
+        self.max_failures = max_failures
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self.drain_timeout = drain_timeout
+        self.status_file = Path(status_file) if status_file else None
+
+        if self.min_workers < 1:
+            raise ValueError("min_workers must be at least 1")
+        if self.max_workers < self.min_workers:
+            raise ValueError("max_workers must be at least min_workers")
+
+        self.workers: Dict[str, List[_Worker]] = {agent_id: [] for agent_id in self.definitions}
+        self._next_index = {agent_id: 0 for agent_id in self.definitions}
+        self._context = None
+        self._router: Optional[MessageRouter] = None
+        self._vector_server: Optional[subprocess.Popen] = None
+        self._transport = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Connect to the message bus and launch min_workers per agent."""
+        if os.environ.get("MESSAGE_TRANSPORT", "inprocess").lower() == "inprocess":
+            # Separate processes need a router; run one here
+            os.environ["MESSAGE_TRANSPORT"] = "unix"
+            os.environ.setdefault("MESSAGE_BUS_SOCKET", DEFAULT_SOCKET_PATH)
+            self._router = MessageRouter(os.environ["MESSAGE_BUS_SOCKET"]).start()
+        if CHROMA_AVAILABLE and not os.environ.get("CHROMA_HOST"):
+            self._start_vector_server()
+        self._transport = create_transport()
+        self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="supervisor-health")
+
+        self._context = multiprocessing.get_context("forkserver")
+        self._context.set_forkserver_preload(PRELOAD_MODULES)
+        for agent_id in self.definitions:
+            for _ in range(self.min_workers):
+                self._launch(agent_id)
+        print(f"🧭 Supervisor started {self.min_workers} worker(s) for {len(self.definitions)} agents")
+
+    def run(self):
+        """start(), then check() every health_interval until stopped."""
+        self.start()
+        try:
+            while not self._stop.wait(self.health_interval):
+                self.check()
+        finally:
+            self.stop()
+
+    def check(self) -> Dict[str, Any]:
+        """
+        One supervision pass: health-check every worker, restart failed
+        ones whose backoff has elapsed, and scale each agent.
+
+        Returns:
+            The status (also written to status_file)
+        """
+        now = time.monotonic()
+        live = [w for workers in self.workers.values() for w in workers if w.state != RESTARTING]
+        for worker, report in zip(live, self._pool.map(self._probe, live)):
+            self._record(worker, report, now)
+
+        for agent_id, workers in self.workers.items():
+            for worker in workers:
+                if worker.state == RESTARTING and now >= worker.restart_at:
+                    self._start_process(worker)
+
+            depth = sum(w.queue_depth for w in workers)
+            wanted = desired_workers(depth, len(workers), self.min_workers, self.max_workers, self.scale_depth)
+            if wanted > len(workers):
+                print(f"📈 Scaling {agent_id} to {wanted} processes (queue depth {depth})")
+                self._launch(agent_id)
+            elif wanted < len(workers):
+                print(f"📉 Scaling {agent_id} to {wanted} processes")
+                self._retire(workers[-1])
+
+        status = self.get_status()
+        if self.status_file is not None:
+            self.status_file.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.status_file.with_suffix(".tmp")
+            temporary.write_text(json.dumps(status, indent=2))
+            os.replace(temporary, self.status_file)
+        return status
+
+    def get_status(self) -> Dict[str, Any]:
+        """Per-agent worker states."""
+        return {
+            'timestamp': time.time(),
+            'agents': {
+                agent_id: {
+                    'name': self.definitions[agent_id]['name'],
+                    'healthy': sum(w.state == HEALTHY for w in workers),
+                    'workers': [w.to_dict() for w in workers],
+                }
+                for agent_id, workers in self.workers.items()
+            },
+        }
+
+    def stop(self):
+        """Stop every worker (letting them drain), then disconnect."""
+        self._stop.set()
+        workers = [w for ws in self.workers.values() for w in ws]
+        for worker in workers:
+            if worker.process is not None and worker.process.is_alive():
+                worker.process.terminate()
+        for worker in workers:
+            if worker.process is not None:
+                worker.process.join(self.drain_timeout + 5)
+                if worker.process.is_alive():
+                    worker.process.kill()
+        for agent_id in self.workers:
+            self.workers[agent_id] = []
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+        if self._transport is not None:
+            self._transport.close()
+        if self._router is not None:
+            self._router.close()
+        if self._vector_server is not None:
+            self._vector_server.terminate()
+            try:
+                self._vector_server.wait(10)
+            except subprocess.TimeoutExpired:
+                self._vector_server.kill()
+            self._vector_server = None
+        print("🧭 Supervisor stopped")
+
+    # ------------------------------------------------------------------
+
+    def _start_vector_server(self, startup_timeout: float = 60.0):
+        """Serve the shared vector store from one process; workers reach it via CHROMA_HOST."""
+        path = vector_store_path()
+        path.mkdir(parents=True, exist_ok=True)
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+        # The `chroma run` console script, with this interpreter
+        self._vector_server = subprocess.Popen(
+            [sys.executable, '-c', 'from chromadb.cli.cli import app; app()', 'run',
+             '--path', str(path), '--host', '127.0.0.1', '--port', str(port)],
+            stdout=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if self._vector_server.poll() is not None or time.monotonic() > deadline:
+                    self._vector_server.kill()
+                    self._vector_server = None
+                    raise RuntimeError(f"Chroma server for {path} did not start")
+                time.sleep(0.2)
+        # Inherited by the forkserver, and so by every worker
+        os.environ["CHROMA_HOST"] = '127.0.0.1'
+        os.environ["CHROMA_PORT"] = str(port)
+        print(f"🧠 Serving the vector store {path} on 127.0.0.1:{port}")
+
+    def _launch(self, agent_id: str) -> _Worker:
+        worker = _Worker(agent_id, self._next_index[agent_id])
+        self._next_index[agent_id] += 1
+        self.workers[agent_id].append(worker)
+        self._start_process(worker)
+        return worker
+
+    def _start_process(self, worker: _Worker):
+        definition = self.definitions[worker.agent_id]
+        worker.process = self._context.Process(
+            target=_run_worker,
+            args=(worker.agent_id, str(definition['path']), definition['type'],
+                  worker.control_id, self.drain_timeout),
+            name=f"agent-{worker.control_id}",
+            daemon=False
+        )
+        worker.process.start()
+        worker.state = STARTING
+        worker.failures = 0
+        worker.started_at = time.monotonic()
+
+    def _retire(self, worker: _Worker):
+        self.workers[worker.agent_id].remove(worker)
+        if worker.process is not None and worker.process.is_alive():
+            worker.process.terminate()  # Drains, then exits; reaped below
+        threading.Thread(target=worker.process.join, daemon=True).start()
+
+    def _probe(self, worker: _Worker) -> Optional[Dict[str, Any]]:
+        """The worker's status report, or None if it didn't answer."""
+        if worker.process is None or not worker.process.is_alive():
+            return None
+        try:
+            reply = self._transport.request(
+                Message(sender='supervisor', receiver=worker.control_id, content='status',
+                        message_type=MessageType.STATUS.value),
+                timeout=self.health_timeout
+            )
+            if reply.message_type != MessageType.STATUS.value:
+                return None
+            return json.loads(reply.content)
+        except Exception:
+            return None
+
+    def _record(self, worker: _Worker, report: Optional[Dict[str, Any]], now: float):
+        if report is not None:
+            worker.state = HEALTHY
+            worker.failures = 0
+            worker.queue_depth = report['queue_depth']
+            worker.last_status = report
+            if worker.restarts and now - worker.started_at >= self.stable_after:
+                worker.restarts = 0
+            return
+
+        exited = worker.process is None or not worker.process.is_alive()
+        starting = worker.state == STARTING and now - worker.started_at < self.health_timeout * self.max_failures
+        if not exited and starting:
+            return  # Still importing / connecting
+        worker.failures += 1
+        worker.queue_depth = 0
+        if exited or worker.failures >= self.max_failures:
+            self._schedule_restart(worker, now, "exited" if exited else "stopped answering health checks")
+        else:
+            worker.state = UNHEALTHY
+
+    def _schedule_restart(self, worker: _Worker, now: float, reason: str):
+        if worker.process is not None and worker.process.is_alive():
+            worker.process.kill()
+            worker.process.join(5)
+        delay = min(self.backoff * (2 ** worker.restarts), self.max_backoff)
+        worker.restarts += 1
+        worker.state = RESTARTING
+        worker.restart_at = now + delay
+        print(f"♻️  {worker.control_id} {reason}; restarting in {delay:.0f}s")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point.
+
+    Usage:
+        python -m agents.supervisor run [--agents ID,ID...]
+        python -m agents.supervisor status
+    """
+    parser = argparse.ArgumentParser(description="AI Flywheel agent supervisor")
+    parser.add_argument("--status-file", default=DEFAULT_STATUS_FILE, help="Status file path")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    run_parser = subcommands.add_parser("run", help="Run and supervise the agents")
+    run_parser.add_argument("--agents", help="Comma-separated agent ids (default: all)")
+    subcommands.add_parser("status", help="Print the running supervisor's status")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        path = Path(args.status_file)
+        if not path.exists():
+            print(f"❌ No supervisor status at {path}")
+            return 1
+        print(path.read_text())
+        return 0
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    supervisor = AgentSupervisor(
+        agents=args.agents.split(',') if args.agents else None,
+        status_file=args.status_file
+    )
+    try:
+        supervisor.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,164 @@
+"""
+SQLite Read-Connection Pool for the Learning Analytics MCP Server
+
+Opening a SQLite connection means opening the file, reading the schema and
+compiling every statement from scratch. Tool calls are short, so that setup
+used to dominate. The pool keeps a fixed set of warm connections:
+
+- WAL journal mode, so readers never block on (or block) the writer
+- Read-only (query_only) connections, so a tool can't modify data by accident
+- A large per-connection statement cache, so repeated tool queries reuse
+  their prepared statements instead of re-parsing SQL
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Union
+
+
+class SQLiteConnectionPool:
+    """
+    Thread-safe pool of read-only SQLite connections.
+
+    Connections are created lazily up to pool_size and handed out one
+    caller at a time.
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        pool_size: int = 4,
+        timeout_seconds: float = 30.0,
+        cached_statements: int = 256
+    ):
+        """
+        Args:
+            db_path: Path to SQLite database
+            pool_size: Maximum number of open connections
+            timeout_seconds: How long to wait for a free connection
+            cached_statements: Prepared statements kept per connection
+        """
+        self.db_path = Path(db_path)
+        self.pool_size = pool_size
+        self.timeout_seconds = timeout_seconds
+        self.cached_statements = cached_statements
+
+        # Guards everything below; notified whenever a connection is returned
+        self._cond = threading.Condition()
+        self._idle: List[sqlite3.Connection] = []   # LIFO, so warm connections get reused
+        self._all: List[sqlite3.Connection] = []
+        self._borrowed = 0
+        self._trace_callback: Optional[Callable[[str], None]] = None
+        self._closed = False
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a connection for the duration of a with-block.
+
+        Usage:
+            with pool.connection() as conn:
+                conn.execute(...)
+        """
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def set_trace_callback(self, callback: Optional[Callable[[str], None]]):
+        """Trace every statement executed on pooled connections (None disables)."""
+        with self._cond:
+            self._trace_callback = callback
+            for conn in self._all:
+                conn.set_trace_callback(callback)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        Close the pool.
+
+        Idle connections are closed at once. Connections other threads
+        still hold are never closed under them: each is closed when its
+        with-block returns it. New borrows fail immediately.
+
+        Args:
+            timeout: Seconds to wait for borrowed connections to come back
+                (default: timeout_seconds)
+
+        Returns:
+            True if every connection is closed, False if some were still
+            borrowed when the wait ran out (they close on return)
+        """
+        if timeout is None:
+            timeout = self.timeout_seconds
+        with self._cond:
+            self._closed = True
+            for conn in self._idle:
+                conn.close()
+                self._all.remove(conn)
+            self._idle.clear()
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._borrowed == 0, timeout)
+
+    def get_stats(self):
+        """Get pool statistics."""
+        with self._cond:
+            return {
+                'pool_size': self.pool_size,
+                'open_connections': len(self._all),
+                'idle_connections': len(self._idle),
+                'borrowed_connections': self._borrowed
+            }
+
+    def _acquire(self) -> sqlite3.Connection:
+        deadline = time.monotonic() + self.timeout_seconds
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if len(self._all) < self.pool_size:
+                    conn = self._connect()
+                    self._all.append(conn)
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"No analytics connection free after {self.timeout_seconds}s "
+                        f"(pool_size={self.pool_size})"
+                    )
+                self._cond.wait(remaining)
+            self._borrowed += 1
+            return conn
+
+    def _release(self, conn: sqlite3.Connection):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._cond:
+            self._borrowed -= 1
+            if self._closed:
+                conn.close()
+                self._all.remove(conn)
+                self._cond.notify_all()   # close() may be waiting
+            else:
+                self._idle.append(conn)
+                self._cond.notify()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA query_only = ON")
+        if self._trace_callback is not None:
+            conn.set_trace_callback(self._trace_callback)
+        return conn
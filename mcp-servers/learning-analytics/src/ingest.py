@@ -0,0 +1,423 @@
+"""
+Bulk Ingestion for the Learning Analytics MCP Server
+
+Loads progress, engagement, NPS (and every other analytics table) from CSV
+or JSONL streams. Built for large loads:
+
+- Rows are written with executemany in batches inside one transaction,
+  with numeric coercion left to SQLite column affinity
+- Every table upserts on its natural key (e.g. one engagement row per
+  student, cohort and week), so re-running a load is safe. nps_scores and
+  harm_prevention are keyed on their own id (nps_id, story_id): re-runs
+  are only idempotent when the records carry it, since rows without one
+  get a fresh generated id each time
+- For big loads the table's secondary indexes and rollup triggers are
+  dropped before writing and rebuilt once at the end, which is much
+  faster than maintaining them row by row
+"""
+
+import csv
+import io
+import itertools
+import json
+import re
+import sqlite3
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+
+def _to_bool(value: Any) -> Any:
+    if value is None or value == '':
+        return None
+    if isinstance(value, str):
+        return 1 if value.strip().lower() in ('1', 'true', 'yes', 'y', 't') else 0
+    return 1 if value else 0
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """How rows for one analytics table are parsed and upserted."""
+    table: str
+    columns: Dict[str, str]                   # column -> 'text' | 'integer' | 'real' | 'bool'
+    natural_key: Tuple[str, ...]              # upsert conflict target
+    id_column: Optional[str] = None           # surrogate key, generated if absent
+
+    @property
+    def needs_unique_index(self) -> bool:
+        """Natural keys other than the primary key need their own UNIQUE index."""
+        return self.natural_key != (self.id_column or self.natural_key[0],)
+
+    @property
+    def unique_index_name(self) -> str:
+        return f"uq_{self.table}_natural_key"
+
+    def unique_index_sql(self) -> str:
+        return (
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {self.unique_index_name} "
+            f"ON {self.table}({', '.join(self.natural_key)})"
+        )
+
+    def duplicates_sql(self) -> str:
+        """Count rows that share a natural key with a later row."""
+        key = ', '.join(self.natural_key)
+        not_null = ' AND '.join(f"{column} IS NOT NULL" for column in self.natural_key)
+        return (
+            f"SELECT COALESCE(SUM(n - 1), 0) FROM (SELECT COUNT(*) AS n FROM {self.table} "
+            f"WHERE {not_null} GROUP BY {key} HAVING n > 1)"
+        )
+
+    def dedupe_sql(self) -> str:
+        """Delete all but the latest row per natural key (what re-upserting would keep)."""
+        key = ', '.join(self.natural_key)
+        not_null = ' AND '.join(f"{column} IS NOT NULL" for column in self.natural_key)
+        return (
+            f"DELETE FROM {self.table} WHERE {not_null} AND rowid NOT IN "
+            f"(SELECT MAX(rowid) FROM {self.table} GROUP BY {key})"
+        )
+
+
+TABLE_SPECS: Dict[str, TableSpec] = {
+    'cohorts': TableSpec(
+        table='cohorts',
+        columns={
+            'cohort_id': 'text', 'name': 'text', 'start_date': 'text',
+            'end_date': 'text', 'student_count': 'integer',
+        },
+        natural_key=('cohort_id',),
+    ),
+    'students': TableSpec(
+        table='students',
+        columns={
+            'student_id': 'text', 'cohort_id': 'text',
+            'persona_type': 'text', 'enrollment_date': 'text',
+        },
+        natural_key=('student_id',),
+    ),
+    'course_progress': TableSpec(
+        table='course_progress',
+        columns={
+            'progress_id': 'text', 'student_id': 'text', 'module_id': 'text',
+            'completed': 'bool', 'completion_date': 'text',
+            'satisfaction_score': 'real', 'time_spent_minutes': 'integer',
+        },
+        natural_key=('student_id', 'module_id'),
+        id_column='progress_id',
+    ),
+    'community_engagement': TableSpec(
+        table='community_engagement',
+        columns={
+            'engagement_id': 'text', 'student_id': 'text', 'cohort_id': 'text',
+            'week_number': 'integer', 'posts_created': 'integer', 'replies_made': 'integer',
+            'office_hours_attended': 'integer', 'peer_reviews_given': 'integer',
+            'recorded_at': 'text',
+        },
+        natural_key=('student_id', 'cohort_id', 'week_number'),
+        id_column='engagement_id',
+    ),
+    'practice_adoption': TableSpec(
+        table='practice_adoption',
+        columns={
+            'adoption_id': 'text', 'student_id': 'text', 'framework_name': 'text',
+            'week_number': 'integer', 'self_reported': 'bool',
+            'evidence_shared': 'bool', 'peer_validated': 'bool',
+            'recorded_at': 'text',
+        },
+        natural_key=('student_id', 'framework_name', 'week_number'),
+        id_column='adoption_id',
+    ),
+    'retention_tracking': TableSpec(
+        table='retention_tracking',
+        columns={
+            'retention_id': 'text', 'student_id': 'text', 'cohort_id': 'text',
+            'months_post_course': 'integer', 'still_using_practices': 'bool',
+            'frameworks_still_used': 'text', 'evidence_provided': 'text',
+            'survey_date': 'text',
+        },
+        natural_key=('student_id', 'cohort_id', 'months_post_course'),
+        id_column='retention_id',
+    ),
+    'harm_prevention': TableSpec(
+        table='harm_prevention',
+        columns={
+            'story_id': 'text', 'student_id': 'text', 'week_number': 'integer',
+            'risk_type': 'text', 'description': 'text', 'action_taken': 'text',
+            'recorded_at': 'text',
+        },
+        # Students can have several stories, so the story itself is the key
+        natural_key=('story_id',),
+        id_column='story_id',
+    ),
+    'nps_scores': TableSpec(
+        table='nps_scores',
+        columns={
+            'nps_id': 'text', 'student_id': 'text', 'cohort_id': 'text',
+            'score': 'integer', 'survey_type': 'text', 'comment': 'text',
+            'recorded_at': 'text',
+        },
+        # Students answer the same survey again week after week, so each
+        # response is its own row
+        natural_key=('nps_id',),
+        id_column='nps_id',
+    ),
+}
+
+
+_SCHEMA_OBJECT = re.compile(
+    r"(INDEX|TRIGGER)\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)", re.IGNORECASE
+)
+
+
+class BulkLoader:
+    """
+    Loads one table's rows from a stream in large upserting transactions.
+
+    Usage:
+        loader = BulkLoader(conn, TABLE_SPECS['community_engagement'], indexes)
+        stats = loader.load(read_records("engagement.csv"))
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        spec: TableSpec,
+        secondary_indexes: Optional[List[str]] = None,
+        triggers: Optional[List[str]] = None,
+        rebuild_derived: Optional[Callable[[sqlite3.Connection, Optional[List[str]]], None]] = None,
+        batch_size: int = 50_000,
+        rebuild_threshold: int = 100_000
+    ):
+        """
+        Args:
+            conn: Writable connection in autocommit mode (isolation_level=None)
+            spec: Table being loaded
+            secondary_indexes: CREATE INDEX statements for the table's
+                non-unique indexes (dropped and rebuilt for big loads)
+            triggers: CREATE TRIGGER statements on the table (dropped for
+                big loads and recreated after rebuild_derived runs)
+            rebuild_derived: Called as rebuild_derived(conn, cohort_ids)
+                after a big load to recompute what the dropped triggers
+                maintain; cohort_ids is None if the table has no cohort_id
+            batch_size: Rows per executemany call
+            rebuild_threshold: Loads at least this large rebuild indexes
+        """
+        self.conn = conn
+        self.spec = spec
+        self.secondary_indexes = secondary_indexes or []
+        self.triggers = triggers or []
+        self.rebuild_derived = rebuild_derived
+        self.batch_size = batch_size
+        self.rebuild_threshold = rebuild_threshold
+
+    def load(
+        self,
+        records: Iterable[Dict[str, Any]],
+        rebuild_indexes: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        Upsert records into the table.
+
+        Args:
+            records: Dicts keyed by column name (unknown keys are ignored)
+            rebuild_indexes: Force (True) or skip (False) the index
+                drop/rebuild; None decides from the load size
+
+        Returns:
+            Load statistics (rows, seconds, rows_per_second, ...)
+        """
+        started = time.perf_counter()
+        records = iter(records)
+
+        # Peek far enough ahead to know whether this is a big load
+        lookahead = list(itertools.islice(records, self.rebuild_threshold))
+        if not lookahead:
+            return self._stats(0, started, False, [])
+
+        columns = self._columns_for(lookahead)
+        if rebuild_indexes is None:
+            rebuild_indexes = len(lookahead) >= self.rebuild_threshold
+
+        # next(id_sequence) after the load is the number of generated ids
+        id_sequence = itertools.count()
+        rows = itertools.chain(
+            self._to_rows(lookahead, columns, id_sequence),
+            self._to_rows(records, columns, id_sequence, check_columns=True)
+        )
+        cohort_position = columns.index('cohort_id') if 'cohort_id' in columns else None
+        cohorts_seen = set()
+
+        total = 0
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            if rebuild_indexes:
+                for statement in self.secondary_indexes + self.triggers:
+                    kind, name = self._object(statement)
+                    self.conn.execute(f"DROP {kind} IF EXISTS {name}")
+
+            sql = self._upsert_sql(columns)
+
+            while True:
+                batch = list(itertools.islice(rows, self.batch_size))
+                if not batch:
+                    break
+                self.conn.executemany(sql, batch)
+                total += len(batch)
+                if cohort_position is not None:
+                    cohorts_seen.update(row[cohort_position] for row in batch)
+
+            if rebuild_indexes:
+                for statement in self.secondary_indexes:
+                    self.conn.execute(statement)
+                if self.rebuild_derived:
+                    self.rebuild_derived(
+                        self.conn,
+                        sorted(cohorts_seen) if cohort_position is not None else None
+                    )
+                for statement in self.triggers:
+                    self.conn.execute(statement)
+
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        return self._stats(
+            total, started, rebuild_indexes, sorted(cohorts_seen), next(id_sequence)
+        )
+
+    def _columns_for(self, records: List[Dict[str, Any]]) -> List[str]:
+        # JSONL records may omit empty fields, so take every column any
+        # record in the lookahead has
+        present = set()
+        for record in records:
+            present.update(record)
+        columns = [c for c in self.spec.columns if c in present]
+        missing = [c for c in self.spec.natural_key if c not in columns]
+        if missing and self.spec.natural_key != (self.spec.id_column,):
+            raise ValueError(
+                f"{self.spec.table} records must include natural key columns: {missing}"
+            )
+        if self.spec.id_column and self.spec.id_column not in columns:
+            columns.insert(0, self.spec.id_column)
+        return columns
+
+    def _to_rows(
+        self,
+        records: Iterable[Dict[str, Any]],
+        columns: List[str],
+        sequence: Iterator[int],
+        check_columns: bool = False
+    ) -> Iterator[List[Any]]:
+        # Integer, real and text values are left to SQLite column affinity
+        # (numeric CSV strings are stored as numbers); only booleans need
+        # Python-side parsing. Per-value function calls dominate load time
+        # otherwise.
+        bool_positions = [
+            i for i, c in enumerate(columns) if self.spec.columns[c] == 'bool'
+        ]
+        generate_id = self.spec.id_column is not None
+
+        # Ids for new rows: one random prefix per load plus a counter.
+        # Sequential keys append to the primary-key B-tree instead of
+        # scattering random UUIDs across it.
+        prefix = uuid.uuid4().hex[:16]
+
+        # Records past the lookahead must not bring columns it didn't have
+        unseen = [c for c in self.spec.columns if c not in columns] if check_columns else []
+
+        for record in records:
+            if unseen and any(c in record for c in unseen):
+                late = [c for c in unseen if c in record]
+                raise ValueError(
+                    f"{self.spec.table} record has columns missing from the first "
+                    f"{self.rebuild_threshold:,} records: {late}"
+                )
+            get = record.get
+            row = [get(column) for column in columns]
+            for i in bool_positions:
+                row[i] = _to_bool(row[i])
+            if generate_id and row[0] is None:
+                row[0] = f"{prefix}-{next(sequence):012d}"
+            yield row
+
+    def _upsert_sql(self, columns: List[str]) -> str:
+        # Empty CSV fields load as NULL
+        placeholders = ', '.join("NULLIF(?, '')" for _ in columns)
+        updates = [
+            f"{c} = excluded.{c}"
+            for c in columns
+            if c not in self.spec.natural_key and c != self.spec.id_column
+        ]
+        conflict = (
+            f"DO UPDATE SET {', '.join(updates)}" if updates else "DO NOTHING"
+        )
+        return (
+            f"INSERT INTO {self.spec.table} ({', '.join(columns)}) "
+            f"VALUES ({placeholders}) "
+            f"ON CONFLICT ({', '.join(self.spec.natural_key)}) {conflict}"
+        )
+
+    @staticmethod
+    def _object(statement: str) -> Tuple[str, str]:
+        """(kind, name) of a CREATE INDEX / CREATE TRIGGER statement."""
+        match = _SCHEMA_OBJECT.search(statement)
+        return match.group(1).upper(), match.group(2)
+
+    def _stats(
+        self,
+        rows: int,
+        started: float,
+        rebuilt: bool,
+        cohort_ids: List[str],
+        ids_generated: int = 0
+    ) -> Dict[str, Any]:
+        seconds = time.perf_counter() - started
+        return {
+            'table': self.spec.table,
+            'rows': rows,
+            'seconds': round(seconds, 3),
+            'rows_per_second': int(rows / seconds) if seconds > 0 else rows,
+            'indexes_rebuilt': rebuilt,
+            'cohort_ids': cohort_ids,
+            'ids_generated': ids_generated
+        }
+
+
+def read_records(
+    source: Union[str, Path, TextIO],
+    format: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream records from a CSV or JSONL file, path or open text stream.
+
+    Args:
+        source: File path, '-' for stdin, or a text stream
+        format: 'csv' or 'jsonl' (inferred from the file extension if omitted)
+    """
+    if format is None:
+        suffix = Path(str(getattr(source, 'name', source))).suffix.lower()
+        format = 'jsonl' if suffix in ('.jsonl', '.ndjson', '.json') else 'csv'
+
+    if format not in ('csv', 'jsonl'):
+        raise ValueError(f"Unknown ingest format: {format}")
+
+    if isinstance(source, io.TextIOBase) or hasattr(source, 'read'):
+        yield from _parse(source, format)
+    elif str(source) == '-':
+        yield from _parse(sys.stdin, format)
+    else:
+        with open(source, 'r', newline='', encoding='utf-8') as f:
+            yield from _parse(f, format)
+
+
+def _parse(stream: TextIO, format: str) -> Iterator[Dict[str, Any]]:
+    if format == 'csv':
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
@@ -0,0 +1,204 @@
+"""
+Tool Result Cache for the Learning Analytics MCP Server
+
+Several agents tend to ask the same question within seconds of each other
+(the Data Analyst and two Chiefs all checking one cohort's health). This
+module memoizes MCP tool results so each distinct question only reaches
+SQLite once.
+
+Invalidation:
+- Every table has a data-version counter. Writes bump the counters of the
+  tables they touch, and any entry computed against an older version of a
+  table it read is treated as a miss.
+- Every entry also expires after a TTL, which bounds staleness for writes
+  made outside the server (e.g. ad-hoc loader scripts).
+"""
+
+import copy
+import functools
+import inspect
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# Lookup result for a missing or invalid entry (None is a valid tool result)
+_MISSING = object()
+
+
+class ToolResultCache:
+    """
+    Memoization layer for MCP tool results.
+
+    Entries are keyed on tool name plus canonical arguments, and remember
+    the data version of every table the tool read.
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 1024):
+        """
+        Args:
+            ttl_seconds: Maximum age of a cached result (0 disables caching)
+            max_entries: Upper bound on cached results (oldest evicted first)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._entries: Dict[Hashable, Tuple[float, Dict[str, int], Any]] = {}
+        self._versions: Dict[str, int] = {}
+        # key -> [lock, callers holding or waiting for it]
+        self._key_locks: Dict[Hashable, List[Any]] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    @staticmethod
+    def make_key(tool_name: str, arguments: Dict[str, Any]) -> Hashable:
+        """Build a cache key from tool name and canonical (sorted) arguments."""
+        return (tool_name, json.dumps(arguments, sort_keys=True, default=str))
+
+    def get_or_compute(
+        self,
+        key: Hashable,
+        tables: Iterable[str],
+        compute: Callable[[], Any]
+    ) -> Any:
+        """
+        Return the cached result for key, computing it on a miss.
+
+        Concurrent callers asking the same question wait for the first one
+        instead of running the query again.
+
+        Args:
+            key: Cache key (see make_key)
+            tables: Tables the computation reads
+            compute: Zero-argument function producing the result
+        """
+        if not self.enabled:
+            return compute()
+
+        tables = tuple(tables)
+
+        # The lock lives while anyone holds or waits for it, so every
+        # concurrent caller of a key serializes on the same one
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            key_lock[1] += 1
+
+        try:
+            with key_lock[0]:
+                cached = self._lookup(key)
+                if cached is not _MISSING:
+                    return copy.deepcopy(cached)
+
+                # Snapshot versions before computing so a write that lands
+                # mid-query invalidates the entry we are about to store
+                versions = self._current_versions(tables)
+                result = compute()
+                self._store(key, versions, result)
+        finally:
+            with self._lock:
+                key_lock[1] -= 1
+                if not key_lock[1]:
+                    del self._key_locks[key]
+
+        return copy.deepcopy(result)
+
+    def bump(self, *tables: str):
+        """Record a write to the given tables, invalidating dependent entries."""
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def clear(self):
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total * 100, 1) if total > 0 else 0,
+                'ttl_seconds': self.ttl_seconds,
+                'table_versions': dict(self._versions)
+            }
+
+    def _lookup(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+
+            created_at, versions, result = entry
+            expired = time.monotonic() - created_at > self.ttl_seconds
+            stale = any(
+                self._versions.get(table, 0) != version
+                for table, version in versions.items()
+            )
+
+            if expired or stale:
+                del self._entries[key]
+                self.misses += 1
+                return _MISSING
+
+            self.hits += 1
+            return result
+
+    def _current_versions(self, tables: Tuple[str, ...]) -> Dict[str, int]:
+        with self._lock:
+            return {table: self._versions.get(table, 0) for table in tables}
+
+    def _store(self, key: Hashable, versions: Dict[str, int], result: Any):
+        with self._lock:
+            if len(self._entries) >= self.max_entries and key not in self._entries:
+                # Dicts keep insertion order, so the first key is the oldest
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = (time.monotonic(), versions, result)
+
+
+def cached_tool(*tables: str):
+    """
+    Decorator memoizing an MCP tool method through the server's cache.
+
+    Arguments are bound against the method signature (defaults applied),
+    so get_course_metrics("c1") and get_course_metrics(cohort_id="c1")
+    share one entry.
+
+    Args:
+        tables: Tables the tool reads; writes to any of them invalidate it
+    """
+    def decorator(method: Callable) -> Callable:
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache: Optional[ToolResultCache] = getattr(self, 'cache', None)
+            if cache is None or not cache.enabled:
+                return method(self, *args, **kwargs)
+
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            arguments.pop('self')
+
+            key = cache.make_key(method.__name__, arguments)
+            return cache.get_or_compute(
+                key,
+                tables,
+                lambda: method(self, *args, **kwargs)
+            )
+
+        wrapper.cache_tables = tables
+        return wrapper
+
+    return decorator
@@ -0,0 +1,347 @@
+"""
+Rollup Tables for the Learning Analytics MCP Server
+
+Pre-aggregated copies of the numbers the MCP tools report, kept current by
+triggers on the raw tables. A tool call reads one rollup row (or one row
+per cohort) instead of re-aggregating every raw event:
+
+- engagement_weekly_rollup: activity sums and distinct active students
+  per (cohort, week)
+- engagement_cohort_rollup: the same across all weeks of a cohort
+- module_progress_rollup: completions, satisfaction and time per
+  (cohort, module)
+- cohort_progress_rollup: the same across all modules of a cohort
+
+Averages are stored as sum + count pairs so they can be maintained
+incrementally and combined across rows. Distinct student counts are
+maintained by checking, for each inserted or deleted raw row, whether
+another row for the same student already falls in the same group.
+
+Because the triggers live in the database, every writer (the ingest API,
+test fixtures, ad-hoc scripts) keeps the rollups current. Bulk loads drop
+a table's triggers and rebuild the affected rollups in one pass instead.
+"""
+
+import json
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class RollupSpec:
+    """One trigger-maintained rollup table."""
+    table: str
+    source: str                                   # raw table being aggregated
+    keys: Tuple[Tuple[str, str, str], ...]        # (column, type, expression over {row})
+    match: Tuple[str, ...]                        # source columns identifying a student within a group
+    distinct_column: str                          # distinct student count column
+    measures: Tuple[Tuple[str, str, str], ...]    # (column, type, expression over {row})
+    lookup: Optional[Tuple[str, str, str]] = None  # (table, alias, join condition) for the cohort
+    indexes: Tuple[str, ...] = ()
+
+    # Schema
+
+    def create_sql(self) -> str:
+        columns = [f"{name} {sql_type} NOT NULL" for name, sql_type, _ in self.keys]
+        columns.append(f"{self.distinct_column} INTEGER NOT NULL DEFAULT 0")
+        columns += [
+            f"{name} {sql_type} NOT NULL DEFAULT 0" for name, sql_type, _ in self.measures
+        ]
+        return (
+            f"CREATE TABLE IF NOT EXISTS {self.table} (\n    "
+            + ",\n    ".join(columns)
+            + f",\n    PRIMARY KEY ({', '.join(self._key_columns)})\n) WITHOUT ROWID"
+        )
+
+    def trigger_sql(self) -> Dict[str, List[str]]:
+        """CREATE TRIGGER statements, keyed by the table they are defined on."""
+        triggers = {
+            self.source: [
+                self._trigger('ai', f"AFTER INSERT ON {self.source}", [
+                    self._add_sql('NEW', f"NOT {self._exists_other('NEW', exclude_self=True)}"),
+                ]),
+                self._trigger('ad', f"AFTER DELETE ON {self.source}", [
+                    self._subtract_sql('OLD', f"NOT {self._exists_other('OLD')}"),
+                ]),
+                # An update is the old row leaving its group and the new row
+                # joining one; the distinct count only moves if the student
+                # changed groups
+                self._trigger('au', f"AFTER UPDATE ON {self.source}", [
+                    self._subtract_sql(
+                        'OLD', f"{self._moved()} AND NOT {self._exists_other('OLD')}"
+                    ),
+                    self._add_sql(
+                        'NEW',
+                        f"{self._moved()} AND NOT {self._exists_other('NEW', exclude_self=True)}"
+                    ),
+                ]),
+            ]
+        }
+
+        if self.lookup:
+            # Rows are attributed to a cohort through the lookup table, so
+            # a student joining, leaving or changing cohort re-aggregates the
+            # cohorts involved
+            table, _, _ = self.lookup
+            has_rows = "EXISTS (SELECT 1 FROM {source} x WHERE x.student_id = {row}.student_id)"
+            triggers[table] = [
+                self._trigger(
+                    'lookup_ai',
+                    f"AFTER INSERT ON {table} "
+                    f"WHEN {has_rows.format(source=self.source, row='NEW')}",
+                    self.rebuild_sql("NEW.cohort_id"),
+                ),
+                self._trigger(
+                    'lookup_ad',
+                    f"AFTER DELETE ON {table} "
+                    f"WHEN {has_rows.format(source=self.source, row='OLD')}",
+                    self.rebuild_sql("OLD.cohort_id"),
+                ),
+                self._trigger(
+                    'lookup_au',
+                    f"AFTER UPDATE OF cohort_id, student_id ON {table} "
+                    f"WHEN (OLD.cohort_id IS NOT NEW.cohort_id OR OLD.student_id IS NOT NEW.student_id) "
+                    f"AND ({has_rows.format(source=self.source, row='OLD')} "
+                    f"OR {has_rows.format(source=self.source, row='NEW')})",
+                    self.rebuild_sql("OLD.cohort_id, NEW.cohort_id"),
+                ),
+            ]
+
+        return triggers
+
+    def rebuild_sql(self, cohort_filter: Optional[str] = None) -> List[str]:
+        """
+        Statements that re-aggregate the rollup from the raw table.
+
+        Args:
+            cohort_filter: SQL list for `cohort_id IN (...)`; None rebuilds everything
+        """
+        row = 'x'
+        key_exprs = [self._expr(expr, row) for _, _, expr in self.keys]
+        cohort_expr = key_exprs[self._key_columns.index('cohort_id')]
+
+        delete = f"DELETE FROM {self.table}"
+        select = (
+            f"INSERT INTO {self.table} "
+            f"({', '.join(self._all_columns)}) "
+            f"SELECT {', '.join(key_exprs)}, COUNT(DISTINCT {row}.student_id), "
+            + ", ".join(f"SUM({self._expr(expr, row)})" for _, _, expr in self.measures)
+            + f" FROM {self.source} {row}"
+        )
+        if self.lookup:
+            table, alias, condition = self.lookup
+            select += f" JOIN {table} {alias} ON {condition.format(row=row)}"
+
+        if cohort_filter is not None:
+            delete += f" WHERE cohort_id IN ({cohort_filter})"
+            select += f" WHERE {cohort_expr} IN ({cohort_filter})"
+
+        select += f" GROUP BY {', '.join(key_exprs)}"
+        return [delete, select]
+
+    # Trigger bodies
+
+    @property
+    def _key_columns(self) -> List[str]:
+        return [name for name, _, _ in self.keys]
+
+    @property
+    def _all_columns(self) -> List[str]:
+        return (
+            self._key_columns
+            + [self.distinct_column]
+            + [name for name, _, _ in self.measures]
+        )
+
+    def _expr(self, template: str, row: str) -> str:
+        return template.format(row=row)
+
+    def _trigger(self, suffix: str, event: str, statements: List[str]) -> str:
+        body = "".join(f"    {statement};\n" for statement in statements)
+        return (
+            f"CREATE TRIGGER IF NOT EXISTS trg_{self.table}_{suffix} "
+            f"{event}\nBEGIN\n{body}END"
+        )
+
+    def _exists_other(self, row: str, exclude_self: bool = False) -> str:
+        conditions = [f"o.{column} = {row}.{column}" for column in self.match]
+        if exclude_self:
+            conditions.append(f"o.rowid <> {row}.rowid")
+        return f"EXISTS (SELECT 1 FROM {self.source} o WHERE {' AND '.join(conditions)})"
+
+    def _moved(self) -> str:
+        same = " AND ".join(f"NEW.{column} IS OLD.{column}" for column in self.match)
+        return f"NOT ({same})"
+
+    def _from_row(self, row: str) -> str:
+        if not self.lookup:
+            return " WHERE true"
+        table, alias, condition = self.lookup
+        return f" FROM {table} {alias} WHERE {condition.format(row=row)}"
+
+    def _key_value(self, template: str, row: str) -> str:
+        """A key expression as a scalar, going through the lookup if needed."""
+        expr = self._expr(template, row)
+        if self.lookup and expr.startswith(self.lookup[1] + '.'):
+            return f"(SELECT {expr}{self._from_row(row)})"
+        return expr
+
+    def _add_sql(self, row: str, distinct: str) -> str:
+        values = (
+            [self._expr(expr, row) for _, _, expr in self.keys]
+            + [f"({distinct})"]
+            + [self._expr(expr, row) for _, _, expr in self.measures]
+        )
+        increments = [
+            f"{column} = {column} + excluded.{column}"
+            for column in self._all_columns[len(self.keys):]
+        ]
+        return (
+            f"INSERT INTO {self.table} ({', '.join(self._all_columns)}) "
+            f"SELECT {', '.join(values)}{self._from_row(row)} "
+            f"ON CONFLICT ({', '.join(self._key_columns)}) "
+            f"DO UPDATE SET {', '.join(increments)}"
+        )
+
+    def _subtract_sql(self, row: str, distinct: str) -> str:
+        decrements = [f"{self.distinct_column} = {self.distinct_column} - ({distinct})"]
+        decrements += [
+            f"{name} = {name} - ({self._expr(expr, row)})" for name, _, expr in self.measures
+        ]
+        where = " AND ".join(
+            f"{name} = {self._key_value(expr, row)}" for name, _, expr in self.keys
+        )
+        return f"UPDATE {self.table} SET {', '.join(decrements)} WHERE {where}"
+
+
+_ENGAGEMENT_MEASURES = (
+    ('total_posts', 'INTEGER', "COALESCE({row}.posts_created, 0)"),
+    ('total_replies', 'INTEGER', "COALESCE({row}.replies_made, 0)"),
+    ('total_office_hours', 'INTEGER', "COALESCE({row}.office_hours_attended, 0)"),
+    ('total_peer_reviews', 'INTEGER', "COALESCE({row}.peer_reviews_given, 0)"),
+)
+
+_PROGRESS_MEASURES = (
+    ('completions', 'INTEGER', "COALESCE({row}.completed = 1, 0)"),
+    ('satisfaction_sum', 'REAL', "COALESCE({row}.satisfaction_score, 0)"),
+    ('satisfaction_count', 'INTEGER', "{row}.satisfaction_score IS NOT NULL"),
+    ('time_spent_sum', 'INTEGER', "COALESCE({row}.time_spent_minutes, 0)"),
+    ('time_spent_count', 'INTEGER', "{row}.time_spent_minutes IS NOT NULL"),
+)
+
+# course_progress has no cohort column; rows belong to their student's cohort
+_STUDENT_COHORT = ('students', 's', "s.student_id = {row}.student_id")
+
+
+ROLLUPS: Dict[str, RollupSpec] = {
+    'engagement_weekly_rollup': RollupSpec(
+        table='engagement_weekly_rollup',
+        source='community_engagement',
+        keys=(
+            ('cohort_id', 'TEXT', "{row}.cohort_id"),
+            ('week_number', 'INTEGER', "{row}.week_number"),
+        ),
+        match=('cohort_id', 'week_number', 'student_id'),
+        distinct_column='active_students',
+        measures=_ENGAGEMENT_MEASURES,
+    ),
+    'engagement_cohort_rollup': RollupSpec(
+        table='engagement_cohort_rollup',
+        source='community_engagement',
+        keys=(('cohort_id', 'TEXT', "{row}.cohort_id"),),
+        match=('student_id', 'cohort_id'),
+        distinct_column='active_students',
+        measures=_ENGAGEMENT_MEASURES,
+    ),
+    'module_progress_rollup': RollupSpec(
+        table='module_progress_rollup',
+        source='course_progress',
+        keys=(
+            ('cohort_id', 'TEXT', "s.cohort_id"),
+            ('module_id', 'TEXT', "{row}.module_id"),
+        ),
+        match=('student_id', 'module_id'),
+        distinct_column='total_students',
+        measures=_PROGRESS_MEASURES,
+        lookup=_STUDENT_COHORT,
+        indexes=(
+            # Module filter without a cohort
+            "CREATE INDEX IF NOT EXISTS idx_module_progress_rollup_module "
+            "ON module_progress_rollup(module_id)",
+        ),
+    ),
+    'cohort_progress_rollup': RollupSpec(
+        table='cohort_progress_rollup',
+        source='course_progress',
+        keys=(('cohort_id', 'TEXT', "s.cohort_id"),),
+        match=('student_id',),
+        distinct_column='total_students',
+        measures=_PROGRESS_MEASURES,
+        lookup=_STUDENT_COHORT,
+    ),
+}
+
+
+def _dependent(table: Optional[str]) -> List[RollupSpec]:
+    """Rollups whose contents depend on writes to `table` (all if None)."""
+    return [
+        spec for spec in ROLLUPS.values()
+        if table is None or spec.source == table or (spec.lookup and spec.lookup[0] == table)
+    ]
+
+
+def rollup_triggers(table: str) -> List[str]:
+    """CREATE TRIGGER statements defined on `table`."""
+    statements = []
+    for spec in ROLLUPS.values():
+        statements += spec.trigger_sql().get(table, [])
+    return statements
+
+
+def create_rollups(conn: sqlite3.Connection):
+    """
+    Create rollup tables and their triggers.
+
+    Rollups that are empty while their raw table has rows (a database
+    created before rollups existed) are backfilled.
+    """
+    for spec in ROLLUPS.values():
+        conn.execute(spec.create_sql())
+        for statement in spec.indexes:
+            conn.execute(statement)
+        for statements in spec.trigger_sql().values():
+            for statement in statements:
+                conn.execute(statement)
+
+        empty = conn.execute(f"SELECT NOT EXISTS (SELECT 1 FROM {spec.table})").fetchone()[0]
+        has_rows = conn.execute(f"SELECT EXISTS (SELECT 1 FROM {spec.source})").fetchone()[0]
+        if empty and has_rows:
+            for statement in spec.rebuild_sql():
+                conn.execute(statement)
+
+
+def rebuild_rollups(
+    conn: sqlite3.Connection,
+    table: Optional[str] = None,
+    cohort_ids: Optional[Sequence[str]] = None
+):
+    """
+    Re-aggregate rollups from the raw tables.
+
+    Args:
+        conn: Writable connection
+        table: Only rebuild rollups that depend on this raw table (default: all)
+        cohort_ids: Only rebuild these cohorts. Applied to rollups whose
+            source is `table`; rollups that depend on it through the
+            students lookup (students can move cohorts) are rebuilt in full
+    """
+    for spec in _dependent(table):
+        if cohort_ids is not None and spec.source == table:
+            statements = spec.rebuild_sql("SELECT value FROM json_each(?)")
+            params = (json.dumps(list(cohort_ids)),)
+        else:
+            statements = spec.rebuild_sql()
+            params = ()
+        for statement in statements:
+            conn.execute(statement, params)
@@ -0,0 +1,467 @@
+"""
+At-Risk Student Scoring for the Learning Analytics MCP Server
+
+Scores every student in a cohort for risk of not sustaining the course's
+practices after it ends (the retention outcome tracked in
+retention_tracking):
+
+1. Feature extraction: one grouped query pulls each student's progress,
+   engagement and practice-adoption history into columnar NumPy arrays
+2. Model: logistic regression over standardized features, fitted offline
+   with Newton's method (IRLS) from past cohorts' retention outcomes
+3. Scoring: one matrix-vector product scores the whole cohort and
+   argpartition picks the top-k without sorting everyone
+
+Until a model has been trained, a hand-weighted heuristic over
+cohort-relative (z-scored) features ranks students instead.
+"""
+
+import json
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    print("⚠️  NumPy not available. At-risk scoring will be disabled.")
+
+
+# (feature, label used when explaining a score)
+FEATURES: List[Tuple[str, str]] = [
+    ('completion_rate', 'module completion rate'),
+    ('avg_satisfaction', 'satisfaction score'),
+    ('avg_time_minutes', 'time spent per module'),
+    ('weeks_active', 'weeks active in community'),
+    ('weeks_since_active', 'weeks since last community activity'),
+    ('contributions_per_week', 'posts and replies per active week'),
+    ('office_hours', 'office hours attended'),
+    ('peer_reviews', 'peer reviews given'),
+    ('frameworks_adopted', 'frameworks adopted'),
+    ('evidence_rate', 'adoption evidence shared'),
+]
+FEATURE_NAMES = [name for name, _ in FEATURES]
+
+# Fallback weights (on z-scored features) used before a model is trained:
+# disengagement and low adoption raise risk
+HEURISTIC_WEIGHTS = {
+    'completion_rate': -1.0,
+    'avg_satisfaction': -0.5,
+    'avg_time_minutes': -0.1,
+    'weeks_active': -0.8,
+    'weeks_since_active': 0.8,
+    'contributions_per_week': -0.5,
+    'office_hours': -0.3,
+    'peer_reviews': -0.3,
+    'frameworks_adopted': -0.7,
+    'evidence_rate': -0.4,
+}
+HEURISTIC_BIAS = -1.0
+
+RISK_LEVELS = [(0.6, 'high'), (0.3, 'medium'), (0.0, 'low')]
+
+
+_FEATURE_QUERY = """
+    -- CROSS JOIN keeps the cohort's roster as the outer loop, so only its
+    -- students' rows are read (not every row of each history table)
+    WITH roster AS (
+        SELECT student_id, cohort_id, persona_type
+        FROM students
+        {roster_filter}
+    ),
+    progress AS (
+        SELECT
+            cp.student_id,
+            AVG(CASE WHEN cp.completed = 1 THEN 1.0 ELSE 0.0 END) as completion_rate,
+            AVG(cp.satisfaction_score) as avg_satisfaction,
+            AVG(cp.time_spent_minutes) as avg_time_minutes
+        FROM roster
+        CROSS JOIN course_progress cp ON cp.student_id = roster.student_id
+        GROUP BY cp.student_id
+    ),
+    engagement AS (
+        SELECT
+            ce.student_id,
+            COUNT(DISTINCT ce.week_number) as weeks_active,
+            MAX(ce.week_number) as last_active_week,
+            SUM(COALESCE(ce.posts_created, 0) + COALESCE(ce.replies_made, 0)) as contributions,
+            SUM(COALESCE(ce.office_hours_attended, 0)) as office_hours,
+            SUM(COALESCE(ce.peer_reviews_given, 0)) as peer_reviews
+        FROM roster
+        CROSS JOIN community_engagement ce
+            ON ce.student_id = roster.student_id AND ce.cohort_id = roster.cohort_id
+        GROUP BY ce.student_id
+    ),
+    adoption AS (
+        SELECT
+            pa.student_id,
+            COUNT(DISTINCT CASE
+                WHEN pa.self_reported = 1 OR pa.evidence_shared = 1 OR pa.peer_validated = 1
+                THEN pa.framework_name
+            END) as frameworks_adopted,
+            AVG(CASE
+                WHEN pa.evidence_shared = 1 OR pa.peer_validated = 1 THEN 1.0 ELSE 0.0
+            END) as evidence_rate
+        FROM roster
+        CROSS JOIN practice_adoption pa ON pa.student_id = roster.student_id
+        GROUP BY pa.student_id
+    ),
+    latest AS (
+        SELECT cohort_id, MAX(week_number) as latest_week
+        FROM engagement_weekly_rollup
+        WHERE active_students > 0 {latest_filter}
+        GROUP BY cohort_id
+    )
+    SELECT
+        roster.student_id,
+        roster.cohort_id,
+        roster.persona_type,
+        COALESCE(progress.completion_rate, 0),
+        progress.avg_satisfaction,
+        progress.avg_time_minutes,
+        COALESCE(engagement.weeks_active, 0),
+        COALESCE(latest.latest_week - engagement.last_active_week, latest.latest_week, 0),
+        COALESCE(engagement.contributions * 1.0 / engagement.weeks_active, 0),
+        COALESCE(engagement.office_hours, 0),
+        COALESCE(engagement.peer_reviews, 0),
+        COALESCE(adoption.frameworks_adopted, 0),
+        COALESCE(adoption.evidence_rate, 0)
+        {label_column}
+    FROM roster
+    LEFT JOIN progress ON progress.student_id = roster.student_id
+    LEFT JOIN engagement ON engagement.student_id = roster.student_id
+    LEFT JOIN adoption ON adoption.student_id = roster.student_id
+    LEFT JOIN latest ON latest.cohort_id = roster.cohort_id
+    {label_join}
+    ORDER BY roster.student_id
+"""
+
+
+@dataclass
+class StudentFeatures:
+    """Columnar feature arrays, one row per student."""
+    student_ids: "np.ndarray"
+    cohort_ids: "np.ndarray"
+    persona_types: "np.ndarray"
+    X: "np.ndarray"                    # (students, len(FEATURES)), NaN where unknown
+    y: Optional["np.ndarray"] = None   # 1 = did not sustain practices (training only)
+
+    def __len__(self) -> int:
+        return len(self.student_ids)
+
+
+def extract_features(
+    conn: sqlite3.Connection,
+    cohort_id: Optional[str] = None,
+    months_post_course: Optional[int] = None
+) -> StudentFeatures:
+    """
+    Pull per-student features in one grouped query.
+
+    Args:
+        conn: Read connection to the analytics database
+        cohort_id: Only this cohort's students (default: every student)
+        months_post_course: If set, also load training labels from the
+            retention survey at this horizon; unsurveyed students are skipped
+    """
+    _require_numpy()
+
+    params: Dict[str, Any] = {}
+    roster_filter = latest_filter = label_column = label_join = ""
+    if cohort_id is not None:
+        roster_filter = "WHERE cohort_id = :cohort_id"
+        latest_filter = "AND cohort_id = :cohort_id"
+        params['cohort_id'] = cohort_id
+    if months_post_course is not None:
+        label_column = ", CASE WHEN rt.still_using_practices = 1 THEN 0 ELSE 1 END"
+        label_join = (
+            "JOIN retention_tracking rt ON rt.student_id = roster.student_id "
+            "AND rt.cohort_id = roster.cohort_id "
+            "AND rt.months_post_course = :months_post_course "
+            "AND rt.still_using_practices IS NOT NULL"
+        )
+        params['months_post_course'] = months_post_course
+
+    query = _FEATURE_QUERY.format(
+        roster_filter=roster_filter,
+        latest_filter=latest_filter,
+        label_column=label_column,
+        label_join=label_join
+    )
+
+    # Plain tuples are much cheaper to convert than sqlite3.Row
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    rows = cursor.execute(query, params).fetchall()
+
+    n_features = len(FEATURES)
+    if not rows:
+        empty = np.empty(0, dtype=object)
+        return StudentFeatures(
+            empty, empty, empty, np.empty((0, n_features)),
+            np.empty(0) if months_post_course is not None else None
+        )
+
+    columns = list(zip(*rows))
+    X = np.array(columns[3:3 + n_features], dtype=np.float64).T  # None -> NaN
+    y = None
+    if months_post_course is not None:
+        y = np.array(columns[3 + n_features], dtype=np.float64)
+
+    return StudentFeatures(
+        student_ids=np.array(columns[0], dtype=object),
+        cohort_ids=np.array(columns[1], dtype=object),
+        persona_types=np.array(columns[2], dtype=object),
+        X=X,
+        y=y
+    )
+
+
+class RiskModel:
+    """
+    Logistic at-risk model over standardized student features.
+
+    Usage:
+        model = RiskModel.fit(extract_features(conn, months_post_course=6))
+        model.save("data/at_risk_model.json")
+        probabilities = RiskModel.load("data/at_risk_model.json").predict_proba(features.X)
+    """
+
+    def __init__(
+        self,
+        weights: "np.ndarray",
+        bias: float,
+        mean: Optional["np.ndarray"] = None,
+        std: Optional["np.ndarray"] = None,
+        fill: Optional["np.ndarray"] = None,
+        source: str = 'heuristic',
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Args:
+            weights: One weight per feature (on standardized values)
+            bias: Intercept
+            mean, std: Standardization from training; None standardizes
+                each scored batch against itself (cohort-relative)
+            fill: Per-feature values for missing data (default: batch mean)
+            source: 'trained' or 'heuristic'
+            metadata: Training details reported alongside scores
+        """
+        _require_numpy()
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        self.mean = None if mean is None else np.asarray(mean, dtype=np.float64)
+        self.std = None if std is None else np.asarray(std, dtype=np.float64)
+        self.fill = None if fill is None else np.asarray(fill, dtype=np.float64)
+        self.source = source
+        self.metadata = metadata or {}
+
+    @classmethod
+    def heuristic(cls) -> 'RiskModel':
+        return cls(
+            weights=[HEURISTIC_WEIGHTS[name] for name in FEATURE_NAMES],
+            bias=HEURISTIC_BIAS
+        )
+
+    @classmethod
+    def fit(
+        cls,
+        features: StudentFeatures,
+        l2: float = 1.0,
+        max_iter: int = 25,
+        tol: float = 1e-6
+    ) -> 'RiskModel':
+        """
+        Fit by Newton's method (IRLS) with an L2 penalty on the weights.
+
+        Args:
+            features: Labelled features (extract_features with months_post_course)
+            l2: Ridge penalty; keeps small or separable samples stable
+        """
+        if features.y is None:
+            raise ValueError("Training needs labelled features (pass months_post_course)")
+        y = features.y
+        if len(y) < 10 or y.min() == y.max():
+            raise ValueError(
+                f"Need at least 10 surveyed students with both outcomes to train "
+                f"(got {len(y)}, {int(y.sum())} at risk)"
+            )
+
+        fill = _nanmean(features.X)
+        X = np.where(np.isnan(features.X), fill, features.X)
+        mean = X.mean(axis=0)
+        std = X.std(axis=0)
+        std[std == 0] = 1.0
+        Z = np.hstack([np.ones((len(X), 1)), (X - mean) / std])
+
+        penalty = np.full(Z.shape[1], l2)
+        penalty[0] = 0.0  # don't shrink the intercept
+        w = np.zeros(Z.shape[1])
+        for iteration in range(1, max_iter + 1):
+            p = _sigmoid(Z @ w)
+            gradient = Z.T @ (y - p) - penalty * w
+            hessian = (Z * (p * (1 - p))[:, None]).T @ Z + np.diag(penalty)
+            step = np.linalg.solve(hessian, gradient)
+            w += step
+            if np.abs(step).max() < tol:
+                break
+
+        p = _sigmoid(Z @ w)
+        metadata = {
+            'trained_at': datetime.now().isoformat(),
+            'n_samples': int(len(y)),
+            'at_risk_rate': round(float(y.mean()), 3),
+            'train_accuracy': round(float(((p >= 0.5) == (y == 1)).mean()), 3),
+            'train_auc': round(_auc(y, p), 3),
+            'iterations': iteration,
+        }
+        return cls(w[1:], w[0], mean, std, fill, source='trained', metadata=metadata)
+
+    def standardize(self, X: "np.ndarray") -> "np.ndarray":
+        fill = self.fill if self.fill is not None else _nanmean(X)
+        X = np.where(np.isnan(X), fill, X)
+        if self.mean is not None:
+            return (X - self.mean) / self.std
+        std = X.std(axis=0)
+        std[std == 0] = 1.0
+        return (X - X.mean(axis=0)) / std
+
+    def predict_proba(self, X: "np.ndarray") -> "np.ndarray":
+        """Probability each student does not sustain the practices."""
+        if len(X) == 0:
+            return np.empty(0)
+        return _sigmoid(self.standardize(X) @ self.weights + self.bias)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'features': FEATURE_NAMES,
+            'weights': self.weights.tolist(),
+            'bias': self.bias,
+            'mean': None if self.mean is None else self.mean.tolist(),
+            'std': None if self.std is None else self.std.tolist(),
+            'fill': None if self.fill is None else self.fill.tolist(),
+            'source': self.source,
+            'metadata': self.metadata
+        }
+
+    def save(self, path: Union[str, Path]):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'RiskModel':
+        data = json.loads(Path(path).read_text())
+        if data['features'] != FEATURE_NAMES:
+            raise ValueError(
+                f"Model at {path} was trained on different features; retrain it"
+            )
+        return cls(
+            data['weights'], data['bias'], data['mean'], data['std'], data['fill'],
+            source=data.get('source', 'trained'), metadata=data.get('metadata')
+        )
+
+
+def rank_at_risk(
+    features: StudentFeatures,
+    model: RiskModel,
+    top_k: int = 10,
+    n_factors: int = 3
+) -> Tuple["np.ndarray", List[Dict[str, Any]]]:
+    """
+    Score every student and explain the top_k highest risks.
+
+    Returns:
+        (probabilities for all students, top_k student dicts sorted by risk)
+    """
+    _require_numpy()
+    if len(features) == 0:
+        return np.empty(0), []
+
+    Z = model.standardize(features.X)
+    scores = _sigmoid(Z @ model.weights + model.bias)
+
+    k = min(top_k, len(scores))
+    if k <= 0:
+        return scores, []
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind='stable')]
+
+    # Per-feature push towards risk for just the selected students
+    contributions = Z[top] * model.weights
+    factor_order = np.argsort(-contributions, axis=1)[:, :n_factors]
+
+    students = []
+    for row, index in enumerate(top):
+        factors = []
+        for feature in factor_order[row]:
+            if contributions[row, feature] <= 0:
+                break
+            direction = 'low' if Z[index, feature] < 0 else 'high'
+            factors.append(f"{direction} {FEATURES[feature][1]}")
+
+        students.append({
+            'student_id': features.student_ids[index],
+            'cohort_id': features.cohort_ids[index],
+            'persona_type': features.persona_types[index],
+            'risk_score': round(float(scores[index]), 3),
+            'risk_level': risk_level(float(scores[index])),
+            'top_factors': factors,
+            'features': {
+                name: (None if np.isnan(value) else round(float(value), 2))
+                for name, value in zip(FEATURE_NAMES, features.X[index])
+            }
+        })
+
+    return scores, students
+
+
+def risk_level(score: float) -> str:
+    for threshold, level in RISK_LEVELS:
+        if score >= threshold:
+            return level
+    return 'low'
+
+
+def risk_distribution(scores: "np.ndarray") -> Dict[str, int]:
+    high, medium = RISK_LEVELS[0][0], RISK_LEVELS[1][0]
+    return {
+        'high': int((scores >= high).sum()),
+        'medium': int(((scores >= medium) & (scores < high)).sum()),
+        'low': int((scores < medium).sum()),
+    }
+
+
+def _require_numpy():
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("At-risk scoring requires numpy (pip install numpy)")
+
+
+def _sigmoid(z: "np.ndarray") -> "np.ndarray":
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -35, 35)))
+
+
+def _nanmean(X: "np.ndarray") -> "np.ndarray":
+    """Column means ignoring NaN; all-missing columns get 0."""
+    counts = (~np.isnan(X)).sum(axis=0)
+    sums = np.nansum(X, axis=0)
+    return np.divide(sums, counts, out=np.zeros(X.shape[1]), where=counts > 0)
+
+
+def _auc(y: "np.ndarray", p: "np.ndarray") -> float:
+    """Rank-based ROC AUC (Mann-Whitney U), ties averaged."""
+    order = np.argsort(p, kind='mergesort')
+    ranks = np.empty(len(p))
+    ranks[order] = np.arange(1, len(p) + 1)
+    # Average ranks over tied scores
+    _, inverse, counts = np.unique(p, return_inverse=True, return_counts=True)
+    rank_sums = np.bincount(inverse, weights=ranks)
+    ranks = (rank_sums / counts)[inverse]
+
+    positives = y == 1
+    n_pos, n_neg = positives.sum(), (~positives).sum()
+    return float((ranks[positives].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg))
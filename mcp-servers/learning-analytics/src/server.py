@@ -11,14 +11,111 @@ Key Tools Provided:
 - get_outcome_metrics: 6-month retention, harm prevention
 - get_persona_analytics: Performance by student persona
 - get_cohort_health: Overall cohort status
+- get_engagement_trend: Week-by-week engagement series with moving averages
+- get_nps_trend: NPS by week or month with moving averages
+- get_*_batch: Course, engagement, outcome and health metrics for many
+  cohorts in one call
+- predict_student_outcomes: Top-k at-risk students in a cohort
+- compare_cohorts: Confidence intervals and pairwise significance tests
+  across cohorts
+
+get_course_metrics and get_persona_analytics can add confidence intervals
+and significance tests (include_statistics=True, see significance.py).
+
+get_persona_analytics and the outcome tools can also read a columnar
+snapshot (source='snapshot', see snapshot.py) instead of the live database.
+
+`python src/server.py serve` runs the MCP server loop (JSON-RPC over stdio
+or a shared Unix socket, see transport.py). call_tool validates and coerces
+arguments against each tool's schema first (see validation.py).
 """
 
+import argparse
+import asyncio
 import json
 import sqlite3
+import sys
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any, TextIO, Tuple, Union
 from pathlib import Path
 
+try:
+    from .connection_pool import SQLiteConnectionPool
+    from .ingest import TABLE_SPECS, BulkLoader, read_records
+    from .query_cache import ToolResultCache, cached_tool
+    from .rollups import create_rollups, rebuild_rollups, rollup_triggers
+    from .scoring import RiskModel, extract_features, rank_at_risk, risk_distribution
+    from .significance import (
+        ALPHA, CONFIDENCE, compare_means, compare_proportions, mean_interval, rate_intervals
+    )
+    from .snapshot import (
+        Snapshot, current_snapshot_name, export_snapshot, outcome_counts, persona_breakdown
+    )
+    from .transport import AsyncMCPServer
+    from .validation import ToolArgumentError, compile_validators
+except ImportError:  # Running as a script: python src/server.py
+    from connection_pool import SQLiteConnectionPool
+    from ingest import TABLE_SPECS, BulkLoader, read_records
+    from query_cache import ToolResultCache, cached_tool
+    from rollups import create_rollups, rebuild_rollups, rollup_triggers
+    from scoring import RiskModel, extract_features, rank_at_risk, risk_distribution
+    from significance import (
+        ALPHA, CONFIDENCE, compare_means, compare_proportions, mean_interval, rate_intervals
+    )
+    from snapshot import (
+        Snapshot, current_snapshot_name, export_snapshot, outcome_counts, persona_breakdown
+    )
+    from transport import AsyncMCPServer
+    from validation import ToolArgumentError, compile_validators
+
+
+# Secondary indexes, matched to the filters each MCP tool applies.
+# Keyed by table so bulk loaders can drop and rebuild one table's indexes.
+ANALYTICS_INDEXES: Dict[str, List[str]] = {
+    'students': [
+        # Cohort and persona filters; covers the student_id join key
+        "CREATE INDEX IF NOT EXISTS idx_students_cohort_persona "
+        "ON students(cohort_id, persona_type, student_id)",
+    ],
+    'course_progress': [
+        # Per-student joins, optionally narrowed to one module. Covers the
+        # aggregated columns so unfiltered metrics never touch the table
+        "CREATE INDEX IF NOT EXISTS idx_course_progress_student_module "
+        "ON course_progress(student_id, module_id, completed, "
+        "satisfaction_score, time_spent_minutes)",
+        # Module filter without a cohort
+        "CREATE INDEX IF NOT EXISTS idx_course_progress_module "
+        "ON course_progress(module_id, student_id)",
+    ],
+    'community_engagement': [
+        # Cohort/week filters and latest-week lookups
+        "CREATE INDEX IF NOT EXISTS idx_engagement_cohort_week "
+        "ON community_engagement(cohort_id, week_number, student_id)",
+        "CREATE INDEX IF NOT EXISTS idx_engagement_student "
+        "ON community_engagement(student_id, week_number)",
+    ],
+    'practice_adoption': [
+        "CREATE INDEX IF NOT EXISTS idx_practice_adoption_student "
+        "ON practice_adoption(student_id, week_number)",
+    ],
+    'retention_tracking': [
+        "CREATE INDEX IF NOT EXISTS idx_retention_cohort_months "
+        "ON retention_tracking(cohort_id, months_post_course)",
+    ],
+    'harm_prevention': [
+        "CREATE INDEX IF NOT EXISTS idx_harm_prevention_student "
+        "ON harm_prevention(student_id, week_number)",
+    ],
+    'nps_scores': [
+        "CREATE INDEX IF NOT EXISTS idx_nps_cohort_survey "
+        "ON nps_scores(cohort_id, survey_type)",
+        # NPS trends group a cohort's scores by period; covering
+        "CREATE INDEX IF NOT EXISTS idx_nps_cohort_recorded "
+        "ON nps_scores(cohort_id, recorded_at, survey_type, score)",
+    ],
+}
+
 
 class LearningAnalyticsServer:
     """
@@ -26,24 +123,57 @@ class LearningAnalyticsServer:
 
     Provides AI agents with access to student performance,
     engagement, and outcome data for data-driven decision making.
+
+    Tool results are memoized per (tool, arguments) and invalidated when
+    the tables they read are written to, or after cache_ttl_seconds.
     """
 
-    def __init__(self, db_path: str = "./data/analytics.db"):
+    def __init__(
+        self,
+        db_path: str = "./data/analytics.db",
+        cache_ttl_seconds: float = 30.0,
+        pool_size: int = 4,
+        risk_model_path: Optional[str] = None,
+        snapshot_dir: Optional[str] = None
+    ):
         """
         Initialize the Learning Analytics MCP Server
 
         Args:
             db_path: Path to SQLite database with analytics data
+            cache_ttl_seconds: How long tool results are reused (0 disables caching)
+            pool_size: Number of pooled read connections
+            risk_model_path: Trained at-risk model (default: at_risk_model.json
+                next to the database)
+            snapshot_dir: Columnar snapshots for source='snapshot' reads
+                (default: snapshots/ next to the database)
         """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.cache = ToolResultCache(ttl_seconds=cache_ttl_seconds)
+        self._write_lock = threading.Lock()
+        self.risk_model_path = (
+            Path(risk_model_path) if risk_model_path
+            else self.db_path.parent / "at_risk_model.json"
+        )
+        self._risk_model: Optional[RiskModel] = None
+        self._risk_model_lock = threading.Lock()
+        self.snapshot_dir = (
+            Path(snapshot_dir) if snapshot_dir else self.db_path.parent / "snapshots"
+        )
+        self._snapshot: Optional[Snapshot] = None
+        self._snapshot_lock = threading.Lock()
         self._init_database()
+        self._pool = SQLiteConnectionPool(self.db_path, pool_size=pool_size)
 
     def _init_database(self):
         """Initialize database schema if not exists"""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
+        # WAL lets pooled readers run alongside a writer
+        cursor.execute("PRAGMA journal_mode = WAL")
+
         # Cohorts table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS cohorts (
@@ -155,13 +285,43 @@ class LearningAnalyticsServer:
             )
         """)
 
+        for statements in ANALYTICS_INDEXES.values():
+            for statement in statements:
+                cursor.execute(statement)
+
+        # Natural-key uniqueness, which bulk ingestion upserts against.
+        # Rows are never deleted here: tables with duplicate keys (loaded
+        # before the index existed) go without it until `migrate --dedupe`.
+        self.duplicate_keys: Dict[str, int] = {}
+        for spec in TABLE_SPECS.values():
+            if not spec.needs_unique_index:
+                # Tables keyed on their primary key (nps_scores used not to be)
+                cursor.execute(f"DROP INDEX IF EXISTS {spec.unique_index_name}")
+                continue
+            try:
+                cursor.execute(spec.unique_index_sql())
+            except sqlite3.IntegrityError:
+                self.duplicate_keys[spec.table] = cursor.execute(spec.duplicates_sql()).fetchone()[0]
+                # stderr: in `serve` mode stdout is the JSON-RPC stream
+                print(
+                    f"⚠️  {self.duplicate_keys[spec.table]} duplicate {spec.table} rows on "
+                    f"{spec.natural_key} - bulk loads into {spec.table} are disabled until "
+                    f"`server.py migrate --dedupe` removes them",
+                    file=sys.stderr
+                )
+
+        # Trigger-maintained aggregates the engagement/course tools read
+        create_rollups(conn)
+
         conn.commit()
         conn.close()
 
+    @cached_tool('course_progress', 'students')
     def get_course_metrics(
         self,
         cohort_id: Optional[str] = None,
-        module_id: Optional[str] = None
+        module_id: Optional[str] = None,
+        include_statistics: bool = False
     ) -> Dict[str, Any]:
         """
         Get course performance metrics
@@ -171,55 +331,49 @@ class LearningAnalyticsServer:
         Args:
             cohort_id: Filter by specific cohort (optional)
             module_id: Filter by specific module (optional)
+            include_statistics: Add a Wilson interval for the module
+                completion rate and a bootstrap interval for satisfaction
 
         Returns:
             Dictionary with completion rates, satisfaction scores, time metrics
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        # Build query with optional filters
-        query = """
+        # Read from the rollups: per (cohort, module) when filtering by
+        # module, otherwise per cohort. Students belong to one cohort, so
+        # distinct counts add up across cohorts.
+        rollup = 'module_progress_rollup' if module_id else 'cohort_progress_rollup'
+        query = f"""
             SELECT
-                COUNT(DISTINCT cp.student_id) as total_students,
-                SUM(CASE WHEN cp.completed = 1 THEN 1 ELSE 0 END) as completions,
-                ROUND(AVG(cp.satisfaction_score), 2) as avg_satisfaction,
-                ROUND(AVG(cp.time_spent_minutes), 0) as avg_time_minutes
-            FROM course_progress cp
-            JOIN students s ON cp.student_id = s.student_id
+                SUM(total_students) as total_students,
+                SUM(completions) as completions,
+                ROUND(SUM(satisfaction_sum) / NULLIF(SUM(satisfaction_count), 0), 2) as avg_satisfaction,
+                ROUND(1.0 * SUM(time_spent_sum) / NULLIF(SUM(time_spent_count), 0), 0) as avg_time_minutes
+            FROM {rollup}
             WHERE 1=1
         """
 
         params = []
         if cohort_id:
-            query += " AND s.cohort_id = ?"
+            query += " AND cohort_id = ?"
             params.append(cohort_id)
         if module_id:
-            query += " AND cp.module_id = ?"
+            query += " AND module_id = ?"
             params.append(module_id)
 
-        cursor.execute(query, params)
-        row = cursor.fetchone()
-
-        total = row['total_students'] or 0
-        completions = row['completions'] or 0
+        with self._pool.connection() as conn:
+            row = conn.execute(query, params).fetchone()
 
-        result = {
-            'total_students': total,
-            'completions': completions,
-            'completion_rate': round((completions / total * 100), 1) if total > 0 else 0,
-            'avg_satisfaction': row['avg_satisfaction'] or 0,
-            'avg_time_minutes': row['avg_time_minutes'] or 0,
-            'filters_applied': {
-                'cohort_id': cohort_id,
-                'module_id': module_id
-            }
-        }
+            distribution = None
+            if include_statistics:
+                distribution = self._progress_distribution(
+                    conn, cohort_id=cohort_id, module_id=module_id
+                ).get(None)
 
-        conn.close()
+        result = self._course_result(row, cohort_id, module_id)
+        if include_statistics:
+            result['statistics'] = self._progress_statistics(distribution)
         return result
 
+    @cached_tool('community_engagement', 'cohorts')
     def get_engagement_metrics(
         self,
         cohort_id: str,
@@ -237,59 +391,47 @@ class LearningAnalyticsServer:
         Returns:
             Dictionary with community activity metrics
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
+        # One rollup row: the cohort's week, or the cohort across all weeks
         query = """
             SELECT
-                COUNT(DISTINCT student_id) as active_students,
-                SUM(posts_created) as total_posts,
-                SUM(replies_made) as total_replies,
-                SUM(office_hours_attended) as total_office_hours,
-                SUM(peer_reviews_given) as total_peer_reviews
-            FROM community_engagement
+                active_students,
+                total_posts,
+                total_replies,
+                total_office_hours,
+                total_peer_reviews
+            FROM {rollup}
             WHERE cohort_id = ?
         """
 
         params = [cohort_id]
-        if week_number:
+        if week_number is not None:
+            query = query.format(rollup='engagement_weekly_rollup')
             query += " AND week_number = ?"
             params.append(week_number)
+        else:
+            query = query.format(rollup='engagement_cohort_rollup')
 
-        cursor.execute(query, params)
-        row = cursor.fetchone()
-
-        # Get total students in cohort
-        cursor.execute(
-            "SELECT student_count FROM cohorts WHERE cohort_id = ?",
-            (cohort_id,)
-        )
-        cohort_row = cursor.fetchone()
-        total_students = cohort_row['student_count'] if cohort_row else 0
+        with self._pool.connection() as conn:
+            row = conn.execute(query, params).fetchone()
 
-        active = row['active_students'] or 0
+            # Get total students in cohort
+            cohort_row = conn.execute(
+                "SELECT student_count FROM cohorts WHERE cohort_id = ?",
+                (cohort_id,)
+            ).fetchone()
 
-        result = {
-            'cohort_id': cohort_id,
-            'week_number': week_number,
-            'total_students': total_students,
-            'active_students': active,
-            'weekly_active_rate': round((active / total_students * 100), 1) if total_students > 0 else 0,
-            'total_posts': row['total_posts'] or 0,
-            'total_replies': row['total_replies'] or 0,
-            'total_office_hours': row['total_office_hours'] or 0,
-            'total_peer_reviews': row['total_peer_reviews'] or 0,
-            'avg_posts_per_student': round((row['total_posts'] or 0) / active, 1) if active > 0 else 0
-        }
+        total_students = cohort_row['student_count'] if cohort_row else 0
 
-        conn.close()
-        return result
+        # No rollup row yet means no activity recorded
+        totals = dict(row) if row else {}
+        return self._engagement_result(cohort_id, week_number, total_students, totals)
 
+    @cached_tool('retention_tracking', 'harm_prevention', 'students', 'cohorts', 'snapshot')
     def get_outcome_metrics(
         self,
         cohort_id: str,
-        months_post_course: int = 6
+        months_post_course: int = 6,
+        source: str = 'live'
     ) -> Dict[str, Any]:
         """
         Get outcome metrics (6-month retention, harm prevention)
@@ -299,65 +441,58 @@ class LearningAnalyticsServer:
         Args:
             cohort_id: Cohort to analyze
             months_post_course: Number of months post-course (default: 6)
+            source: 'live' database or latest columnar 'snapshot'
 
         Returns:
             Dictionary with outcome metrics
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        # Get retention data
-        cursor.execute("""
-            SELECT
-                COUNT(*) as total_responses,
-                SUM(CASE WHEN still_using_practices = 1 THEN 1 ELSE 0 END) as still_using
-            FROM retention_tracking
-            WHERE cohort_id = ? AND months_post_course = ?
-        """, (cohort_id, months_post_course))
-
-        retention_row = cursor.fetchone()
-        total_responses = retention_row['total_responses'] or 0
-        still_using = retention_row['still_using'] or 0
-
-        # Get harm prevention stories
-        cursor.execute("""
-            SELECT COUNT(DISTINCT hp.student_id) as students_with_stories
-            FROM harm_prevention hp
-            JOIN students s ON hp.student_id = s.student_id
-            WHERE s.cohort_id = ?
-        """, (cohort_id,))
-
-        harm_row = cursor.fetchone()
-
-        # Get cohort size
-        cursor.execute(
-            "SELECT student_count FROM cohorts WHERE cohort_id = ?",
-            (cohort_id,)
+        snapshot = self._get_snapshot(source)
+        if snapshot is not None:
+            counts = outcome_counts(snapshot, [cohort_id], months_post_course)[cohort_id]
+            result = self._outcome_result(cohort_id, months_post_course, **counts)
+            result['data_as_of'] = snapshot.created_at
+            return result
+
+        with self._pool.connection() as conn:
+            # Get retention data
+            retention_row = conn.execute("""
+                SELECT
+                    COUNT(*) as total_responses,
+                    SUM(CASE WHEN still_using_practices = 1 THEN 1 ELSE 0 END) as still_using
+                FROM retention_tracking
+                WHERE cohort_id = ? AND months_post_course = ?
+            """, (cohort_id, months_post_course)).fetchone()
+
+            # Get harm prevention stories
+            harm_row = conn.execute("""
+                SELECT COUNT(DISTINCT hp.student_id) as students_with_stories
+                FROM harm_prevention hp
+                JOIN students s ON hp.student_id = s.student_id
+                WHERE s.cohort_id = ?
+            """, (cohort_id,)).fetchone()
+
+            # Get cohort size
+            cohort_row = conn.execute(
+                "SELECT student_count FROM cohorts WHERE cohort_id = ?",
+                (cohort_id,)
+            ).fetchone()
+
+        return self._outcome_result(
+            cohort_id,
+            months_post_course,
+            total_students=cohort_row['student_count'] if cohort_row else 0,
+            total_responses=retention_row['total_responses'] or 0,
+            still_using=retention_row['still_using'] or 0,
+            students_with_stories=harm_row['students_with_stories'] or 0
         )
-        cohort_row = cursor.fetchone()
-        total_students = cohort_row['student_count'] if cohort_row else 0
-
-        result = {
-            'cohort_id': cohort_id,
-            'months_post_course': months_post_course,
-            'total_students': total_students,
-            'retention_responses': total_responses,
-            'still_using_practices': still_using,
-            'retention_rate': round((still_using / total_responses * 100), 1) if total_responses > 0 else 0,
-            'harm_prevention_stories': harm_row['students_with_stories'] or 0,
-            'harm_prevention_rate': round(
-                ((harm_row['students_with_stories'] or 0) / total_students * 100), 1
-            ) if total_students > 0 else 0
-        }
-
-        conn.close()
-        return result
 
+    @cached_tool('students', 'course_progress', 'snapshot')
     def get_persona_analytics(
         self,
         cohort_id: str,
-        persona_type: Optional[str] = None
+        persona_type: Optional[str] = None,
+        source: str = 'live',
+        include_statistics: bool = False
     ) -> Dict[str, Any]:
         """
         Get analytics by student persona
@@ -367,20 +502,30 @@ class LearningAnalyticsServer:
         Args:
             cohort_id: Cohort to analyze
             persona_type: Filter by persona (sarah, marcus, priya) - optional
+            source: 'live' database or latest columnar 'snapshot'
+            include_statistics: Add confidence intervals per persona and
+                pairwise significance tests between personas
 
         Returns:
             Dictionary with persona-specific performance data
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        snapshot = self._get_snapshot(source)
+        if snapshot is not None:
+            rows = persona_breakdown(
+                snapshot, cohort_id, persona_type, with_distributions=include_statistics
+            )
+            result = self._persona_result(cohort_id, persona_type, rows, include_statistics)
+            result['data_as_of'] = snapshot.created_at
+            return result
 
         query = """
             SELECT
                 s.persona_type,
                 COUNT(DISTINCT s.student_id) as student_count,
                 ROUND(AVG(CASE WHEN cp.completed = 1 THEN 1.0 ELSE 0.0 END) * 100, 1) as completion_rate,
-                ROUND(AVG(cp.satisfaction_score), 2) as avg_satisfaction
+                ROUND(AVG(cp.satisfaction_score), 2) as avg_satisfaction,
+                SUM(CASE WHEN cp.completed = 1 THEN 1 ELSE 0 END) as completions,
+                COUNT(*) as progress_rows
             FROM students s
             LEFT JOIN course_progress cp ON s.student_id = cp.student_id
             WHERE s.cohort_id = ?
@@ -393,27 +538,47 @@ class LearningAnalyticsServer:
 
         query += " GROUP BY s.persona_type"
 
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-
-        personas = []
-        for row in rows:
-            personas.append({
-                'persona_type': row['persona_type'],
-                'student_count': row['student_count'],
-                'completion_rate': row['completion_rate'] or 0,
-                'avg_satisfaction': row['avg_satisfaction'] or 0
-            })
+        with self._pool.connection() as conn:
+            rows = conn.execute(query, params).fetchall()
 
-        result = {
-            'cohort_id': cohort_id,
-            'filter_persona': persona_type,
-            'personas': personas
-        }
+            if include_statistics:
+                rows = [dict(row) for row in rows]
+                distributions = self._satisfaction_by_persona(conn, cohort_id, persona_type)
+                for row in rows:
+                    row['satisfaction_distribution'] = distributions.get(row['persona_type'], ([], []))
 
-        conn.close()
-        return result
+        return self._persona_result(cohort_id, persona_type, rows, include_statistics)
 
+    def _satisfaction_by_persona(
+        self,
+        conn: sqlite3.Connection,
+        cohort_id: str,
+        persona_type: Optional[str]
+    ) -> Dict[Optional[str], Tuple[List[float], List[int]]]:
+        """Each persona's satisfaction scores as (distinct values, counts)."""
+        query = """
+            SELECT s.persona_type, cp.satisfaction_score, COUNT(*) as responses
+            FROM students s
+            JOIN course_progress cp ON s.student_id = cp.student_id
+            WHERE s.cohort_id = ? AND cp.satisfaction_score IS NOT NULL
+        """
+        params = [cohort_id]
+        if persona_type:
+            query += " AND s.persona_type = ?"
+            params.append(persona_type)
+        query += " GROUP BY s.persona_type, cp.satisfaction_score"
+
+        distributions: Dict[Optional[str], Tuple[List[float], List[int]]] = {}
+        for row in conn.execute(query, params):
+            values, counts = distributions.setdefault(row['persona_type'], ([], []))
+            values.append(row['satisfaction_score'])
+            counts.append(row['responses'])
+        return distributions
+
+    @cached_tool(
+        'course_progress', 'students', 'community_engagement',
+        'practice_adoption', 'cohorts'
+    )
     def get_cohort_health(self, cohort_id: str) -> Dict[str, Any]:
         """
         Get overall cohort health score
@@ -426,169 +591,1326 @@ class LearningAnalyticsServer:
         - Satisfaction (target: 4.5/5.0)
         - Practice adoption (target: 75%+)
 
+        All components come from a single query, so dashboards refreshing
+        every cohort pay one round-trip per cohort.
+
         Args:
             cohort_id: Cohort to assess
 
         Returns:
             Dictionary with health score and component metrics
         """
-        conn = sqlite3.connect(self.db_path)
-
-        # Get course metrics
-        course_metrics = self.get_course_metrics(cohort_id=cohort_id)
+        with self._pool.connection() as conn:
+            row = conn.execute("""
+                WITH progress AS (
+                    SELECT
+                        SUM(total_students) as total_students,
+                        SUM(completions) as completions,
+                        ROUND(SUM(satisfaction_sum) / NULLIF(SUM(satisfaction_count), 0), 2) as avg_satisfaction
+                    FROM cohort_progress_rollup
+                    WHERE cohort_id = :cohort_id
+                ),
+                latest AS (
+                    SELECT MAX(week_number) as latest_week
+                    FROM engagement_weekly_rollup
+                    WHERE cohort_id = :cohort_id AND active_students > 0
+                ),
+                engagement AS (
+                    SELECT SUM(er.active_students) as active_students
+                    FROM engagement_weekly_rollup er
+                    JOIN latest ON er.week_number = latest.latest_week
+                    WHERE er.cohort_id = :cohort_id
+                ),
+                adoption AS (
+                    SELECT COUNT(DISTINCT pa.student_id) as adopting_students
+                    FROM practice_adoption pa
+                    JOIN students s ON pa.student_id = s.student_id
+                    WHERE s.cohort_id = :cohort_id
+                      AND (pa.self_reported = 1 OR pa.evidence_shared = 1 OR pa.peer_validated = 1)
+                )
+                SELECT
+                    progress.total_students,
+                    progress.completions,
+                    progress.avg_satisfaction,
+                    latest.latest_week,
+                    engagement.active_students,
+                    adoption.adopting_students,
+                    (SELECT student_count FROM cohorts WHERE cohort_id = :cohort_id) as cohort_size
+                FROM progress, latest, engagement, adoption
+            """, {'cohort_id': cohort_id}).fetchone()
+
+        return self._health_result(cohort_id, row)
+
+    @cached_tool(
+        'students', 'course_progress', 'community_engagement',
+        'practice_adoption', 'risk_model'
+    )
+    def predict_student_outcomes(self, cohort_id: str, top_k: int = 10) -> Dict[str, Any]:
+        """
+        Identify the students most at risk of not sustaining the practices
 
-        # Get latest week engagement
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT MAX(week_number) as latest_week
-            FROM community_engagement
-            WHERE cohort_id = ?
-        """, (cohort_id,))
-        latest_week = cursor.fetchone()[0]
+        MCP Tool: predict_student_outcomes
 
-        engagement_metrics = self.get_engagement_metrics(
-            cohort_id=cohort_id,
-            week_number=latest_week
-        ) if latest_week else {'weekly_active_rate': 0}
+        Extracts every student's progress, engagement and adoption features
+        in one query and scores the whole cohort in one vectorized pass
+        (see scoring.py). Uses the trained model if one has been saved
+        (train_risk_model), otherwise a heuristic ranking.
 
-        # Calculate health score (0-100)
-        completion_score = min(course_metrics['completion_rate'] / 85 * 25, 25)
-        engagement_score = min(engagement_metrics['weekly_active_rate'] / 80 * 25, 25)
-        satisfaction_score = min((course_metrics['avg_satisfaction'] / 4.5) * 25, 25)
+        Args:
+            cohort_id: Cohort to score
+            top_k: Number of highest-risk students to return (default: 10)
 
-        # Practice adoption (simplified for now)
-        practice_score = 15  # Placeholder
+        Returns:
+            Dictionary with the top-k at-risk students, their main risk
+            factors and the cohort's risk distribution
+        """
+        model = self._get_risk_model()
 
-        health_score = round(
-            completion_score + engagement_score + satisfaction_score + practice_score,
-            1
-        )
+        with self._pool.connection() as conn:
+            features = extract_features(conn, cohort_id=cohort_id)
 
-        # Determine status
-        if health_score >= 80:
-            status = "ELITE"
-            status_emoji = "🏆"
-        elif health_score >= 60:
-            status = "HEALTHY"
-            status_emoji = "✅"
-        elif health_score >= 40:
-            status = "NEEDS_ATTENTION"
-            status_emoji = "⚠️"
-        else:
-            status = "AT_RISK"
-            status_emoji = "❌"
+        scores, at_risk = rank_at_risk(features, model, top_k=top_k)
 
         result = {
             'cohort_id': cohort_id,
-            'health_score': health_score,
-            'status': status,
-            'status_emoji': status_emoji,
-            'component_scores': {
-                'completion': round(completion_score, 1),
-                'engagement': round(engagement_score, 1),
-                'satisfaction': round(satisfaction_score, 1),
-                'practice_adoption': practice_score
+            'students_scored': len(features),
+            'model': {
+                'source': model.source,
+                **model.metadata
             },
-            'metrics': {
-                'completion_rate': course_metrics['completion_rate'],
-                'weekly_active_rate': engagement_metrics['weekly_active_rate'],
-                'avg_satisfaction': course_metrics['avg_satisfaction']
-            },
-            'recommendations': self._get_health_recommendations(
-                course_metrics,
-                engagement_metrics
-            )
+            'risk_distribution': risk_distribution(scores),
+            'avg_risk_score': round(float(scores.mean()), 3) if len(scores) else 0,
+            'at_risk_students': at_risk
         }
 
-        conn.close()
         return result
 
-    def _get_health_recommendations(
+    def train_risk_model(self, months_post_course: int = 6, save: bool = True) -> Dict[str, Any]:
+        """
+        Fit the at-risk model on every student with a retention survey.
+
+        Meant to run offline (python src/server.py train-risk-model) after
+        cohorts finish their retention surveys.
+
+        Args:
+            months_post_course: Survey horizon used as the outcome label
+            save: Write the model to risk_model_path
+
+        Returns:
+            Training metadata (samples, at-risk rate, accuracy, AUC)
+        """
+        with self._pool.connection() as conn:
+            features = extract_features(conn, months_post_course=months_post_course)
+
+        model = RiskModel.fit(features)
+        model.metadata['months_post_course'] = months_post_course
+        if save:
+            model.save(self.risk_model_path)
+
+        with self._risk_model_lock:
+            self._risk_model = model
+        self.invalidate_cache('risk_model')
+
+        return model.metadata
+
+    def _get_risk_model(self) -> RiskModel:
+        with self._risk_model_lock:
+            if self._risk_model is None:
+                if self.risk_model_path.exists():
+                    self._risk_model = RiskModel.load(self.risk_model_path)
+                else:
+                    self._risk_model = RiskModel.heuristic()
+            return self._risk_model
+
+    # Portfolio (multi-cohort) tools
+
+    @cached_tool('course_progress', 'students', 'cohorts')
+    def get_course_metrics_batch(
         self,
-        course_metrics: Dict,
-        engagement_metrics: Dict
-    ) -> List[str]:
-        """Generate recommendations based on metrics"""
-        recommendations = []
+        cohort_ids: Optional[List[str]] = None,
+        module_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get course metrics for many cohorts at once
 
-        if course_metrics['completion_rate'] < 75:
-            recommendations.append(
-                "⚠️ Completion rate below target - investigate module difficulty or engagement"
-            )
+        MCP Tool: get_course_metrics_batch
 
-        if engagement_metrics['weekly_active_rate'] < 70:
-            recommendations.append(
-                "⚠️ Low community engagement - boost Slack activity and office hours attendance"
-            )
+        One query over the progress rollups for every selected cohort;
+        each entry matches get_course_metrics(cohort_id, module_id).
 
-        if course_metrics['avg_satisfaction'] < 4.0:
-            recommendations.append(
-                "⚠️ Satisfaction below target - review student feedback and module quality"
+        Args:
+            cohort_ids: Cohorts to include (default: all cohorts)
+            module_id: Filter by specific module (optional)
+
+        Returns:
+            Dictionary with per-cohort results keyed by cohort_id
+        """
+        selected, params = self._selected_cohorts(cohort_ids)
+        if module_id:
+            rollup_join = (
+                "LEFT JOIN module_progress_rollup r "
+                "ON r.cohort_id = selected.cohort_id AND r.module_id = :module_id"
             )
+            params['module_id'] = module_id
+        else:
+            rollup_join = "LEFT JOIN cohort_progress_rollup r ON r.cohort_id = selected.cohort_id"
+
+        with self._pool.connection() as conn:
+            rows = conn.execute(f"""
+                WITH selected AS ({selected})
+                SELECT
+                    selected.cohort_id,
+                    r.total_students,
+                    r.completions,
+                    ROUND(r.satisfaction_sum / NULLIF(r.satisfaction_count, 0), 2) as avg_satisfaction,
+                    ROUND(1.0 * r.time_spent_sum / NULLIF(r.time_spent_count, 0), 0) as avg_time_minutes
+                FROM selected
+                {rollup_join}
+                ORDER BY selected.cohort_id
+            """, params).fetchall()
+
+        return self._batch_result(
+            {row['cohort_id']: self._course_result(row, row['cohort_id'], module_id) for row in rows},
+            module_id=module_id
+        )
 
-        if not recommendations:
-            recommendations.append("✅ All metrics healthy - maintain current approach")
+    @cached_tool('community_engagement', 'cohorts')
+    def get_engagement_metrics_batch(
+        self,
+        cohort_ids: Optional[List[str]] = None,
+        week_number: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Get community engagement metrics for many cohorts at once
 
-        return recommendations
+        MCP Tool: get_engagement_metrics_batch
 
+        Args:
+            cohort_ids: Cohorts to include (default: all cohorts)
+            week_number: Filter by specific week (optional)
 
-# MCP Server Tool Definitions (for integration with agents)
-MCP_TOOLS = [
-    {
-        "name": "get_course_metrics",
-        "description": "Get course completion rates, satisfaction scores, and time metrics",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "cohort_id": {
-                    "type": "string",
-                    "description": "Filter by specific cohort ID (optional)"
-                },
-                "module_id": {
-                    "type": "string",
-                    "description": "Filter by specific module ID (optional)"
-                }
-            }
-        }
-    },
-    {
-        "name": "get_engagement_metrics",
-        "description": "Get community engagement metrics (posts, replies, attendance)",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "cohort_id": {
-                    "type": "string",
-                    "description": "Cohort ID to analyze"
-                },
-                "week_number": {
-                    "type": "integer",
-                    "description": "Filter by specific week number (optional)"
-                }
+        Returns:
+            Dictionary with per-cohort results keyed by cohort_id
+        """
+        selected, params = self._selected_cohorts(cohort_ids)
+        if week_number is not None:
+            rollup_join = (
+                "LEFT JOIN engagement_weekly_rollup r "
+                "ON r.cohort_id = selected.cohort_id AND r.week_number = :week_number"
+            )
+            params['week_number'] = week_number
+        else:
+            rollup_join = "LEFT JOIN engagement_cohort_rollup r ON r.cohort_id = selected.cohort_id"
+
+        with self._pool.connection() as conn:
+            rows = conn.execute(f"""
+                WITH selected AS ({selected})
+                SELECT
+                    selected.cohort_id,
+                    COALESCE(c.student_count, 0) as student_count,
+                    r.active_students,
+                    r.total_posts,
+                    r.total_replies,
+                    r.total_office_hours,
+                    r.total_peer_reviews
+                FROM selected
+                LEFT JOIN cohorts c ON c.cohort_id = selected.cohort_id
+                {rollup_join}
+                ORDER BY selected.cohort_id
+            """, params).fetchall()
+
+        return self._batch_result(
+            {
+                row['cohort_id']: self._engagement_result(
+                    row['cohort_id'], week_number, row['student_count'], dict(row)
+                )
+                for row in rows
             },
-            "required": ["cohort_id"]
-        }
-    },
-    {
-        "name": "get_outcome_metrics",
-        "description": "Get outcome metrics (6-month retention, harm prevention stories)",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "cohort_id": {
-                    "type": "string",
-                    "description": "Cohort ID to analyze"
+            week_number=week_number
+        )
+
+    @cached_tool('retention_tracking', 'harm_prevention', 'students', 'cohorts', 'snapshot')
+    def get_outcome_metrics_batch(
+        self,
+        cohort_ids: Optional[List[str]] = None,
+        months_post_course: int = 6,
+        source: str = 'live'
+    ) -> Dict[str, Any]:
+        """
+        Get outcome metrics (retention, harm prevention) for many cohorts at once
+
+        MCP Tool: get_outcome_metrics_batch
+
+        Retention, harm-prevention stories and cohort sizes are each
+        grouped by cohort and combined in a single GROUP BY.
+
+        Args:
+            cohort_ids: Cohorts to include (default: all cohorts)
+            months_post_course: Number of months post-course (default: 6)
+            source: 'live' database or latest columnar 'snapshot'
+
+        Returns:
+            Dictionary with per-cohort results keyed by cohort_id
+        """
+        snapshot = self._get_snapshot(source)
+        if snapshot is not None:
+            if isinstance(cohort_ids, str):
+                cohort_ids = [cohort_ids]
+            counts = outcome_counts(snapshot, cohort_ids, months_post_course)
+            result = self._batch_result(
+                {
+                    cohort_id: self._outcome_result(cohort_id, months_post_course, **cohort_counts)
+                    for cohort_id, cohort_counts in counts.items()
                 },
-                "months_post_course": {
-                    "type": "integer",
-                    "description": "Months after course completion (default: 6)"
-                }
+                months_post_course=months_post_course
+            )
+            result['data_as_of'] = snapshot.created_at
+            return result
+
+        selected, params = self._selected_cohorts(cohort_ids)
+        params['months_post_course'] = months_post_course
+
+        with self._pool.connection() as conn:
+            rows = conn.execute(f"""
+                WITH selected AS ({selected})
+                SELECT
+                    cohort_id,
+                    SUM(student_count) as student_count,
+                    SUM(total_responses) as total_responses,
+                    SUM(still_using) as still_using,
+                    SUM(students_with_stories) as students_with_stories
+                FROM (
+                    SELECT cohort_id, 0 as student_count, 0 as total_responses,
+                           0 as still_using, 0 as students_with_stories
+                    FROM selected
+
+                    UNION ALL
+                    SELECT cohort_id, student_count, 0, 0, 0
+                    FROM cohorts
+                    WHERE cohort_id IN (SELECT cohort_id FROM selected)
+
+                    UNION ALL
+                    SELECT cohort_id, 0, COUNT(*),
+                           SUM(CASE WHEN still_using_practices = 1 THEN 1 ELSE 0 END), 0
+                    FROM retention_tracking
+                    WHERE cohort_id IN (SELECT cohort_id FROM selected)
+                      AND months_post_course = :months_post_course
+                    GROUP BY cohort_id
+
+                    UNION ALL
+                    SELECT s.cohort_id, 0, 0, 0, COUNT(DISTINCT hp.student_id)
+                    FROM students s
+                    JOIN harm_prevention hp ON hp.student_id = s.student_id
+                    WHERE s.cohort_id IN (SELECT cohort_id FROM selected)
+                    GROUP BY s.cohort_id
+                )
+                GROUP BY cohort_id
+                ORDER BY cohort_id
+            """, params).fetchall()
+
+        return self._batch_result(
+            {
+                row['cohort_id']: self._outcome_result(
+                    row['cohort_id'],
+                    months_post_course,
+                    total_students=row['student_count'] or 0,
+                    total_responses=row['total_responses'] or 0,
+                    still_using=row['still_using'] or 0,
+                    students_with_stories=row['students_with_stories'] or 0
+                )
+                for row in rows
             },
-            "required": ["cohort_id"]
-        }
-    },
-    {
-        "name": "get_persona_analytics",
+            months_post_course=months_post_course
+        )
+
+    @cached_tool(
+        'course_progress', 'students', 'community_engagement',
+        'practice_adoption', 'cohorts'
+    )
+    def get_cohort_health_batch(self, cohort_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Get health scores for many cohorts at once
+
+        MCP Tool: get_cohort_health_batch
+
+        The per-cohort health components are grouped by cohort in one
+        query; each entry matches get_cohort_health(cohort_id).
+
+        Args:
+            cohort_ids: Cohorts to include (default: all cohorts)
+
+        Returns:
+            Dictionary with per-cohort health keyed by cohort_id, plus a
+            count of cohorts per status
+        """
+        selected, params = self._selected_cohorts(cohort_ids)
+
+        with self._pool.connection() as conn:
+            rows = conn.execute(f"""
+                WITH selected AS ({selected}),
+                latest AS (
+                    SELECT cohort_id, MAX(week_number) as latest_week
+                    FROM engagement_weekly_rollup
+                    WHERE cohort_id IN (SELECT cohort_id FROM selected)
+                      AND active_students > 0
+                    GROUP BY cohort_id
+                ),
+                adoption AS (
+                    SELECT s.cohort_id, COUNT(DISTINCT pa.student_id) as adopting_students
+                    FROM students s
+                    JOIN practice_adoption pa ON pa.student_id = s.student_id
+                    WHERE s.cohort_id IN (SELECT cohort_id FROM selected)
+                      AND (pa.self_reported = 1 OR pa.evidence_shared = 1 OR pa.peer_validated = 1)
+                    GROUP BY s.cohort_id
+                )
+                SELECT
+                    selected.cohort_id,
+                    cpr.total_students,
+                    cpr.completions,
+                    ROUND(cpr.satisfaction_sum / NULLIF(cpr.satisfaction_count, 0), 2) as avg_satisfaction,
+                    latest.latest_week,
+                    er.active_students,
+                    adoption.adopting_students,
+                    c.student_count as cohort_size
+                FROM selected
+                LEFT JOIN cohorts c ON c.cohort_id = selected.cohort_id
+                LEFT JOIN cohort_progress_rollup cpr ON cpr.cohort_id = selected.cohort_id
+                LEFT JOIN latest ON latest.cohort_id = selected.cohort_id
+                LEFT JOIN engagement_weekly_rollup er
+                    ON er.cohort_id = selected.cohort_id AND er.week_number = latest.latest_week
+                LEFT JOIN adoption ON adoption.cohort_id = selected.cohort_id
+                ORDER BY selected.cohort_id
+            """, params).fetchall()
+
+        cohorts = {row['cohort_id']: self._health_result(row['cohort_id'], row) for row in rows}
+
+        status_counts: Dict[str, int] = {}
+        for health in cohorts.values():
+            status_counts[health['status']] = status_counts.get(health['status'], 0) + 1
+
+        result = self._batch_result(cohorts)
+        result['status_counts'] = status_counts
+        return result
+
+    @cached_tool('course_progress', 'students', 'cohorts', 'retention_tracking', 'harm_prevention')
+    def compare_cohorts(
+        self,
+        cohort_ids: Optional[List[str]] = None,
+        module_id: Optional[str] = None,
+        months_post_course: int = 6
+    ) -> Dict[str, Any]:
+        """
+        Compare cohorts with confidence intervals and significance tests
+
+        MCP Tool: compare_cohorts
+
+        Each cohort gets Wilson intervals for its module completion,
+        retention and harm-prevention rates and a bootstrap interval for
+        satisfaction. Every pair of cohorts is compared with two-proportion
+        z-tests (rates) and a bootstrap test (satisfaction); p-values are
+        Holm-adjusted within each metric.
+
+        Args:
+            cohort_ids: Cohorts to compare (default: all cohorts)
+            module_id: Restrict completion and satisfaction to one module (optional)
+            months_post_course: Retention survey horizon (default: 6)
+
+        Returns:
+            Dictionary with per-cohort estimates and intervals, and the
+            pairwise comparisons
+        """
+        outcomes = self.get_outcome_metrics_batch(
+            cohort_ids=cohort_ids, months_post_course=months_post_course
+        )['cohorts']
+        labels = list(outcomes)
+
+        selected, params = self._selected_cohorts(labels)
+        with self._pool.connection() as conn:
+            progress = self._progress_distribution(
+                conn, module_id=module_id, selected=selected, params=params
+            )
+
+        empty = {'records': 0, 'completions': 0, 'satisfaction': ([], [])}
+        progress = [progress.get(cohort_id, empty) for cohort_id in labels]
+        completions = [p['completions'] for p in progress]
+        records = [p['records'] for p in progress]
+        distributions = [p['satisfaction'] for p in progress]
+        retained = [o['still_using_practices'] for o in outcomes.values()]
+        responses = [o['retention_responses'] for o in outcomes.values()]
+        stories = [o['harm_prevention_stories'] for o in outcomes.values()]
+        students = [o['total_students'] for o in outcomes.values()]
+
+        completion_ci = rate_intervals(completions, records)
+        retention_ci = rate_intervals(retained, responses)
+        harm_ci = rate_intervals(stories, students)
+
+        cohorts = {}
+        for i, cohort_id in enumerate(labels):
+            values, counts = distributions[i]
+            satisfaction_responses = sum(counts)
+            cohorts[cohort_id] = {
+                'module_records': records[i],
+                'module_completion_rate': (
+                    round(completions[i] / records[i] * 100, 1) if records[i] else 0
+                ),
+                'module_completion_rate_ci': completion_ci[i],
+                'satisfaction_responses': satisfaction_responses,
+                'avg_satisfaction': round(
+                    sum(v * c for v, c in zip(values, counts)) / satisfaction_responses, 2
+                ) if satisfaction_responses else 0,
+                'avg_satisfaction_ci': mean_interval(values, counts),
+                'retention_responses': responses[i],
+                'retention_rate': outcomes[cohort_id]['retention_rate'],
+                'retention_rate_ci': retention_ci[i],
+                'total_students': students[i],
+                'harm_prevention_rate': outcomes[cohort_id]['harm_prevention_rate'],
+                'harm_prevention_rate_ci': harm_ci[i]
+            }
+
+        result = self._batch_result(
+            cohorts, module_id=module_id, months_post_course=months_post_course
+        )
+        result['confidence'] = CONFIDENCE
+        result['alpha'] = ALPHA
+        result['comparisons'] = (
+            compare_proportions('module_completion_rate', labels, completions, records)
+            + compare_means('avg_satisfaction', labels, distributions)
+            + compare_proportions('retention_rate', labels, retained, responses)
+            + compare_proportions('harm_prevention_rate', labels, stories, students)
+        )
+        return result
+
+    def _progress_distribution(
+        self,
+        conn: sqlite3.Connection,
+        cohort_id: Optional[str] = None,
+        module_id: Optional[str] = None,
+        selected: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Dict[Optional[str], Dict[str, Any]]:
+        """
+        Module records, completions and satisfaction scores (as distinct
+        values and counts) per cohort, grouped in SQL.
+
+        With selected (a batch tool's `selected` CTE), results are keyed by
+        cohort_id; otherwise everything is pooled under the key None.
+        """
+        params = dict(params or {})
+        filters = []
+        if selected:
+            prefix, group_key = f"WITH selected AS ({selected})", "s.cohort_id"
+            filters.append("s.cohort_id IN (SELECT cohort_id FROM selected)")
+        else:
+            prefix, group_key = "", "NULL"
+        if cohort_id:
+            filters.append("s.cohort_id = :cohort_id")
+            params['cohort_id'] = cohort_id
+        if module_id:
+            filters.append("cp.module_id = :module_id")
+            params['module_id'] = module_id
+
+        rows = conn.execute(f"""
+            {prefix}
+            SELECT
+                {group_key} as cohort_id,
+                COALESCE(cp.completed = 1, 0) as completed,
+                cp.satisfaction_score,
+                COUNT(*) as records
+            FROM students s
+            JOIN course_progress cp ON cp.student_id = s.student_id
+            {"WHERE " + " AND ".join(filters) if filters else ""}
+            GROUP BY 1, 2, 3
+        """, params)
+
+        groups: Dict[Optional[str], Dict[str, Any]] = {}
+        for row in rows:
+            group = groups.setdefault(
+                row['cohort_id'], {'records': 0, 'completions': 0, 'satisfaction': {}}
+            )
+            group['records'] += row['records']
+            if row['completed']:
+                group['completions'] += row['records']
+            score = row['satisfaction_score']
+            if score is not None:
+                group['satisfaction'][score] = group['satisfaction'].get(score, 0) + row['records']
+
+        for group in groups.values():
+            scores = sorted(group['satisfaction'].items())
+            group['satisfaction'] = ([v for v, _ in scores], [c for _, c in scores])
+        return groups
+
+    def _selected_cohorts(self, cohort_ids: Optional[List[str]]):
+        """SQL for the `selected` CTE of a batch tool, and its parameters."""
+        if cohort_ids is None:
+            return "SELECT cohort_id FROM cohorts", {}
+        if isinstance(cohort_ids, str):
+            cohort_ids = [cohort_ids]
+        return (
+            "SELECT DISTINCT value as cohort_id FROM json_each(:cohort_ids)",
+            {'cohort_ids': json.dumps(list(cohort_ids))}
+        )
+
+    def _batch_result(self, cohorts: Dict[str, Dict[str, Any]], **filters) -> Dict[str, Any]:
+        return {
+            'cohort_count': len(cohorts),
+            'cohorts': cohorts,
+            'filters_applied': filters
+        }
+
+    # Result shaping, shared by the single-cohort and batch tools
+
+    def _course_result(
+        self,
+        row: sqlite3.Row,
+        cohort_id: Optional[str],
+        module_id: Optional[str]
+    ) -> Dict[str, Any]:
+        total = row['total_students'] or 0
+        completions = row['completions'] or 0
+
+        return {
+            'total_students': total,
+            'completions': completions,
+            'completion_rate': round((completions / total * 100), 1) if total > 0 else 0,
+            'avg_satisfaction': row['avg_satisfaction'] or 0,
+            'avg_time_minutes': row['avg_time_minutes'] or 0,
+            'filters_applied': {
+                'cohort_id': cohort_id,
+                'module_id': module_id
+            }
+        }
+
+    def _engagement_result(
+        self,
+        cohort_id: str,
+        week_number: Optional[int],
+        total_students: int,
+        totals: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        active = totals.get('active_students') or 0
+        total_posts = totals.get('total_posts') or 0
+
+        return {
+            'cohort_id': cohort_id,
+            'week_number': week_number,
+            'total_students': total_students,
+            'active_students': active,
+            'weekly_active_rate': round((active / total_students * 100), 1) if total_students > 0 else 0,
+            'total_posts': total_posts,
+            'total_replies': totals.get('total_replies') or 0,
+            'total_office_hours': totals.get('total_office_hours') or 0,
+            'total_peer_reviews': totals.get('total_peer_reviews') or 0,
+            'avg_posts_per_student': round(total_posts / active, 1) if active > 0 else 0
+        }
+
+    def _outcome_result(
+        self,
+        cohort_id: str,
+        months_post_course: int,
+        total_students: int,
+        total_responses: int,
+        still_using: int,
+        students_with_stories: int
+    ) -> Dict[str, Any]:
+        return {
+            'cohort_id': cohort_id,
+            'months_post_course': months_post_course,
+            'total_students': total_students,
+            'retention_responses': total_responses,
+            'still_using_practices': still_using,
+            'retention_rate': round((still_using / total_responses * 100), 1) if total_responses > 0 else 0,
+            'harm_prevention_stories': students_with_stories,
+            'harm_prevention_rate': round(
+                (students_with_stories / total_students * 100), 1
+            ) if total_students > 0 else 0
+        }
+
+    def _persona_result(
+        self,
+        cohort_id: str,
+        persona_type: Optional[str],
+        rows: List[Any],
+        include_statistics: bool = False
+    ) -> Dict[str, Any]:
+        personas = []
+        for row in rows:
+            personas.append({
+                'persona_type': row['persona_type'],
+                'student_count': row['student_count'],
+                'completion_rate': row['completion_rate'] or 0,
+                'avg_satisfaction': row['avg_satisfaction'] or 0
+            })
+
+        result = {
+            'cohort_id': cohort_id,
+            'filter_persona': persona_type,
+            'personas': personas
+        }
+
+        if include_statistics:
+            labels = [row['persona_type'] or 'unspecified' for row in rows]
+            completions = [row['completions'] for row in rows]
+            progress_rows = [row['progress_rows'] for row in rows]
+            distributions = [row['satisfaction_distribution'] for row in rows]
+
+            for persona, interval, distribution in zip(
+                personas, rate_intervals(completions, progress_rows), distributions
+            ):
+                persona['completion_rate_ci'] = interval
+                persona['avg_satisfaction_ci'] = mean_interval(*distribution)
+
+            result['statistics'] = {
+                'confidence': CONFIDENCE,
+                'alpha': ALPHA,
+                'comparisons': (
+                    compare_proportions('completion_rate', labels, completions, progress_rows)
+                    + compare_means('avg_satisfaction', labels, distributions)
+                )
+            }
+
+        return result
+
+    def _progress_statistics(self, distribution: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Intervals for one group's module completion rate and satisfaction."""
+        distribution = distribution or {'records': 0, 'completions': 0, 'satisfaction': ([], [])}
+        records, completions = distribution['records'], distribution['completions']
+        values, counts = distribution['satisfaction']
+
+        return {
+            'confidence': CONFIDENCE,
+            'module_records': records,
+            'module_completion_rate': round(completions / records * 100, 1) if records else 0,
+            'module_completion_rate_ci': rate_intervals(completions, records)[0],
+            'satisfaction_responses': sum(counts),
+            'avg_satisfaction_ci': mean_interval(values, counts)
+        }
+
+    def _health_result(self, cohort_id: str, row: sqlite3.Row) -> Dict[str, Any]:
+        progress_students = row['total_students'] or 0
+        completions = row['completions'] or 0
+        cohort_size = row['cohort_size'] or 0
+
+        completion_rate = round(
+            completions / progress_students * 100, 1
+        ) if progress_students > 0 else 0
+        weekly_active_rate = round(
+            (row['active_students'] or 0) / cohort_size * 100, 1
+        ) if cohort_size > 0 else 0
+        practice_adoption_rate = round(
+            (row['adopting_students'] or 0) / cohort_size * 100, 1
+        ) if cohort_size > 0 else 0
+        avg_satisfaction = row['avg_satisfaction'] or 0
+
+        # Calculate health score (0-100)
+        completion_score = min(completion_rate / 85 * 25, 25)
+        engagement_score = min(weekly_active_rate / 80 * 25, 25)
+        satisfaction_score = min((avg_satisfaction / 4.5) * 25, 25)
+        practice_score = min(practice_adoption_rate / 75 * 25, 25)
+
+        health_score = round(
+            completion_score + engagement_score + satisfaction_score + practice_score,
+            1
+        )
+
+        # Determine status
+        if health_score >= 80:
+            status = "ELITE"
+            status_emoji = "🏆"
+        elif health_score >= 60:
+            status = "HEALTHY"
+            status_emoji = "✅"
+        elif health_score >= 40:
+            status = "NEEDS_ATTENTION"
+            status_emoji = "⚠️"
+        else:
+            status = "AT_RISK"
+            status_emoji = "❌"
+
+        metrics = {
+            'completion_rate': completion_rate,
+            'weekly_active_rate': weekly_active_rate,
+            'avg_satisfaction': avg_satisfaction,
+            'practice_adoption_rate': practice_adoption_rate
+        }
+
+        result = {
+            'cohort_id': cohort_id,
+            'health_score': health_score,
+            'status': status,
+            'status_emoji': status_emoji,
+            'component_scores': {
+                'completion': round(completion_score, 1),
+                'engagement': round(engagement_score, 1),
+                'satisfaction': round(satisfaction_score, 1),
+                'practice_adoption': round(practice_score, 1)
+            },
+            'metrics': metrics,
+            'latest_week': row['latest_week'],
+            'cohort_size': cohort_size,
+            'recommendations': self._get_health_recommendations(metrics)
+        }
+
+        return result
+
+    def _get_health_recommendations(self, metrics: Dict) -> List[str]:
+        """Generate recommendations based on metrics"""
+        recommendations = []
+
+        if metrics['completion_rate'] < 75:
+            recommendations.append(
+                "⚠️ Completion rate below target - investigate module difficulty or engagement"
+            )
+
+        if metrics['weekly_active_rate'] < 70:
+            recommendations.append(
+                "⚠️ Low community engagement - boost Slack activity and office hours attendance"
+            )
+
+        if metrics['avg_satisfaction'] < 4.0:
+            recommendations.append(
+                "⚠️ Satisfaction below target - review student feedback and module quality"
+            )
+
+        if metrics['practice_adoption_rate'] < 65:
+            recommendations.append(
+                "⚠️ Practice adoption below target - prompt students to share evidence of framework use"
+            )
+
+        if not recommendations:
+            recommendations.append("✅ All metrics healthy - maintain current approach")
+
+        return recommendations
+
+    @cached_tool('community_engagement', 'cohorts')
+    def get_engagement_trend(
+        self,
+        cohort_id: str,
+        start_week: Optional[int] = None,
+        end_week: Optional[int] = None,
+        window: int = 3
+    ) -> Dict[str, Any]:
+        """
+        Get a week-by-week engagement series
+
+        MCP Tool: get_engagement_trend
+
+        Returns every week from the cohort's first to last recorded week in
+        one query (weeks with no activity are included as zeros), with
+        moving averages computed by SQL window functions. Replaces one
+        get_engagement_metrics call per week.
+
+        Args:
+            cohort_id: Cohort to analyze
+            start_week: First week to return (optional)
+            end_week: Last week to return (optional)
+            window: Weeks in each moving average (default: 3)
+
+        Returns:
+            Dictionary with the weekly series and a summary
+        """
+        if window < 1:
+            raise ValueError("window must be at least 1")
+
+        # Moving averages are computed over the cohort's whole history
+        # before the start/end filter, so the first returned week still
+        # averages in the weeks before it
+        with self._pool.connection() as conn:
+            rows = conn.execute("""
+                WITH RECURSIVE bounds AS (
+                    SELECT MIN(week_number) as first_week, MAX(week_number) as last_week
+                    FROM engagement_weekly_rollup
+                    WHERE cohort_id = :cohort_id AND active_students > 0
+                ),
+                weeks(week_number) AS (
+                    SELECT first_week FROM bounds WHERE first_week IS NOT NULL
+                    UNION ALL
+                    SELECT weeks.week_number + 1 FROM weeks, bounds
+                    WHERE weeks.week_number < bounds.last_week
+                ),
+                series AS (
+                    SELECT
+                        weeks.week_number,
+                        COALESCE(er.active_students, 0) as active_students,
+                        COALESCE(er.total_posts, 0) as total_posts,
+                        COALESCE(er.total_replies, 0) as total_replies,
+                        COALESCE(er.total_office_hours, 0) as total_office_hours,
+                        COALESCE(er.total_peer_reviews, 0) as total_peer_reviews,
+                        ROUND(COALESCE(er.active_students, 0) * 100.0 / NULLIF(
+                            (SELECT student_count FROM cohorts WHERE cohort_id = :cohort_id), 0
+                        ), 1) as weekly_active_rate
+                    FROM weeks
+                    LEFT JOIN engagement_weekly_rollup er
+                        ON er.cohort_id = :cohort_id AND er.week_number = weeks.week_number
+                ),
+                trend AS (
+                    SELECT
+                        series.*,
+                        ROUND(AVG(weekly_active_rate) OVER recent, 1) as active_rate_moving_avg,
+                        ROUND(AVG(total_posts) OVER recent, 1) as posts_moving_avg,
+                        active_students - LAG(active_students) OVER (ORDER BY week_number)
+                            as active_change
+                    FROM series
+                    WINDOW recent AS (
+                        ORDER BY week_number ROWS BETWEEN :preceding PRECEDING AND CURRENT ROW
+                    )
+                )
+                SELECT * FROM trend
+                WHERE week_number >= COALESCE(:start_week, week_number)
+                  AND week_number <= COALESCE(:end_week, week_number)
+                ORDER BY week_number
+            """, {
+                'cohort_id': cohort_id,
+                'start_week': start_week,
+                'end_week': end_week,
+                'preceding': window - 1
+            }).fetchall()
+
+            cohort_row = conn.execute(
+                "SELECT student_count FROM cohorts WHERE cohort_id = ?",
+                (cohort_id,)
+            ).fetchone()
+
+        weeks = [dict(row) for row in rows]
+        for week in weeks:
+            week['weekly_active_rate'] = week['weekly_active_rate'] or 0
+            week['active_rate_moving_avg'] = week['active_rate_moving_avg'] or 0
+
+        peak = max(weeks, key=lambda w: w['active_students']) if weeks else None
+
+        result = {
+            'cohort_id': cohort_id,
+            'total_students': cohort_row['student_count'] if cohort_row else 0,
+            'window': window,
+            'weeks': weeks,
+            'summary': {
+                'weeks_returned': len(weeks),
+                'peak_week': peak['week_number'] if peak else None,
+                'avg_weekly_active_rate': round(
+                    sum(w['weekly_active_rate'] for w in weeks) / len(weeks), 1
+                ) if weeks else 0,
+                'latest_active_rate_moving_avg': weeks[-1]['active_rate_moving_avg'] if weeks else 0
+            },
+            'filters_applied': {
+                'start_week': start_week,
+                'end_week': end_week
+            }
+        }
+
+        return result
+
+    @cached_tool('nps_scores')
+    def get_nps_trend(
+        self,
+        cohort_id: str,
+        period: str = 'month',
+        survey_type: Optional[str] = None,
+        window: int = 3
+    ) -> Dict[str, Any]:
+        """
+        Get NPS over time
+
+        MCP Tool: get_nps_trend
+
+        Groups the cohort's NPS responses by week or month in one query.
+        NPS = % promoters (9-10) - % detractors (0-6). The moving NPS pools
+        the responses of the last `window` periods rather than averaging
+        per-period scores, so small periods don't get outsized weight.
+
+        Args:
+            cohort_id: Cohort to analyze
+            period: 'week' or 'month' (default: month)
+            survey_type: Filter by survey type (optional)
+            window: Periods in each moving NPS (default: 3)
+
+        Returns:
+            Dictionary with the per-period series and overall NPS
+        """
+        if period not in NPS_PERIOD_FORMATS:
+            raise ValueError(
+                f"Unknown period '{period}'. Expected one of: {', '.join(NPS_PERIOD_FORMATS)}"
+            )
+        if window < 1:
+            raise ValueError("window must be at least 1")
+
+        query = """
+            WITH periods AS (
+                SELECT
+                    strftime(:period_format, recorded_at) as period,
+                    COUNT(*) as responses,
+                    SUM(score >= 9) as promoters,
+                    SUM(score <= 6) as detractors,
+                    SUM(score) as score_sum
+                FROM nps_scores
+                WHERE cohort_id = :cohort_id
+                  AND recorded_at IS NOT NULL
+                  {survey_filter}
+                GROUP BY period
+            )
+            SELECT
+                period,
+                responses,
+                promoters,
+                detractors,
+                ROUND(score_sum * 1.0 / responses, 2) as avg_score,
+                ROUND((promoters - detractors) * 100.0 / responses, 1) as nps,
+                ROUND(
+                    (SUM(promoters) OVER recent - SUM(detractors) OVER recent) * 100.0
+                    / SUM(responses) OVER recent, 1
+                ) as nps_moving_avg
+            FROM periods
+            WINDOW recent AS (
+                ORDER BY period ROWS BETWEEN :preceding PRECEDING AND CURRENT ROW
+            )
+            ORDER BY period
+        """.format(
+            survey_filter="AND survey_type = :survey_type" if survey_type else ""
+        )
+
+        with self._pool.connection() as conn:
+            rows = conn.execute(query, {
+                'cohort_id': cohort_id,
+                'period_format': NPS_PERIOD_FORMATS[period],
+                'survey_type': survey_type,
+                'preceding': window - 1
+            }).fetchall()
+
+        periods = [dict(row) for row in rows]
+        responses = sum(p['responses'] for p in periods)
+        promoters = sum(p['promoters'] for p in periods)
+        detractors = sum(p['detractors'] for p in periods)
+
+        result = {
+            'cohort_id': cohort_id,
+            'period': period,
+            'window': window,
+            'periods': periods,
+            'overall': {
+                'responses': responses,
+                'nps': round((promoters - detractors) * 100 / responses, 1) if responses > 0 else 0
+            },
+            'filters_applied': {
+                'survey_type': survey_type
+            }
+        }
+
+        return result
+
+    def ingest(
+        self,
+        table: str,
+        source: Union[str, Path, TextIO, Iterable[Dict[str, Any]]],
+        format: Optional[str] = None,
+        batch_size: int = 50_000,
+        rebuild_indexes: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        Bulk-load rows into an analytics table.
+
+        Rows are upserted on the table's natural key (see ingest.TABLE_SPECS)
+        in one transaction. Loads of 100K+ rows drop the table's secondary
+        indexes and rollup triggers, then rebuild the indexes and the
+        affected rollups once. cohorts.student_count is recomputed whenever
+        students or cohorts are loaded.
+
+        Args:
+            table: Analytics table to load (e.g. 'community_engagement')
+            source: CSV/JSONL path ('-' for stdin), text stream, or iterable of dicts
+            format: 'csv' or 'jsonl' (inferred from file extension if omitted)
+            batch_size: Rows per executemany batch
+            rebuild_indexes: Force or skip the index drop/rebuild (default: by size)
+
+        Returns:
+            Load statistics (rows, seconds, rows_per_second, indexes_rebuilt)
+        """
+        if table not in TABLE_SPECS:
+            raise ValueError(
+                f"Unknown table '{table}'. Expected one of: {', '.join(TABLE_SPECS)}"
+            )
+        if table in self.duplicate_keys:
+            raise ValueError(
+                f"{table} has {self.duplicate_keys[table]} rows with duplicate natural keys; "
+                f"run `server.py migrate --dedupe` before loading it"
+            )
+
+        if isinstance(source, (str, Path)) or hasattr(source, 'read'):
+            records = read_records(source, format)
+        else:
+            records = source
+
+        with self._write_lock:
+            conn = sqlite3.connect(self.db_path, isolation_level=None)
+            try:
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.execute("PRAGMA synchronous = NORMAL")
+                conn.execute("PRAGMA cache_size = -65536")  # 64MB
+
+                loader = BulkLoader(
+                    conn,
+                    TABLE_SPECS[table],
+                    secondary_indexes=ANALYTICS_INDEXES.get(table, []),
+                    triggers=rollup_triggers(table),
+                    rebuild_derived=lambda conn, cohort_ids: rebuild_rollups(conn, table, cohort_ids),
+                    batch_size=batch_size
+                )
+                stats = loader.load(records, rebuild_indexes=rebuild_indexes)
+
+                if table in ('students', 'cohorts') and stats['rows']:
+                    self._refresh_student_counts(conn, all_cohorts=(table == 'students'))
+            finally:
+                conn.close()
+
+        touched = [table, 'cohorts'] if table == 'students' else [table]
+        self.invalidate_cache(*touched)
+
+        return stats
+
+    def _refresh_student_counts(self, conn: sqlite3.Connection, all_cohorts: bool):
+        """
+        Recompute cohorts.student_count from the students table.
+
+        After a students load every cohort is recounted (students may have
+        moved between cohorts). After a cohorts-only load, counts supplied
+        in the file are kept for cohorts with no student rows yet.
+        """
+        query = """
+            UPDATE cohorts
+            SET student_count = (
+                SELECT COUNT(*) FROM students s WHERE s.cohort_id = cohorts.cohort_id
+            )
+        """
+        if not all_cohorts:
+            query += """
+            WHERE EXISTS (
+                SELECT 1 FROM students s WHERE s.cohort_id = cohorts.cohort_id
+            )
+            """
+        conn.execute(query)
+
+    def export_snapshot(self, tables: Optional[List[str]] = None, keep: int = 2) -> Dict[str, Any]:
+        """
+        Export the analytics tables as a columnar snapshot.
+
+        Tools called with source='snapshot' read the latest snapshot
+        (memory-mapped) instead of the live database. Meant to run on a
+        schedule (python src/server.py snapshot), e.g. nightly.
+
+        Args:
+            tables: Tables to export (default: every analytics table)
+            keep: Number of snapshots to keep on disk
+
+        Returns:
+            Snapshot name, creation time and per-table row counts
+        """
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        try:
+            manifest = export_snapshot(conn, self.snapshot_dir, tables=tables, keep=keep)
+        finally:
+            conn.close()
+
+        self.invalidate_cache('snapshot')
+
+        return {
+            'name': manifest['name'],
+            'created_at': manifest['created_at'],
+            'path': str(self.snapshot_dir / manifest['name']),
+            'tables': {table: entry['rows'] for table, entry in manifest['tables'].items()}
+        }
+
+    def _get_snapshot(self, source: str) -> Optional[Snapshot]:
+        """The latest snapshot for source='snapshot', None for live reads."""
+        if source not in DATA_SOURCES:
+            raise ValueError(
+                f"Unknown source '{source}'. Expected one of: {', '.join(DATA_SOURCES)}"
+            )
+        if source == 'live':
+            return None
+
+        # Snapshots may be exported by another process; follow CURRENT
+        name = current_snapshot_name(self.snapshot_dir)
+        if name is None:
+            raise ValueError(
+                f"No analytics snapshot in {self.snapshot_dir} - "
+                "run `python src/server.py snapshot` first"
+            )
+        with self._snapshot_lock:
+            if self._snapshot is None or self._snapshot.name != name:
+                self._snapshot = Snapshot.open(self.snapshot_dir)
+                self.invalidate_cache('snapshot')
+            return self._snapshot
+
+    def dedupe_natural_keys(self) -> Dict[str, int]:
+        """
+        Remove rows that block a table's natural-key index, keeping the
+        latest row per key (what re-loading them would have kept), and
+        create the index.
+
+        Returns:
+            Rows deleted per table (only tables that had duplicates)
+        """
+        removed = {}
+        with self._write_lock:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                with conn:
+                    for table in list(self.duplicate_keys):
+                        spec = TABLE_SPECS[table]
+                        removed[table] = conn.execute(spec.dedupe_sql()).rowcount
+                        conn.execute(spec.unique_index_sql())
+            finally:
+                conn.close()
+            self.duplicate_keys.clear()
+        self.invalidate_cache(*removed)
+        return removed
+
+    def list_tools(self) -> List[Dict[str, Any]]:
+        """MCP tool definitions (name, description, input_schema)."""
+        return MCP_TOOLS
+
+    def validate_arguments(
+        self,
+        name: str,
+        arguments: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Check and coerce a tool call's arguments against its schema.
+
+        Args:
+            name: Tool name from MCP_TOOLS
+            arguments: Tool arguments as sent by the model
+
+        Returns:
+            Coerced arguments (e.g. "3" -> 3, nulls dropped)
+
+        Raises:
+            ValueError: Unknown tool
+            ToolArgumentError: Arguments the tool's schema doesn't accept
+        """
+        validate = TOOL_VALIDATORS.get(name)
+        if validate is None:
+            raise ValueError(f"Unknown tool '{name}'")
+        return validate(arguments)
+
+    def call_tool(
+        self,
+        name: str,
+        arguments: Optional[Dict[str, Any]] = None,
+        validated: bool = False
+    ) -> Any:
+        """
+        Run an MCP tool by name.
+
+        Arguments are validated first, so invalid calls are rejected
+        without touching the database.
+
+        Args:
+            name: Tool name from MCP_TOOLS
+            arguments: Tool arguments
+            validated: The arguments already came from validate_arguments()
+                (the async transport validates on its event loop)
+
+        Raises:
+            ValueError: Unknown tool
+            ToolArgumentError: Arguments the tool's schema doesn't accept
+        """
+        if not validated:
+            arguments = self.validate_arguments(name, arguments)
+        return getattr(self, name)(**arguments)
+
+    def invalidate_cache(self, *tables: str):
+        """
+        Invalidate cached tool results after data changes.
+
+        Loaders that write to the database directly should call this with
+        the tables they touched. With no arguments, drops every entry.
+
+        Args:
+            tables: Names of tables that were written to
+        """
+        if tables:
+            self.cache.bump(*tables)
+        else:
+            self.cache.clear()
+
+    def close(self):
+        """Close pooled database connections."""
+        self._pool.close()
+
+
+DATA_SOURCES = ('live', 'snapshot')
+
+NPS_PERIOD_FORMATS = {
+    'week': '%Y-W%W',
+    'month': '%Y-%m',
+}
+
+
+# MCP Server Tool Definitions (for integration with agents)
+MCP_TOOLS = [
+    {
+        "name": "get_course_metrics",
+        "description": "Get course completion rates, satisfaction scores, and time metrics",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "cohort_id": {
+                    "type": "string",
+                    "description": "Filter by specific cohort ID (optional)"
+                },
+                "module_id": {
+                    "type": "string",
+                    "description": "Filter by specific module ID (optional)"
+                },
+                "include_statistics": {
+                    "type": "boolean",
+                    "description": "Add 95% confidence intervals for completion and satisfaction (default: false)"
+                }
+            }
+        }
+    },
+    {
+        "name": "get_engagement_metrics",
+        "description": "Get community engagement metrics (posts, replies, attendance)",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "cohort_id": {
+                    "type": "string",
+                    "description": "Cohort ID to analyze"
+                },
+                "week_number": {
+                    "type": "integer",
+                    "description": "Filter by specific week number (optional)"
+                }
+            },
+            "required": ["cohort_id"]
+        }
+    },
+    {
+        "name": "get_outcome_metrics",
+        "description": "Get outcome metrics (6-month retention, harm prevention stories)",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "cohort_id": {
+                    "type": "string",
+                    "description": "Cohort ID to analyze"
+                },
+                "months_post_course": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "description": "Months after course completion (default: 6)"
+                },
+                "source": {
+                    "type": "string",
+                    "enum": ["live", "snapshot"],
+                    "description": "'live' database (default) or the latest columnar snapshot for large scans"
+                }
+            },
+            "required": ["cohort_id"]
+        }
+    },
+    {
+        "name": "get_persona_analytics",
         "description": "Get performance analytics by student persona (sarah, marcus, priya)",
         "input_schema": {
             "type": "object",
@@ -600,6 +1922,15 @@ MCP_TOOLS = [
                 "persona_type": {
                     "type": "string",
                     "description": "Filter by persona: sarah, marcus, or priya (optional)"
+                },
+                "source": {
+                    "type": "string",
+                    "enum": ["live", "snapshot"],
+                    "description": "'live' database (default) or the latest columnar snapshot for large scans"
+                },
+                "include_statistics": {
+                    "type": "boolean",
+                    "description": "Add 95% confidence intervals per persona and pairwise significance tests (default: false)"
                 }
             },
             "required": ["cohort_id"]
@@ -618,12 +1949,321 @@ MCP_TOOLS = [
             },
             "required": ["cohort_id"]
         }
+    },
+    {
+        "name": "get_engagement_trend",
+        "description": "Get week-by-week engagement for a cohort with moving averages (use instead of calling get_engagement_metrics per week)",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "cohort_id": {
+                    "type": "string",
+                    "description": "Cohort ID to analyze"
+                },
+                "start_week": {
+                    "type": "integer",
+                    "description": "First week to return (optional)"
+                },
+                "end_week": {
+                    "type": "integer",
+                    "description": "Last week to return (optional)"
+                },
+                "window": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "Weeks per moving average (default: 3)"
+                }
+            },
+            "required": ["cohort_id"]
+        }
+    },
+    {
+        "name": "get_nps_trend",
+        "description": "Get NPS by week or month for a cohort with a moving NPS",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "cohort_id": {
+                    "type": "string",
+                    "description": "Cohort ID to analyze"
+                },
+                "period": {
+                    "type": "string",
+                    "enum": ["week", "month"],
+                    "description": "Group by week or month (default: month)"
+                },
+                "survey_type": {
+                    "type": "string",
+                    "description": "Filter by survey type (optional)"
+                },
+                "window": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "Periods per moving NPS (default: 3)"
+                }
+            },
+            "required": ["cohort_id"]
+        }
+    },
+    {
+        "name": "predict_student_outcomes",
+        "description": "Score every student in a cohort for risk of not sustaining practices after the course and return the top-k at-risk students with their main risk factors",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "cohort_id": {
+                    "type": "string",
+                    "description": "Cohort ID to score"
+                },
+                "top_k": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "Number of highest-risk students to return (default: 10)"
+                }
+            },
+            "required": ["cohort_id"]
+        }
+    },
+    {
+        "name": "get_course_metrics_batch",
+        "description": "Get course metrics for many cohorts in one call, keyed by cohort ID",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "cohort_ids": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Cohort IDs to include (optional, default: all cohorts)"
+                },
+                "module_id": {
+                    "type": "string",
+                    "description": "Filter by specific module ID (optional)"
+                }
+            }
+        }
+    },
+    {
+        "name": "get_engagement_metrics_batch",
+        "description": "Get community engagement metrics for many cohorts in one call, keyed by cohort ID",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "cohort_ids": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Cohort IDs to include (optional, default: all cohorts)"
+                },
+                "week_number": {
+                    "type": "integer",
+                    "description": "Filter by specific week number (optional)"
+                }
+            }
+        }
+    },
+    {
+        "name": "get_outcome_metrics_batch",
+        "description": "Get retention and harm prevention outcomes for many cohorts in one call, keyed by cohort ID",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "cohort_ids": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Cohort IDs to include (optional, default: all cohorts)"
+                },
+                "months_post_course": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "description": "Months after course completion (default: 6)"
+                },
+                "source": {
+                    "type": "string",
+                    "enum": ["live", "snapshot"],
+                    "description": "'live' database (default) or the latest columnar snapshot for large scans"
+                }
+            }
+        }
+    },
+    {
+        "name": "compare_cohorts",
+        "description": "Compare cohorts' completion, satisfaction, retention and harm prevention with 95% confidence intervals and pairwise significance tests (Holm-adjusted p-values)",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "cohort_ids": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Cohort IDs to compare (optional, default: all cohorts)"
+                },
+                "module_id": {
+                    "type": "string",
+                    "description": "Restrict completion and satisfaction to one module (optional)"
+                },
+                "months_post_course": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "description": "Retention survey horizon in months (default: 6)"
+                }
+            }
+        }
+    },
+    {
+        "name": "get_cohort_health_batch",
+        "description": "Get health scores for many cohorts (default: all) in one call - use for portfolio-level questions",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "cohort_ids": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Cohort IDs to include (optional, default: all cohorts)"
+                }
+            }
+        }
     }
 ]
 
 
-if __name__ == "__main__":
-    # Example usage
-    server = LearningAnalyticsServer()
+TOOL_NAMES = frozenset(tool['name'] for tool in MCP_TOOLS)
+
+# Compiled once at import; call_tool checks arguments against these
+TOOL_VALIDATORS = compile_validators(MCP_TOOLS)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point.
+
+    Usage:
+        python src/server.py                                # init database, list tools
+        python src/server.py ingest TABLE FILE [--format csv|jsonl]
+        python src/server.py train-risk-model [--months 6]
+        python src/server.py score-risk COHORT_ID [--top-k 10]
+        python src/server.py snapshot [--out DIR] [--keep 2]
+        python src/server.py migrate [--dedupe]
+        python src/server.py serve [--socket PATH] [--workers 8] [--timeout SECONDS]
+    """
+    parser = argparse.ArgumentParser(description="Learning Analytics MCP Server")
+    parser.add_argument("--db", default="./data/analytics.db", help="SQLite database path")
+    subcommands = parser.add_subparsers(dest="command")
+
+    ingest_parser = subcommands.add_parser(
+        "ingest",
+        help="Bulk-load a CSV/JSONL file (re-runs upsert; nps_scores and "
+             "harm_prevention rows need their id column for that)"
+    )
+    ingest_parser.add_argument("table", choices=sorted(TABLE_SPECS))
+    ingest_parser.add_argument("file", help="CSV/JSONL file, or '-' for stdin")
+    ingest_parser.add_argument("--format", choices=["csv", "jsonl"])
+    ingest_parser.add_argument("--batch-size", type=int, default=50_000)
+
+    train_parser = subcommands.add_parser(
+        "train-risk-model", help="Fit the at-risk model from retention surveys"
+    )
+    train_parser.add_argument("--months", type=int, default=6, help="Retention survey horizon")
+    train_parser.add_argument("--out", help="Model path (default: next to the database)")
+
+    score_parser = subcommands.add_parser("score-risk", help="Print a cohort's at-risk students")
+    score_parser.add_argument("cohort_id")
+    score_parser.add_argument("--top-k", type=int, default=10)
+    score_parser.add_argument("--model", help="Model path (default: next to the database)")
+
+    snapshot_parser = subcommands.add_parser(
+        "snapshot", help="Export a columnar snapshot for source='snapshot' reads"
+    )
+    snapshot_parser.add_argument("--out", help="Snapshot directory (default: next to the database)")
+    snapshot_parser.add_argument("--keep", type=int, default=2, help="Snapshots to keep")
+
+    migrate_parser = subcommands.add_parser(
+        "migrate", help="Report (or, with --dedupe, remove) rows with duplicate natural keys"
+    )
+    migrate_parser.add_argument(
+        "--dedupe", action="store_true", help="Delete all but the latest row per natural key"
+    )
+
+    serve_parser = subcommands.add_parser(
+        "serve", help="Run the MCP server (JSON-RPC on stdio, or a shared Unix socket)"
+    )
+    serve_parser.add_argument("--socket", help="Unix socket path (default: stdin/stdout)")
+    serve_parser.add_argument("--workers", type=int, default=8, help="Concurrent tool calls")
+    serve_parser.add_argument("--timeout", type=float, help="Per-call timeout in seconds")
+
+    args = parser.parse_args(argv)
+    server = LearningAnalyticsServer(
+        db_path=args.db,
+        pool_size=getattr(args, 'workers', 4),
+        risk_model_path=(
+            getattr(args, 'out', None) if args.command == "train-risk-model"
+            else getattr(args, 'model', None)
+        ),
+        snapshot_dir=getattr(args, 'out', None) if args.command == "snapshot" else None
+    )
+
+    if args.command == "ingest":
+        stats = server.ingest(
+            args.table,
+            args.file,
+            format=args.format,
+            batch_size=args.batch_size
+        )
+        print(f"✅ Loaded {stats['rows']:,} rows into {stats['table']} "
+              f"in {stats['seconds']}s ({stats['rows_per_second']:,} rows/s)")
+        spec = TABLE_SPECS[args.table]
+        if stats['ids_generated'] and spec.natural_key == (spec.id_column,):
+            print(f"⚠️  {stats['ids_generated']:,} rows had no {spec.id_column} and got a "
+                  f"generated one; re-running this load will insert them again", file=sys.stderr)
+        return 0
+
+    if args.command == "train-risk-model":
+        metadata = server.train_risk_model(months_post_course=args.months)
+        print(f"✅ Trained at-risk model on {metadata['n_samples']:,} students "
+              f"(AUC {metadata['train_auc']}) -> {server.risk_model_path}")
+        return 0
+
+    if args.command == "score-risk":
+        print(json.dumps(
+            server.predict_student_outcomes(args.cohort_id, top_k=args.top_k), indent=2
+        ))
+        return 0
+
+    if args.command == "snapshot":
+        snapshot = server.export_snapshot(keep=args.keep)
+        print(f"✅ Exported snapshot {snapshot['name']} "
+              f"({sum(snapshot['tables'].values()):,} rows) -> {snapshot['path']}")
+        return 0
+
+    if args.command == "migrate":
+        if not server.duplicate_keys:
+            print("✅ No duplicate natural keys")
+        elif not args.dedupe:
+            for table, count in server.duplicate_keys.items():
+                print(f"{table}: {count:,} duplicate rows (rerun with --dedupe to delete them)")
+        else:
+            for table, count in server.dedupe_natural_keys().items():
+                print(f"✅ {table}: deleted {count:,} duplicate rows, kept the latest per "
+                      f"{', '.join(TABLE_SPECS[table].natural_key)}")
+        server.close()
+        return 0
+
+    if args.command == "serve":
+        transport = AsyncMCPServer(server, max_workers=args.workers, call_timeout=args.timeout)
+        try:
+            if args.socket:
+                print(f"✅ Serving {len(MCP_TOOLS)} tools on {args.socket}", file=sys.stderr)
+                asyncio.run(transport.serve_unix(args.socket))
+            else:
+                asyncio.run(transport.serve_stdio())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            transport.close()
+            server.close()
+        return 0
+
     print("Learning Analytics MCP Server initialized")
     print(f"Available tools: {[tool['name'] for tool in MCP_TOOLS]}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,332 @@
+"""
+Statistical Significance Helpers for the Learning Analytics MCP Server
+
+Lets tools return confidence intervals and significance tests alongside
+point estimates, so agents don't have to reason about statistics from raw
+counts (or ask for more data to do so):
+
+- Wilson score intervals for rates (well-behaved for small samples and
+  rates near 0% or 100%)
+- Bootstrap intervals for mean satisfaction
+- Two-proportion z-tests between personas or cohorts, with Holm-adjusted
+  p-values for the family of pairwise comparisons
+
+Everything is vectorized over groups. Bootstraps resample the grouped
+value counts (a multinomial draw per resample) rather than individual
+rows, so their cost depends on the number of distinct values, not on the
+number of students. Resampling is seeded (every function takes a seed and
+builds its own generator from it, nothing is shared between calls or
+threads), so results are reproducible and safe to cache.
+"""
+
+import math
+from itertools import combinations
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    print("⚠️  NumPy not available. Tool statistics will be disabled.")
+
+
+CONFIDENCE = 0.95
+ALPHA = 0.05
+BOOTSTRAP_RESAMPLES = 2000
+BOOTSTRAP_SEED = 0
+
+# Upper bound on multinomial draws held in memory at once
+_MAX_DRAWS = 1_000_000
+
+
+def z_critical(confidence: float = CONFIDENCE) -> float:
+    """Two-sided standard normal critical value (1.96 for 95%)."""
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+    return NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+
+
+def wilson_interval(
+    successes: Any,
+    trials: Any,
+    confidence: float = CONFIDENCE
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Wilson score interval for one or many proportions.
+
+    Args:
+        successes, trials: Scalars or arrays of counts
+        confidence: Interval coverage
+
+    Returns:
+        (low, high) arrays of proportions in [0, 1]; NaN where trials == 0
+    """
+    _require_numpy()
+    successes = np.asarray(successes, dtype=np.float64)
+    trials = np.asarray(trials, dtype=np.float64)
+    z = z_critical(confidence)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = successes / trials
+        denominator = 1 + z ** 2 / trials
+        center = (p + z ** 2 / (2 * trials)) / denominator
+        half_width = z * np.sqrt(p * (1 - p) / trials + z ** 2 / (4 * trials ** 2)) / denominator
+
+    return np.clip(center - half_width, 0, 1), np.clip(center + half_width, 0, 1)
+
+
+def two_proportion_ztest(
+    successes_a: Any,
+    trials_a: Any,
+    successes_b: Any,
+    trials_b: Any
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Pooled two-proportion z-test, vectorized over pairs.
+
+    Returns:
+        (z, two-sided p-value) arrays; NaN where either group is empty
+    """
+    _require_numpy()
+    x_a, n_a = np.asarray(successes_a, np.float64), np.asarray(trials_a, np.float64)
+    x_b, n_b = np.asarray(successes_b, np.float64), np.asarray(trials_b, np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pooled = (x_a + x_b) / (n_a + n_b)
+        standard_error = np.sqrt(pooled * (1 - pooled) * (1 / n_a + 1 / n_b))
+        difference = x_a / n_a - x_b / n_b
+        # Both rates 0% (or both 100%): no evidence of a difference
+        z = np.where(standard_error > 0, difference / standard_error, 0.0)
+
+    z = np.where((n_a > 0) & (n_b > 0), z, np.nan)
+    p_value = np.array([
+        math.erfc(abs(value) / math.sqrt(2)) if not math.isnan(value) else math.nan
+        for value in np.atleast_1d(z)
+    ]).reshape(np.shape(z))
+    return z, p_value
+
+
+def holm_adjust(p_values: Any) -> "np.ndarray":
+    """Holm-Bonferroni adjusted p-values (NaNs are left out of the family)."""
+    _require_numpy()
+    p_values = np.asarray(p_values, dtype=np.float64)
+    adjusted = np.full(p_values.shape, np.nan)
+    tested = np.flatnonzero(~np.isnan(p_values))
+    if len(tested) == 0:
+        return adjusted
+
+    order = tested[np.argsort(p_values[tested], kind='stable')]
+    scaled = p_values[order] * (len(order) - np.arange(len(order)))
+    adjusted[order] = np.minimum(np.maximum.accumulate(scaled), 1.0)
+    return adjusted
+
+
+def bootstrap_means(
+    values: Sequence[float],
+    counts: Sequence[int],
+    n_resamples: int = BOOTSTRAP_RESAMPLES,
+    rng: Optional["np.random.Generator"] = None,
+    seed: int = BOOTSTRAP_SEED
+) -> "np.ndarray":
+    """
+    Bootstrap distribution of the mean of a grouped sample.
+
+    Resampling n observations with replacement is a multinomial draw over
+    the distinct values, so each resample costs O(distinct values).
+
+    Args:
+        values: Distinct observed values
+        counts: How many times each value was observed
+        rng: Generator to draw from (default: a new one from seed)
+        seed: Seed for the generator when rng isn't given
+    """
+    _require_numpy()
+    values = np.asarray(values, dtype=np.float64)
+    counts = np.asarray(counts, dtype=np.int64)
+    n = int(counts.sum())
+    if n == 0:
+        return np.full(n_resamples, np.nan)
+
+    rng = rng if rng is not None else np.random.default_rng(seed)
+    probabilities = counts / n
+    means = np.empty(n_resamples)
+    chunk = max(1, _MAX_DRAWS // len(values))
+    for start in range(0, n_resamples, chunk):
+        draws = rng.multinomial(n, probabilities, size=min(chunk, n_resamples - start))
+        means[start:start + len(draws)] = draws @ values / n
+    return means
+
+
+def bootstrap_mean_interval(
+    values: Sequence[float],
+    counts: Sequence[int],
+    confidence: float = CONFIDENCE,
+    n_resamples: int = BOOTSTRAP_RESAMPLES,
+    seed: int = BOOTSTRAP_SEED
+) -> Tuple[float, float]:
+    """Percentile bootstrap interval for a mean; NaNs for an empty sample."""
+    means = bootstrap_means(values, counts, n_resamples, seed=seed)
+    if np.isnan(means).any():
+        return math.nan, math.nan
+    tail = (1 - confidence) / 2
+    low, high = np.quantile(means, [tail, 1 - tail])
+    return float(low), float(high)
+
+
+def rate_intervals(
+    successes: Any,
+    trials: Any,
+    confidence: float = CONFIDENCE
+) -> List[Optional[List[float]]]:
+    """Wilson intervals as [low, high] percentages (1 decimal), None if no trials."""
+    low, high = wilson_interval(np.atleast_1d(successes), np.atleast_1d(trials), confidence)
+    return [
+        None if math.isnan(lo) else [round(lo * 100, 1), round(hi * 100, 1)]
+        for lo, hi in zip(low.tolist(), high.tolist())
+    ]
+
+
+def mean_interval(
+    values: Sequence[float],
+    counts: Sequence[int],
+    confidence: float = CONFIDENCE,
+    digits: int = 2,
+    seed: int = BOOTSTRAP_SEED
+) -> Optional[List[float]]:
+    """Bootstrap interval as [low, high] (rounded), None for an empty sample."""
+    low, high = bootstrap_mean_interval(values, counts, confidence, seed=seed)
+    if math.isnan(low):
+        return None
+    return [round(low, digits), round(high, digits)]
+
+
+def compare_proportions(
+    metric: str,
+    labels: Sequence[str],
+    successes: Sequence[int],
+    trials: Sequence[int],
+    alpha: float = ALPHA
+) -> List[Dict[str, Any]]:
+    """
+    Two-proportion z-tests between every pair of groups.
+
+    Returns:
+        One entry per pair, with the difference in percentage points, z,
+        p-value and Holm-adjusted p-value; significant uses the adjusted one
+    """
+    _require_numpy()
+    pairs = list(combinations(range(len(labels)), 2))
+    if not pairs:
+        return []
+
+    a, b = (np.array(side) for side in zip(*pairs))
+    successes = np.asarray(successes, dtype=np.float64)
+    trials = np.asarray(trials, dtype=np.float64)
+    z, p_value = two_proportion_ztest(successes[a], trials[a], successes[b], trials[b])
+    adjusted = holm_adjust(p_value)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates = successes / trials * 100
+
+    return [
+        _comparison(
+            metric, labels[i], labels[j],
+            difference=rates[i] - rates[j], digits=1,
+            z=z[k], p_value=p_value[k], adjusted=adjusted[k], alpha=alpha
+        )
+        for k, (i, j) in enumerate(pairs)
+    ]
+
+
+def compare_means(
+    metric: str,
+    labels: Sequence[str],
+    distributions: Sequence[Tuple[Sequence[float], Sequence[int]]],
+    confidence: float = CONFIDENCE,
+    alpha: float = ALPHA,
+    n_resamples: int = BOOTSTRAP_RESAMPLES,
+    seed: int = BOOTSTRAP_SEED
+) -> List[Dict[str, Any]]:
+    """
+    Bootstrap comparison of means between every pair of groups.
+
+    Each group's bootstrap distribution is drawn once and reused for all
+    of its pairs. The p-value is the two-sided bootstrap p-value of the
+    difference; difference_ci is its percentile interval. Each group
+    draws from its own stream spawned from seed, so a group's resamples
+    don't depend on the size or order of the groups before it.
+    """
+    _require_numpy()
+    pairs = list(combinations(range(len(labels)), 2))
+    if not pairs:
+        return []
+
+    streams = np.random.SeedSequence(seed).spawn(len(distributions))
+    means = [
+        bootstrap_means(values, counts, n_resamples, np.random.default_rng(stream))
+        for (values, counts), stream in zip(distributions, streams)
+    ]
+    observed = [_weighted_mean(values, counts) for values, counts in distributions]
+
+    tail = (1 - confidence) / 2
+    p_values = np.full(len(pairs), np.nan)
+    intervals: List[Optional[List[float]]] = []
+    for k, (i, j) in enumerate(pairs):
+        difference = means[i] - means[j]
+        if np.isnan(difference).any():
+            intervals.append(None)
+            continue
+        p_values[k] = min(1.0, 2 * min((difference <= 0).mean(), (difference >= 0).mean()))
+        low, high = np.quantile(difference, [tail, 1 - tail])
+        intervals.append([round(float(low), 2), round(float(high), 2)])
+    adjusted = holm_adjust(p_values)
+
+    comparisons = []
+    for k, (i, j) in enumerate(pairs):
+        comparison = _comparison(
+            metric, labels[i], labels[j],
+            difference=observed[i] - observed[j], digits=2,
+            z=math.nan, p_value=p_values[k], adjusted=adjusted[k], alpha=alpha
+        )
+        del comparison['z']
+        comparison['difference_ci'] = intervals[k]
+        comparisons.append(comparison)
+    return comparisons
+
+
+def _comparison(
+    metric: str,
+    a: str,
+    b: str,
+    difference: float,
+    digits: int,
+    z: float,
+    p_value: float,
+    adjusted: float,
+    alpha: float
+) -> Dict[str, Any]:
+    def number(value: float, places: int) -> Optional[float]:
+        return None if math.isnan(value) else round(float(value), places)
+
+    return {
+        'metric': metric,
+        'a': a,
+        'b': b,
+        'difference': number(difference, digits),
+        'z': number(z, 2),
+        'p_value': number(p_value, 4),
+        'p_value_adjusted': number(adjusted, 4),
+        'significant': bool(not math.isnan(adjusted) and adjusted < alpha)
+    }
+
+
+def _weighted_mean(values: Sequence[float], counts: Sequence[int]) -> float:
+    total = float(np.sum(counts))
+    return float(np.dot(values, counts) / total) if total else math.nan
+
+
+def _require_numpy():
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("Tool statistics require numpy (pip install numpy)")
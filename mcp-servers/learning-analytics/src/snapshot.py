@@ -0,0 +1,477 @@
+"""
+Columnar Analytics Snapshots for the Learning Analytics MCP Server
+
+Heavy analytical scans (persona breakdowns, portfolio-wide outcomes) don't
+need to run against the row-oriented SQLite file that also takes writes.
+This module exports the analytics tables as one NumPy .npy file per
+column, and reads them back memory-mapped so only the columns a query
+touches are paged in:
+
+- Text columns are dictionary-encoded: a sorted array of distinct values
+  plus int32 codes (-1 for NULL). Sorted dictionaries keep codes
+  order-preserving and let joins and group-bys work on codes
+- Numeric columns are int64, or float64 with NaN for NULL
+
+Columns are deliberately uncompressed .npy rather than np.savez_compressed
+archives. Compressed arrays can't be memory-mapped: every read would
+inflate whole columns into each reader process's heap, turning a page-in
+of a few columns into a full decompression per query. Dictionary
+encoding already shrinks the text columns that dominate the export, and
+export_snapshot() keeps only the last few snapshots (keep=2), so the extra
+disk is bounded.
+
+Layout:
+    snapshots/
+        CURRENT                         # name of the latest complete snapshot
+        20251025T120000123456Z/
+            manifest.json               # tables, row counts, column encodings
+            students/
+                student_id.codes.npy
+                student_id.dict.npy
+                ...
+            course_progress/
+                time_spent_minutes.npy
+                ...
+
+A snapshot is written to a temporary directory and published by
+replacing CURRENT, so readers never see a partial export.
+"""
+
+import json
+import math
+import os
+import shutil
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    print("⚠️  NumPy not available. Analytics snapshots will be disabled.")
+
+
+SNAPSHOT_FORMAT = 1
+
+# Raw analytics tables (rollups are derived, so they aren't exported)
+SNAPSHOT_TABLES = [
+    'cohorts',
+    'students',
+    'course_progress',
+    'community_engagement',
+    'practice_adoption',
+    'retention_tracking',
+    'harm_prevention',
+    'nps_scores',
+]
+
+
+def export_snapshot(
+    conn: sqlite3.Connection,
+    root: Union[str, Path],
+    tables: Optional[Iterable[str]] = None,
+    keep: int = 2
+) -> Dict[str, Any]:
+    """
+    Write the analytics tables as a new columnar snapshot.
+
+    All tables are read inside one transaction, so the snapshot is
+    consistent across tables even while writes continue.
+
+    Args:
+        conn: Connection to the analytics database (autocommit mode)
+        root: Snapshot directory (holds CURRENT and one directory per snapshot)
+        tables: Tables to export (default: SNAPSHOT_TABLES)
+        keep: Number of snapshots to keep, including the new one
+
+    Returns:
+        The new snapshot's manifest
+    """
+    _require_numpy()
+    if keep < 1:
+        raise ValueError("keep must be at least 1")
+
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    created_at = datetime.now(timezone.utc)
+    name = created_at.strftime('%Y%m%dT%H%M%S%fZ')
+    staging = root / f".tmp-{name}"
+    staging.mkdir()
+
+    manifest: Dict[str, Any] = {
+        'format': SNAPSHOT_FORMAT,
+        'name': name,
+        'created_at': created_at.isoformat(),
+        'tables': {}
+    }
+
+    try:
+        conn.execute("BEGIN")
+        try:
+            for table in (tables or SNAPSHOT_TABLES):
+                manifest['tables'][table] = _export_table(conn, table, staging / table)
+        finally:
+            conn.execute("COMMIT")
+
+        (staging / "manifest.json").write_text(json.dumps(manifest, indent=2))
+        staging.rename(root / name)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    pointer = root / "CURRENT.tmp"
+    pointer.write_text(name)
+    os.replace(pointer, root / "CURRENT")
+
+    # Directory names sort by creation time
+    snapshots = sorted(p.name for p in root.iterdir() if p.is_dir() and not p.name.startswith('.'))
+    for old in snapshots[:-keep]:
+        shutil.rmtree(root / old, ignore_errors=True)
+
+    return manifest
+
+
+def _export_table(conn: sqlite3.Connection, table: str, directory: Path) -> Dict[str, Any]:
+    """Write one .npy per column (two for text columns); return its manifest entry."""
+    columns = [
+        (row[1], _affinity(row[2]))
+        for row in conn.execute(f"PRAGMA table_info({table})")
+    ]
+    if not columns:
+        raise ValueError(f"Unknown table '{table}'")
+
+    # Values are cast in SQL, so a stray number in a text column (or text
+    # in a numeric one) can't break the encoding
+    select = ", ".join(
+        f"CAST({name} AS {'TEXT' if affinity == 'text' else 'REAL'})" for name, affinity in columns
+    )
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    rows = cursor.execute(f"SELECT {select} FROM {table} ORDER BY rowid").fetchall()
+    values = list(zip(*rows)) if rows else [()] * len(columns)
+
+    directory.mkdir()
+    entry: Dict[str, Any] = {'rows': len(rows), 'columns': {}}
+
+    for (name, affinity), column in zip(columns, values):
+        if affinity == 'text':
+            codes, dictionary = _dictionary_encode(column)
+            np.save(directory / f"{name}.codes.npy", codes)
+            np.save(directory / f"{name}.dict.npy", dictionary)
+            entry['columns'][name] = {'encoding': 'dictionary', 'distinct': len(dictionary)}
+        else:
+            array = np.array(column, dtype=np.float64)
+            if (
+                affinity != 'real'
+                and not np.isnan(array).any()
+                and np.array_equal(array, np.round(array))
+            ):
+                array = array.astype(np.int64)
+            np.save(directory / f"{name}.npy", array)
+            entry['columns'][name] = {'encoding': str(array.dtype)}
+
+    return entry
+
+
+def _affinity(declared_type: str) -> str:
+    """SQLite's column affinity rules, minus BLOB (BOOLEAN is 'numeric')."""
+    declared_type = declared_type.upper()
+    if 'INT' in declared_type:
+        return 'integer'
+    if any(marker in declared_type for marker in ('CHAR', 'CLOB', 'TEXT')):
+        return 'text'
+    if any(marker in declared_type for marker in ('REAL', 'FLOA', 'DOUB')):
+        return 'real'
+    return 'numeric'
+
+
+def _dictionary_encode(values: tuple):
+    """Sorted distinct values and each row's int32 code (-1 for NULL)."""
+    values = np.array(values, dtype=object)
+    is_null = values == None  # noqa: E711 - elementwise
+    dictionary, inverse = np.unique(values[~is_null].astype(str), return_inverse=True)
+
+    codes = np.full(len(values), -1, dtype=np.int32)
+    codes[~is_null] = inverse
+    return codes, dictionary
+
+
+class SnapshotTable:
+    """
+    One table of a snapshot. Columns are memory-mapped on first use.
+
+    For dictionary-encoded columns, array() returns the codes; see
+    dictionary(), decode() and key_index().
+    """
+
+    def __init__(self, directory: Path, name: str, entry: Dict[str, Any]):
+        self.directory = directory
+        self.name = name
+        self.rows: int = entry['rows']
+        self.encodings = {
+            column: info['encoding'] for column, info in entry['columns'].items()
+        }
+        self._arrays: Dict[str, "np.ndarray"] = {}
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.encodings)
+
+    def is_dictionary(self, column: str) -> bool:
+        return self._encoding(column) == 'dictionary'
+
+    def array(self, column: str) -> "np.ndarray":
+        """Numeric values, or int32 codes for a dictionary-encoded column."""
+        suffix = '.codes.npy' if self.is_dictionary(column) else '.npy'
+        return self._load(column + suffix)
+
+    def dictionary(self, column: str) -> "np.ndarray":
+        """Sorted distinct values of a dictionary-encoded column."""
+        if not self.is_dictionary(column):
+            raise ValueError(f"{self.name}.{column} is not dictionary-encoded")
+        return self._load(column + '.dict.npy')
+
+    def decode(self, column: str, rows: Optional["np.ndarray"] = None) -> List[Optional[str]]:
+        """Original values (None for NULL), optionally for selected rows only."""
+        codes = self.array(column)
+        if rows is not None:
+            codes = codes[rows]
+        dictionary = self.dictionary(column)
+        return [None if code < 0 else str(dictionary[code]) for code in codes]
+
+    def key_index(self, column: str, keys: "np.ndarray") -> "np.ndarray":
+        """
+        For every row, the position of its value in keys (-1 if absent/NULL).
+
+        Args:
+            column: Dictionary-encoded column
+            keys: Sorted array of distinct strings
+        """
+        dictionary = self.dictionary(column)
+        keys = np.asarray(keys, dtype=str)
+        positions = np.searchsorted(keys, dictionary)
+        found = positions < len(keys)
+        found[found] = keys[positions[found]] == dictionary[found]
+
+        # Code -1 (NULL) picks the trailing -1
+        mapping = np.append(np.where(found, positions, -1), -1)
+        return mapping[self.array(column)]
+
+    def join(self, column: str, target: "SnapshotTable", target_column: str) -> "np.ndarray":
+        """
+        For every row, the row of target whose (unique) target_column
+        matches this row's column value, or -1.
+        """
+        row_of_code = np.full(len(target.dictionary(target_column)) + 1, -1, dtype=np.int64)
+        codes = target.array(target_column)
+        row_of_code[codes[codes >= 0]] = np.flatnonzero(codes >= 0)
+        return row_of_code[self.key_index(column, target.dictionary(target_column))]
+
+    def equals(self, column: str, value: str) -> "np.ndarray":
+        """Boolean mask of rows whose column equals value."""
+        return self.key_index(column, np.array([value], dtype=str)) == 0
+
+    def _encoding(self, column: str) -> str:
+        if column not in self.encodings:
+            raise ValueError(f"Column '{column}' not in snapshot table '{self.name}'")
+        return self.encodings[column]
+
+    def _load(self, filename: str) -> "np.ndarray":
+        array = self._arrays.get(filename)
+        if array is None:
+            array = np.load(self.directory / filename, mmap_mode='r')
+            self._arrays[filename] = array
+        return array
+
+
+class Snapshot:
+    """
+    A published columnar snapshot.
+
+    Usage:
+        snapshot = Snapshot.open("data/snapshots")
+        students = snapshot.table('students')
+        in_cohort = students.equals('cohort_id', 'cohort-q1-2025')
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.manifest = json.loads((self.directory / "manifest.json").read_text())
+        if self.manifest.get('format') != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format in {self.directory}")
+        self.name: str = self.manifest['name']
+        self.created_at: str = self.manifest['created_at']
+        self._tables: Dict[str, SnapshotTable] = {}
+
+    @classmethod
+    def open(cls, root: Union[str, Path]) -> Optional["Snapshot"]:
+        """Open the latest snapshot under root, or None if none was exported."""
+        _require_numpy()
+        name = current_snapshot_name(root)
+        return cls(Path(root) / name) if name else None
+
+    def table(self, name: str) -> SnapshotTable:
+        table = self._tables.get(name)
+        if table is None:
+            if name not in self.manifest['tables']:
+                raise ValueError(f"Table '{name}' not in snapshot {self.name}")
+            table = SnapshotTable(self.directory / name, name, self.manifest['tables'][name])
+            self._tables[name] = table
+        return table
+
+
+def current_snapshot_name(root: Union[str, Path]) -> Optional[str]:
+    """Name of the latest published snapshot under root, if any."""
+    try:
+        return (Path(root) / "CURRENT").read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+# Analytics over snapshots. Each mirrors a server tool's SQL exactly,
+# including SQLite's NULL handling, grouping order and rounding.
+
+def persona_breakdown(
+    snapshot: Snapshot,
+    cohort_id: str,
+    persona_type: Optional[str] = None,
+    with_distributions: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Per-persona student counts, completion rate and satisfaction for a
+    cohort (same rows as get_persona_analytics' query), plus the
+    completions and progress_rows behind the completion rate.
+
+    Args:
+        with_distributions: Also return each persona's satisfaction scores
+            as satisfaction_distribution: (distinct values, counts)
+    """
+    students = snapshot.table('students')
+    progress = snapshot.table('course_progress')
+
+    selected = students.equals('cohort_id', cohort_id)
+    if persona_type:
+        selected &= students.equals('persona_type', persona_type)
+
+    # Group 0 is NULL persona; SQLite sorts NULL first in GROUP BY
+    personas = students.dictionary('persona_type')
+    groups = len(personas) + 1
+    group_of_student = np.where(selected, students.array('persona_type') + 1, -1)
+
+    owner = progress.join('student_id', students, 'student_id')
+    group = np.append(group_of_student, -1)[owner]
+    in_cohort = group >= 0
+    group = group[in_cohort]
+
+    student_count = np.bincount(group_of_student[selected], minlength=groups)
+
+    # LEFT JOIN: students without progress rows count once, as not completed
+    has_progress = np.bincount(owner[owner >= 0], minlength=students.rows) > 0
+    joined_rows = (
+        np.bincount(group, minlength=groups)
+        + np.bincount(group_of_student[selected & ~has_progress], minlength=groups)
+    )
+    completed = np.asarray(progress.array('completed'))[in_cohort] == 1
+    completions = np.bincount(group, weights=completed, minlength=groups)
+
+    satisfaction = np.asarray(progress.array('satisfaction_score'), dtype=np.float64)[in_cohort]
+    rated = ~np.isnan(satisfaction)
+    satisfaction_sum = np.bincount(group[rated], weights=satisfaction[rated], minlength=groups)
+    satisfaction_count = np.bincount(group[rated], minlength=groups)
+
+    distributions: Dict[int, Any] = {}
+    if with_distributions:
+        pairs, counts = np.unique(
+            np.stack([group[rated], satisfaction[rated]]), axis=1, return_counts=True
+        )
+        for g in np.unique(pairs[0]).astype(int):
+            in_group = pairs[0] == g
+            distributions[g] = (pairs[1][in_group].tolist(), counts[in_group].tolist())
+
+    rows = []
+    for g in np.flatnonzero(student_count):
+        rows.append({
+            'persona_type': None if g == 0 else str(personas[g - 1]),
+            'student_count': int(student_count[g]),
+            'completion_rate': sql_round(completions[g] / joined_rows[g] * 100, 1),
+            'avg_satisfaction': (
+                sql_round(satisfaction_sum[g] / satisfaction_count[g], 2)
+                if satisfaction_count[g] else None
+            ),
+            'completions': int(completions[g]),
+            'progress_rows': int(joined_rows[g])
+        })
+        if with_distributions:
+            rows[-1]['satisfaction_distribution'] = distributions.get(g, ([], []))
+    return rows
+
+
+def outcome_counts(
+    snapshot: Snapshot,
+    cohort_ids: Optional[Iterable[str]],
+    months_post_course: int
+) -> Dict[str, Dict[str, int]]:
+    """
+    Cohort size, retention responses and harm-prevention stories per
+    cohort (the inputs of get_outcome_metrics / get_outcome_metrics_batch).
+
+    Args:
+        cohort_ids: Cohorts to include (None: every cohort in the snapshot)
+    """
+    cohorts = snapshot.table('cohorts')
+    students = snapshot.table('students')
+    retention = snapshot.table('retention_tracking')
+    harm = snapshot.table('harm_prevention')
+
+    if cohort_ids is None:
+        keys = np.asarray(cohorts.dictionary('cohort_id'), dtype=str)
+    else:
+        keys = np.unique(np.array(list(cohort_ids), dtype=str))
+    n = len(keys)
+
+    cohort_row = cohorts.key_index('cohort_id', keys)
+    student_count = np.zeros(n, dtype=np.int64)
+    sizes = np.nan_to_num(np.asarray(cohorts.array('student_count'), dtype=np.float64))
+    student_count[cohort_row[cohort_row >= 0]] = sizes[cohort_row >= 0]
+
+    cohort_of_response = retention.key_index('cohort_id', keys)
+    in_horizon = (cohort_of_response >= 0) & (
+        np.asarray(retention.array('months_post_course')) == months_post_course
+    )
+    responses = np.bincount(cohort_of_response[in_horizon], minlength=n)
+    still_using = np.bincount(
+        cohort_of_response[in_horizon],
+        weights=np.asarray(retention.array('still_using_practices'))[in_horizon] == 1,
+        minlength=n
+    )
+
+    # COUNT(DISTINCT hp.student_id) per student cohort
+    cohort_of_student = students.key_index('cohort_id', keys)
+    storytellers = np.unique(harm.join('student_id', students, 'student_id'))
+    storytellers = storytellers[storytellers >= 0]
+    story_cohort = cohort_of_student[storytellers]
+    stories = np.bincount(story_cohort[story_cohort >= 0], minlength=n)
+
+    return {
+        str(keys[i]): {
+            'total_students': int(student_count[i]),
+            'total_responses': int(responses[i]),
+            'still_using': int(still_using[i]),
+            'students_with_stories': int(stories[i])
+        }
+        for i in range(n)
+    }
+
+
+def sql_round(value: float, digits: int) -> float:
+    """ROUND() the way SQLite does it: halves round away from zero."""
+    scale = 10 ** digits
+    return math.copysign(math.floor(abs(value) * scale + 0.5) / scale, value)
+
+
+def _require_numpy():
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("Analytics snapshots require numpy (pip install numpy)")
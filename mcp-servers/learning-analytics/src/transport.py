@@ -0,0 +1,428 @@
+"""
+Async MCP Transport for the Learning Analytics MCP Server
+
+Serves the analytics tools over JSON-RPC 2.0 (newline-delimited, as in
+MCP's stdio transport), either on stdin/stdout or on a Unix socket that
+several agent processes share, so they all use one warm server (pooled
+connections, result cache) instead of each opening the database.
+
+- Requests are pipelined: every request runs as its own task and
+  responses are written as they complete, not in arrival order
+- Blocking SQLite work runs in a thread pool sized to the connection pool
+- notifications/cancelled cancels an in-flight call (a call still queued
+  for a worker never runs; one already running finishes its statement
+  and its result is dropped)
+- Arguments are validated on the event loop (if the server has
+  validate_arguments), so invalid calls never wait for a worker
+- Every tool result carries its duration in _meta, and per-tool timings
+  are kept in AsyncMCPServer.stats
+
+Usage:
+    python src/server.py serve                          # stdio
+    python src/server.py serve --socket /tmp/analytics.sock
+
+    client = MCPClient("/tmp/analytics.sock")
+    health = client.call_tool("get_cohort_health", {"cohort_id": "cohort-q4-2024"})
+"""
+
+import asyncio
+import functools
+import itertools
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+
+PROTOCOL_VERSION = "2025-06-18"
+SUPPORTED_PROTOCOL_VERSIONS = ("2025-06-18", "2025-03-26", "2024-11-05")
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+# Longest accepted request line
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+
+class JSONRPCError(Exception):
+    """A request that gets a JSON-RPC error response."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class AsyncMCPServer:
+    """
+    JSON-RPC/MCP front end for a tool server.
+
+    The wrapped server needs list_tools() (MCP_TOOLS-style definitions)
+    and call_tool(name, arguments), which may block. If it also has
+    validate_arguments(name, arguments), arguments are validated here
+    and passed on as call_tool(name, arguments, validated=True).
+    """
+
+    def __init__(
+        self,
+        server: Any,
+        max_workers: int = 8,
+        call_timeout: Optional[float] = None,
+        server_name: str = "learning-analytics",
+        server_version: str = "0.1.0"
+    ):
+        """
+        Args:
+            server: Tool server (e.g. LearningAnalyticsServer)
+            max_workers: Threads running tool calls concurrently
+            call_timeout: Seconds before a tool call is abandoned (None: no limit)
+            server_name, server_version: Reported in the initialize response
+        """
+        self.server = server
+        self.call_timeout = call_timeout
+        self.server_info = {'name': server_name, 'version': server_version}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mcp-tool")
+        self._tools = [
+            {
+                'name': tool['name'],
+                'description': tool['description'],
+                'inputSchema': tool['input_schema']
+            }
+            for tool in server.list_tools()
+        ]
+        self._validate = getattr(server, 'validate_arguments', None)
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._stats_lock = threading.Lock()
+
+    # Protocol
+
+    async def handle(self, message: Any) -> Optional[Dict[str, Any]]:
+        """
+        Handle one decoded JSON-RPC message.
+
+        Returns:
+            The response, or None for notifications
+        """
+        if not isinstance(message, dict) or message.get('jsonrpc') != '2.0' \
+                or not isinstance(message.get('method'), str):
+            return _error(
+                message.get('id') if isinstance(message, dict) else None,
+                INVALID_REQUEST, "Invalid JSON-RPC 2.0 request"
+            )
+
+        is_notification = 'id' not in message
+        request_id = message.get('id')
+        params = message.get('params') or {}
+
+        try:
+            if not isinstance(params, dict):
+                raise JSONRPCError(INVALID_PARAMS, "params must be an object")
+            result = await self._dispatch(message['method'], params)
+        except JSONRPCError as e:
+            return None if is_notification else _error(request_id, e.code, e.message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return None if is_notification else _error(
+                request_id, INTERNAL_ERROR, f"{type(e).__name__}: {e}"
+            )
+
+        if is_notification:
+            return None
+        return {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+
+    async def _dispatch(self, method: str, params: Dict[str, Any]) -> Any:
+        if method == 'initialize':
+            requested = params.get('protocolVersion')
+            return {
+                'protocolVersion': (
+                    requested if requested in SUPPORTED_PROTOCOL_VERSIONS else PROTOCOL_VERSION
+                ),
+                'capabilities': {'tools': {'listChanged': False}},
+                'serverInfo': self.server_info
+            }
+        if method == 'ping':
+            return {}
+        if method == 'tools/list':
+            return {'tools': self._tools}
+        if method == 'tools/call':
+            return await self._call_tool(params)
+        if method.startswith('notifications/'):
+            return None
+        raise JSONRPCError(METHOD_NOT_FOUND, f"Method not found: {method}")
+
+    async def _call_tool(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        name = params.get('name')
+        arguments = params.get('arguments') or {}
+        if not isinstance(name, str) or not any(tool['name'] == name for tool in self._tools):
+            raise JSONRPCError(INVALID_PARAMS, f"Unknown tool: {name}")
+        if not isinstance(arguments, dict):
+            raise JSONRPCError(INVALID_PARAMS, "arguments must be an object")
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        outcome = 'ok'
+        try:
+            if self._validate is not None:
+                # Microseconds on the event loop; invalid calls never take a worker
+                outcome = 'invalid'
+                arguments = self._validate(name, arguments)
+                outcome = 'ok'
+            call = (functools.partial(self.server.call_tool, validated=True)
+                    if self._validate is not None else self.server.call_tool)
+            future = loop.run_in_executor(self._executor, call, name, arguments)
+            result = await asyncio.wait_for(future, timeout=self.call_timeout)
+            content, is_error = json.dumps(result, default=str, separators=(',', ':')), False
+        except asyncio.TimeoutError:
+            outcome = 'timeout'
+            content, is_error = f"Tool call timed out after {self.call_timeout}s", True
+        except asyncio.CancelledError:
+            outcome = 'cancelled'
+            raise
+        except Exception as e:
+            # Tool errors go back to the model as results, not protocol errors
+            if outcome == 'ok':
+                outcome = 'error'
+            content, is_error = f"{type(e).__name__}: {e}", True
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            self._record(name, outcome, duration_ms)
+
+        return {
+            'content': [{'type': 'text', 'text': content}],
+            'isError': is_error,
+            '_meta': {'durationMs': round(duration_ms, 2)}
+        }
+
+    # Sessions
+
+    async def serve_session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serve one client connection until it closes.
+
+        Each request runs as its own task; in-flight calls are finished
+        (and answered) after the client stops sending.
+        """
+        in_flight: Dict[Any, asyncio.Task] = {}
+        write_lock = asyncio.Lock()
+
+        async def send(response: Optional[Dict[str, Any]]):
+            if response is None:
+                return
+            data = json.dumps(response, default=str, separators=(',', ':')).encode() + b"\n"
+            async with write_lock:
+                writer.write(data)
+                await writer.drain()
+
+        async def respond(message: Dict[str, Any]):
+            try:
+                await send(await self.handle(message))
+            except asyncio.CancelledError:
+                pass  # Cancelled requests get no response
+            except (ConnectionError, RuntimeError):
+                pass  # Client went away
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    await send(_error(None, INVALID_REQUEST, "Message too large"))
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError as e:
+                    await send(_error(None, PARSE_ERROR, f"Parse error: {e}"))
+                    continue
+
+                if isinstance(message, dict) and message.get('method') == 'notifications/cancelled':
+                    params = message.get('params') or {}
+                    task = in_flight.get(_request_key(params.get('requestId')))
+                    if task is not None:
+                        task.cancel()
+                    continue
+
+                task = asyncio.create_task(respond(message))
+                if isinstance(message, dict) and 'id' in message:
+                    key = _request_key(message['id'])
+                    in_flight[key] = task
+                    task.add_done_callback(lambda _, key=key: in_flight.pop(key, None))
+
+            if in_flight:
+                await asyncio.gather(*in_flight.values(), return_exceptions=True)
+        finally:
+            for task in in_flight.values():
+                task.cancel()
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except (ConnectionError, RuntimeError):
+                pass
+
+    async def serve_stdio(self):
+        """Serve a single client over stdin/stdout (MCP stdio transport)."""
+        loop = asyncio.get_running_loop()
+        stdout = sys.stdout
+        # Anything printed while serving must not corrupt the protocol stream
+        sys.stdout = sys.stderr
+
+        reader = asyncio.StreamReader(limit=MAX_MESSAGE_BYTES)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        transport, protocol = await loop.connect_write_pipe(
+            asyncio.streams.FlowControlMixin, stdout
+        )
+        writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+        try:
+            await self.serve_session(reader, writer)
+        finally:
+            sys.stdout = stdout
+
+    async def serve_unix(self, path: Union[str, Path], ready: Optional[asyncio.Event] = None):
+        """
+        Serve any number of clients on a Unix socket until cancelled.
+
+        Args:
+            path: Socket path (a stale socket file is replaced)
+            ready: Set once the socket is accepting connections
+        """
+        path = Path(path)
+        if path.exists():
+            path.unlink()
+        server = await asyncio.start_unix_server(
+            self.serve_session, path=str(path), limit=MAX_MESSAGE_BYTES
+        )
+        os.chmod(path, 0o600)
+        try:
+            async with server:
+                if ready is not None:
+                    ready.set()
+                await server.serve_forever()
+        finally:
+            if path.exists():
+                path.unlink()
+
+    # Timing
+
+    @property
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-tool call counts, outcomes and durations (ms)."""
+        with self._stats_lock:
+            return {
+                name: {**entry, 'avg_ms': round(entry['total_ms'] / entry['calls'], 2)}
+                for name, entry in self._stats.items()
+            }
+
+    def _record(self, name: str, outcome: str, duration_ms: float):
+        with self._stats_lock:
+            entry = self._stats.setdefault(name, {
+                'calls': 0, 'errors': 0, 'invalid': 0, 'timeouts': 0, 'cancelled': 0,
+                'total_ms': 0.0, 'max_ms': 0.0
+            })
+            entry['calls'] += 1
+            if outcome == 'error':
+                entry['errors'] += 1
+            elif outcome == 'timeout':
+                entry['timeouts'] += 1
+            elif outcome == 'cancelled':
+                entry['cancelled'] += 1
+            elif outcome == 'invalid':
+                entry['invalid'] += 1
+            entry['total_ms'] = round(entry['total_ms'] + duration_ms, 2)
+            entry['max_ms'] = round(max(entry['max_ms'], duration_ms), 2)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class MCPClient:
+    """
+    Minimal blocking client for a shared server's Unix socket.
+
+    Thread-safe: concurrent callers share the connection, and each call
+    waits for the response with its own request id.
+    """
+
+    def __init__(self, path: Union[str, Path], timeout: Optional[float] = 60.0):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(str(path))
+        self._file = self._socket.makefile('rb')
+        self._ids = itertools.count(1)
+        self._send_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._responses: Dict[Any, Dict[str, Any]] = {}
+        self.request('initialize', {
+            'protocolVersion': PROTOCOL_VERSION,
+            'capabilities': {},
+            'clientInfo': {'name': 'learning-analytics-client', 'version': '0.1.0'}
+        })
+        self.notify('notifications/initialized')
+
+    def request(self, method: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Send a request and wait for its result (raises JSONRPCError on errors)."""
+        request_id = next(self._ids)
+        self._send({'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params or {}})
+        response = self._wait_for(request_id)
+        if 'error' in response:
+            raise JSONRPCError(response['error']['code'], response['error']['message'])
+        return response['result']
+
+    def notify(self, method: str, params: Optional[Dict[str, Any]] = None):
+        self._send({'jsonrpc': '2.0', 'method': method, 'params': params or {}})
+
+    def list_tools(self) -> List[Dict[str, Any]]:
+        return self.request('tools/list')['tools']
+
+    def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> Any:
+        """Call a tool and decode its JSON result (raises ValueError for tool errors)."""
+        result = self.request('tools/call', {'name': name, 'arguments': arguments or {}})
+        text = result['content'][0]['text']
+        if result.get('isError'):
+            raise ValueError(text)
+        return json.loads(text)
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+    def _send(self, message: Dict[str, Any]):
+        data = json.dumps(message, separators=(',', ':')).encode() + b"\n"
+        with self._send_lock:
+            self._socket.sendall(data)
+
+    def _wait_for(self, request_id: int) -> Dict[str, Any]:
+        # Whoever holds the read lock reads responses, filing other callers'
+        while True:
+            with self._read_lock:
+                if request_id in self._responses:
+                    return self._responses.pop(request_id)
+                line = self._file.readline()
+                if not line:
+                    raise ConnectionError("MCP server closed the connection")
+                response = json.loads(line)
+                if response.get('id') == request_id:
+                    return response
+                self._responses[response.get('id')] = response
+
+
+def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+
+def _request_key(request_id: Any) -> Any:
+    # Ids may be strings or numbers; JSON keeps them distinct
+    return (type(request_id).__name__, request_id)
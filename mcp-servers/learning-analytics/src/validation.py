@@ -0,0 +1,207 @@
+"""
+Tool Argument Validation for the Learning Analytics MCP Server
+
+Compiles each tool's JSON schema (MCP_TOOLS input_schema) into a plain
+Python validator once, at import, so a bad call from the model is rejected
+in microseconds - before it costs a query, or fails deep inside SQLite with
+an error the model can't act on.
+
+Validators also do the cheap coercions models need:
+- integers given as "3" or 3.0 become 3
+- booleans given as "true"/"false" become True/False
+- null for an optional argument means "use the default"
+
+Supported schema keywords: type (string, integer, number, boolean, array),
+enum, items, minimum, maximum, required. Unknown arguments are rejected.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+Coercer = Callable[[Any], Any]
+Validator = Callable[[Optional[Dict[str, Any]]], Dict[str, Any]]
+
+_TRUE_STRINGS = frozenset({'true', '1', 'yes'})
+_FALSE_STRINGS = frozenset({'false', '0', 'no'})
+
+
+class ToolArgumentError(ValueError):
+    """A tool was called with arguments its schema doesn't accept."""
+
+    def __init__(self, tool: str, argument: Optional[str], message: str):
+        self.tool = tool
+        self.argument = argument
+        prefix = f"{argument}: " if argument else ""
+        super().__init__(f"Invalid arguments for {tool}: {prefix}{message}")
+
+
+def compile_validator(tool: Dict[str, Any]) -> Validator:
+    """
+    Build a validator for one MCP tool definition.
+
+    Args:
+        tool: Tool definition with name and input_schema
+
+    Returns:
+        Function taking the call's arguments (dict or None) and returning
+        the coerced arguments; raises ToolArgumentError if they're invalid
+
+    Raises:
+        ValueError: The schema uses a type this module doesn't support
+    """
+    name = tool['name']
+    schema = tool.get('input_schema', {})
+    properties = schema.get('properties', {})
+    coercers = {
+        argument: _compile_property(name, argument, spec)
+        for argument, spec in properties.items()
+    }
+    required = tuple(schema.get('required', ()))
+    accepted = ', '.join(properties) or 'none'
+
+    def validate(arguments: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if arguments is None:
+            arguments = {}
+        elif not isinstance(arguments, dict):
+            raise ToolArgumentError(name, None, "arguments must be an object")
+
+        validated = {}
+        for argument, value in arguments.items():
+            coerce = coercers.get(argument)
+            if coerce is None:
+                raise ToolArgumentError(
+                    name, argument, f"unknown argument (accepted: {accepted})"
+                )
+            if value is not None:
+                validated[argument] = coerce(value)
+
+        for argument in required:
+            if argument not in validated:
+                raise ToolArgumentError(name, argument, "required")
+        return validated
+
+    return validate
+
+
+def compile_validators(tools: Iterable[Dict[str, Any]]) -> Dict[str, Validator]:
+    """Validators for a list of tool definitions, keyed by tool name."""
+    return {tool['name']: compile_validator(tool) for tool in tools}
+
+
+def _compile_property(tool: str, argument: str, spec: Dict[str, Any]) -> Coercer:
+    schema_type = spec.get('type')
+    if schema_type == 'array':
+        coerce_item = _compile_property(tool, argument, spec.get('items', {}))
+        return _array_coercer(tool, argument, coerce_item)
+
+    if schema_type not in _SCALAR_COERCERS:
+        raise ValueError(f"{tool}.{argument}: unsupported schema type {schema_type!r}")
+    coerce = _SCALAR_COERCERS[schema_type](tool, argument)
+
+    checks = []
+    if 'enum' in spec:
+        allowed = frozenset(spec['enum'])
+        expected = ', '.join(map(repr, spec['enum']))
+
+        def check_enum(value):
+            if value not in allowed:
+                raise ToolArgumentError(tool, argument, f"must be one of {expected}, got {value!r}")
+        checks.append(check_enum)
+    if 'minimum' in spec:
+        minimum = spec['minimum']
+
+        def check_minimum(value):
+            if value < minimum:
+                raise ToolArgumentError(tool, argument, f"must be at least {minimum}, got {value}")
+        checks.append(check_minimum)
+    if 'maximum' in spec:
+        maximum = spec['maximum']
+
+        def check_maximum(value):
+            if value > maximum:
+                raise ToolArgumentError(tool, argument, f"must be at most {maximum}, got {value}")
+        checks.append(check_maximum)
+
+    if not checks:
+        return coerce
+
+    def coerce_and_check(value):
+        value = coerce(value)
+        for check in checks:
+            check(value)
+        return value
+    return coerce_and_check
+
+
+def _string_coercer(tool: str, argument: str) -> Coercer:
+    def coerce(value):
+        if type(value) is not str:
+            raise ToolArgumentError(tool, argument, f"must be a string, got {_describe(value)}")
+        return value
+    return coerce
+
+
+def _integer_coercer(tool: str, argument: str) -> Coercer:
+    def coerce(value):
+        value_type = type(value)
+        if value_type is int:
+            return value
+        if value_type is float and value.is_integer():
+            return int(value)
+        if value_type is str:
+            try:
+                return int(value.strip())
+            except ValueError:
+                pass
+        raise ToolArgumentError(tool, argument, f"must be an integer, got {_describe(value)}")
+    return coerce
+
+
+def _number_coercer(tool: str, argument: str) -> Coercer:
+    def coerce(value):
+        value_type = type(value)
+        if value_type is int or value_type is float:
+            return value
+        if value_type is str:
+            try:
+                return float(value.strip())
+            except ValueError:
+                pass
+        raise ToolArgumentError(tool, argument, f"must be a number, got {_describe(value)}")
+    return coerce
+
+
+def _boolean_coercer(tool: str, argument: str) -> Coercer:
+    def coerce(value):
+        if type(value) is bool:
+            return value
+        if type(value) is str:
+            lowered = value.strip().lower()
+            if lowered in _TRUE_STRINGS:
+                return True
+            if lowered in _FALSE_STRINGS:
+                return False
+        raise ToolArgumentError(tool, argument, f"must be a boolean, got {_describe(value)}")
+    return coerce
+
+
+def _array_coercer(tool: str, argument: str, coerce_item: Coercer) -> Coercer:
+    def coerce(value) -> List[Any]:
+        if type(value) is not list and type(value) is not tuple:
+            raise ToolArgumentError(tool, argument, f"must be an array, got {_describe(value)}")
+        return [coerce_item(item) for item in value]
+    return coerce
+
+
+_SCALAR_COERCERS = {
+    'string': _string_coercer,
+    'integer': _integer_coercer,
+    'number': _number_coercer,
+    'boolean': _boolean_coercer,
+}
+
+
+def _describe(value: Any) -> str:
+    text = repr(value)
+    if len(text) > 40:
+        text = text[:37] + '...'
+    return f"{type(value).__name__} {text}"
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test script for the multi-cohort batch tools
+
+Tests:
+- Every batch entry equals the single-cohort tool's result
+- Default selection is every cohort; unknown ids come back as empty metrics
+- Each batch call runs a single query
+"""
+
+import random
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.server import LearningAnalyticsServer
+
+COHORTS = ['cohort-a', 'cohort-b', 'cohort-c']
+
+
+def _make_server() -> LearningAnalyticsServer:
+    db_path = Path(tempfile.mkdtemp()) / "batch_test.db"
+    server = LearningAnalyticsServer(db_path=str(db_path), cache_ttl_seconds=0)
+    rng = random.Random(7)
+
+    conn = sqlite3.connect(server.db_path)
+    for c, cohort in enumerate(COHORTS):
+        size = 10 + 5 * c
+        conn.execute(
+            "INSERT INTO cohorts (cohort_id, name, start_date, student_count) "
+            "VALUES (?, ?, '2025-01-06', ?)",
+            (cohort, cohort, size)
+        )
+        for i in range(size):
+            student = f"{cohort}-student-{i}"
+            conn.execute(
+                "INSERT INTO students (student_id, cohort_id, enrollment_date) "
+                "VALUES (?, ?, '2025-01-06')",
+                (student, cohort)
+            )
+            for module in range(1, 4):
+                conn.execute(
+                    "INSERT INTO course_progress (progress_id, student_id, module_id, completed, "
+                    "satisfaction_score, time_spent_minutes) VALUES (?, ?, ?, ?, ?, ?)",
+                    (f"{student}-p{module}", student, f"module-{module}", rng.random() < 0.8,
+                     round(rng.uniform(3, 5), 1), rng.randrange(20, 90))
+                )
+            for week in range(1, 5):
+                if rng.random() < 0.75:
+                    conn.execute(
+                        "INSERT INTO community_engagement (engagement_id, student_id, cohort_id, "
+                        "week_number, posts_created, replies_made) VALUES (?, ?, ?, ?, ?, ?)",
+                        (f"{student}-e{week}", student, cohort, week,
+                         rng.randrange(4), rng.randrange(4))
+                    )
+            if rng.random() < 0.6:
+                conn.execute(
+                    "INSERT INTO practice_adoption (adoption_id, student_id, framework_name, "
+                    "week_number, self_reported) VALUES (?, ?, 'framework-1', 2, 1)",
+                    (f"{student}-a", student)
+                )
+            conn.execute(
+                "INSERT INTO retention_tracking (retention_id, student_id, cohort_id, "
+                "months_post_course, still_using_practices, survey_date) "
+                "VALUES (?, ?, ?, 6, ?, '2025-09-01')",
+                (f"{student}-r", student, cohort, rng.random() < 0.7)
+            )
+            if rng.random() < 0.3:
+                conn.execute(
+                    "INSERT INTO harm_prevention (story_id, student_id, week_number) VALUES (?, ?, 3)",
+                    (f"{student}-h", student)
+                )
+    conn.commit()
+    conn.close()
+    return server
+
+
+def test_batch_matches_single_tools():
+    """Each cohort's batch entry is exactly what the single-cohort tool returns."""
+    server = _make_server()
+
+    cases = [
+        ('get_course_metrics_batch', {}, lambda c: server.get_course_metrics(cohort_id=c)),
+        ('get_course_metrics_batch', {'module_id': 'module-2'},
+         lambda c: server.get_course_metrics(cohort_id=c, module_id='module-2')),
+        ('get_engagement_metrics_batch', {}, lambda c: server.get_engagement_metrics(cohort_id=c)),
+        ('get_engagement_metrics_batch', {'week_number': 3},
+         lambda c: server.get_engagement_metrics(cohort_id=c, week_number=3)),
+        ('get_outcome_metrics_batch', {}, lambda c: server.get_outcome_metrics(cohort_id=c)),
+        ('get_cohort_health_batch', {}, lambda c: server.get_cohort_health(cohort_id=c)),
+    ]
+    for tool, arguments, single in cases:
+        batch = getattr(server, tool)(**arguments)
+        assert sorted(batch['cohorts']) == COHORTS, (tool, batch['cohorts'].keys())
+        for cohort in COHORTS:
+            assert batch['cohorts'][cohort] == single(cohort), (tool, arguments, cohort)
+
+    health = server.get_cohort_health_batch()
+    assert sum(health['status_counts'].values()) == len(COHORTS)
+    print("✅ Batch results match single-cohort tools for every cohort")
+
+
+def test_cohort_selection():
+    """Explicit ids restrict the batch; unknown ids return empty metrics."""
+    server = _make_server()
+
+    subset = server.get_course_metrics_batch(cohort_ids=['cohort-b', 'cohort-b', 'no-such-cohort'])
+    assert sorted(subset['cohorts']) == ['cohort-b', 'no-such-cohort']
+    assert subset['cohorts']['no-such-cohort']['total_students'] == 0
+
+    health = server.get_cohort_health_batch(cohort_ids=['no-such-cohort'])
+    assert health['cohorts']['no-such-cohort']['status'] == 'AT_RISK'
+
+    assert server.get_outcome_metrics_batch(cohort_ids=[])['cohort_count'] == 0
+    print("✅ Batch cohort selection working")
+
+
+def test_one_query_per_batch():
+    """A portfolio call is one statement, however many cohorts it covers."""
+    server = _make_server()
+    statements = []
+    server._pool.set_trace_callback(statements.append)
+
+    for tool in (
+        'get_course_metrics_batch', 'get_engagement_metrics_batch',
+        'get_outcome_metrics_batch', 'get_cohort_health_batch'
+    ):
+        statements.clear()
+        getattr(server, tool)()
+        queries = [sql for sql in statements if sql.lstrip().upper().startswith(('SELECT', 'WITH'))]
+        assert len(queries) == 1, (tool, queries)
+
+    server._pool.set_trace_callback(None)
+    print("✅ Each batch tool runs a single query")
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*70)
+    print(" LEARNING ANALYTICS - BATCH TOOL TESTS")
+    print("="*70)
+
+    test_batch_matches_single_tools()
+    test_cohort_selection()
+    test_one_query_per_batch()
+
+    print("\n✅ Batch tools: ALL TESTS PASSED\n")
+
+
+if __name__ == "__main__":
+    main()
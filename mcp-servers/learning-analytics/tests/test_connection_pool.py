@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test script for the read-connection pool
+
+Tests:
+- Concurrent borrowers share at most pool_size connections
+- Borrowing times out when every connection is in use
+- Pooled connections are read-only
+- close() waits for borrowed connections and closes each on return
+"""
+
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.connection_pool import SQLiteConnectionPool
+
+
+def _make_pool(**kwargs) -> SQLiteConnectionPool:
+    db_path = Path(tempfile.mkdtemp()) / "pool_test.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE numbers (n INTEGER)")
+    conn.executemany("INSERT INTO numbers VALUES (?)", [(i,) for i in range(100)])
+    conn.commit()
+    conn.close()
+    return SQLiteConnectionPool(db_path, **kwargs)
+
+
+def test_concurrent_borrowers():
+    """Many threads borrow and return without sharing a connection."""
+    pool = _make_pool(pool_size=3)
+    in_use = set()
+    peak = [0]
+    lock = threading.Lock()
+
+    def query(i):
+        with pool.connection() as conn:
+            with lock:
+                assert id(conn) not in in_use, "Connection handed to two borrowers"
+                in_use.add(id(conn))
+                peak[0] = max(peak[0], len(in_use))
+            total = conn.execute("SELECT SUM(n) FROM numbers WHERE n < ?", (i,)).fetchone()[0]
+            time.sleep(0.005)
+            with lock:
+                in_use.discard(id(conn))
+        return total or 0
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        totals = list(executor.map(query, range(100)))
+
+    assert totals == [i * (i - 1) // 2 for i in range(100)]
+    stats = pool.get_stats()
+    assert peak[0] <= 3 and stats['open_connections'] <= 3, (peak, stats)
+    assert stats['borrowed_connections'] == 0
+    assert stats['idle_connections'] == stats['open_connections']
+    pool.close()
+    print("✅ Concurrent borrowers share the pool's connections")
+
+
+def test_acquire_timeout():
+    """A borrower gives up after timeout_seconds when the pool is exhausted."""
+    pool = _make_pool(pool_size=1, timeout_seconds=0.2)
+    with pool.connection():
+        started = time.perf_counter()
+        try:
+            with pool.connection():
+                raise AssertionError("Expected TimeoutError")
+        except TimeoutError:
+            pass
+        assert 0.15 <= time.perf_counter() - started < 2
+
+    # Returned connections are available again
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM numbers").fetchone()[0] == 100
+    pool.close()
+    print("✅ Acquire timeout working")
+
+
+def test_connections_are_read_only():
+    """Writes fail on pooled (query_only) connections."""
+    pool = _make_pool()
+    with pool.connection() as conn:
+        for statement in ("INSERT INTO numbers VALUES (1000)", "DELETE FROM numbers",
+                          "CREATE TABLE other (x)"):
+            try:
+                conn.execute(statement)
+                raise AssertionError(f"Expected a read-only error for: {statement}")
+            except sqlite3.OperationalError as e:
+                assert 'readonly' in str(e) or 'read-only' in str(e), e
+        assert conn.execute("SELECT COUNT(*) FROM numbers").fetchone()[0] == 100
+    pool.close()
+    print("✅ Pooled connections are read-only")
+
+
+def test_close_waits_for_borrowers():
+    """close() leaves borrowed connections alone until they come back."""
+    pool = _make_pool(pool_size=2)
+    with pool.connection():
+        pass  # One idle connection
+    borrowed = threading.Event()
+    release = threading.Event()
+    results = []
+
+    def reader():
+        with pool.connection() as conn:
+            borrowed.set()
+            release.wait(5)
+            # Still usable after close() started
+            results.append(conn.execute("SELECT COUNT(*) FROM numbers").fetchone()[0])
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    borrowed.wait(5)
+
+    # Nobody returns it in time: close() reports that and leaves it open
+    assert pool.close(timeout=0.1) is False
+    stats = pool.get_stats()
+    assert stats['borrowed_connections'] == 1 and stats['idle_connections'] == 0, stats
+    try:
+        with pool.connection():
+            raise AssertionError("Expected RuntimeError from a closed pool")
+    except RuntimeError:
+        pass
+
+    release.set()
+    thread.join(5)
+    assert results == [100]
+    assert pool.get_stats()['open_connections'] == 0
+
+    # A close() that waits long enough sees the borrower return
+    pool = _make_pool()
+    borrowed.clear()
+    release.clear()
+    thread = threading.Thread(target=reader)
+    thread.start()
+    borrowed.wait(5)
+    threading.Timer(0.1, release.set).start()
+    assert pool.close(timeout=5) is True
+    thread.join(5)
+    assert results == [100, 100] and pool.get_stats()['open_connections'] == 0
+    print("✅ close() waits for borrowed connections")
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*70)
+    print(" CONNECTION POOL - TEST SUITE")
+    print("="*70)
+
+    test_concurrent_borrowers()
+    test_acquire_timeout()
+    test_connections_are_read_only()
+    test_close_waits_for_borrowers()
+
+    print("\n✅ Connection pool: ALL TESTS PASSED\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk ingestion
+
+Tests:
+- CSV and JSONL loading
+- Upserts on natural keys (re-loads don't duplicate rows)
+- Repeated NPS responses are all kept
+- JSONL records with differing fields (union of columns, late columns rejected)
+- Existing databases with duplicate natural keys are migrated
+- cohorts.student_count stays correct
+- Index drop/rebuild for big loads
+- Cache invalidation after a load
+"""
+
+import contextlib
+import io
+import json
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.server import LearningAnalyticsServer, ANALYTICS_INDEXES
+from src.server import main as server_main
+from src.ingest import BulkLoader, TABLE_SPECS
+
+
+def _make_server() -> LearningAnalyticsServer:
+    db_path = Path(tempfile.mkdtemp()) / "ingest_test.db"
+    return LearningAnalyticsServer(db_path=str(db_path))
+
+
+def _load_cohort(server: LearningAnalyticsServer, students: int = 10):
+    server.ingest('cohorts', io.StringIO(
+        "cohort_id,name,start_date\n"
+        "cohort-a,Cohort A,2025-01-06\n"
+    ), format='csv')
+    server.ingest('students', [
+        {
+            'student_id': f"student-{i}",
+            'cohort_id': 'cohort-a',
+            'persona_type': 'sarah' if i % 2 else 'priya',
+            'enrollment_date': '2025-01-06'
+        }
+        for i in range(students)
+    ])
+
+
+def _count(server: LearningAnalyticsServer, sql: str, params=()) -> int:
+    conn = sqlite3.connect(server.db_path)
+    value = conn.execute(sql, params).fetchone()[0]
+    conn.close()
+    return value
+
+
+def test_csv_and_jsonl_loading():
+    """Both stream formats load and coerce types."""
+    server = _make_server()
+    _load_cohort(server)
+
+    jsonl = "\n".join(
+        json.dumps({
+            'student_id': f"student-{i}", 'cohort_id': 'cohort-a', 'week_number': 1,
+            'posts_created': 2, 'replies_made': 3
+        })
+        for i in range(10)
+    )
+    stats = server.ingest('community_engagement', io.StringIO(jsonl), format='jsonl')
+    assert stats['rows'] == 10
+
+    csv_data = "student_id,module_id,completed,satisfaction_score,time_spent_minutes\n" + "".join(
+        f"student-{i},module-1,{'true' if i < 8 else 'false'},4.5,60\n" for i in range(10)
+    )
+    server.ingest('course_progress', io.StringIO(csv_data), format='csv')
+
+    metrics = server.get_course_metrics(cohort_id='cohort-a')
+    assert metrics['completions'] == 8, metrics
+    assert metrics['avg_satisfaction'] == 4.5
+    print("✅ CSV and JSONL ingestion working")
+
+
+def test_upsert_on_natural_key():
+    """Loading the same week twice updates rows instead of duplicating them."""
+    server = _make_server()
+    _load_cohort(server)
+
+    rows = [
+        {'student_id': f"student-{i}", 'cohort_id': 'cohort-a', 'week_number': 2, 'posts_created': 1}
+        for i in range(10)
+    ]
+    server.ingest('community_engagement', rows)
+    server.get_engagement_metrics(cohort_id='cohort-a', week_number=2)  # warm the cache
+
+    for row in rows:
+        row['posts_created'] = 5
+    server.ingest('community_engagement', rows)
+
+    assert _count(server, "SELECT COUNT(*) FROM community_engagement") == 10
+    engagement = server.get_engagement_metrics(cohort_id='cohort-a', week_number=2)
+    assert engagement['total_posts'] == 50, engagement
+    print("✅ Upserts on natural key working (and cache invalidated)")
+
+
+def test_repeated_nps_responses():
+    """A student answering the same survey every week keeps every response."""
+    server = _make_server()
+    _load_cohort(server)
+
+    responses = [
+        {'nps_id': f"nps-{week}", 'student_id': 'student-1', 'cohort_id': 'cohort-a',
+         'score': 6 + week, 'survey_type': 'weekly', 'recorded_at': f"2025-01-{6 + 7 * week:02d}"}
+        for week in range(3)
+    ]
+    server.ingest('nps_scores', responses)
+    server.ingest('nps_scores', responses)  # Re-running with ids is still idempotent
+    stats = server.ingest('nps_scores', [{k: v for k, v in responses[0].items() if k != 'nps_id'}])
+    assert stats['ids_generated'] == 1  # Only this row would be duplicated by a re-run
+
+    assert _count(server, "SELECT COUNT(*) FROM nps_scores WHERE student_id = 'student-1'") == 4
+    print("✅ Repeated NPS responses kept")
+
+
+def test_jsonl_columns_vary():
+    """JSONL records that leave out fields still load every column."""
+    server = _make_server()
+    _load_cohort(server)
+
+    lines = [
+        {'nps_id': 'nps-1', 'student_id': 'student-1', 'cohort_id': 'cohort-a', 'score': 9,
+         'survey_type': 'weekly'},
+        {'nps_id': 'nps-2', 'student_id': 'student-2', 'cohort_id': 'cohort-a', 'score': 4,
+         'survey_type': 'weekly', 'comment': 'Too fast'},
+    ]
+    server.ingest('nps_scores', io.StringIO(''.join(json.dumps(line) + '\n' for line in lines)),
+                  format='jsonl')
+    assert _count(server, "SELECT COUNT(*) FROM nps_scores WHERE comment = 'Too fast'") == 1
+
+    # Past the lookahead a new column can no longer be added, so it is rejected
+    conn = sqlite3.connect(server.db_path, isolation_level=None)
+    loader = BulkLoader(conn, TABLE_SPECS['nps_scores'], rebuild_threshold=2)
+    late = lines + [dict(lines[0], nps_id='nps-3', recorded_at='2025-02-03')]
+    try:
+        loader.load(late)
+        raise AssertionError("Expected ValueError for a late column")
+    except ValueError as e:
+        assert 'recorded_at' in str(e)
+    conn.close()
+    assert _count(server, "SELECT COUNT(*) FROM nps_scores WHERE nps_id = 'nps-3'") == 0
+    print("✅ Varying JSONL columns loaded (late columns rejected)")
+
+
+def test_duplicate_natural_keys_migrated():
+    """Opening a database with duplicates deletes nothing; `migrate --dedupe` does."""
+    server = _make_server()
+    _load_cohort(server)
+
+    conn = sqlite3.connect(server.db_path)
+    conn.execute("DROP INDEX uq_course_progress_natural_key")
+    conn.execute("CREATE UNIQUE INDEX uq_nps_scores_natural_key ON nps_scores(student_id, cohort_id, survey_type)")
+    conn.executemany(
+        "INSERT INTO course_progress (progress_id, student_id, module_id, time_spent_minutes) VALUES (?, ?, ?, ?)",
+        [('p-1', 'student-1', 'module-1', 10), ('p-2', 'student-1', 'module-1', 20),
+         ('p-3', 'student-2', 'module-1', 30)]
+    )
+    conn.commit()
+    conn.close()
+
+    stderr, stdout = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stderr(stderr), contextlib.redirect_stdout(stdout):
+        reopened = LearningAnalyticsServer(db_path=server.db_path)
+    assert stdout.getvalue() == ''  # stdout is the JSON-RPC stream under `serve`
+    assert '1 duplicate course_progress rows' in stderr.getvalue()
+    assert reopened.duplicate_keys == {'course_progress': 1}
+    assert _count(reopened, "SELECT COUNT(*) FROM course_progress") == 3
+    assert _count(reopened, "SELECT COUNT(*) FROM sqlite_master WHERE name = 'uq_course_progress_natural_key'") == 0
+    assert _count(reopened, "SELECT COUNT(*) FROM sqlite_master WHERE name = 'uq_nps_scores_natural_key'") == 0
+    try:
+        reopened.ingest('course_progress', [{'student_id': 'student-1', 'module_id': 'module-1'}])
+        raise AssertionError("Expected ValueError while duplicates remain")
+    except ValueError as e:
+        assert 'migrate --dedupe' in str(e)
+    reopened.close()
+
+    # `migrate` reports; `migrate --dedupe` deletes and says what it deleted
+    db = str(server.db_path)
+    with contextlib.redirect_stderr(io.StringIO()):
+        for argv, expected in ((['--db', db, 'migrate'], 'course_progress: 1 duplicate rows'),
+                               (['--db', db, 'migrate', '--dedupe'], 'course_progress: deleted 1 duplicate rows'),
+                               (['--db', db, 'migrate'], 'No duplicate natural keys')):
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                assert server_main(argv) == 0
+            assert expected in output.getvalue(), output.getvalue()
+
+    migrated = LearningAnalyticsServer(db_path=db)
+    assert _count(migrated, "SELECT COUNT(*) FROM course_progress") == 2
+    assert _count(migrated, "SELECT time_spent_minutes FROM course_progress WHERE student_id = 'student-1'") == 20
+    migrated.ingest('course_progress', [{'student_id': 'student-1', 'module_id': 'module-1', 'time_spent_minutes': 30}])
+    assert _count(migrated, "SELECT time_spent_minutes FROM course_progress WHERE student_id = 'student-1'") == 30
+    print("✅ Duplicate natural keys reported on open, removed only by migrate --dedupe")
+
+
+def test_student_count_maintained():
+    """cohorts.student_count follows the students table."""
+    server = _make_server()
+    _load_cohort(server, students=12)
+    assert _count(server, "SELECT student_count FROM cohorts WHERE cohort_id = 'cohort-a'") == 12
+
+    # Move two students to a new cohort
+    server.ingest('cohorts', [{'cohort_id': 'cohort-b', 'name': 'B', 'start_date': '2025-04-01'}])
+    server.ingest('students', [
+        {'student_id': f"student-{i}", 'cohort_id': 'cohort-b', 'enrollment_date': '2025-04-01'}
+        for i in range(2)
+    ])
+
+    assert _count(server, "SELECT student_count FROM cohorts WHERE cohort_id = 'cohort-a'") == 10
+    assert _count(server, "SELECT student_count FROM cohorts WHERE cohort_id = 'cohort-b'") == 2
+    print("✅ cohorts.student_count maintained")
+
+
+def test_big_load_rebuilds_indexes():
+    """Large loads drop and recreate secondary indexes, leaving them in place."""
+    server = _make_server()
+    _load_cohort(server)
+
+    rows = 200_000
+    started = time.perf_counter()
+    stats = server.ingest('community_engagement', (
+        {
+            'student_id': f"student-{i % 1000}", 'cohort_id': 'cohort-a',
+            'week_number': i // 1000, 'posts_created': i % 3
+        }
+        for i in range(rows)
+    ))
+    elapsed = time.perf_counter() - started
+
+    assert stats['rows'] == rows
+    assert stats['indexes_rebuilt'] is True
+
+    expected = {
+        statement.split()[5] for statement in ANALYTICS_INDEXES['community_engagement']
+    }
+    conn = sqlite3.connect(server.db_path)
+    present = {
+        row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'community_engagement'"
+        )
+    }
+    conn.close()
+    assert expected <= present, (expected, present)
+    print(f"✅ Loaded {rows:,} rows in {elapsed:.2f}s ({stats['rows_per_second']:,} rows/s), indexes rebuilt")
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*70)
+    print(" BULK INGESTION - TEST SUITE")
+    print("="*70)
+
+    test_csv_and_jsonl_loading()
+    test_upsert_on_natural_key()
+    test_repeated_nps_responses()
+    test_jsonl_columns_vary()
+    test_duplicate_natural_keys_migrated()
+    test_student_count_maintained()
+    test_big_load_rebuilds_indexes()
+
+    print("\n✅ Bulk ingestion: ALL TESTS PASSED\n")
+
+
+if __name__ == "__main__":
+    main()
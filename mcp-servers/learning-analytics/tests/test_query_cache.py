@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script for the tool result cache
+
+Tests:
+- Repeated questions hit SQLite once
+- Equivalent argument spellings share one entry
+- Table writes invalidate dependent entries only
+- TTL expiry
+- Concurrent callers compute once; None results are cached too
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.server import LearningAnalyticsServer
+from src.query_cache import ToolResultCache
+
+
+def _make_server(ttl: float = 30.0) -> LearningAnalyticsServer:
+    db_path = Path(tempfile.mkdtemp()) / "cache_test.db"
+    return LearningAnalyticsServer(db_path=str(db_path), cache_ttl_seconds=ttl)
+
+
+def test_repeated_questions_hit_cache():
+    """Same question from several agents only reaches SQLite once."""
+    server = _make_server()
+
+    first = server.get_course_metrics(cohort_id="cohort-a")
+    second = server.get_course_metrics("cohort-a")
+    third = server.get_course_metrics(cohort_id="cohort-a", module_id=None)
+
+    stats = server.cache.get_stats()
+    assert first == second == third
+    assert stats['misses'] == 1, stats
+    assert stats['hits'] == 2, stats
+    print("✅ Equivalent calls share one cache entry")
+
+    # Callers get their own copy, so mutating a result can't poison the cache
+    first['completion_rate'] = -1
+    assert server.get_course_metrics(cohort_id="cohort-a")['completion_rate'] != -1
+    print("✅ Cached results are isolated from caller mutation")
+
+
+def test_write_invalidates_dependent_tools():
+    """Bumping a table only invalidates tools that read it."""
+    server = _make_server()
+
+    server.get_course_metrics(cohort_id="cohort-a")
+    server.get_engagement_metrics(cohort_id="cohort-a", week_number=1)
+
+    server.invalidate_cache('course_progress')
+
+    server.get_course_metrics(cohort_id="cohort-a")
+    server.get_engagement_metrics(cohort_id="cohort-a", week_number=1)
+
+    stats = server.cache.get_stats()
+    assert stats['misses'] == 3, stats
+    assert stats['hits'] == 1, stats
+    print("✅ Table version bump invalidates only dependent entries")
+
+
+def test_ttl_expiry():
+    """Entries older than the TTL are recomputed."""
+    cache = ToolResultCache(ttl_seconds=0.05)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'value': len(calls)}
+
+    key = cache.make_key('tool', {'a': 1})
+    cache.get_or_compute(key, ['t'], compute)
+    cache.get_or_compute(key, ['t'], compute)
+    assert len(calls) == 1
+
+    time.sleep(0.1)
+    cache.get_or_compute(key, ['t'], compute)
+    assert len(calls) == 2
+    print("✅ TTL expiry working")
+
+
+def test_cache_disabled():
+    """A zero TTL turns the cache off."""
+    server = _make_server(ttl=0)
+    server.get_course_metrics(cohort_id="cohort-a")
+    server.get_course_metrics(cohort_id="cohort-a")
+    assert server.cache.get_stats()['entries'] == 0
+    print("✅ Cache can be disabled")
+
+
+def test_concurrent_callers_and_none():
+    """Waves of concurrent callers compute once per version; None is a cached result."""
+    cache = ToolResultCache(ttl_seconds=30)
+    computed = []
+    lock = threading.Lock()
+
+    def compute():
+        with lock:
+            computed.append(1)
+        time.sleep(0.02)
+        return None
+
+    for wave in range(5):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(
+                lambda _: cache.get_or_compute(('tool', '{}'), ['students'], compute), range(16)
+            ))
+        assert results == [None] * 16
+        assert len(computed) == wave + 1, (wave, len(computed))
+        cache.bump('students')
+
+    assert cache._key_locks == {}
+    assert cache.get_stats()['hits'] == 5 * 15
+    print("✅ Concurrent callers share one computation; None results cached")
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*70)
+    print(" TOOL RESULT CACHE - TEST SUITE")
+    print("="*70)
+
+    test_repeated_questions_hit_cache()
+    test_write_invalidates_dependent_tools()
+    test_ttl_expiry()
+    test_cache_disabled()
+    test_concurrent_callers_and_none()
+
+    print("\n✅ Tool result cache: ALL TESTS PASSED\n")
+
+
+if __name__ == "__main__":
+    main()
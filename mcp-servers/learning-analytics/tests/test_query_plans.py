@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression tests for the Learning Analytics MCP Server
+
+Runs every MCP tool with every filter combination, captures the SQL it
+executes, and checks EXPLAIN QUERY PLAN for each statement. A tool query
+that falls back to a full table scan (or makes SQLite build an automatic
+index on the fly) means an index is missing, so the test fails.
+"""
+
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Tuple
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.rollups import ROLLUPS
+from src.server import LearningAnalyticsServer
+
+
+# Every tool, with each combination of optional filters it accepts
+TOOL_CALLS: List[Tuple[str, dict]] = [
+    ('get_course_metrics', {}),
+    ('get_course_metrics', {'cohort_id': 'cohort-a'}),
+    ('get_course_metrics', {'module_id': 'module-1'}),
+    ('get_course_metrics', {'cohort_id': 'cohort-a', 'module_id': 'module-1'}),
+    ('get_course_metrics', {'include_statistics': True}),
+    ('get_course_metrics', {'cohort_id': 'cohort-a', 'module_id': 'module-1', 'include_statistics': True}),
+    ('get_course_metrics', {'module_id': 'module-1', 'include_statistics': True}),
+    ('get_engagement_metrics', {'cohort_id': 'cohort-a'}),
+    ('get_engagement_metrics', {'cohort_id': 'cohort-a', 'week_number': 3}),
+    ('get_outcome_metrics', {'cohort_id': 'cohort-a'}),
+    ('get_outcome_metrics', {'cohort_id': 'cohort-a', 'months_post_course': 3}),
+    ('get_persona_analytics', {'cohort_id': 'cohort-a'}),
+    ('get_persona_analytics', {'cohort_id': 'cohort-a', 'persona_type': 'sarah'}),
+    ('get_persona_analytics', {'cohort_id': 'cohort-a', 'include_statistics': True}),
+    ('get_cohort_health', {'cohort_id': 'cohort-a'}),
+    ('get_engagement_trend', {'cohort_id': 'cohort-a'}),
+    ('get_engagement_trend', {'cohort_id': 'cohort-a', 'start_week': 2, 'end_week': 6}),
+    ('get_nps_trend', {'cohort_id': 'cohort-a'}),
+    ('get_nps_trend', {'cohort_id': 'cohort-a', 'period': 'week', 'survey_type': 'end_of_course'}),
+    ('predict_student_outcomes', {'cohort_id': 'cohort-a'}),
+    ('get_course_metrics_batch', {}),
+    ('get_course_metrics_batch', {'cohort_ids': ['cohort-a', 'cohort-b'], 'module_id': 'module-1'}),
+    ('get_engagement_metrics_batch', {}),
+    ('get_engagement_metrics_batch', {'cohort_ids': ['cohort-a'], 'week_number': 3}),
+    ('get_outcome_metrics_batch', {}),
+    ('get_outcome_metrics_batch', {'cohort_ids': ['cohort-a', 'cohort-b'], 'months_post_course': 3}),
+    ('get_cohort_health_batch', {}),
+    ('get_cohort_health_batch', {'cohort_ids': ['cohort-a', 'cohort-b']}),
+    ('compare_cohorts', {}),
+    ('compare_cohorts', {'cohort_ids': ['cohort-a', 'cohort-b'], 'module_id': 'module-1'}),
+]
+
+
+def capture_tool_queries() -> Tuple[LearningAnalyticsServer, List[Tuple[str, str]]]:
+    """Run every tool call and record (tool, sql) for each statement executed."""
+    db_path = Path(tempfile.mkdtemp()) / "plans.db"
+    server = LearningAnalyticsServer(db_path=str(db_path), cache_ttl_seconds=0)
+
+    captured: List[Tuple[str, str]] = []
+    current_tool = ['']
+    server._pool.set_trace_callback(
+        lambda sql: captured.append((current_tool[0], sql))
+    )
+
+    for tool_name, arguments in TOOL_CALLS:
+        current_tool[0] = f"{tool_name}({arguments})"
+        getattr(server, tool_name)(**arguments)
+
+    server._pool.set_trace_callback(None)
+    return server, captured
+
+
+def find_full_scans(conn: sqlite3.Connection, sql: str) -> List[str]:
+    """Return the plan lines that scan a table without an index."""
+    plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+
+    # CTEs and subqueries are materialized in memory; scanning them is fine
+    derived = {
+        line.split()[-1]
+        for line in plan
+        if line.startswith(('MATERIALIZE', 'CO-ROUTINE'))
+    }
+
+    # Rollups hold one row per cohort (or cohort and week/module), so
+    # summing a whole rollup is bounded by the number of cohorts
+    derived |= set(ROLLUPS)
+
+    problems = []
+    for line in plan:
+        if 'VIRTUAL TABLE' in line:
+            # json_each over a caller-supplied list of ids
+            continue
+        if 'AUTOMATIC' in line:
+            # Fine on a small materialized CTE, never on a real table
+            if line.split()[1] not in derived:
+                problems.append(line)
+        elif line.startswith('SCAN ') and 'USING' not in line:
+            scanned = line.split()[1]
+            if scanned not in derived:
+                problems.append(line)
+    return problems
+
+
+def test_every_tool_query_uses_an_index():
+    """No MCP tool query may fall back to a full table scan."""
+    server, captured = capture_tool_queries()
+    assert captured, "No queries captured - is the trace callback wired up?"
+
+    conn = sqlite3.connect(server.db_path)
+    failures = []
+    for tool, sql in captured:
+        if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+            continue
+        problems = find_full_scans(conn, sql)
+        if problems:
+            failures.append(f"{tool}: {problems}\n    {' '.join(sql.split())}")
+    conn.close()
+    server.close()
+
+    assert not failures, "Full scans found:\n" + "\n".join(failures)
+    print(f"✅ {len(captured)} tool queries checked, no full scans")
+
+
+def test_every_tool_is_exercised():
+    """Adding a tool without plan coverage should fail loudly."""
+    from src.server import MCP_TOOLS
+
+    covered = {name for name, _ in TOOL_CALLS}
+    missing = [tool['name'] for tool in MCP_TOOLS if tool['name'] not in covered]
+    assert not missing, f"Add query-plan coverage for: {missing}"
+    print("✅ All MCP tools covered by query-plan checks")
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*70)
+    print(" LEARNING ANALYTICS - QUERY PLAN REGRESSION TESTS")
+    print("="*70)
+
+    test_every_tool_is_exercised()
+    test_every_tool_query_uses_an_index()
+
+    print("\n✅ Query plans: ALL TESTS PASSED\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Test script for at-risk student scoring
+
+Tests:
+- Feature extraction into columnar arrays
+- Logistic model training recovers the at-risk signal (AUC)
+- Model save/load round trip
+- predict_student_outcomes with the heuristic and trained models
+- Scoring a 20,000-student cohort in well under a second
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from src.scoring import FEATURE_NAMES, RiskModel, extract_features
+from src.server import LearningAnalyticsServer
+
+
+def _load_cohorts(server: LearningAnalyticsServer, students_per_cohort: int, cohorts=('past', 'current'), seed=3):
+    """
+    Synthetic cohorts where disengaged students tend not to sustain practices.
+
+    Returns the set of students generated as disengaged.
+    """
+    rng = random.Random(seed)
+    disengaged = set()
+    cohort_rows, students, progress, engagement, adoption, retention = [], [], [], [], [], []
+
+    for cohort in cohorts:
+        cohort_rows.append({'cohort_id': cohort, 'name': cohort, 'start_date': '2025-01-06'})
+        for i in range(students_per_cohort):
+            student = f"{cohort}-{i}"
+            at_risk = rng.random() < 0.3
+            if at_risk:
+                disengaged.add(student)
+            students.append({
+                'student_id': student, 'cohort_id': cohort,
+                'persona_type': rng.choice(['sarah', 'marcus', 'priya']),
+                'enrollment_date': '2025-01-06'
+            })
+            for module in range(1, 5):
+                progress.append({
+                    'student_id': student, 'module_id': f"module-{module}",
+                    'completed': rng.random() < (0.4 if at_risk else 0.9),
+                    'satisfaction_score': round(rng.uniform(2.5, 4.2) if at_risk else rng.uniform(3.8, 5.0), 1),
+                    'time_spent_minutes': rng.randrange(20, 90)
+                })
+            last_week = rng.randrange(2, 5) if at_risk else 8
+            for week in range(1, last_week + 1):
+                engagement.append({
+                    'student_id': student, 'cohort_id': cohort, 'week_number': week,
+                    'posts_created': rng.randrange(0, 2 if at_risk else 5),
+                    'replies_made': rng.randrange(0, 2 if at_risk else 6),
+                    'office_hours_attended': int(rng.random() < 0.5)
+                })
+            if not at_risk or rng.random() < 0.2:
+                adoption.append({
+                    'student_id': student, 'framework_name': 'framework-1', 'week_number': 4,
+                    'self_reported': True, 'evidence_shared': rng.random() < 0.6
+                })
+            if cohort == 'past':
+                retention.append({
+                    'student_id': student, 'cohort_id': cohort, 'months_post_course': 6,
+                    'still_using_practices': rng.random() < (0.2 if at_risk else 0.85),
+                    'survey_date': '2025-09-01'
+                })
+
+    for table, rows in (
+        ('cohorts', cohort_rows), ('students', students), ('course_progress', progress),
+        ('community_engagement', engagement), ('practice_adoption', adoption),
+        ('retention_tracking', retention)
+    ):
+        server.ingest(table, rows)
+    return disengaged
+
+
+def _make_server() -> LearningAnalyticsServer:
+    db_path = Path(tempfile.mkdtemp()) / "scoring_test.db"
+    return LearningAnalyticsServer(db_path=str(db_path), cache_ttl_seconds=0)
+
+
+def test_feature_extraction():
+    """One row per student, one column per feature, NaN only where unknown."""
+    server = _make_server()
+    _load_cohorts(server, 50)
+
+    with server._pool.connection() as conn:
+        features = extract_features(conn, cohort_id='current')
+        labelled = extract_features(conn, months_post_course=6)
+
+    assert len(features) == 50
+    assert features.X.shape == (50, len(FEATURE_NAMES))
+    assert set(features.cohort_ids) == {'current'}
+    assert features.y is None
+    assert not np.isnan(features.X).any()
+
+    # Only the surveyed (past) cohort is labelled
+    assert len(labelled) == 50 and set(labelled.cohort_ids) == {'past'}
+    assert set(np.unique(labelled.y)) == {0.0, 1.0}
+    print("✅ Feature extraction into columnar arrays working")
+
+
+def test_training_and_persistence():
+    """A trained model separates at-risk students and survives save/load."""
+    server = _make_server()
+    _load_cohorts(server, 400)
+
+    metadata = server.train_risk_model(months_post_course=6)
+    assert metadata['n_samples'] == 400
+    assert metadata['train_auc'] > 0.75, metadata
+    assert server.risk_model_path.exists()
+
+    with server._pool.connection() as conn:
+        features = extract_features(conn, cohort_id='current')
+    original = server._get_risk_model()
+    reloaded = RiskModel.load(server.risk_model_path)
+    assert np.allclose(original.predict_proba(features.X), reloaded.predict_proba(features.X))
+    print(f"✅ Trained model (AUC {metadata['train_auc']}) saved and reloaded")
+
+
+def test_predict_student_outcomes():
+    """Top-k students are mostly the disengaged ones, with explanations."""
+    server = _make_server()
+    disengaged = _load_cohorts(server, 200)
+
+    heuristic = server.predict_student_outcomes(cohort_id='current', top_k=20)
+    assert heuristic['model']['source'] == 'heuristic'
+    assert heuristic['students_scored'] == 200
+    assert sum(heuristic['risk_distribution'].values()) == 200
+
+    server.train_risk_model()
+    trained = server.predict_student_outcomes(cohort_id='current', top_k=20)
+    assert trained['model']['source'] == 'trained'
+
+    for result in (heuristic, trained):
+        top = result['at_risk_students']
+        assert len(top) == 20
+        assert [s['risk_score'] for s in top] == sorted((s['risk_score'] for s in top), reverse=True)
+        hits = sum(s['student_id'] in disengaged for s in top)
+        assert hits >= 16, (result['model']['source'], hits)
+        assert top[0]['top_factors'], top[0]
+
+    empty = server.predict_student_outcomes(cohort_id='no-such-cohort')
+    assert empty['students_scored'] == 0 and empty['at_risk_students'] == []
+    print("✅ predict_student_outcomes ranks disengaged students first (heuristic and trained)")
+
+
+def test_scoring_speed():
+    """A 20,000-student cohort is extracted and scored in well under a second."""
+    server = _make_server()
+    _load_cohorts(server, 20_000, cohorts=('past', 'current'))
+    server.train_risk_model()
+
+    started = time.perf_counter()
+    result = server.predict_student_outcomes(cohort_id='current', top_k=25)
+    elapsed = time.perf_counter() - started
+
+    assert result['students_scored'] == 20_000
+    assert elapsed < 1.0, f"Scoring took {elapsed:.2f}s"
+    print(f"✅ Scored {result['students_scored']:,} students in {elapsed * 1000:.0f}ms")
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*70)
+    print(" LEARNING ANALYTICS - AT-RISK SCORING TESTS")
+    print("="*70)
+
+    test_feature_extraction()
+    test_training_and_persistence()
+    test_predict_student_outcomes()
+    test_scoring_speed()
+
+    print("\n✅ At-risk scoring: ALL TESTS PASSED\n")
+
+
+if __name__ == "__main__":
+    main()
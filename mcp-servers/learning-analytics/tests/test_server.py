@@ -145,6 +145,25 @@ def create_mock_data(server: LearningAnalyticsServer):
 
     print(f"✅ Created 8 weeks of community engagement data")
 
+    # Create practice adoption (75%+ apply a framework - elite!)
+    for student_id, persona in student_ids:
+        if (hash(student_id + "adoption") % 100) < 80:
+            cursor.execute("""
+                INSERT INTO practice_adoption
+                (adoption_id, student_id, framework_name, week_number, self_reported, evidence_shared, peer_validated)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (
+                str(uuid.uuid4()),
+                student_id,
+                "Privacy Framework",
+                2 + (hash(student_id) % 6),  # Week 2-7
+                1,
+                1 if (hash(student_id + "evidence") % 2) == 0 else 0,
+                0
+            ))
+
+    print(f"✅ Created practice adoption data")
+
     # Create 6-month retention data (70%+ still using - elite!)
     for student_id, persona in student_ids:
         # 70% still using practices
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Test script for the statistical significance helpers
+
+Tests:
+- Wilson intervals, two-proportion z-tests and Holm adjustment against
+  reference values
+- Grouped (multinomial) bootstrap intervals
+- include_statistics on get_course_metrics and get_persona_analytics
+- compare_cohorts flags real differences and not noise
+"""
+
+import math
+import random
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from src.significance import (
+    bootstrap_mean_interval, compare_means, holm_adjust, two_proportion_ztest, wilson_interval
+)
+from src.server import LearningAnalyticsServer
+
+# (cohort, persona) -> (completion probability, satisfaction range, retention probability)
+PROFILES = {
+    ('cohort-strong', 'sarah'): (0.95, (4.0, 5.0), 0.9),
+    ('cohort-strong', 'marcus'): (0.40, (2.5, 3.5), 0.9),
+    ('cohort-twin', 'sarah'): (0.95, (4.0, 5.0), 0.9),
+    ('cohort-twin', 'marcus'): (0.40, (2.5, 3.5), 0.9),
+    ('cohort-weak', 'sarah'): (0.50, (2.5, 3.5), 0.3),
+    ('cohort-weak', 'marcus'): (0.50, (2.5, 3.5), 0.3),
+}
+
+
+def _make_server() -> LearningAnalyticsServer:
+    db_path = Path(tempfile.mkdtemp()) / "significance_test.db"
+    server = LearningAnalyticsServer(db_path=str(db_path), cache_ttl_seconds=0)
+    rng = random.Random(5)
+
+    conn = sqlite3.connect(server.db_path)
+    for cohort in sorted({cohort for cohort, _ in PROFILES}):
+        conn.execute(
+            "INSERT INTO cohorts (cohort_id, name, start_date, student_count) "
+            "VALUES (?, ?, '2025-01-06', 200)",
+            (cohort, cohort)
+        )
+    for (cohort, persona), (completion, (low, high), retention) in PROFILES.items():
+        for i in range(100):
+            student = f"{cohort}-{persona}-{i}"
+            conn.execute(
+                "INSERT INTO students (student_id, cohort_id, persona_type, enrollment_date) "
+                "VALUES (?, ?, ?, '2025-01-06')",
+                (student, cohort, persona)
+            )
+            for module in range(1, 5):
+                conn.execute(
+                    "INSERT INTO course_progress (progress_id, student_id, module_id, completed, "
+                    "satisfaction_score) VALUES (?, ?, ?, ?, ?)",
+                    (f"{student}-p{module}", student, f"module-{module}",
+                     rng.random() < completion, round(rng.uniform(low, high), 1))
+                )
+            conn.execute(
+                "INSERT INTO retention_tracking (retention_id, student_id, cohort_id, "
+                "months_post_course, still_using_practices, survey_date) "
+                "VALUES (?, ?, ?, 6, ?, '2025-09-01')",
+                (f"{student}-r", student, cohort, rng.random() < retention)
+            )
+    conn.commit()
+    conn.close()
+    return server
+
+
+def test_reference_values():
+    """Wilson, z-test and Holm match textbook values."""
+    low, high = wilson_interval([8, 0, 50], [10, 10, 100])
+    assert np.allclose(low, [0.4902, 0.0, 0.4038], atol=1e-4), low
+    assert np.allclose(high, [0.9433, 0.2775, 0.5962], atol=1e-4), high
+    assert all(math.isnan(v) for v in wilson_interval(0, 0))
+
+    # 45/100 vs 60/100: z = -2.1232, p = 0.0337
+    z, p = two_proportion_ztest(45, 100, 60, 100)
+    assert abs(z - -2.1232) < 1e-3 and abs(p - 0.0337) < 1e-3, (z, p)
+    z, p = two_proportion_ztest(0, 10, 0, 20)
+    assert z == 0 and p == 1
+
+    adjusted = holm_adjust([0.01, 0.04, 0.03, np.nan])
+    assert np.allclose(adjusted[:3], [0.03, 0.06, 0.06]) and np.isnan(adjusted[3])
+    print("✅ Wilson intervals, z-tests and Holm adjustment match reference values")
+
+
+def test_grouped_bootstrap():
+    """Bootstrap over value counts behaves like a row-level bootstrap."""
+    values, counts = [1.0, 2.0, 3.0, 4.0, 5.0], [50, 100, 300, 400, 150]
+    sample = np.repeat(values, counts)
+    low, high = bootstrap_mean_interval(values, counts)
+
+    half_width = 1.96 * sample.std(ddof=1) / math.sqrt(len(sample))
+    assert low < sample.mean() < high
+    assert abs((high - low) / 2 - half_width) < 0.2 * half_width, (low, high, half_width)
+
+    # Seeded: identical inputs give identical intervals (safe to cache)
+    assert bootstrap_mean_interval(values, counts) == (low, high)
+    assert bootstrap_mean_interval(values, counts, seed=1) != (low, high)
+    assert bootstrap_mean_interval(values, counts, seed=1) == bootstrap_mean_interval(values, counts, seed=1)
+    groups = [([1.0, 5.0], [3, 2]), ([2.0, 4.0], [300, 200])]
+    assert compare_means('m', ['a', 'b'], groups) == compare_means('m', ['a', 'b'], groups)
+    assert all(math.isnan(v) for v in bootstrap_mean_interval([], []))
+    print("✅ Grouped bootstrap intervals working")
+
+
+def test_tool_statistics():
+    """include_statistics adds intervals and persona comparisons."""
+    server = _make_server()
+
+    plain = server.get_persona_analytics(cohort_id='cohort-strong')
+    with_stats = server.get_persona_analytics(cohort_id='cohort-strong', include_statistics=True)
+    assert 'statistics' not in plain
+
+    for persona in with_stats['personas']:
+        low, high = persona['completion_rate_ci']
+        assert low <= persona['completion_rate'] <= high
+        low, high = persona['avg_satisfaction_ci']
+        assert low <= persona['avg_satisfaction'] <= high
+
+    comparisons = {c['metric']: c for c in with_stats['statistics']['comparisons']}
+    assert comparisons['completion_rate']['significant'], comparisons
+    assert comparisons['avg_satisfaction']['significant'], comparisons
+
+    # Identical profiles: no difference to find
+    weak = server.get_persona_analytics(cohort_id='cohort-weak', include_statistics=True)
+    assert not any(c['significant'] for c in weak['statistics']['comparisons']), weak
+
+    # Snapshot reads give the same statistics
+    server.export_snapshot()
+    snapshot = server.get_persona_analytics(
+        cohort_id='cohort-strong', include_statistics=True, source='snapshot'
+    )
+    snapshot.pop('data_as_of')
+    assert snapshot == with_stats
+
+    course = server.get_course_metrics(cohort_id='cohort-strong', module_id='module-1', include_statistics=True)
+    statistics = course['statistics']
+    assert statistics['module_records'] == course['total_students'] == 200
+    assert statistics['module_completion_rate'] == course['completion_rate']
+    low, high = statistics['avg_satisfaction_ci']
+    assert low <= course['avg_satisfaction'] <= high
+    print("✅ include_statistics adds intervals and significance tests")
+
+
+def test_compare_cohorts():
+    """Real differences are significant, twins are not."""
+    server = _make_server()
+    comparison = server.compare_cohorts()
+
+    assert sorted(comparison['cohorts']) == ['cohort-strong', 'cohort-twin', 'cohort-weak']
+    for cohort in comparison['cohorts'].values():
+        low, high = cohort['retention_rate_ci']
+        assert low <= cohort['retention_rate'] <= high
+
+    significant = {
+        (c['metric'], c['a'], c['b']): c['significant'] for c in comparison['comparisons']
+    }
+    for metric in ('retention_rate', 'avg_satisfaction'):
+        assert significant[(metric, 'cohort-strong', 'cohort-weak')], metric
+        assert not significant[(metric, 'cohort-strong', 'cohort-twin')], metric
+    assert len(comparison['comparisons']) == 4 * 3
+
+    single = server.compare_cohorts(cohort_ids=['cohort-weak'])
+    assert single['comparisons'] == [] and single['cohort_count'] == 1
+    print("✅ compare_cohorts separates real differences from noise")
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*70)
+    print(" LEARNING ANALYTICS - SIGNIFICANCE TESTS")
+    print("="*70)
+
+    test_reference_values()
+    test_grouped_bootstrap()
+    test_tool_statistics()
+    test_compare_cohorts()
+
+    print("\n✅ Significance helpers: ALL TESTS PASSED\n")
+
+
+if __name__ == "__main__":
+    main()
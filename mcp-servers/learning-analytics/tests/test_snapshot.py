@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Test script for columnar analytics snapshots
+
+Tests:
+- Export writes one memory-mappable .npy per column, with dictionary-encoded text
+- source='snapshot' results equal the live database's
+- Snapshots are point-in-time, published atomically and pruned
+"""
+
+import random
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from src.snapshot import Snapshot, current_snapshot_name, sql_round
+from src.server import LearningAnalyticsServer
+
+COHORTS = ['cohort-a', 'cohort-b', 'cohort-c']
+
+
+def _make_server() -> LearningAnalyticsServer:
+    db_path = Path(tempfile.mkdtemp()) / "snapshot_test.db"
+    server = LearningAnalyticsServer(db_path=str(db_path), cache_ttl_seconds=0)
+    rng = random.Random(11)
+
+    conn = sqlite3.connect(server.db_path)
+    for c, cohort in enumerate(COHORTS):
+        size = 20 + 10 * c
+        conn.execute(
+            "INSERT INTO cohorts (cohort_id, name, start_date, student_count) "
+            "VALUES (?, ?, '2025-01-06', ?)",
+            (cohort, cohort, size)
+        )
+        for i in range(size):
+            student = f"{cohort}-student-{i}"
+            # Some students have no persona, some have no progress at all
+            conn.execute(
+                "INSERT INTO students (student_id, cohort_id, persona_type, enrollment_date) "
+                "VALUES (?, ?, ?, '2025-01-06')",
+                (student, cohort, rng.choice(['sarah', 'marcus', 'priya', None]))
+            )
+            for module in range(1, rng.randrange(0, 5)):
+                conn.execute(
+                    "INSERT INTO course_progress (progress_id, student_id, module_id, completed, "
+                    "satisfaction_score, time_spent_minutes) VALUES (?, ?, ?, ?, ?, ?)",
+                    (f"{student}-p{module}", student, f"module-{module}", rng.random() < 0.7,
+                     rng.choice([None, 3.0, 3.5, 4.0, 4.5, 5.0]), rng.choice([None, 30, 60]))
+                )
+            for months in (3, 6):
+                if rng.random() < 0.8:
+                    conn.execute(
+                        "INSERT INTO retention_tracking (retention_id, student_id, cohort_id, "
+                        "months_post_course, still_using_practices, survey_date) "
+                        "VALUES (?, ?, ?, ?, ?, '2025-09-01')",
+                        (f"{student}-r{months}", student, cohort, months,
+                         rng.choice([True, False, None]))
+                    )
+            for story in range(rng.choice([0, 0, 1, 2])):
+                conn.execute(
+                    "INSERT INTO harm_prevention (story_id, student_id, week_number) VALUES (?, ?, 3)",
+                    (f"{student}-h{story}", student)
+                )
+    conn.commit()
+    conn.close()
+    return server
+
+
+def test_export_layout():
+    """One .npy per column; text is dictionary-encoded, NULLs preserved."""
+    server = _make_server()
+    exported = server.export_snapshot()
+
+    assert current_snapshot_name(server.snapshot_dir) == exported['name']
+    assert exported['tables']['students'] == 90
+
+    snapshot = Snapshot.open(server.snapshot_dir)
+    students = snapshot.table('students')
+    assert students.is_dictionary('persona_type')
+    assert isinstance(students.array('persona_type'), np.memmap)
+    assert list(students.dictionary('persona_type')) == ['marcus', 'priya', 'sarah']
+
+    conn = sqlite3.connect(server.db_path)
+    live = [row[0] for row in conn.execute("SELECT persona_type FROM students ORDER BY rowid")]
+    assert students.decode('persona_type') == live
+
+    progress = snapshot.table('course_progress')
+    assert progress.array('satisfaction_score').dtype == np.float64
+    live_nulls = conn.execute(
+        "SELECT COUNT(*) FROM course_progress WHERE satisfaction_score IS NULL"
+    ).fetchone()[0]
+    assert np.isnan(progress.array('satisfaction_score')).sum() == live_nulls
+
+    retention = snapshot.table('retention_tracking')
+    assert retention.array('months_post_course').dtype == np.int64
+    conn.close()
+    print("✅ Snapshot export writes memory-mapped, dictionary-encoded columns")
+
+
+def test_snapshot_matches_live():
+    """Every snapshot-capable tool returns the live result."""
+    server = _make_server()
+    server.export_snapshot()
+
+    for cohort in COHORTS + ['no-such-cohort']:
+        for persona in (None, 'sarah', 'priya'):
+            live = server.get_persona_analytics(cohort_id=cohort, persona_type=persona)
+            snap = server.get_persona_analytics(cohort_id=cohort, persona_type=persona, source='snapshot')
+            assert snap.pop('data_as_of')
+            assert snap == live, (cohort, persona, snap, live)
+
+        for months in (3, 6, 12):
+            live = server.get_outcome_metrics(cohort_id=cohort, months_post_course=months)
+            snap = server.get_outcome_metrics(cohort_id=cohort, months_post_course=months, source='snapshot')
+            assert snap.pop('data_as_of')
+            assert snap == live, (cohort, months, snap, live)
+
+    for cohort_ids in (None, ['cohort-b', 'cohort-b', 'no-such-cohort'], []):
+        live = server.get_outcome_metrics_batch(cohort_ids=cohort_ids)
+        snap = server.get_outcome_metrics_batch(cohort_ids=cohort_ids, source='snapshot')
+        assert snap.pop('data_as_of')
+        assert snap == live, (cohort_ids, snap, live)
+
+    # ROUND() semantics: halves away from zero, like SQLite
+    assert sql_round(4.125, 2) == 4.13 and sql_round(62.45, 1) == 62.5
+    print("✅ source='snapshot' results match the live database")
+
+
+def test_point_in_time_and_pruning():
+    """Snapshots don't see later writes until re-exported; old ones are pruned."""
+    server = _make_server()
+
+    for bad in ('snapshot', 'warehouse'):
+        try:
+            server.get_persona_analytics(cohort_id='cohort-a', source=bad)
+            raise AssertionError(f"Expected ValueError for source={bad}")
+        except ValueError:
+            pass
+
+    first = server.export_snapshot(keep=2)
+    before = server.get_outcome_metrics(cohort_id='cohort-a', source='snapshot')
+
+    conn = sqlite3.connect(server.db_path)
+    conn.execute(
+        "INSERT INTO harm_prevention (story_id, student_id, week_number) "
+        "VALUES ('late-story', 'cohort-a-student-0', 5)"
+    )
+    conn.commit()
+    conn.close()
+    server.invalidate_cache('harm_prevention')
+
+    stale = server.get_outcome_metrics(cohort_id='cohort-a', source='snapshot')
+    assert stale['harm_prevention_stories'] == before['harm_prevention_stories']
+
+    server.export_snapshot(keep=2)
+    latest = server.export_snapshot(keep=2)
+    fresh = server.get_outcome_metrics(cohort_id='cohort-a', source='snapshot')
+    live = server.get_outcome_metrics(cohort_id='cohort-a')
+    assert fresh['data_as_of'] == latest['created_at']
+    assert fresh['harm_prevention_stories'] == live['harm_prevention_stories']
+
+    on_disk = sorted(p.name for p in server.snapshot_dir.iterdir() if p.is_dir())
+    assert len(on_disk) == 2 and first['name'] not in on_disk, on_disk
+    assert on_disk[-1] == latest['name']
+    print("✅ Snapshots are point-in-time and old ones are pruned")
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*70)
+    print(" LEARNING ANALYTICS - COLUMNAR SNAPSHOT TESTS")
+    print("="*70)
+
+    test_export_layout()
+    test_snapshot_matches_live()
+    test_point_in_time_and_pruning()
+
+    print("\n✅ Snapshots: ALL TESTS PASSED\n")
+
+
+if __name__ == "__main__":
+    main()
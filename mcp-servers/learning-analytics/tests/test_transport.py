@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Test script for the async MCP transport
+
+Tests:
+- Pipelined requests are answered as they finish, not in arrival order
+- notifications/cancelled, call timeouts, tool and protocol errors
+- Several clients sharing one server over a Unix socket
+- `server.py serve` over stdio
+"""
+
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.server import MCP_TOOLS, LearningAnalyticsServer
+from src.transport import AsyncMCPServer, MCPClient
+
+SERVER_SCRIPT = Path(__file__).parent.parent / "src" / "server.py"
+
+
+class SlowTools:
+    """Tool server whose calls take as long as asked to."""
+
+    def __init__(self):
+        self.finished = []
+
+    def list_tools(self):
+        return [
+            {'name': 'sleep', 'description': 'Sleep', 'input_schema': {'type': 'object'}},
+            {'name': 'fail', 'description': 'Fail', 'input_schema': {'type': 'object'}},
+        ]
+
+    def call_tool(self, name, arguments):
+        if name == 'fail':
+            raise ValueError("no such cohort")
+        time.sleep(arguments['seconds'])
+        self.finished.append(arguments.get('tag'))
+        return {'slept': arguments['seconds']}
+
+
+def _serve_in_background(transport: AsyncMCPServer):
+    """Serve on a fresh Unix socket in a background event loop; returns (path, stop)."""
+    path = Path(tempfile.mkdtemp()) / "mcp.sock"
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    tasks = []
+
+    async def run():
+        ready = asyncio.Event()
+        tasks.append(asyncio.create_task(transport.serve_unix(path, ready=ready)))
+        await ready.wait()
+        started.set()
+        try:
+            await tasks[0]
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(run(),), daemon=True)
+    thread.start()
+    assert started.wait(5), "server did not start"
+
+    def stop():
+        loop.call_soon_threadsafe(tasks[0].cancel)
+        thread.join(5)
+        transport.close()
+
+    return path, stop
+
+
+class RawConnection:
+    """Line-oriented socket connection for sending pipelined requests."""
+
+    def __init__(self, path):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(5)
+        self.sock.connect(str(path))
+        self.file = self.sock.makefile('rb')
+
+    def send(self, *messages):
+        self.sock.sendall(b"".join(
+            (m if isinstance(m, bytes) else json.dumps(m).encode()) + b"\n" for m in messages
+        ))
+
+    def receive(self, count):
+        return [json.loads(self.file.readline()) for _ in range(count)]
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+def _call(request_id, seconds, tag=None):
+    return {
+        'jsonrpc': '2.0', 'id': request_id, 'method': 'tools/call',
+        'params': {'name': 'sleep', 'arguments': {'seconds': seconds, 'tag': tag}}
+    }
+
+
+def test_pipelining_and_errors():
+    """Responses come back as calls finish; errors are reported properly."""
+    transport = AsyncMCPServer(SlowTools(), max_workers=4)
+    path, stop = _serve_in_background(transport)
+    conn = RawConnection(path)
+
+    conn.send(_call(1, 0.4), _call(2, 0.05), {'jsonrpc': '2.0', 'id': 3, 'method': 'ping'})
+    responses = conn.receive(3)
+    assert [r['id'] for r in responses][-1] == 1, responses
+    slow = next(r for r in responses if r['id'] == 1)['result']
+    assert json.loads(slow['content'][0]['text']) == {'slept': 0.4}
+    assert slow['_meta']['durationMs'] >= 400
+
+    conn.send(
+        {'jsonrpc': '2.0', 'id': 'e1', 'method': 'tools/call', 'params': {'name': 'fail'}},
+        {'jsonrpc': '2.0', 'id': 'e2', 'method': 'tools/call', 'params': {'name': 'nope'}},
+        {'jsonrpc': '2.0', 'id': 'e3', 'method': 'resources/list'},
+        b"{not json",
+    )
+    by_id = {r['id']: r for r in conn.receive(4)}
+    assert by_id['e1']['result']['isError'] and 'no such cohort' in by_id['e1']['result']['content'][0]['text']
+    assert by_id['e2']['error']['code'] == -32602
+    assert by_id['e3']['error']['code'] == -32601
+    assert by_id[None]['error']['code'] == -32700
+
+    stats = transport.stats
+    assert stats['sleep']['calls'] == 2 and stats['fail']['errors'] == 1
+    conn.close()
+    stop()
+    print("✅ Pipelined requests answered out of order; errors reported")
+
+
+def test_cancellation_and_timeout():
+    """Cancelled calls get no response (queued ones never run); slow calls time out."""
+    tools = SlowTools()
+    transport = AsyncMCPServer(tools, max_workers=1, call_timeout=1.0)
+    path, stop = _serve_in_background(transport)
+    conn = RawConnection(path)
+
+    conn.send(_call(1, 0.3, tag='running'), _call(2, 0.3, tag='queued'))
+    # Let call 2 reach the worker queue before cancelling it
+    time.sleep(0.1)
+    conn.send(
+        {'jsonrpc': '2.0', 'method': 'notifications/cancelled', 'params': {'requestId': 2}},
+        {'jsonrpc': '2.0', 'id': 3, 'method': 'ping'},
+    )
+    responses = conn.receive(2)
+    assert sorted(r['id'] for r in responses) == [1, 3], responses
+    time.sleep(0.5)
+    assert tools.finished == ['running'], tools.finished
+    assert transport.stats['sleep']['cancelled'] == 1
+
+    conn.send(_call(4, 2.0))
+    timed_out = conn.receive(1)[0]['result']
+    assert timed_out['isError'] and 'timed out' in timed_out['content'][0]['text']
+    conn.close()
+    stop()
+    print("✅ Cancellation and call timeouts working")
+
+
+def test_shared_socket_server():
+    """Several clients share one warm server; results match direct calls."""
+    db_path = Path(tempfile.mkdtemp()) / "transport_test.db"
+    server = LearningAnalyticsServer(db_path=str(db_path))
+    conn = __import__('sqlite3').connect(db_path)
+    conn.execute(
+        "INSERT INTO cohorts (cohort_id, name, start_date, student_count) "
+        "VALUES ('cohort-a', 'A', '2025-01-06', 2)"
+    )
+    for i in range(2):
+        conn.execute(
+            "INSERT INTO students (student_id, cohort_id, persona_type, enrollment_date) "
+            "VALUES (?, 'cohort-a', 'sarah', '2025-01-06')",
+            (f"student-{i}",)
+        )
+        conn.execute(
+            "INSERT INTO course_progress (progress_id, student_id, module_id, completed, "
+            "satisfaction_score) VALUES (?, ?, 'module-1', 1, 4.5)",
+            (f"p-{i}", f"student-{i}")
+        )
+    conn.commit()
+    conn.close()
+
+    validations = []
+    validate = server.validate_arguments
+    server.validate_arguments = lambda name, arguments: validations.append(name) or validate(name, arguments)
+
+    transport = AsyncMCPServer(server, max_workers=4)
+    path, stop = _serve_in_background(transport)
+
+    client = MCPClient(path)
+    assert {t['name'] for t in client.list_tools()} == {t['name'] for t in MCP_TOOLS}
+    assert all('inputSchema' in t for t in client.list_tools())
+
+    expected = server.get_cohort_health(cohort_id='cohort-a')
+
+    def agent(n):
+        own = MCPClient(path)
+        try:
+            results = [own.call_tool('get_cohort_health', {'cohort_id': 'cohort-a'}) for _ in range(5)]
+            # The shared client is safe to use from several threads too
+            results.append(client.call_tool('get_course_metrics', {'cohort_id': 'cohort-a'}))
+            return results
+        finally:
+            own.close()
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        for results in pool.map(agent, range(6)):
+            assert all(r == expected for r in results[:-1])
+            assert results[-1]['completions'] == 2
+
+    try:
+        client.call_tool('get_cohort_health', {'cohort': 'cohort-a'})
+        raise AssertionError("Expected ValueError for bad arguments")
+    except ValueError as e:
+        assert 'Invalid arguments' in str(e)
+    # Rejected on the event loop, before reaching a worker
+    assert transport.stats['get_cohort_health']['invalid'] == 1
+    assert len(validations) == 6 * 6 + 1  # Once per call, not again in call_tool
+
+    client.close()
+    stop()
+    server.close()
+    print("✅ Several clients share one server over a Unix socket")
+
+
+def test_stdio_serve():
+    """`server.py serve` speaks MCP over stdin/stdout."""
+    db_path = Path(tempfile.mkdtemp()) / "stdio_test.db"
+    process = subprocess.Popen(
+        [sys.executable, str(SERVER_SCRIPT), "--db", str(db_path), "serve"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    requests = [
+        {'jsonrpc': '2.0', 'id': 1, 'method': 'initialize',
+         'params': {'protocolVersion': '2025-03-26', 'capabilities': {}, 'clientInfo': {'name': 't'}}},
+        {'jsonrpc': '2.0', 'method': 'notifications/initialized'},
+        {'jsonrpc': '2.0', 'id': 2, 'method': 'tools/list'},
+        {'jsonrpc': '2.0', 'id': 3, 'method': 'tools/call',
+         'params': {'name': 'get_course_metrics', 'arguments': {}}},
+    ]
+    stdout, stderr = process.communicate(
+        b"".join(json.dumps(r).encode() + b"\n" for r in requests), timeout=30
+    )
+    assert process.returncode == 0, stderr.decode()
+
+    responses = {r['id']: r for r in map(json.loads, stdout.decode().splitlines())}
+    assert sorted(responses) == [1, 2, 3], stdout
+    assert responses[1]['result']['protocolVersion'] == '2025-03-26'
+    assert len(responses[2]['result']['tools']) == len(MCP_TOOLS)
+    metrics = json.loads(responses[3]['result']['content'][0]['text'])
+    assert metrics['total_students'] == 0
+    print("✅ stdio transport working")
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*70)
+    print(" LEARNING ANALYTICS - MCP TRANSPORT TESTS")
+    print("="*70)
+
+    test_pipelining_and_errors()
+    test_cancellation_and_timeout()
+    test_shared_socket_server()
+    test_stdio_serve()
+
+    print("\n✅ MCP transport: ALL TESTS PASSED\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test script for the trend tools
+
+Tests:
+- get_engagement_trend returns every week (gaps as zeros) with moving averages
+- Week filters keep moving averages anchored to the full history
+- get_nps_trend groups by month/week with a pooled moving NPS
+- Repeated responses from one student all count toward the trend
+"""
+
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.server import LearningAnalyticsServer
+
+
+def _make_server() -> LearningAnalyticsServer:
+    db_path = Path(tempfile.mkdtemp()) / "trend_test.db"
+    server = LearningAnalyticsServer(db_path=str(db_path))
+
+    conn = sqlite3.connect(server.db_path)
+    conn.execute(
+        "INSERT INTO cohorts (cohort_id, name, start_date, student_count) "
+        "VALUES ('cohort-a', 'Cohort A', '2025-01-06', 10)"
+    )
+    for i in range(10):
+        conn.execute(
+            "INSERT INTO students (student_id, cohort_id, enrollment_date) "
+            "VALUES (?, 'cohort-a', '2025-01-06')",
+            (f"student-{i}",)
+        )
+
+    # Weeks 1-5 with 10, 8, 6, (none), 4 active students; week 4 is a gap
+    for week, active in ((1, 10), (2, 8), (3, 6), (5, 4)):
+        for i in range(active):
+            conn.execute(
+                "INSERT INTO community_engagement (engagement_id, student_id, cohort_id, "
+                "week_number, posts_created) VALUES (?, ?, 'cohort-a', ?, 2)",
+                (f"e-{week}-{i}", f"student-{i}", week)
+            )
+
+    # January: 3 promoters, 1 detractor; February: 1 promoter, 3 detractors
+    scores = [
+        ('2025-01-10', 10), ('2025-01-11', 9), ('2025-01-12', 9), ('2025-01-13', 3),
+        ('2025-02-10', 10), ('2025-02-11', 5), ('2025-02-12', 6), ('2025-02-13', 2),
+    ]
+    for n, (day, score) in enumerate(scores):
+        conn.execute(
+            "INSERT INTO nps_scores (nps_id, student_id, cohort_id, score, survey_type, recorded_at) "
+            "VALUES (?, ?, 'cohort-a', ?, ?, ?)",
+            (f"n-{n}", f"student-{n}", score, 'mid_course' if n % 2 else 'end_of_course', day)
+        )
+    conn.commit()
+    conn.close()
+    return server
+
+
+def test_engagement_trend():
+    """Whole series in one call, with gaps filled and moving averages."""
+    server = _make_server()
+    trend = server.get_engagement_trend(cohort_id='cohort-a', window=2)
+
+    weeks = trend['weeks']
+    assert [w['week_number'] for w in weeks] == [1, 2, 3, 4, 5]
+    assert [w['active_students'] for w in weeks] == [10, 8, 6, 0, 4]
+    assert [w['weekly_active_rate'] for w in weeks] == [100.0, 80.0, 60.0, 0, 40.0]
+    assert [w['active_rate_moving_avg'] for w in weeks] == [100.0, 90.0, 70.0, 30.0, 20.0]
+    assert weeks[0]['active_change'] is None and weeks[1]['active_change'] == -2
+    assert trend['summary']['peak_week'] == 1
+
+    # Each week matches the single-week snapshot tool
+    for week in weeks:
+        if week['active_students']:
+            snapshot = server.get_engagement_metrics(cohort_id='cohort-a', week_number=week['week_number'])
+            assert snapshot['active_students'] == week['active_students']
+            assert snapshot['total_posts'] == week['total_posts']
+    print("✅ Engagement trend returns the full weekly series with moving averages")
+
+
+def test_engagement_trend_filters():
+    """Filtered ranges keep the moving average from earlier weeks."""
+    server = _make_server()
+    trend = server.get_engagement_trend(cohort_id='cohort-a', start_week=3, end_week=4, window=3)
+
+    assert [w['week_number'] for w in trend['weeks']] == [3, 4]
+    assert trend['weeks'][0]['active_rate_moving_avg'] == 80.0  # (100 + 80 + 60) / 3
+
+    empty = server.get_engagement_trend(cohort_id='no-such-cohort')
+    assert empty['weeks'] == [] and empty['summary']['peak_week'] is None
+    print("✅ Engagement trend filters working")
+
+
+def test_nps_trend():
+    """Monthly NPS with a pooled moving NPS, and weekly/survey filters."""
+    server = _make_server()
+    trend = server.get_nps_trend(cohort_id='cohort-a', period='month', window=2)
+
+    periods = trend['periods']
+    assert [p['period'] for p in periods] == ['2025-01', '2025-02']
+    assert [p['nps'] for p in periods] == [50.0, -50.0]
+    assert periods[1]['nps_moving_avg'] == 0.0  # 4 promoters - 4 detractors over 8
+    assert trend['overall'] == {'responses': 8, 'nps': 0.0}
+
+    weekly = server.get_nps_trend(cohort_id='cohort-a', period='week', survey_type='end_of_course')
+    assert sum(p['responses'] for p in weekly['periods']) == 4
+
+    try:
+        server.get_nps_trend(cohort_id='cohort-a', period='day')
+        raise AssertionError("Expected ValueError for unknown period")
+    except ValueError:
+        pass
+    print("✅ NPS trend working")
+
+
+def test_nps_trend_repeated_responses():
+    """A student answering the weekly survey every week counts every week."""
+    server = _make_server()
+    server.ingest('nps_scores', [
+        {'student_id': 'student-0', 'cohort_id': 'cohort-a', 'score': score,
+         'survey_type': 'weekly', 'recorded_at': day}
+        for day, score in (('2025-03-04', 10), ('2025-03-11', 9), ('2025-03-18', 4))
+    ] + [
+        {'student_id': 'student-1', 'cohort_id': 'cohort-a', 'score': 10,
+         'survey_type': 'weekly', 'recorded_at': '2025-03-04'}
+    ])
+
+    trend = server.get_nps_trend(cohort_id='cohort-a', period='week', survey_type='weekly')
+    assert [p['responses'] for p in trend['periods']] == [2, 1, 1]
+    assert [p['nps'] for p in trend['periods']] == [100.0, 100.0, -100.0]
+    assert trend['overall'] == {'responses': 4, 'nps': 50.0}
+
+    monthly = server.get_nps_trend(cohort_id='cohort-a', period='month')
+    assert monthly['periods'][-1]['period'] == '2025-03' and monthly['periods'][-1]['responses'] == 4
+    print("✅ NPS trend counts repeated responses from the same student")
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*70)
+    print(" LEARNING ANALYTICS - TREND TOOL TESTS")
+    print("="*70)
+
+    test_engagement_trend()
+    test_engagement_trend_filters()
+    test_nps_trend()
+    test_nps_trend_repeated_responses()
+
+    print("\n✅ Trends: ALL TESTS PASSED\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test script for tool argument validation
+
+Tests:
+- Every tool's schema matches its method's signature
+- Cheap coercions ("3" -> 3, "true" -> True, null -> default)
+- Invalid calls are rejected with clear errors, without touching the database
+- week_number=0 filters to week 0 instead of running the all-weeks aggregate
+"""
+
+import inspect
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.server import MCP_TOOLS, TOOL_VALIDATORS, LearningAnalyticsServer
+from src.validation import ToolArgumentError, compile_validator
+
+
+def _make_server() -> LearningAnalyticsServer:
+    db_path = Path(tempfile.mkdtemp()) / "validation_test.db"
+    server = LearningAnalyticsServer(db_path=str(db_path), cache_ttl_seconds=0)
+
+    conn = sqlite3.connect(server.db_path)
+    conn.execute(
+        "INSERT INTO cohorts (cohort_id, name, start_date, student_count) "
+        "VALUES ('cohort-a', 'A', '2025-01-06', 3)"
+    )
+    for i in range(3):
+        conn.execute(
+            "INSERT INTO students (student_id, cohort_id, enrollment_date) "
+            "VALUES (?, 'cohort-a', '2025-01-06')",
+            (f"student-{i}",)
+        )
+        for week in (0, 1, 2):
+            conn.execute(
+                "INSERT INTO community_engagement (engagement_id, student_id, cohort_id, "
+                "week_number, posts_created) VALUES (?, ?, 'cohort-a', ?, ?)",
+                (f"e-{i}-{week}", f"student-{i}", week, week + 1)
+            )
+    conn.commit()
+    conn.close()
+    return server
+
+
+def test_schemas_match_signatures():
+    """Schema properties are exactly each method's parameters."""
+    for tool in MCP_TOOLS:
+        method = getattr(LearningAnalyticsServer, tool['name'])
+        parameters = dict(inspect.signature(method).parameters)
+        parameters.pop('self')
+        schema = tool['input_schema']
+
+        assert set(schema.get('properties', {})) == set(parameters), tool['name']
+        required = {name for name, p in parameters.items() if p.default is inspect.Parameter.empty}
+        assert set(schema.get('required', [])) == required, tool['name']
+    assert set(TOOL_VALIDATORS) == {tool['name'] for tool in MCP_TOOLS}
+    print(f"✅ {len(MCP_TOOLS)} tool schemas match their method signatures")
+
+
+def test_coercion():
+    """Model-style arguments are coerced to the schema's types."""
+    server = _make_server()
+
+    assert server.validate_arguments('get_engagement_metrics', {
+        'cohort_id': 'cohort-a', 'week_number': '2'
+    }) == {'cohort_id': 'cohort-a', 'week_number': 2}
+    assert server.validate_arguments('predict_student_outcomes', {
+        'cohort_id': 'cohort-a', 'top_k': 5.0
+    }) == {'cohort_id': 'cohort-a', 'top_k': 5}
+    assert server.validate_arguments('get_course_metrics', {
+        'cohort_id': 'cohort-a', 'include_statistics': 'true', 'module_id': None
+    }) == {'cohort_id': 'cohort-a', 'include_statistics': True}
+    assert server.validate_arguments('get_cohort_health_batch', None) == {}
+
+    coerced = server.call_tool('get_engagement_metrics', {'cohort_id': 'cohort-a', 'week_number': '2'})
+    assert coerced == server.get_engagement_metrics(cohort_id='cohort-a', week_number=2)
+    print("✅ Arguments coerced to schema types")
+
+
+def test_rejections():
+    """Invalid calls fail fast with errors the model can act on."""
+    server = _make_server()
+    server.close()  # Any database access from here on would raise RuntimeError
+
+    cases = [
+        ('get_engagement_metrics', {'cohort_id': 'cohort-a', 'week_number': 'three'}, 'week_number', 'integer'),
+        ('get_engagement_metrics', {'cohort_id': 'cohort-a', 'week_number': True}, 'week_number', 'integer'),
+        ('get_engagement_metrics', {'cohort_id': 7}, 'cohort_id', 'string'),
+        ('get_engagement_metrics', {'week_number': 1}, 'cohort_id', 'required'),
+        ('get_cohort_health', {'cohort': 'cohort-a'}, 'cohort', 'unknown argument'),
+        ('get_nps_trend', {'cohort_id': 'cohort-a', 'period': 'year'}, 'period', 'one of'),
+        ('get_nps_trend', {'cohort_id': 'cohort-a', 'window': 0}, 'window', 'at least 1'),
+        ('get_cohort_health_batch', {'cohort_ids': 'cohort-a'}, 'cohort_ids', 'array'),
+        ('get_cohort_health_batch', {'cohort_ids': ['cohort-a', 3]}, 'cohort_ids', 'string'),
+    ]
+    for name, arguments, argument, message in cases:
+        try:
+            server.call_tool(name, arguments)
+            raise AssertionError(f"Expected ToolArgumentError for {name}({arguments})")
+        except ToolArgumentError as e:
+            assert e.tool == name and e.argument == argument, (e.tool, e.argument)
+            assert message in str(e) and str(e).startswith(f"Invalid arguments for {name}"), str(e)
+
+    try:
+        server.call_tool('drop_tables', {})
+        raise AssertionError("Expected ValueError for an unknown tool")
+    except ValueError as e:
+        assert not isinstance(e, ToolArgumentError)
+
+    # Rejections are cheap: tens of microseconds at most
+    validate = TOOL_VALIDATORS['get_engagement_metrics_batch']
+    bad = {'cohort_ids': ['cohort-a', 'cohort-b'], 'week_number': 'three'}
+    started = time.perf_counter()
+    for _ in range(10_000):
+        try:
+            validate(bad)
+        except ToolArgumentError:
+            pass
+    per_call_us = (time.perf_counter() - started) / 10_000 * 1e6
+    assert per_call_us < 50, per_call_us
+
+    try:
+        compile_validator({'name': 'x', 'input_schema': {'properties': {'a': {'type': 'object'}}}})
+        raise AssertionError("Expected ValueError for an unsupported schema type")
+    except ValueError:
+        pass
+    print(f"✅ Invalid calls rejected before any query ({per_call_us:.1f}µs each)")
+
+
+def test_week_zero_filters():
+    """week_number=0 is a filter, not 'all weeks'."""
+    server = _make_server()
+
+    week_zero = server.get_engagement_metrics(cohort_id='cohort-a', week_number=0)
+    all_weeks = server.get_engagement_metrics(cohort_id='cohort-a')
+    assert week_zero['week_number'] == 0
+    assert week_zero['total_posts'] == 3 and all_weeks['total_posts'] == 3 * (1 + 2 + 3)
+
+    batch = server.get_engagement_metrics_batch(cohort_ids=['cohort-a'], week_number=0)
+    assert batch['cohorts']['cohort-a'] == week_zero
+    print("✅ week_number=0 filters to week 0")
+
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*70)
+    print(" LEARNING ANALYTICS - ARGUMENT VALIDATION TESTS")
+    print("="*70)
+
+    test_schemas_match_signatures()
+    test_coercion()
+    test_rejections()
+    test_week_zero_filters()
+
+    print("\n✅ Argument validation: ALL TESTS PASSED\n")
+
+
+if __name__ == "__main__":
+    main()
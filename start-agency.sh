@@ -149,18 +149,33 @@ echo ""
 print_info "Starting infrastructure services..."
 echo ""
 
-# Start Message Broker Proxy (if RabbitMQ is running)
+# Start the message router (agents in separate processes talk through it)
 print_progress "Starting Message Broker..."
-# TODO: Start actual message broker service
-# For now, just simulate
-sleep 1
-print_success "Message Broker online"
-
-# Start Agent Supervisor (monitors agent health)
+case "${MESSAGE_TRANSPORT:-inprocess}" in
+    unix)
+        MESSAGE_BUS_SOCKET="${MESSAGE_BUS_SOCKET:-${AGENCY_ROOT}/data/agency-bus.sock}"
+        export MESSAGE_TRANSPORT MESSAGE_BUS_SOCKET
+        PYTHONPATH="${AGENCY_ROOT}" python3 -m agents.base.transport router \
+            --socket "${MESSAGE_BUS_SOCKET}" > "${LOG_DIR}/message-router.log" 2>&1 &
+        echo $! > "${PID_DIR}/message-router.pid"
+        print_success "Message router online (${MESSAGE_BUS_SOCKET})"
+        ;;
+    amqp)
+        export MESSAGE_TRANSPORT RABBITMQ_URL
+        print_success "Agents will use RabbitMQ for messaging"
+        ;;
+    *)
+        print_info "MESSAGE_TRANSPORT=inprocess - agents share one process, no broker needed"
+        ;;
+esac
+
+# Start Agent Supervisor (runs, health-checks and scales the agent processes)
 print_progress "Starting Agent Supervisor..."
-# TODO: Start actual supervisor service
-# For now, just simulate
-sleep 1
+SUPERVISOR_STATUS="${AGENCY_ROOT}/data/supervisor-status.json"
+rm -f "${SUPERVISOR_STATUS}"
+PYTHONPATH="${AGENCY_ROOT}" python3 -m agents.supervisor --status-file "${SUPERVISOR_STATUS}" run \
+    > "${LOG_DIR}/supervisor.log" 2>&1 &
+echo $! > "${PID_DIR}/supervisor.pid"
 print_success "Agent Supervisor online"
 
 echo ""
@@ -169,74 +184,42 @@ echo ""
 # START THE 10 AI AGENTS
 ###############################################################################
 
-print_info "Starting AI Agents..."
+print_info "Starting AI Agents (one process each, forked from a preloaded server)..."
 echo ""
 
-# Array of agents to start
-# Format: "agent-id|display-name|script-path"
-declare -a AGENTS=(
-    "chief-learning-strategist|Chief Learning Strategist|agents/chief_learning_strategist.py"
-    "chief-experience-strategist|Chief Experience Strategist|agents/chief_experience_strategist.py"
-    "chief-community-strategist|Chief Community Strategist|agents/chief_community_strategist.py"
-    "market-research-analyst|Market Research Analyst|agents/market_research_analyst.py"
-    "learning-designer|Learning Designer|agents/learning_designer.py"
-    "behavioral-scientist|Behavioral Scientist|agents/behavioral_scientist.py"
-    "experience-designer|Experience Designer|agents/experience_designer.py"
-    "community-manager|Community Manager|agents/community_manager.py"
-    "data-analyst|Data Analyst|agents/data_analyst.py"
-    "quality-assurance-specialist|Quality Assurance Specialist|agents/quality_assurance_specialist.py"
-)
-
-# Function to start an agent
-start_agent() {
-    local agent_id=$1
-    local display_name=$2
-    local script_path=$3
-
-    print_progress "Starting ${display_name}..."
-
-    # Check if agent script exists
-    if [ ! -f "${AGENCY_ROOT}/${script_path}" ]; then
-        print_warning "${display_name} script not found: ${script_path}"
-        print_info "Creating placeholder..."
-
-        # Create placeholder (in real implementation, this would be the actual agent)
-        mkdir -p "$(dirname "${AGENCY_ROOT}/${script_path}")"
-        cat > "${AGENCY_ROOT}/${script_path}" << AGENT_EOF
-#!/usr/bin/env python3
-# ${display_name} Agent - Placeholder
-# TODO: Implement agent based on specifications
-
-print("${display_name} starting...")
-print("Agent ID: ${agent_id}")
-print("Status: Waiting for implementation")
-
-# In production, this would:
-# 1. Connect to message broker
-# 2. Initialize memory systems
-# 3. Load configuration
-# 4. Start listening for messages
-# 5. Report health status
-AGENT_EOF
-        chmod +x "${AGENCY_ROOT}/${script_path}"
-    fi
-
-    # Start the agent in background
-    # TODO: Actually start the Python agent
-    # python3 "${AGENCY_ROOT}/${script_path}" > "${LOG_DIR}/${agent_id}.log" 2>&1 &
-    # echo $! > "${PID_DIR}/${agent_id}.pid"
-
-    # For now, simulate startup
-    sleep 0.5
-    print_success "${display_name} online"
+# Healthy worker processes per agent, from the supervisor's status file
+agent_health() {
+    python3 - "${SUPERVISOR_STATUS}" << 'PY_EOF'
+import json, sys
+try:
+    status = json.load(open(sys.argv[1]))
+except (OSError, ValueError):
+    sys.exit(0)
+for agent_id, agent in status['agents'].items():
+    print(f"{agent['name']}|{agent['healthy']}|{len(agent['workers'])}")
+PY_EOF
 }
 
-# Start all agents
-for agent_data in "${AGENTS[@]}"; do
-    IFS='|' read -r agent_id display_name script_path <<< "$agent_data"
-    start_agent "$agent_id" "$display_name" "$script_path"
+# Wait for the first health checks (agents load their configs and connect)
+for attempt in $(seq 1 30); do
+    if ! kill -0 "$(cat "${PID_DIR}/supervisor.pid")" 2>/dev/null; then
+        print_error "Agent Supervisor exited - see ${LOG_DIR}/supervisor.log"
+        exit 1
+    fi
+    if [ -f "${SUPERVISOR_STATUS}" ] && ! agent_health | grep -q '|0|'; then
+        break
+    fi
+    sleep 1
 done
 
+while IFS='|' read -r display_name healthy workers; do
+    if [ "${healthy}" -gt 0 ]; then
+        print_success "${display_name} online (${healthy}/${workers} processes healthy)"
+    else
+        print_warning "${display_name} not responding yet - the supervisor will keep retrying"
+    fi
+done < <(agent_health)
+
 echo ""
 
 ###############################################################################
@@ -248,10 +231,11 @@ echo ""
 
 # Check agent health
 print_progress "Checking agent health..."
-sleep 1
-# TODO: Actually ping each agent and verify response
-# For now, assume all healthy
-print_success "All agents responding"
+if agent_health | grep -q '|0|'; then
+    print_warning "Some agents are not responding yet (status: python3 -m agents.supervisor status)"
+else
+    print_success "All agents responding"
+fi
 
 # Check memory systems
 print_progress "Checking memory systems..."
@@ -288,16 +272,13 @@ echo "━━━━━━━━━━━━━━━━━━━━━━━━
 echo "AGENT STATUS:"
 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
 echo ""
-print_success "Chief Learning Strategist        ✓ Online"
-print_success "Chief Experience Strategist      ✓ Online"
-print_success "Chief Community Strategist       ✓ Online"
-print_success "Market Research Analyst          ✓ Online"
-print_success "Learning Designer                ✓ Online"
-print_success "Behavioral Scientist             ✓ Online"
-print_success "Experience Designer              ✓ Online"
-print_success "Community Manager                ✓ Online"
-print_success "Data Analyst                     ✓ Online"
-print_success "Quality Assurance Specialist     ✓ Online"
+while IFS='|' read -r display_name healthy workers; do
+    if [ "${healthy}" -gt 0 ]; then
+        print_success "$(printf '%-32s' "${display_name}") ✓ Online (${healthy} process(es))"
+    else
+        print_warning "$(printf '%-32s' "${display_name}") … Starting"
+    fi
+done < <(agent_health)
 echo ""
 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
 echo ""
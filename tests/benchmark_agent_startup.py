@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: agent startup time
+
+Spins up all ten agents from agents/definitions in a fresh interpreter
+(so import costs count) and reports:
+- Time to import the agent framework
+- Time to construct all ten agents
+- Which heavy modules and files were loaded along the way
+
+Nothing that an idle agent doesn't need (anthropic, chromadb, SQLite
+files, the vector store) should be touched, and the whole run should
+take well under a second.
+
+Usage:
+    python tests/benchmark_agent_startup.py [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+TARGET_SECONDS = 1.0
+
+# Runs in a fresh interpreter from an empty working directory
+STARTUP_SCRIPT = """
+import json, os, sys, time
+started = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+from agents.base.agent import ChiefAgent, ExecutionAgent, SpecialistAgent, load_definition
+imported = time.perf_counter()
+
+from pathlib import Path
+classes = {'chief': ChiefAgent, 'specialist': SpecialistAgent, 'execution': ExecutionAgent}
+agents = []
+for path in sorted(Path(sys.argv[1], 'agents', 'definitions').glob('*.yaml')):
+    relative = os.path.relpath(path, sys.argv[1])
+    config = load_definition(relative)
+    agents.append(classes[config['type'].split('-')[0]](config['agent_id'], relative))
+constructed = time.perf_counter()
+
+print(json.dumps({
+    'import_seconds': imported - started,
+    'construct_seconds': constructed - imported,
+    'agents': len(agents),
+    'heavy_modules': sorted(m for m in ('anthropic', 'chromadb') if m in sys.modules),
+    'files_created': sorted(str(p) for p in Path('.').rglob('*')),
+}))
+"""
+
+
+def run_once() -> dict:
+    """Start all agents in a fresh interpreter; return its measurements."""
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, ANTHROPIC_API_KEY=os.environ.get('ANTHROPIC_API_KEY', 'benchmark-key'))
+        env.pop('MESSAGE_JOURNAL_DIR', None)
+        output = subprocess.run(
+            [sys.executable, "-c", STARTUP_SCRIPT, str(REPO_ROOT.resolve())],
+            cwd=workdir, env=env, capture_output=True, text=True, check=True
+        ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Agent startup benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh-interpreter runs")
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print(" AI FLYWHEEL AGENCY - AGENT STARTUP BENCHMARK")
+    print("="*70)
+
+    results = [run_once() for _ in range(args.runs)]
+    best = min(results, key=lambda r: r['import_seconds'] + r['construct_seconds'])
+    total = best['import_seconds'] + best['construct_seconds']
+
+    print(f"\n⏱️  Import framework:      {best['import_seconds'] * 1000:7.1f} ms")
+    print(f"⏱️  Construct {best['agents']} agents:   {best['construct_seconds'] * 1000:7.1f} ms")
+    print(f"⏱️  Total (best of {args.runs}):     {total * 1000:7.1f} ms  (target < {TARGET_SECONDS * 1000:.0f} ms)")
+    print(f"📦 Heavy modules loaded:  {best['heavy_modules'] or 'none'}")
+    print(f"📁 Files created:         {best['files_created'] or 'none'}")
+
+    assert best['agents'] == 10
+    assert not best['heavy_modules'], best['heavy_modules']
+    assert not best['files_created'], best['files_created']
+    assert total < TARGET_SECONDS, total
+    print("\n✅ Agent startup within target")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
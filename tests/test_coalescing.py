@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Test script for request coalescing and deduplication
+
+Tests:
+- Coalescing keys: normalized content, routing-only metadata ignored,
+  conversations kept apart unless the receiver has no history for them
+- Two chiefs' identical requests (each a new conversation) run once
+- Identical concurrent requests run once; each waiter gets its own reply
+- Duplicate deliveries (same message_id) are answered, not re-handled
+- Failures reach every waiter and can be retried
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.base.coalescing import RequestCoalescer, coalescing_key
+from agents.base.messaging import Message, MessageBus
+
+
+class CountingAnalyst:
+    """Slow handler standing in for an LLM turn; counts its calls."""
+
+    def __init__(self, delay=0.3, failures=0):
+        self.delay = delay
+        self.failures = failures
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, message):
+        with self.lock:
+            self.calls += 1
+            fail = self.failures > 0
+            self.failures -= 1
+        time.sleep(self.delay)
+        if fail:
+            raise RuntimeError("model overloaded")
+        return Message(sender='data-analyst', receiver=message.sender,
+                       content=f"analysis #{self.calls}", message_type='response',
+                       conversation_id=message.conversation_id)
+
+
+def _ask(sender, content='What is Q4 completion?', metadata=None, conversation_id='conv-q4-review'):
+    return Message.request(sender=sender, receiver='data-analyst', content=content,
+                           conversation_id=conversation_id, metadata=metadata or {})
+
+
+def test_coalescing_key():
+    """Which requests count as identical."""
+    base = coalescing_key(_ask('chief-a', 'What is  Q4\ncompletion? ', {'coordinated_by': 'chief-a'}))
+    assert base == coalescing_key(_ask('chief-b', 'What is Q4 completion?', {'coordinated_by': 'chief-b'}))
+    assert base != coalescing_key(_ask('chief-a', 'What is Q3 completion?'))
+    assert base != coalescing_key(_ask('chief-b', 'What is Q4 completion?', conversation_id='conv-other'))
+    assert coalescing_key(_ask('chief-a', metadata={'cohort': 'a', 'week': 2})) == \
+        coalescing_key(_ask('chief-b', metadata={'week': 2, 'cohort': 'a'}))
+    assert coalescing_key(_ask('chief-a', metadata={'cohort': 'a'})) != \
+        coalescing_key(_ask('chief-a', metadata={'cohort': 'b'}))
+    assert coalescing_key(Message.inform(sender='a', receiver='data-analyst', content='x')) is None
+
+    # Conversations the receiver has no history for don't change the answer
+    known = {'conv-q4-review'}
+    fresh = coalescing_key(_ask('chief-a', conversation_id='conv-1'), known.__contains__)
+    assert fresh == coalescing_key(_ask('chief-b', conversation_id='conv-2'), known.__contains__)
+    assert fresh != coalescing_key(_ask('chief-b'), known.__contains__)
+    assert base == coalescing_key(_ask('chief-b'), known.__contains__)
+    print("✅ Coalescing keys normalize content, ignore routing metadata and keep conversations apart")
+
+
+def test_concurrent_requests_coalesce():
+    """Three chiefs ask the same question: one computation, three replies."""
+    analyst = CountingAnalyst()
+    bus = MessageBus()
+    bus.subscribe('data-analyst', analyst, workers=3)
+
+    chiefs = ['chief-learning-strategist', 'chief-experience-strategist', 'chief-community-strategist']
+    requests = [_ask(chief, metadata={'coordinated_by': chief}) for chief in chiefs]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        replies = list(pool.map(bus.send, requests))
+    elapsed = time.perf_counter() - started
+
+    assert analyst.calls == 1, analyst.calls
+    assert elapsed < 0.6, elapsed
+    for request, reply in zip(requests, replies):
+        assert reply.content == 'analysis #1'
+        assert reply.in_reply_to == request.message_id
+        assert reply.receiver == request.sender
+        assert reply.conversation_id == request.conversation_id
+    assert len({reply.message_id for reply in replies}) == 3
+
+    # Different questions still run separately, and finished ones aren't reused
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(pool.map(bus.send, [_ask('chief-a', 'Q1?'), _ask('chief-b', 'Q2?')]))
+    bus.send(_ask('chief-a'))
+    assert analyst.calls == 4, analyst.calls
+
+    # So does the same question from two conversations
+    conversations = [_ask('chief-a', conversation_id='conv-1'), _ask('chief-b', conversation_id='conv-2')]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        replies = list(pool.map(bus.send, conversations))
+    assert analyst.calls == 6, analyst.calls
+    assert [reply.conversation_id for reply in replies] == ['conv-1', 'conv-2']
+
+    stats = bus.get_stats()['coalescing']['data-analyst']
+    assert stats['handled'] == 6 and stats['coalesced'] == 2 and stats['in_flight'] == 0, stats
+    bus.unsubscribe('data-analyst')
+    print(f"✅ 3 identical requests answered by 1 computation in {elapsed:.2f}s")
+
+
+def test_chiefs_coalesce_across_conversations():
+    """Two chiefs ask the analyst the same question: one computation."""
+    os.environ.setdefault('ANTHROPIC_API_KEY', 'test-key')
+    from agents.base.agent import ChiefAgent
+    from agents.base.memory import LongTermMemory
+
+    memory = LongTermMemory('data-analyst', db_path=tempfile.mkdtemp())
+    analyst = CountingAnalyst()
+    bus = MessageBus()
+    bus.subscribe('data-analyst', analyst, workers=2, has_history=memory.has_conversation)
+
+    chiefs = [
+        ChiefAgent('chief-learning-strategist', 'agents/definitions/chief_learning_strategist.yaml'),
+        ChiefAgent('chief-community-strategist', 'agents/definitions/chief_community_strategist.yaml'),
+    ]
+    for chief in chiefs:
+        chief.message_bus = bus
+
+    # send_message() starts a new conversation per request
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        replies = list(pool.map(
+            lambda chief: chief.send_message('data-analyst', 'What is Q4 completion?'), chiefs
+        ))
+    assert analyst.calls == 1, analyst.calls
+    assert [reply.receiver for reply in replies] == [chief.agent_id for chief in chiefs]
+    assert replies[0].conversation_id != replies[1].conversation_id
+    assert all(reply.content == 'analysis #1' for reply in replies)
+
+    # A follow-up in a conversation the analyst has history for runs on its own
+    memory.store_interaction(_ask('chief-a'), replies[0], 'conv-q4-review')
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(pool.map(bus.send, [_ask('chief-a'), _ask('chief-b', conversation_id='conv-new')]))
+    assert analyst.calls == 3, analyst.calls
+
+    bus.unsubscribe('data-analyst')
+    print("✅ Two chiefs' identical requests handled once across conversations")
+
+
+def test_duplicate_deliveries():
+    """A redelivered message_id gets the original reply."""
+    analyst = CountingAnalyst(delay=0.05)
+    bus = MessageBus()
+    bus.subscribe('data-analyst', analyst)
+
+    request = _ask('chief-a')
+    first = bus.send(request)
+    again = bus.send(request)
+    assert analyst.calls == 1
+    assert again.content == first.content and again.in_reply_to == request.message_id
+
+    # Duplicate arriving while the original is still running
+    slow = CountingAnalyst(delay=0.3)
+    coalescer = RequestCoalescer('data-analyst', slow, idempotency_size=2)
+    request = _ask('chief-a', 'Cohort health?')
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        replies = list(pool.map(coalescer, [request, request]))
+    assert slow.calls == 1 and replies[0] is replies[1]
+    assert coalescer.get_stats()['duplicates'] == 1
+
+    # The idempotency LRU is bounded
+    for i in range(3):
+        coalescer(_ask('chief-a', f"question {i}"))
+    coalescer(request)
+    assert slow.calls == 5, slow.calls
+
+    bus.unsubscribe('data-analyst')
+    disabled = MessageBus()
+    counting = CountingAnalyst(delay=0.05)
+    disabled.subscribe('data-analyst', counting, coalesce=False)
+    disabled.send(request)
+    disabled.send(request)
+    assert counting.calls == 2 and disabled.get_stats()['coalescing'] == {}
+    disabled.unsubscribe('data-analyst')
+    print("✅ Duplicate deliveries answered without re-running")
+
+
+def test_failures():
+    """A failed computation fails every waiter, and a retry runs again."""
+    analyst = CountingAnalyst(failures=1)
+    coalescer = RequestCoalescer('data-analyst', analyst)
+    requests = [_ask('chief-a'), _ask('chief-b')]
+
+    def call(message):
+        try:
+            return coalescer(message)
+        except RuntimeError as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(call, requests))
+    assert analyst.calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results), results
+
+    retried = coalescer(requests[1])
+    assert analyst.calls == 2 and retried.content == 'analysis #2'
+    print("✅ Failures reach every waiter; retries run again")
+
+
+def main():
+    """Run all tests."""
+    print("\n" + "="*70)
+    print(" AI FLYWHEEL AGENCY - REQUEST COALESCING TESTS")
+    print("="*70)
+
+    test_coalescing_key()
+    test_concurrent_requests_coalesce()
+    test_chiefs_coalesce_across_conversations()
+    test_duplicate_deliveries()
+    test_failures()
+
+    print("\n✅ Request coalescing: ALL TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
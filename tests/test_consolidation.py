@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Test script for memory consolidation
+
+Tests:
+- Quiet conversations get summaries; active ones are left alone
+- Recurring requests become patterns; duplicate patterns merge with
+  combined confidence
+- Request support accumulates across passes without double counting
+- Merging shared patterns retracts the duplicates from the knowledge store
+- Interactions past the retention window are pruned once summarized
+- Work happens in chunks, and the scheduler runs passes only when due
+- Worker processes sharing an agent's database claim each pass once, and
+  concurrent passes don't lose request support
+"""
+
+import json
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.base.consolidation import (
+    RECURRING_REQUEST, REQUEST_SUPPORT_PREFIX, ConsolidationScheduler, MemoryConsolidator,
+    combine_confidence, last_run
+)
+from agents.base.knowledge import SharedKnowledgeStore
+from agents.base.memory import MemoryManager
+from agents.base.messaging import Message
+
+
+def _memory(agent_id='data-analyst'):
+    directory = Path(tempfile.mkdtemp()) / "memory"
+    memory = MemoryManager(agent_id=agent_id, db_path=str(directory))
+    memory.long_term.knowledge = SharedKnowledgeStore(str(directory / "knowledge.db"))
+    return memory
+
+
+def _exchange(memory, conversation_id, question, answer, when):
+    """Store one interaction, backdated to when."""
+    request = Message.request(sender='chief-learning-strategist', receiver=memory.agent_id,
+                              content=question, conversation_id=conversation_id)
+    response = Message.response(sender=memory.agent_id, receiver='chief-learning-strategist',
+                                content=answer, in_reply_to=request.message_id)
+    memory.long_term.store_interaction(request, response, conversation_id)
+    memory.long_term.conn.execute(
+        'UPDATE interactions SET timestamp = ? WHERE rowid = (SELECT MAX(rowid) FROM interactions)', (when,)
+    )
+    memory.long_term.conn.commit()
+
+
+def _count(memory, table):
+    return memory.long_term.conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+
+def test_summarize_and_extract():
+    """Quiet conversations are summarized; recurring requests become patterns."""
+    memory = _memory()
+    now = datetime(2025, 6, 1, 12, 0)
+    for i in range(6):
+        started = now - timedelta(days=10 - i)
+        _exchange(memory, f"conv-{i}", 'What is  Q4 completion?', f"Completion is {80 + i}%. Up from Q3.", started)
+        _exchange(memory, f"conv-{i}", f"Break down cohort {i}", 'Cohort A leads. Others lag.',
+                  started + timedelta(minutes=5))
+    _exchange(memory, 'conv-live', 'What is Q4 completion?', 'Checking.', now - timedelta(minutes=2))
+
+    steps = []
+    consolidator = MemoryConsolidator(memory.long_term, chunk_size=4, now=now)
+    for step in consolidator.steps():
+        steps.append(step)
+    report = consolidator.report
+
+    assert report['conversations_summarized'] == 6
+    assert steps.count('summarize') == 2  # 6 conversations in chunks of 4
+    conversations = {c['conversation_id']: c for c in memory.long_term.retrieve_conversations(limit=20)}
+    assert set(conversations) == {f"conv-{i}" for i in range(6)}  # conv-live is still active
+    summary = conversations['conv-0']
+    assert '2 exchange(s)' in summary['summary'] and 'What is Q4 completion?' in summary['summary']
+    assert 'Completion is 80%.' in summary['key_insights']
+    assert str(now - timedelta(days=10, minutes=-5)) == summary['completed_at']
+
+    patterns = memory.long_term.retrieve_patterns('recurring-request')
+    assert len(patterns) == 1 and report['patterns_extracted'] == 1
+    assert patterns[0]['description'] == 'Recurring request: What is Q4 completion?'
+    assert abs(patterns[0]['confidence'] - 6 / 7) < 1e-3
+
+    # A second pass has nothing new to do
+    again = MemoryConsolidator(memory.long_term, now=now).run()
+    assert again['conversations_summarized'] == 0 and again['patterns_extracted'] == 0
+    print(f"✅ 6 conversations summarized in {steps.count('summarize')} chunks; 1 recurring request found")
+
+
+def test_support_across_passes():
+    """Later passes update the pattern from all support seen so far, counted once per conversation."""
+    memory = _memory()
+    now = datetime(2025, 6, 1, 12, 0)
+    for i in range(2):
+        _exchange(memory, f"conv-{i}", 'What is Q4 completion?', 'About 80%.', now - timedelta(days=2, minutes=-i))
+    first = MemoryConsolidator(memory.long_term, now=now).run()
+    assert first['patterns_extracted'] == 1
+    assert abs(memory.long_term.retrieve_patterns(RECURRING_REQUEST)[0]['confidence'] - 2 / 3) < 1e-3
+
+    # conv-0 asks again (and is re-summarized); conv-2 is new support
+    later = now + timedelta(days=1)
+    _exchange(memory, 'conv-0', 'what is q4 completion?', 'Still about 80%.', later - timedelta(hours=2))
+    _exchange(memory, 'conv-2', 'What is Q4 completion?', 'About 81%.', later - timedelta(hours=2))
+    second = MemoryConsolidator(memory.long_term, now=later).run()
+    assert second['conversations_summarized'] == 2
+    assert second['patterns_extracted'] == 0 and second['patterns_updated'] == 1
+    assert second['patterns_merged'] == 0
+
+    patterns = memory.long_term.retrieve_patterns(RECURRING_REQUEST)
+    assert len(patterns) == 1
+    assert abs(patterns[0]['confidence'] - 3 / 4) < 1e-3
+    assert json.loads(patterns[0]['examples']) == ['conv-0', 'conv-1', 'conv-2']
+    print("✅ Request support accumulates across passes, once per conversation")
+
+
+def test_dedupe_patterns():
+    """Duplicate patterns merge, combining confidence and examples."""
+    memory = _memory()
+    long_term = memory.long_term
+    long_term.store_pattern('student-success', 'Week 1 completers finish', 0.5, ['q3'])
+    long_term.store_pattern('student-success', 'week 1  completers FINISH', 0.6, ['q4'])
+    long_term.store_pattern('student-success', 'Week 1 completers finish', 0.2, ['q3', 'q2'])
+    long_term.store_pattern('engagement', 'Week 1 completers finish', 0.9, [])
+    long_term.store_pattern('student-success', 'Peer pods cut dropout', 0.7, [])
+
+    report = memory.consolidate()
+    assert report['patterns_merged'] == 2
+    merged = [p for p in long_term.retrieve_patterns('student-success') if 'completers' in p['description']]
+    assert len(merged) == 1
+    assert abs(merged[0]['confidence'] - combine_confidence([0.5, 0.6, 0.2])) < 1e-6
+    assert sorted(json.loads(merged[0]['examples'])) == ['q2', 'q3', 'q4']
+    assert len(long_term.retrieve_patterns()) == 3
+    assert combine_confidence([0.5, 0.5]) == 0.75 and combine_confidence([]) == 0.0
+    print("✅ Duplicate patterns merged with combined confidence")
+
+
+def test_dedupe_shared_patterns():
+    """Merged-away patterns leave the knowledge store; a shared survivor is republished."""
+    memory = _memory()
+    long_term, store = memory.long_term, memory.long_term.knowledge
+    older = long_term.store_pattern('engagement', 'Peer pods cut dropout', 0.5, ['q1'], publish=True)
+    newer = long_term.store_pattern('engagement', 'peer pods cut dropout', 0.4, ['q2'])
+    long_term.conn.execute("UPDATE patterns SET last_validated = '2025-01-01' WHERE pattern_id = ?", (older,))
+    long_term.conn.commit()
+    private = [long_term.store_pattern('cohort', 'Small cohorts engage', 0.3, []) for _ in range(2)]
+
+    report = memory.consolidate()
+    assert report['patterns_merged'] == 2 and report['patterns_republished'] == 1
+    assert store.get(older) is None
+    shared = store.get(newer)
+    assert shared['confidence'] == combine_confidence([0.4, 0.5])
+    assert sorted(shared['details']['examples']) == ['q1', 'q2']
+    assert [e['entry_id'] for e in store.query()] == [newer]
+    assert not any(store.get(pattern_id) for pattern_id in private)
+    print("✅ Merging shared patterns retracts duplicates and republishes the survivor")
+
+
+def test_retention_pruning():
+    """Summarized interactions past retention are deleted in chunks."""
+    memory = _memory()
+    now = datetime(2025, 6, 1, 12, 0)
+    for i in range(25):
+        _exchange(memory, f"old-{i % 5}", f"question {i}", f"answer {i}", now - timedelta(days=120, minutes=-i))
+    for i in range(3):
+        _exchange(memory, 'recent', f"question {i}", f"answer {i}", now - timedelta(days=2, minutes=-i))
+    memory.long_term.conn.execute('''
+        INSERT INTO memory_store (key, value, category, timestamp, expires_at)
+        VALUES ('stale', '1', 'cache', ?, ?), ('fresh', '1', 'cache', ?, ?)
+    ''', (now, now - timedelta(days=1), now, now + timedelta(days=1)))
+    memory.long_term.conn.commit()
+
+    consolidator = MemoryConsolidator(memory.long_term, retention_days=90, chunk_size=10, now=now)
+    steps = list(consolidator.steps())
+    report = consolidator.report
+    assert report['interactions_pruned'] == 25 and steps.count('prune_interactions') == 3
+    assert report['expired_pruned'] == 1
+    assert _count(memory, 'interactions') == 3
+    assert _count(memory, 'conversations') == 6  # Summaries outlive their raw interactions
+    assert memory.get_interaction_count() == 3
+
+    # New activity in a pruned conversation extends its summary
+    _exchange(memory, 'old-0', 'follow-up', 'Noted. More later.', now - timedelta(hours=2))
+    MemoryConsolidator(memory.long_term, now=now).run()
+    summary = {c['conversation_id']: c for c in memory.long_term.retrieve_conversations(limit=10)}['old-0']
+    assert 'Noted.' in summary['key_insights'] and 'answer 0' in summary['key_insights']
+    print("✅ 25 old interactions pruned in chunks; summaries kept and extended")
+
+
+def test_scheduler():
+    """The scheduler consolidates registered agents only when due."""
+    memory = _memory()
+    now = datetime(2025, 6, 1, 12, 0)
+    _exchange(memory, 'conv-1', 'What is NPS?', 'NPS is 62.', now - timedelta(days=1))
+
+    scheduler = ConsolidationScheduler(interval=3600, pause=0)
+    assert scheduler.run_pending(now) == {}
+    scheduler.register(memory)
+    reports = scheduler.run_pending(now)
+    assert reports['data-analyst']['conversations_summarized'] == 1
+    assert last_run(memory.long_term) == now
+
+    assert scheduler.run_pending(now + timedelta(minutes=30)) == {}  # Not due yet
+    assert 'data-analyst' in scheduler.run_pending(now + timedelta(hours=2))
+    scheduler.unregister('data-analyst')
+    scheduler.stop()
+
+    disabled = ConsolidationScheduler(interval=0)
+    disabled.register(memory)
+    assert not disabled.enabled and disabled._thread is None
+    print("✅ Scheduler runs passes only when due")
+
+
+def test_concurrent_workers():
+    """Workers of one agent (one database, separate connections) don't double up."""
+    memory = _memory()
+    now = datetime(2025, 6, 1, 12, 0)
+    for i in range(8):
+        _exchange(memory, f"conv-{i}", 'What is Q4 completion?', 'Completion is 81%.',
+                  now - timedelta(days=1, minutes=i))
+    db_path = str(memory.long_term.db_path)
+
+    # Each worker process has its own MemoryManager and scheduler
+    workers = [MemoryManager(agent_id='data-analyst', db_path=db_path) for _ in range(4)]
+    schedulers = [ConsolidationScheduler(interval=3600, pause=0) for _ in workers]
+    for scheduler, worker in zip(schedulers, workers):
+        worker.long_term.knowledge = memory.long_term.knowledge
+        scheduler.register(worker)
+    barrier = threading.Barrier(len(workers))
+
+    def run(scheduler):
+        barrier.wait()
+        return scheduler.run_pending(now)
+
+    with ThreadPoolExecutor(max_workers=len(workers)) as pool:
+        reports = list(pool.map(run, schedulers))
+    assert sum(len(report) for report in reports) == 1, reports
+    assert _count(memory, 'conversations') == 8
+    assert last_run(memory.long_term) == now
+    for scheduler in schedulers:
+        assert scheduler.run_pending(now + timedelta(minutes=5)) == {}
+        scheduler.stop()
+
+    # Passes that do overlap (e.g. consolidate() by hand) keep every conversation
+    fresh = _memory()
+    for i in range(8):
+        _exchange(fresh, f"conv-{i}", 'What is NPS?', 'NPS is 62.', now - timedelta(days=1, minutes=i))
+    copies = [MemoryManager(agent_id='data-analyst', db_path=str(fresh.long_term.db_path)) for _ in range(3)]
+    for copy in copies:
+        copy.long_term.knowledge = fresh.long_term.knowledge
+    barrier = threading.Barrier(len(copies))
+
+    def consolidate(copy):
+        barrier.wait()
+        return MemoryConsolidator(copy.long_term, chunk_size=1, now=now).run()
+
+    with ThreadPoolExecutor(max_workers=len(copies)) as pool:
+        list(pool.map(consolidate, copies))
+    value = fresh.long_term.conn.execute(
+        'SELECT value FROM memory_store WHERE key = ?', (REQUEST_SUPPORT_PREFIX + 'what is nps?',)
+    ).fetchone()[0]
+    assert sorted(json.loads(value)['conversations']) == [f"conv-{i}" for i in range(8)], value
+    print("✅ Workers claim each pass once; overlapping passes keep all support")
+
+
+def main():
+    """Run all tests."""
+    print("\n" + "="*70)
+    print(" AI FLYWHEEL AGENCY - MEMORY CONSOLIDATION TESTS")
+    print("="*70)
+
+    test_summarize_and_extract()
+    test_support_across_passes()
+    test_dedupe_patterns()
+    test_dedupe_shared_patterns()
+    test_retention_pruning()
+    test_scheduler()
+    test_concurrent_workers()
+
+    print("\n✅ Memory consolidation: ALL TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
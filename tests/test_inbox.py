@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Test script for agent inboxes
+
+Tests:
+- Priority order: ERROR/STATUS > human requests > agent coordination
+- Worker pools handle messages concurrently
+- Bounded capacity: rejection and shedding
+- MessageBus integration: backpressure, timeouts and queue metrics
+- Re-entrant calls (A asks B, B asks A back) don't deadlock
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.base.inbox import AgentInbox, InboxClosedError, InboxFullError
+from agents.base.messaging import Message, MessageBus
+
+
+def _reply(message):
+    return Message.response(sender=message.receiver, receiver=message.sender,
+                            content=f"done: {message.content}", in_reply_to=message.message_id)
+
+
+class GatedHandler:
+    """Handler that blocks until released and records what it handled."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.handled = []
+
+    def __call__(self, message):
+        self.started.set()
+        self.release.wait(5)
+        self.handled.append(message.content)
+        return _reply(message)
+
+
+def _coordination(content):
+    return Message.request(sender='chief-learning-strategist', receiver='data-analyst', content=content)
+
+
+def _human(content):
+    return Message.request(sender='human', receiver='data-analyst', content=content)
+
+
+def _status(content):
+    return Message(sender='supervisor', receiver='data-analyst', content=content, message_type='status')
+
+
+def test_priority_order():
+    """Urgent first, then human, then coordination; FIFO within a class."""
+    handler = GatedHandler()
+    inbox = AgentInbox('data-analyst', handler, workers=1, capacity=10)
+
+    first = inbox.submit(_coordination('running'))
+    handler.started.wait(5)
+    futures = [inbox.submit(m) for m in (
+        _coordination('coord-1'), _human('human-1'), _coordination('coord-2'),
+        _status('status-1'), _human('human-2'),
+    )]
+    stats = inbox.get_stats()
+    assert stats['depth'] == 5
+    assert stats['depth_by_priority'] == {'urgent': 1, 'human': 2, 'coordination': 2}
+
+    handler.release.set()
+    for future in [first] + futures:
+        future.result(timeout=5)
+    assert handler.handled == ['running', 'status-1', 'human-1', 'human-2', 'coord-1', 'coord-2'], handler.handled
+    inbox.close()
+    print("✅ Messages handled in priority order")
+
+
+def test_worker_pool():
+    """Several workers handle messages concurrently."""
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def slow(message):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.2)
+        with lock:
+            active[0] -= 1
+        return _reply(message)
+
+    inbox = AgentInbox('data-analyst', slow, workers=3, capacity=10)
+    started = time.perf_counter()
+    futures = [inbox.submit(_coordination(f"q{i}")) for i in range(6)]
+    replies = [f.result(timeout=5) for f in futures]
+    elapsed = time.perf_counter() - started
+
+    assert [r.content for r in replies] == [f"done: q{i}" for i in range(6)]
+    assert peak[0] == 3 and elapsed < 0.9, (peak[0], elapsed)
+    stats = inbox.get_stats()
+    assert stats['handled'] == 6 and stats['max_depth'] >= 3 and stats['avg_handle_ms'] >= 200
+    inbox.close()
+    print(f"✅ 3 workers handled 6 x 200ms messages in {elapsed:.2f}s")
+
+
+def test_reject_and_shed():
+    """Full inboxes reject, or shed the least urgent message."""
+    handler = GatedHandler()
+    inbox = AgentInbox('data-analyst', handler, workers=1, capacity=2, overflow='reject')
+    inbox.submit(_coordination('running'))
+    handler.started.wait(5)
+    inbox.submit(_coordination('queued-1'))
+    inbox.submit(_coordination('queued-2'))
+    try:
+        inbox.submit(_status('urgent'))
+        raise AssertionError("Expected InboxFullError")
+    except InboxFullError:
+        pass
+    assert inbox.get_stats()['rejected'] == 1
+    handler.release.set()
+    inbox.close()
+
+    handler = GatedHandler()
+    inbox = AgentInbox('data-analyst', handler, workers=1, capacity=2, overflow='shed')
+    inbox.submit(_coordination('running'))
+    handler.started.wait(5)
+    kept = inbox.submit(_coordination('coord-old'))
+    shed = inbox.submit(_coordination('coord-new'))
+
+    human = inbox.submit(_human('human'))          # sheds the newest coordination message
+    try:
+        shed.result(timeout=1)
+        raise AssertionError("Expected the newest coordination message to be shed")
+    except InboxFullError:
+        pass
+    try:
+        inbox.submit(_coordination('coord-late'))  # not more urgent than anything queued
+        raise AssertionError("Expected InboxFullError")
+    except InboxFullError:
+        pass
+
+    handler.release.set()
+    assert human.result(timeout=5).content == 'done: human'
+    assert kept.result(timeout=5).content == 'done: coord-old'
+    stats = inbox.get_stats()
+    assert stats['shed'] == 1 and stats['rejected'] == 1 and stats['handled'] == 3, stats
+
+    inbox.close()
+    try:
+        inbox.submit(_human('after close'))
+        raise AssertionError("Expected InboxClosedError")
+    except InboxClosedError:
+        pass
+    print("✅ Full inboxes reject or shed the least urgent message")
+
+
+def test_bus_backpressure():
+    """A burst to a slow agent gets fast rejections instead of piling up."""
+    bus = MessageBus()
+
+    def slow(message):
+        time.sleep(0.1)
+        return _reply(message)
+
+    bus.subscribe('data-analyst', slow, workers=2, capacity=4, overflow='reject')
+
+    def ask(i):
+        started = time.perf_counter()
+        reply = bus.send(_human(f"q{i}"))
+        return reply, time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        results = list(pool.map(ask, range(20)))
+
+    answered = [r for r, _ in results if r.message_type == 'response']
+    rejected = [(r, t) for r, t in results if r.message_type == 'error']
+    assert len(answered) >= 6 and rejected, (len(answered), len(rejected))
+    assert all('inbox full' in r.content and t < 0.1 for r, t in rejected)
+
+    stats = bus.get_stats()['inboxes']['data-analyst']
+    assert stats['handled'] == len(answered) and stats['rejected'] == len(rejected)
+    assert stats['max_depth'] <= 4 and stats['depth'] == 0
+
+    # With a bus timeout, waiting callers give up and their messages are dropped
+    timed = MessageBus(timeout=0.15)
+    timed.subscribe('data-analyst', slow, workers=1, capacity=10)
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        replies = list(pool.map(lambda i: timed.send(_human(f"q{i}")), range(5)))
+    assert any('did not reply' in r.content for r in replies), replies
+    time.sleep(0.3)
+    stats = timed.get_stats()['inboxes']['data-analyst']
+    assert stats['expired'] >= 1 and stats['handled'] + stats['expired'] == 5, stats
+
+    bus.unsubscribe('data-analyst')
+    timed.unsubscribe('data-analyst')
+    assert bus.get_stats()['inboxes'] == {}
+    print(f"✅ Bus backpressure: {len(answered)} answered, {len(rejected)} rejected immediately")
+
+
+def test_reentrant_calls():
+    """A's handler asks B, whose handler asks A back, with one worker each."""
+    bus = MessageBus()
+
+    def agent_a(message):
+        if message.content == 'question':
+            answer = bus.send(Message.request(sender='a', receiver='b', content='ask a'))
+            return Message.response(sender='a', receiver=message.sender,
+                                    content=f"a got {answer.content}", in_reply_to=message.message_id)
+        return Message.response(sender='a', receiver=message.sender,
+                                content='a-answer', in_reply_to=message.message_id)
+
+    def agent_b(message):
+        answer = bus.send(Message.request(sender='b', receiver='a', content='answer me'))
+        return Message.response(sender='b', receiver=message.sender,
+                                content=f"b got {answer.content}", in_reply_to=message.message_id)
+
+    bus.subscribe('a', agent_a, workers=1)
+    bus.subscribe('b', agent_b, workers=1)
+
+    replies = []
+    caller = threading.Thread(
+        target=lambda: replies.append(bus.send(Message.request(sender='human', receiver='a', content='question'))),
+        daemon=True
+    )
+    caller.start()
+    caller.join(5)
+    assert not caller.is_alive(), "A -> B -> A deadlocked"
+    assert replies[0].content == 'a got b got a-answer', replies[0].content
+
+    stats = bus.get_stats()['inboxes']
+    assert stats['a']['reentrant'] == 1 and stats['a']['handled'] == 1
+    assert stats['b']['reentrant'] == 0 and stats['b']['handled'] == 1
+
+    # Unrelated callers still queue behind the busy worker
+    assert bus.send(Message.request(sender='human', receiver='a', content='ping')).content == 'a-answer'
+    assert bus.get_stats()['inboxes']['a']['reentrant'] == 1
+    bus.unsubscribe('a')
+    bus.unsubscribe('b')
+    print("✅ Re-entrant A -> B -> A call answered without deadlock")
+
+
+def main():
+    """Run all tests."""
+    print("\n" + "="*70)
+    print(" AI FLYWHEEL AGENCY - AGENT INBOX TESTS")
+    print("="*70)
+
+    test_priority_order()
+    test_worker_pool()
+    test_reject_and_shed()
+    test_bus_backpressure()
+    test_reentrant_calls()
+
+    print("\n✅ Agent inboxes: ALL TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
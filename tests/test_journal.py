@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Test script for the message journal
+
+Tests:
+- Append and replay round-trip, across segment rotations and reopen
+- Conversation index (including rebuilding a missing .idx)
+- Crash recovery: torn tail truncated, corrupt sealed segments reported
+- MessageBus journals its traffic and restores its log on restart
+- Throughput: tens of thousands of messages per second
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.base import messaging
+from agents.base.journal import JournalCorruptError, MessageJournal
+from agents.base.messaging import Message, MessageBus, get_message_bus
+
+REPO_ROOT = Path(__file__).parent.parent
+
+
+def _message(i: int) -> Message:
+    return Message.request(
+        sender='chief-learning-strategist', receiver='data-analyst',
+        content=f"question {i}: " + "x" * (i % 40),
+        conversation_id=f"conv-{i % 5}" if i % 3 else None,
+        metadata={'n': i}
+    )
+
+
+def test_append_and_replay():
+    """Messages come back in order, across segments and reopen."""
+    directory = Path(tempfile.mkdtemp()) / "journal"
+    messages = [_message(i) for i in range(500)]
+
+    journal = MessageJournal(str(directory), segment_bytes=4096, sync_interval=0.01)
+    offsets = [journal.append(m) for m in messages[:300]]
+    assert offsets == list(range(300))
+    assert journal.get_stats()['segments'] > 5
+    assert [m for _, m in journal.replay()] == messages[:300]
+    journal.close()
+
+    # Reopen: offsets continue, everything replays
+    journal = MessageJournal(str(directory), segment_bytes=4096, sync_interval=0.01)
+    assert len(journal) == 300
+    assert [journal.append(m) for m in messages[300:]] == list(range(300, 500))
+    replayed = list(journal.replay())
+    assert [offset for offset, _ in replayed] == list(range(500))
+    assert [m for _, m in replayed] == messages
+    assert [m for _, m in journal.replay(start=437)] == messages[437:]
+    assert journal.tail(3) == messages[-3:] and journal.tail(0) == []
+
+    for conversation_id in ('conv-1', 'conv-4'):
+        expected = [m for m in messages if m.conversation_id == conversation_id]
+        assert journal.conversation(conversation_id) == expected
+    assert [m for _, m in journal.replay(start=250, conversation_id='conv-2')] == [
+        m for m in messages[250:] if m.conversation_id == 'conv-2'
+    ]
+    assert journal.conversation('conv-unknown') == []
+
+    # One writer per journal; read-only readers alongside it are fine
+    try:
+        MessageJournal(str(directory))
+        raise AssertionError("Expected RuntimeError for a second writer")
+    except RuntimeError:
+        pass
+    reader = MessageJournal(str(directory), read_only=True)
+    assert len(reader) == 500 and reader.conversation('conv-3') == journal.conversation('conv-3')
+    try:
+        reader.append(_message(0))
+        raise AssertionError("Expected RuntimeError appending to a read-only journal")
+    except RuntimeError:
+        pass
+    reader.close()
+    journal.close()
+    print(f"✅ 500 messages replayed across {len(list(directory.glob('*.log')))} segments")
+
+
+def test_crash_recovery():
+    """Torn tails are truncated; missing indexes are rebuilt; corruption is reported."""
+    directory = Path(tempfile.mkdtemp()) / "journal"
+    messages = [_message(i) for i in range(200)]
+    journal = MessageJournal(str(directory), segment_bytes=4096, sync_interval=0)
+    for message in messages:
+        journal.append(message)
+    journal.close()
+
+    segments = sorted(directory.glob("*.log"))
+    active = segments[-1]
+    with open(active, "ab") as file:
+        file.write(b"\x00\x00\x01\x00partial")  # A write cut short by a crash
+    segments[1].with_suffix(".idx").unlink()
+
+    journal = MessageJournal(str(directory), segment_bytes=4096, sync_interval=0)
+    assert len(journal) == 200
+    assert [m for _, m in journal.replay()] == messages
+    assert journal.conversation('conv-2') == [m for m in messages if m.conversation_id == 'conv-2']
+    assert segments[1].with_suffix(".idx").exists()
+    assert journal.append(_message(200)) == 200
+    journal.close()
+
+    # A flipped byte in a sealed segment fails its checksum on replay
+    data = bytearray(segments[0].read_bytes())
+    data[20] ^= 0xFF
+    segments[0].write_bytes(bytes(data))
+    journal = MessageJournal(str(directory), sync_interval=0)
+    try:
+        list(journal.replay())
+        raise AssertionError("Expected JournalCorruptError")
+    except JournalCorruptError as e:
+        assert e.path == segments[0] and e.position == 0
+    journal.close()
+    print("✅ Torn tail truncated, index rebuilt, corruption detected")
+
+
+def test_bus_journal():
+    """The bus journals its traffic and restores its log after a restart."""
+    directory = Path(tempfile.mkdtemp()) / "journal"
+    saved = os.environ.get('MESSAGE_JOURNAL_DIR')
+    os.environ['MESSAGE_JOURNAL_DIR'] = str(directory)
+    try:
+        messaging._global_message_bus = None
+        bus = get_message_bus()
+        bus.subscribe('designer', lambda m: Message.response(
+            sender='designer', receiver=m.sender, content=f"ok: {m.content}",
+            in_reply_to=m.message_id, conversation_id=m.conversation_id
+        ))
+        for i in range(1200):
+            bus.send(Message.request(sender='human', receiver='designer', content=f"q{i}",
+                                     conversation_id=f"session-{i % 2}"))
+        assert bus.get_stats()['journal']['records'] == 2400
+        assert len(bus.get_conversation('session-0')) < 1200  # Ring buffer holds the newest 1,000
+        assert len(bus.journal.conversation('session-0')) == 1200
+        bus.unsubscribe('designer')
+        bus.journal.close()
+
+        # "Restart": a fresh bus rebuilds its log from the journal
+        messaging._global_message_bus = None
+        restarted = get_message_bus()
+        assert restarted.get_stats()['total_messages'] == restarted.max_log_size
+        assert restarted.get_recent_messages(2)[-1].content == 'ok: q1199'
+        assert [m.content for m in restarted.get_conversation('session-1')][-2:] == ['q1199', 'ok: q1199']
+        restarted.journal.close()
+    finally:
+        if saved is None:
+            os.environ.pop('MESSAGE_JOURNAL_DIR', None)
+        else:
+            os.environ['MESSAGE_JOURNAL_DIR'] = saved
+        messaging._global_message_bus = None
+
+    # The CLI reads the journal (read-only) for audits
+    output = subprocess.run(
+        [sys.executable, "-m", "agents.base.journal", "--dir", str(directory),
+         "replay", "--conversation", "session-0", "--start", "2390"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    ).stdout.splitlines()
+    output = [line for line in output if line.startswith('{')]  # Skip optional-dependency warnings
+    assert len(output) == 4 and '"offset": 2392' in output[0]  # q1196 and q1198 with replies
+    print("✅ MessageBus journals traffic and restores its log on restart")
+
+
+def test_throughput():
+    """Tens of thousands of appends per second, and faster replay."""
+    directory = Path(tempfile.mkdtemp()) / "journal"
+    messages = [_message(i) for i in range(50_000)]
+    journal = MessageJournal(str(directory), segment_bytes=2 * 1024 * 1024)
+
+    started = time.perf_counter()
+    for message in messages:
+        journal.append(message)
+    journal.flush()
+    write_rate = len(messages) / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    replayed = sum(1 for _ in journal.replay())
+    replay_rate = replayed / (time.perf_counter() - started)
+    journal.close()
+
+    assert replayed == len(messages)
+    assert write_rate > 10_000, write_rate
+    print(f"✅ Journal: {write_rate:,.0f} appends/s, {replay_rate:,.0f} replayed/s")
+
+
+def main():
+    """Run all tests."""
+    print("\n" + "="*70)
+    print(" AI FLYWHEEL AGENCY - MESSAGE JOURNAL TESTS")
+    print("="*70)
+
+    test_append_and_replay()
+    test_crash_recovery()
+    test_bus_journal()
+    test_throughput()
+
+    print("\n✅ Message journal: ALL TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared knowledge store
+
+Tests:
+- Agents publish selected decisions and patterns; private ones stay private
+- Queries filter by kind, topic, agent, confidence and text
+- The read-through cache serves repeats and refreshes after any write,
+  including writes from another connection (process)
+- ChiefAgent.query_specialists() reads coordinated agents' knowledge
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.base import knowledge
+from agents.base.knowledge import KnowledgeCache, SharedKnowledgeStore
+from agents.base.memory import LongTermMemory
+
+
+def _memories(directory):
+    store = SharedKnowledgeStore(str(directory / "knowledge.db"))
+    analyst = LongTermMemory('data-analyst', db_path=str(directory), knowledge=store)
+    designer = LongTermMemory('learning-designer', db_path=str(directory), knowledge=store)
+    return store, analyst, designer
+
+
+def test_publish_and_query():
+    """Published entries are queryable by every agent; others stay private."""
+    directory = Path(tempfile.mkdtemp())
+    store, analyst, designer = _memories(directory)
+
+    pattern_id = analyst.store_pattern('student-success', 'Week 1 completers finish 90% of the time',
+                                       confidence=0.87, examples=['q3', 'q4'], publish=True)
+    analyst.store_pattern('student-success', 'Tuesday posts get more replies',
+                          confidence=0.4, examples=[], publish=True)
+    analyst.store_pattern('student-success', 'Draft hunch', confidence=0.2, examples=[])
+    decision_id = designer.store_decision('course-structure', 'AI Safety course', 'Use 4 modules',
+                                          'Completion drops after week 4', outcome_value=0.82,
+                                          publish=True)
+
+    assert store.get_stats()['total_entries'] == 3
+    assert store.get_stats()['by_agent'] == {'data-analyst': 2, 'learning-designer': 1}
+    assert [e['summary'] for e in store.query(text='hunch')] == []
+
+    patterns = store.query(kind='pattern', min_confidence=0.8)
+    assert [e['entry_id'] for e in patterns] == [pattern_id]
+    assert patterns[0]['details'] == {'examples': ['q3', 'q4']}
+    assert patterns[0]['agent_id'] == 'data-analyst'
+
+    decision = store.get(decision_id)
+    assert decision['topic'] == 'course-structure' and decision['outcome_value'] == 0.82
+    assert decision['details']['rationale'] == 'Completion drops after week 4'
+    assert [e['kind'] for e in store.query(agent_ids=['learning-designer'])] == ['decision']
+    assert store.query(agent_ids=[]) == []
+    assert len(store.query(topic='student-success', limit=1)) == 1
+
+    # Republishing replaces; retracting removes
+    store.publish('learning-designer', 'decision', 'course-structure', 'Use 5 modules',
+                  entry_id=decision_id)
+    assert store.get(decision_id)['summary'] == 'Use 5 modules'
+    assert store.retract(decision_id) and store.get(decision_id) is None
+
+    try:
+        store.publish('qa', 'opinion', None, 'x')
+        raise AssertionError("Expected ValueError for an unknown kind")
+    except ValueError:
+        pass
+    print("✅ Published knowledge queryable across agents; unpublished stays private")
+
+
+def test_read_through_cache():
+    """Repeat queries hit the cache until the store changes anywhere."""
+    directory = Path(tempfile.mkdtemp())
+    store, analyst, _ = _memories(directory)
+    analyst.store_pattern('engagement', 'Cohorts of 20-30 engage most', 0.9, [], publish=True)
+
+    cache = KnowledgeCache(store, max_entries=2)
+    first = cache.query(kind='pattern')
+    assert cache.query(kind='pattern') is first
+    assert cache.get_stats()['hits'] == 1 and cache.get_stats()['misses'] == 1
+
+    # A write through this store invalidates
+    analyst.store_pattern('engagement', 'Live sessions lift week 2 retention', 0.8, [], publish=True)
+    assert len(cache.query(kind='pattern')) == 2
+
+    # So does a write from another process (a separate connection)
+    other = SharedKnowledgeStore(str(directory / "knowledge.db"))
+    other.publish('community-manager', 'pattern', 'engagement', 'Peer pods cut dropout', confidence=0.7)
+    assert len(cache.query(kind='pattern')) == 3
+    assert cache.get_stats()['invalidations'] == 2
+
+    # The cache is bounded
+    for topic in ('a', 'b', 'c'):
+        cache.query(topic=topic)
+    assert cache.get_stats()['cached_queries'] == 2
+    other.close()
+    print("✅ Read-through cache serves repeats and refreshes after any write")
+
+
+def test_chief_query_specialists():
+    """A chief reads what its coordinated agents shared, without messaging them."""
+    os.environ.setdefault('ANTHROPIC_API_KEY', 'test-key')
+    from agents.base.agent import ChiefAgent
+
+    directory = Path(tempfile.mkdtemp())
+    saved = os.environ.get('KNOWLEDGE_DB_PATH')
+    os.environ['KNOWLEDGE_DB_PATH'] = str(directory / "knowledge.db")
+    knowledge._global_knowledge_store = None
+    try:
+        analyst = LongTermMemory('data-analyst', db_path=str(directory))
+        analyst.store_pattern('student-success', 'Week 1 completers finish', 0.87, [], publish=True)
+        store = knowledge.get_knowledge_store()
+        store.publish('market-research-analyst', 'pattern', 'demand', 'AI courses in demand', confidence=0.9)
+
+        chief = ChiefAgent('chief-community-strategist', 'agents/definitions/chief_community_strategist.yaml')
+        shared = chief.query_specialists(kind='pattern')
+        assert [e['agent_id'] for e in shared] == ['data-analyst']  # Not a coordinated agent's
+        assert chief.query_specialists(agents=['market-research-analyst'])[0]['topic'] == 'demand'
+        chief.query_specialists(kind='pattern')
+        assert chief.knowledge.get_stats()['hits'] == 1
+    finally:
+        knowledge._global_knowledge_store = None
+        if saved is None:
+            os.environ.pop('KNOWLEDGE_DB_PATH', None)
+        else:
+            os.environ['KNOWLEDGE_DB_PATH'] = saved
+    print("✅ ChiefAgent.query_specialists() reads shared knowledge directly")
+
+
+def main():
+    """Run all tests."""
+    print("\n" + "="*70)
+    print(" AI FLYWHEEL AGENCY - SHARED KNOWLEDGE TESTS")
+    print("="*70)
+
+    test_publish_and_query()
+    test_read_through_cache()
+    test_chief_query_specialists()
+
+    print("\n✅ Shared knowledge: ALL TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,16 +7,20 @@ Tests:
 - Long-term memory persistence
 - Semantic search
 - Memory consolidation
+- Lazy initialization: nothing opened until first use
+- Shared vector store: one client per process, cross-agent search
+- Vector store settings from the environment; old per-agent stores migrated
 """
 
 import sys
 import os
+import tempfile
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from agents.base.memory import MemoryManager, ShortTermMemory, LongTermMemory
+from agents.base.memory import MemoryManager, ShortTermMemory, LongTermMemory, CHROMA_AVAILABLE, _agent_filter
 from agents.base.messaging import Message
 from datetime import datetime
 import uuid
@@ -209,6 +213,129 @@ def test_memory_manager():
     print("\n✅ Memory Manager: ALL TESTS PASSED")
 
 
+def test_lazy_initialization():
+    """Test that memory opens its stores on first use, not construction."""
+    print("\n" + "="*60)
+    print("Testing Lazy Initialization")
+    print("="*60)
+
+    test_db_path = Path(tempfile.mkdtemp()) / "memory"
+    mm = MemoryManager(agent_id="test-lazy", db_path=str(test_db_path))
+    assert not test_db_path.exists()
+    assert mm.long_term._conn is None and not mm.long_term._vector_ready
+    print("✅ Construction opens nothing")
+
+    # Status checks read SQLite without building the vector store
+    assert mm.get_interaction_count() == 0
+    assert (test_db_path / "test-lazy.db").exists()
+    assert not mm.long_term._vector_ready
+    print("✅ Interaction count leaves the vector store closed")
+
+    mm.long_term.retrieve_semantic("anything")
+    assert mm.long_term._vector_ready
+    print("✅ Vector store opened on first semantic use")
+
+    print("\n✅ Lazy initialization: ALL TESTS PASSED")
+
+
+def test_shared_vector_store():
+    """Test that agents share one vector store and can search across it."""
+    print("\n" + "="*60)
+    print("Testing Shared Vector Store")
+    print("="*60)
+
+    assert _agent_filter(['data-analyst']) == {'agent_id': 'data-analyst'}
+    assert _agent_filter(['data-analyst', 'qa'], {'type': 'decision'}) == {
+        '$and': [{'agent_id': {'$in': ['data-analyst', 'qa']}}, {'type': 'decision'}]
+    }
+    assert _agent_filter(None) is None
+    assert _agent_filter(None, {'type': 'decision'}) == {'type': 'decision'}
+    print("✅ Agent filters compose with metadata filters")
+
+    test_db_path = str(Path(tempfile.mkdtemp()) / "memory")
+    analyst = LongTermMemory(agent_id="data-analyst", db_path=test_db_path)
+    designer = LongTermMemory(agent_id="learning-designer", db_path=test_db_path)
+    assert analyst.search_agents("anything", agent_ids=[]) == []
+
+    if not CHROMA_AVAILABLE:
+        assert analyst.collection is None and analyst.search_agents("completion") == []
+        print("⚠️  ChromaDB not installed; skipping shared store checks")
+        return
+
+    assert analyst.chroma_client is designer.chroma_client
+    assert analyst.collection is designer.collection
+    print("✅ One client and collection shared by both agents")
+
+    analyst._store_semantic("Week 1 completion predicts course completion", {'type': 'pattern'})
+    designer._store_semantic("Short videos improve completion in week 1", {'type': 'pattern'})
+
+    own = analyst.retrieve_semantic("completion", n_results=5)
+    assert {m['agent_id'] for m in own} == {'data-analyst'}
+    team = designer.search_agents("completion", n_results=5)
+    assert {m['agent_id'] for m in team} == {'data-analyst', 'learning-designer'}
+    print("✅ Own searches stay private; cross-agent search spans both")
+
+    # Counted from vector_ids, not by listing the shared collection
+    assert analyst.get_stats()['semantic_memories'] == 1
+    analyst._store_semantic("Week 1 completion predicts course completion", {'type': 'pattern'},
+                            doc_id="analyst-week-1")
+    analyst._store_semantic("Week 1 completion predicts completion", {'type': 'pattern'},
+                            doc_id="analyst-week-1")
+    assert analyst.get_stats()['semantic_memories'] == 2
+
+    analyst.clear()
+    assert analyst.get_stats()['semantic_memories'] == 0
+    assert designer.get_stats()['semantic_memories'] == 1
+    print("✅ Clearing one agent leaves the others' memories")
+
+    print("\n✅ Shared vector store: ALL TESTS PASSED")
+
+
+def test_vector_store_settings():
+    """Test CHROMA_* settings and migration of old per-agent stores."""
+    print("\n" + "="*60)
+    print("Testing Vector Store Settings")
+    print("="*60)
+
+    directory = Path(tempfile.mkdtemp())
+    saved = {key: os.environ.get(key) for key in ('CHROMA_PERSIST_DIRECTORY', 'CHROMA_COLLECTION_NAME')}
+    try:
+        os.environ['CHROMA_PERSIST_DIRECTORY'] = str(directory / "vectors")
+        os.environ['CHROMA_COLLECTION_NAME'] = "test_memories"
+        memory = LongTermMemory(agent_id="data-analyst", db_path=str(directory / "memory"))
+        assert memory.chroma_path == directory / "vectors" / "agency"
+        assert memory.legacy_chroma_path == directory / "memory" / "vector" / "data-analyst"
+        print("✅ CHROMA_PERSIST_DIRECTORY sets the shared store's location")
+
+        if not CHROMA_AVAILABLE:
+            print("⚠️  ChromaDB not installed; skipping collection and migration checks")
+            return
+
+        import chromadb
+        legacy = chromadb.PersistentClient(path=str(memory.legacy_chroma_path))
+        legacy.get_or_create_collection("data-analyst_memories").add(
+            ids=["data-analyst_1", "data-analyst_2"],
+            documents=["Week 1 completion predicts success", "Cohorts of 20-30 engage most"],
+            metadatas=[{'type': 'interaction', 'timestamp': '2025-01-06T09:00:00'}, {'type': 'pattern'}]
+        )
+        del legacy
+
+        assert memory.collection.name == "test_memories"
+        assert not memory.legacy_chroma_path.exists()
+        assert memory.legacy_chroma_path.with_name("data-analyst.migrated").is_dir()
+        migrated = memory.collection.get(ids=["data-analyst_1"], include=['metadatas'])['metadatas'][0]
+        assert migrated['agent_id'] == "data-analyst"
+        assert migrated['created_at'] == datetime(2025, 1, 6, 9).timestamp()
+        assert len(memory.retrieve_semantic("completion", n_results=5)) == 2
+        print("✅ Old per-agent store migrated into the shared collection")
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
 def main():
     """Run all tests."""
     print("\n" + "="*70)
@@ -220,6 +347,9 @@ def main():
         test_long_term_memory()
         test_semantic_search()
         test_memory_manager()
+        test_lazy_initialization()
+        test_shared_vector_store()
+        test_vector_store_settings()
 
         print("\n" + "="*70)
         print(" 🎉 ALL TESTS PASSED! Memory system is working correctly.")
@@ -228,6 +358,9 @@ def main():
         print("✅ Long-term memory: PASS")
         print("✅ Semantic search: PASS")
         print("✅ Memory Manager: PASS")
+        print("✅ Lazy initialization: PASS")
+        print("✅ Shared vector store: PASS")
+        print("✅ Vector store settings: PASS")
         print("\n💡 Next: Test with actual agents using this memory system!")
 
     except Exception as e:
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Test script for the message bus transports
+
+Tests:
+- Message round-trips through to_dict/from_dict
+- In-process bus: routing, reply correlation, errors
+- Unix socket router: agents in another process, nested and concurrent requests
+- AMQP transport against the local stand-in broker, competing workers of one agent
+- get_message_bus() picks its transport from the environment
+- Ring-buffer message log: eviction, conversation index, type counts
+- Slotted Message: lazy id/timestamp, binary codec, cheap broadcast copies
+"""
+
+import copy
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.base import messaging
+from agents.base.messaging import Message, MessageBus, MessageLog, get_message_bus
+from agents.base.transport import (
+    AMQPTransport, InProcessTransport, LocalBroker, MessageRouter, UnixSocketTransport
+)
+
+REPO_ROOT = Path(__file__).parent.parent
+
+# An agent process: registers 'remote-analyst' and serves until stdin closes
+REMOTE_AGENT = textwrap.dedent("""
+    import os, sys
+    sys.path.insert(0, sys.argv[2])
+    from agents.base.messaging import Message
+    from agents.base.transport import UnixSocketTransport
+
+    transport = UnixSocketTransport(sys.argv[1])
+
+    def handle(message):
+        if message.content == 'crash':
+            raise RuntimeError('analysis failed')
+        return Message.response(
+            sender='remote-analyst', receiver=message.sender,
+            content=f"pid {os.getpid()}: {message.content.upper()}",
+            in_reply_to=message.message_id
+        )
+
+    transport.register('remote-analyst', handle)
+    print('ready', flush=True)
+    sys.stdin.read()
+    transport.close()
+""")
+
+
+def echo_handler(agent_id):
+    def handle(message):
+        return Message(sender=agent_id, receiver=message.sender, content=f"{agent_id}: {message.content}",
+                       message_type="response")
+    return handle
+
+
+def _check_bus(bus: MessageBus, peer: MessageBus):
+    """Shared checks: peer hosts 'designer'; bus sends to it."""
+    peer.subscribe('designer', echo_handler('designer'))
+
+    request = Message.request(sender='human', receiver='designer', content='outline module 3')
+    reply = bus.send(request, timeout=5)
+    assert reply.content == 'designer: outline module 3', reply
+    assert reply.in_reply_to == request.message_id
+
+    missing = bus.send(Message.request(sender='human', receiver='nobody', content='hi'), timeout=5)
+    assert missing.message_type == 'error' and 'not found' in missing.content
+
+    peer.unsubscribe('designer')
+    gone = bus.send(Message.request(sender='human', receiver='designer', content='hi'), timeout=5)
+    assert gone.message_type == 'error', gone
+
+
+def test_message_round_trip():
+    """to_dict/from_dict round-trip."""
+    message = Message.request(sender='chief-learning-strategist', receiver='data-analyst',
+                              content='Q4 retention?', conversation_id='conv-1',
+                              metadata={'priority': 'high'})
+    assert Message.from_dict(message.to_dict()) == message
+    print("✅ Message round-trips through to_dict/from_dict")
+
+
+def test_in_process_bus():
+    """Default transport keeps the original in-process behaviour."""
+    bus = MessageBus()
+    assert isinstance(bus.transport, InProcessTransport)
+    _check_bus(bus, bus)
+
+    def broken(message):
+        raise RuntimeError("model unavailable")
+    bus.subscribe('qa', broken)
+    error = bus.send(Message.request(sender='human', receiver='qa', content='review'))
+    assert error.message_type == 'error' and 'model unavailable' in error.content
+    assert bus.get_stats()['total_agents'] == 1
+    print("✅ In-process bus routing and errors working")
+
+
+def test_unix_socket_transport():
+    """Agents in different processes talk through the router."""
+    socket_path = Path(tempfile.mkdtemp()) / "bus.sock"
+    router = MessageRouter(str(socket_path)).start()
+    agent_process = subprocess.Popen(
+        [sys.executable, "-c", REMOTE_AGENT, str(socket_path), str(REPO_ROOT)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+    )
+    try:
+        assert any(line.strip() == 'ready' for line in iter(agent_process.stdout.readline, ''))
+
+        bus = MessageBus(transport=UnixSocketTransport(str(socket_path)))
+        peer = MessageBus(transport=UnixSocketTransport(str(socket_path)))
+        _check_bus(bus, peer)
+
+        # Another process answers, with correlation on message_id/in_reply_to
+        request = Message.request(sender='human', receiver='remote-analyst', content='cohort health')
+        reply = bus.send(request, timeout=5)
+        assert reply.content == f"pid {agent_process.pid}: COHORT HEALTH", reply
+        assert reply.in_reply_to == request.message_id
+
+        crashed = bus.send(Message.request(sender='human', receiver='remote-analyst', content='crash'), timeout=5)
+        assert crashed.message_type == 'error' and 'analysis failed' in crashed.content
+
+        # A handler can send messages of its own (nested request across processes)
+        def chief(message):
+            analysis = peer.send(Message.request(sender='chief', receiver='remote-analyst', content=message.content))
+            return Message(sender='chief', receiver=message.sender, content=f"chief saw [{analysis.content}]")
+        peer.subscribe('chief', chief)
+        nested = bus.send(Message.request(sender='human', receiver='chief', content='plan'), timeout=5)
+        assert nested.content == f"chief saw [pid {agent_process.pid}: PLAN]", nested
+
+        # Concurrent senders each get their own reply
+        def ask(i):
+            return bus.send(Message.request(sender='human', receiver='remote-analyst', content=f"q{i}"), timeout=5)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            replies = list(pool.map(ask, range(40)))
+        assert [r.content.split(': ')[1] for r in replies] == [f"Q{i}" for i in range(40)]
+
+        assert 'remote-analyst' in router.agents and 'chief' in router.agents
+
+        # Agent process exits: its id is dropped from the router
+        agent_process.stdin.close()
+        agent_process.wait(timeout=10)
+        for _ in range(100):
+            if 'remote-analyst' not in router.agents:
+                break
+            threading.Event().wait(0.05)
+        gone = bus.send(Message.request(sender='human', receiver='remote-analyst', content='hi'), timeout=5)
+        assert gone.message_type == 'error' and 'not found' in gone.content
+
+        bus.transport.close()
+        peer.transport.close()
+    finally:
+        if agent_process.poll() is None:
+            agent_process.kill()
+        router.close()
+    print("✅ Unix socket transport routes between processes")
+
+
+def test_amqp_transport():
+    """AMQP request/reply against the local stand-in broker."""
+    broker = LocalBroker()
+    bus = MessageBus(transport=AMQPTransport(channel=broker.channel()))
+    peer = MessageBus(transport=AMQPTransport(channel=broker.channel()))
+    _check_bus(bus, peer)
+
+    peer.subscribe('analyst', echo_handler('analyst'))
+
+    def ask(i):
+        return bus.send(Message.request(sender='human', receiver='analyst', content=f"q{i}"), timeout=5)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        replies = list(pool.map(ask, range(40)))
+    assert [r.content for r in replies] == [f"analyst: q{i}" for i in range(40)]
+
+    # Closing the last consumer's connection deletes the agent queue
+    peer.transport.close()
+    gone = bus.send(Message.request(sender='human', receiver='analyst', content='hi'), timeout=5)
+    assert gone.message_type == 'error' and 'not found' in gone.content
+    bus.transport.close()
+    print("✅ AMQP transport working against the local broker")
+
+
+def test_amqp_competing_workers():
+    """Several processes serving one agent share its queue (supervisor workers)."""
+    broker = LocalBroker()
+    client = MessageBus(transport=AMQPTransport(channel=broker.channel()))
+    workers = [MessageBus(transport=AMQPTransport(channel=broker.channel())) for _ in range(2)]
+    for n, worker in enumerate(workers):
+        # A second exclusive declaration would fail with RESOURCE_LOCKED
+        worker.subscribe('analyst', echo_handler(f"worker{n}"))
+
+    def ask(i):
+        return client.send(Message.request(sender='human', receiver='analyst', content=f"q{i}"), timeout=5)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        replies = list(pool.map(ask, range(20)))
+    served = {r.content.split(':')[0] for r in replies}
+    assert served == {'worker0', 'worker1'}, served
+
+    # One worker leaving keeps the queue for the other
+    workers[0].unsubscribe('analyst')
+    assert ask(0).content == "worker1: q0"
+    workers[1].transport.close()
+    gone = ask(1)
+    assert gone.message_type == 'error' and 'not found' in gone.content
+    workers[0].transport.close()
+    client.transport.close()
+    print("✅ AMQP workers of one agent compete for its queue")
+
+
+def test_bus_from_environment():
+    """MESSAGE_TRANSPORT selects the global bus's transport."""
+    socket_path = Path(tempfile.mkdtemp()) / "bus.sock"
+    router = MessageRouter(str(socket_path)).start()
+    saved = {key: os.environ.get(key) for key in ('MESSAGE_TRANSPORT', 'MESSAGE_BUS_SOCKET', 'MESSAGE_TIMEOUT_SECONDS')}
+    try:
+        os.environ.update(MESSAGE_TRANSPORT='unix', MESSAGE_BUS_SOCKET=str(socket_path),
+                          MESSAGE_TIMEOUT_SECONDS='7')
+        messaging._global_message_bus = None
+        bus = get_message_bus()
+        assert isinstance(bus.transport, UnixSocketTransport) and bus.timeout == 7.0
+        assert get_message_bus() is bus
+        bus.transport.close()
+
+        os.environ['MESSAGE_TRANSPORT'] = 'carrier-pigeon'
+        messaging._global_message_bus = None
+        try:
+            get_message_bus()
+            raise AssertionError("Expected ValueError for an unknown transport")
+        except ValueError:
+            pass
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        messaging._global_message_bus = None
+        router.close()
+
+    # Importing the transports doesn't warn about AMQP unless it's selected
+    imported = subprocess.run(
+        [sys.executable, "-c", "import agents.base.transport"],
+        cwd=str(Path(__file__).parent.parent), capture_output=True, text=True, check=True
+    )
+    assert imported.stdout == '', imported.stdout
+    print("✅ get_message_bus() configured from the environment")
+
+
+def test_message_log():
+    """Index and counters stay consistent with the log as it wraps."""
+    log = MessageLog(max_size=50)
+    types = ['request', 'response', 'notification', 'status']
+    for i in range(237):
+        log.append(Message(sender='a', receiver='b', content=f"m{i}", message_type=types[i % 4],
+                           conversation_id=f"conv-{i % 7}" if i % 5 else None))
+
+        logged = list(log)
+        assert len(log) == min(i + 1, 50)
+        assert log.type_counts() == dict(Counter(m.message_type for m in logged))
+        conversations = {m.conversation_id for m in logged if m.conversation_id}
+        assert log.conversation_count == len(conversations)
+        for conversation_id in conversations:
+            assert log.conversation(conversation_id) == [
+                m for m in logged if m.conversation_id == conversation_id
+            ]
+
+    assert [m.content for m in log.recent(3)] == ['m234', 'm235', 'm236']
+    assert len(log.recent(500)) == 50 and log.recent(0) == []
+    assert log.conversation('conv-unknown') == []
+
+    try:
+        MessageLog(max_size=0)
+        raise AssertionError("Expected ValueError for max_size=0")
+    except ValueError:
+        pass
+
+    # Through the bus: request and reply are both logged under the conversation
+    bus = MessageBus()
+    bus.subscribe('designer', echo_handler('designer'))
+    bus.send(Message.request(sender='human', receiver='designer', content='outline', conversation_id='c1'))
+    assert len(bus.get_conversation('c1')) == 1
+    stats = bus.get_stats()
+    assert stats['message_types']['request'] == 1 and stats['active_conversations'] == 1
+    bus.clear_log()
+    assert bus.get_stats()['total_messages'] == 0 and bus.get_conversation('c1') == []
+
+    # Monitoring calls don't depend on log size
+    full = MessageLog(max_size=100_000)
+    for i in range(100_000):
+        full.append(Message(sender='a', receiver='b', content='x', conversation_id=f"conv-{i % 1000}"))
+    started = time.perf_counter()
+    for _ in range(1000):
+        full.append(Message(sender='a', receiver='b', content='x', conversation_id='conv-1'))
+        full.type_counts()
+        full.recent(10)
+        full.conversation('conv-2')
+    per_call_us = (time.perf_counter() - started) / 1000 * 1e6
+    assert per_call_us < 500, per_call_us
+    print(f"✅ Ring-buffer message log consistent ({per_call_us:.1f}µs per append + lookups)")
+
+
+def test_message_codec():
+    """Slotted messages: lazy fields, to_bytes/from_bytes, cheap copies."""
+    message = Message(sender='human', receiver='designer', content='outline')
+    assert not hasattr(message, '__dict__')
+    assert message.message_id == message.message_id  # Generated once
+    assert message.timestamp.startswith(str(time.localtime().tm_year))
+
+    # Copies and pickles keep an id that hadn't been read yet
+    fresh = Message(sender='human', receiver='designer', content='outline')
+    assert copy.copy(fresh).message_id == fresh.message_id
+    assert pickle.loads(pickle.dumps(Message(sender='a', receiver='b', content='c'))).message_id
+
+    cases = [
+        message,
+        Message.request(sender='chief-learning-strategist', receiver='data-analyst',
+                        content='Rétention — Q4? ' * 50, conversation_id='conv-1',
+                        metadata={'priority': 'high', 'cohorts': [1, 2], 'nested': {'ok': True}}),
+        Message.response(sender='data-analyst', receiver='chief', content='', in_reply_to='m-1'),
+        Message.from_dict({'sender': 'a', 'receiver': 'b', 'content': 'c',
+                           'timestamp': '2025-01-06T09:00:00', 'message_id': 'fixed'}),
+    ]
+    for case in cases:
+        data = case.to_bytes()
+        assert Message.from_bytes(data) == case, case
+        assert len(data) < len(json.dumps(case.to_dict()).encode())
+    assert Message.from_bytes(cases[3].to_bytes()).timestamp == '2025-01-06T09:00:00'
+
+    for bad in (b'', b'\x02\x00' + b'\x00' * 24, cases[1].to_bytes()[:-1], cases[1].to_bytes() + b'x'):
+        try:
+            Message.from_bytes(bad)
+            raise AssertionError(f"Expected ValueError for {bad[:10]!r}")
+        except ValueError:
+            pass
+
+    # Broadcast copies share content and metadata but get their own ids
+    received = []
+    bus = MessageBus()
+    for agent_id in ('qa', 'designer'):
+        bus.subscribe(agent_id, lambda m: received.append(m) or echo_handler(m.receiver)(m))
+    announcement = Message.inform(sender='chief', receiver='all', content='Q4 plan', metadata={'v': 2})
+    bus.broadcast(announcement, ['qa', 'designer'])
+    assert [m.receiver for m in received] == ['qa', 'designer']
+    assert all(m.metadata is announcement.metadata and m.content is announcement.content for m in received)
+    assert len({m.message_id for m in received} | {announcement.message_id}) == 3
+
+    # Cheaper than the JSON round-trip the transports used
+    sample = cases[1]
+    started = time.perf_counter()
+    for _ in range(5000):
+        Message.from_bytes(sample.to_bytes())
+    binary_us = (time.perf_counter() - started) / 5000 * 1e6
+    started = time.perf_counter()
+    for _ in range(5000):
+        Message.from_dict(json.loads(json.dumps(sample.to_dict(), separators=(',', ':')).encode()))
+    json_us = (time.perf_counter() - started) / 5000 * 1e6
+    assert binary_us < json_us, (binary_us, json_us)
+    print(f"✅ Binary codec round-trip {binary_us:.1f}µs vs {json_us:.1f}µs for JSON")
+
+
+def main():
+    """Run all tests."""
+    print("\n" + "="*70)
+    print(" AI FLYWHEEL AGENCY - MESSAGE BUS TRANSPORT TESTS")
+    print("="*70)
+
+    test_message_round_trip()
+    test_in_process_bus()
+    test_unix_socket_transport()
+    test_amqp_transport()
+    test_amqp_competing_workers()
+    test_bus_from_environment()
+    test_message_log()
+    test_message_codec()
+
+    print("\n✅ Message bus transports: ALL TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Test script for topic publish/subscribe and multicast
+
+Tests:
+- Topic pattern matching ('*' one word, '#' any number)
+- publish() is fire-and-forget and shares one message between subscribers
+- multicast() reaches agents behind a remote transport
+- ChiefAgent.notify() reaches every coordinated agent in one call
+"""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.base.messaging import Message, MessageBus, topic_matches
+from agents.base.transport import AMQPTransport, LocalBroker
+
+
+class Recorder:
+    """Handler that records what it receives, optionally slowly."""
+
+    def __init__(self, agent_id, delay=0.0):
+        self.agent_id = agent_id
+        self.delay = delay
+        self.received = []
+        self.done = threading.Event()
+
+    def __call__(self, message):
+        time.sleep(self.delay)
+        self.received.append(message)
+        self.done.set()
+        return Message.response(sender=self.agent_id, receiver=message.sender,
+                                content='noted', in_reply_to=message.message_id)
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for deliveries")
+        time.sleep(0.01)
+
+
+def test_topic_matching():
+    """Wildcards follow AMQP topic rules."""
+    cases = [
+        ('cohort.*.health_changed', 'cohort.q4-2025.health_changed', True),
+        ('cohort.*.health_changed', 'cohort.health_changed', False),
+        ('cohort.*.health_changed', 'cohort.a.b.health_changed', False),
+        ('cohort.#', 'cohort', True),
+        ('cohort.#', 'cohort.q4-2025.nps.dropped', True),
+        ('#.dropped', 'cohort.q4-2025.nps.dropped', True),
+        ('#', 'anything.at.all', True),
+        ('cohort.#.dropped', 'cohort.dropped', True),
+        ('cohort.#.dropped', 'cohort.q4.raised', False),
+        ('community.sentiment', 'community.sentiment', True),
+        ('community.sentiment', 'community.sentiment.daily', False),
+    ]
+    for pattern, topic, expected in cases:
+        assert topic_matches(pattern, topic) is expected, (pattern, topic)
+
+    bus = MessageBus()
+    for bad in ('', 'cohort..health', '.cohort'):
+        try:
+            bus.subscribe_topic('qa', bad)
+            raise AssertionError(f"Expected ValueError for pattern '{bad}'")
+        except ValueError:
+            pass
+    try:
+        bus.publish('cohort.*', Message.inform(sender='a', receiver='cohort.*', content='x'))
+        raise AssertionError("Expected ValueError for a wildcard in a published topic")
+    except ValueError:
+        pass
+    print(f"✅ {len(cases)} topic patterns matched correctly")
+
+
+def test_publish():
+    """Publishing queues for every subscriber and returns immediately."""
+    bus = MessageBus()
+    strategist = Recorder('chief-community-strategist', delay=0.3)
+    manager = Recorder('community-manager', delay=0.3)
+    designer = Recorder('learning-designer')
+    for recorder in (strategist, manager, designer):
+        bus.subscribe(recorder.agent_id, recorder)
+
+    bus.subscribe_topic('chief-community-strategist', 'cohort.*.health_changed')
+    bus.subscribe_topic('community-manager', 'cohort.#')
+    bus.subscribe_topic('learning-designer', 'curriculum.#')
+
+    event = Message.inform(sender='data-analyst', receiver='cohort.q4-2025.health_changed',
+                           content='Completion down 12%', metadata={'cohort_id': 'q4-2025'})
+    started = time.perf_counter()
+    queued = bus.publish('cohort.q4-2025.health_changed', event)
+    elapsed = time.perf_counter() - started
+    assert queued == 2 and elapsed < 0.05, (queued, elapsed)
+
+    _wait_for(lambda: strategist.received and manager.received)
+    assert strategist.received[0] is event and manager.received[0] is event
+    assert designer.received == []
+    assert bus.get_recent_messages(1)[0] is event  # Logged once
+
+    # Unsubscribing (from the topic, or from the bus) stops deliveries
+    bus.unsubscribe_topic('community-manager', 'cohort.#')
+    assert bus.publish('cohort.q4-2025.health_changed', event) == 1
+    _wait_for(lambda: len(strategist.received) == 2)
+    bus.unsubscribe('chief-community-strategist')
+    assert bus.publish('cohort.q4-2025.health_changed', event) == 0
+    assert bus.get_stats()['topics'] == {'curriculum.#': ['learning-designer']}
+
+    _wait_for(lambda: bus.get_stats()['notifications']['delivered'] == 3)
+    for agent_id in ('community-manager', 'learning-designer'):
+        bus.unsubscribe(agent_id)
+    print(f"✅ publish() queued for 2 slow subscribers in {elapsed * 1000:.1f}ms")
+
+
+def test_multicast_remote():
+    """Remote agents get notifications from a background pool."""
+    broker = LocalBroker()
+    bus = MessageBus(transport=AMQPTransport(channel=broker.channel()))
+    peer = MessageBus(transport=AMQPTransport(channel=broker.channel()))
+    analyst = Recorder('data-analyst', delay=0.2)
+    peer.subscribe('data-analyst', analyst)
+    designer = Recorder('learning-designer')
+    bus.subscribe('learning-designer', designer)
+
+    update = Message.inform(sender='chief', receiver='coordinated-agents', content='Q4 plan approved')
+    started = time.perf_counter()
+    assert bus.multicast(update, ['data-analyst', 'learning-designer', 'nobody']) == 3
+    assert time.perf_counter() - started < 0.05
+
+    assert analyst.done.wait(5) and designer.done.wait(5)
+    assert analyst.received[0].content == 'Q4 plan approved'
+    assert analyst.received[0].receiver == 'data-analyst'  # Addressed copy for routing
+    assert designer.received[0] is update
+    _wait_for(lambda: bus.get_stats()['notifications'] == {'delivered': 2, 'dropped': 1})
+
+    bus.transport.close()
+    peer.transport.close()
+    print("✅ multicast() reaches local and remote agents without waiting")
+
+
+def test_chief_notify():
+    """A chief notifies all coordinated agents in one call."""
+    os.environ.setdefault('ANTHROPIC_API_KEY', 'test-key')
+    from agents.base.agent import ChiefAgent
+
+    chief = ChiefAgent('chief-community-strategist', 'agents/definitions/chief_community_strategist.yaml')
+    bus = MessageBus()
+    chief.message_bus = bus
+    assert chief.coordinated_agents == [
+        'community-manager', 'behavioral-scientist', 'learning-designer', 'data-analyst'
+    ]
+
+    recorders = [Recorder(agent_id, delay=0.2) for agent_id in chief.coordinated_agents]
+    for recorder in recorders:
+        bus.subscribe(recorder.agent_id, recorder)
+
+    started = time.perf_counter()
+    assert chief.notify('Spring cohort launches Monday', metadata={'cohort_id': 'spring'}) == 4
+    elapsed = time.perf_counter() - started
+    assert elapsed < 0.1, elapsed  # Not 4 x 200ms round-trips
+
+    for recorder in recorders:
+        assert recorder.done.wait(5)
+        message = recorder.received[0]
+        assert message.message_type == 'inform'
+        assert message.metadata == {'coordinated_by': 'chief-community-strategist', 'cohort_id': 'spring'}
+
+    # Topics from the agent definition are subscribed on start()
+    chief.start()
+    assert bus.topics.route('cohort.q4-2025.health_changed') == ('chief-community-strategist',)
+    assert bus.topics.route('community.sentiment.daily') == ('chief-community-strategist',)
+    chief.stop()
+    assert bus.topics.route('cohort.q4-2025.health_changed') == ()
+    print(f"✅ ChiefAgent.notify() reached 4 agents in {elapsed * 1000:.1f}ms")
+
+
+def main():
+    """Run all tests."""
+    print("\n" + "="*70)
+    print(" AI FLYWHEEL AGENCY - PUBLISH/SUBSCRIBE TESTS")
+    print("="*70)
+
+    test_topic_matching()
+    test_publish()
+    test_multicast_remote()
+    test_chief_notify()
+
+    print("\n✅ Publish/subscribe: ALL TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
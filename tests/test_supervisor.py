@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for the agent supervisor
+
+Tests:
+- Scaling decisions: one step towards queue depth / scale depth, within bounds
+- The router spreads an agent's requests over all of its processes
+- Workers start healthy, are restarted after dying, and scale back down
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.base.messaging import Message
+from agents.base.transport import MessageRouter, UnixSocketTransport
+from agents.supervisor import HEALTHY, AgentSupervisor, desired_workers, load_definitions
+
+
+def _wait_until(supervisor, condition, timeout=60.0):
+    """Run supervision passes until condition(status) holds."""
+    deadline = time.monotonic() + timeout
+    while True:
+        status = supervisor.check()
+        if condition(status):
+            return status
+        if time.monotonic() > deadline:
+            raise AssertionError(f"Timed out; last status: {status}")
+        time.sleep(0.2)
+
+
+def test_desired_workers():
+    """Scale one step at a time, between min and max."""
+    assert desired_workers(0, 1, 1, 3, 10) == 1
+    assert desired_workers(25, 1, 1, 3, 10) == 2
+    assert desired_workers(25, 2, 1, 3, 10) == 3
+    assert desired_workers(500, 3, 1, 3, 10) == 3
+    assert desired_workers(0, 3, 1, 3, 10) == 2
+    assert desired_workers(10, 1, 1, 3, 10) == 1
+    assert desired_workers(0, 0, 2, 3, 10) == 1
+
+    definitions = load_definitions()
+    assert len(definitions) == 10
+    assert definitions['data-analyst']['type'] == 'specialist-analyst'
+    try:
+        load_definitions(agents=['no-such-agent'])
+        raise AssertionError("Expected ValueError for an unknown agent")
+    except ValueError:
+        pass
+    print("✅ Scaling decisions stay within bounds, one step per check")
+
+
+def test_router_spreads_load():
+    """Two processes serving one agent id share its requests."""
+    socket_path = str(Path(tempfile.mkdtemp()) / "bus.sock")
+    router = MessageRouter(socket_path).start()
+    handled = {'a': 0, 'b': 0}
+    lock = threading.Lock()
+
+    def host(name):
+        def handler(message):
+            with lock:
+                handled[name] += 1
+            time.sleep(0.2)
+            return Message.response(sender='data-analyst', receiver=message.sender,
+                                    content=name, in_reply_to=message.message_id)
+        return handler
+
+    hosts = [UnixSocketTransport(socket_path), UnixSocketTransport(socket_path)]
+    hosts[0].register('data-analyst', host('a'))
+    hosts[1].register('data-analyst', host('b'))
+    client = UnixSocketTransport(socket_path)
+
+    requests = [Message.request(sender='chief', receiver='data-analyst', content=f"q{i}") for i in range(4)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        replies = list(pool.map(lambda m: client.request(m, timeout=5), requests))
+    elapsed = time.perf_counter() - started
+    assert handled == {'a': 2, 'b': 2}, handled
+    assert all(r.in_reply_to == m.message_id for r, m in zip(replies, requests))
+
+    # Losing one process leaves the other serving the agent
+    hosts[0].close()
+    time.sleep(0.2)
+    assert client.request(requests[0], timeout=5).content == 'b'
+    assert router.agents == ['data-analyst']
+
+    for transport in (hosts[1], client):
+        transport.close()
+    router.close()
+    print(f"✅ 4 requests spread over 2 processes in {elapsed:.2f}s")
+
+
+def test_supervisor_restarts_and_scales():
+    """Workers become healthy, come back after dying, and scale down when idle."""
+    os.environ.setdefault('ANTHROPIC_API_KEY', 'test-key')
+    saved = {key: os.environ.get(key) for key in ('MESSAGE_TRANSPORT', 'MESSAGE_BUS_SOCKET')}
+    os.environ.pop('MESSAGE_TRANSPORT', None)
+    os.environ['MESSAGE_BUS_SOCKET'] = str(Path(tempfile.mkdtemp()) / "bus.sock")
+    status_file = Path(tempfile.mkdtemp()) / "supervisor-status.json"
+
+    supervisor = AgentSupervisor(
+        agents=['data-analyst'], min_workers=1, max_workers=2, health_timeout=2.0,
+        backoff=0.1, drain_timeout=2.0, status_file=str(status_file)
+    )
+    try:
+        started = time.perf_counter()
+        supervisor.start()
+        _wait_until(supervisor, lambda s: s['agents']['data-analyst']['healthy'] == 1)
+        startup = time.perf_counter() - started
+        worker = supervisor.workers['data-analyst'][0]
+        assert worker.last_status['agent']['agent_id'] == 'data-analyst'
+        assert worker.last_status['pid'] == worker.process.pid
+        assert status_file.exists()
+
+        # A crashed worker is restarted
+        crashed_pid = worker.process.pid
+        worker.process.kill()
+        worker.process.join(5)
+        supervisor.check()
+        assert worker.state == 'restarting' and worker.restarts == 1
+        _wait_until(supervisor, lambda s: s['agents']['data-analyst']['healthy'] == 1)
+        assert worker.process.pid != crashed_pid
+
+        # An extra, idle worker is scaled back down
+        supervisor._launch('data-analyst')
+        _wait_until(supervisor, lambda s: len(s['agents']['data-analyst']['workers']) == 1)
+        assert supervisor.workers['data-analyst'][0].state == HEALTHY
+    finally:
+        supervisor.stop()
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+    print(f"✅ Supervised worker healthy in {startup:.1f}s, restarted after a crash")
+
+
+def main():
+    """Run all tests."""
+    print("\n" + "="*70)
+    print(" AI FLYWHEEL AGENCY - AGENT SUPERVISOR TESTS")
+    print("="*70)
+
+    test_desired_workers()
+    test_router_spreads_load()
+    test_supervisor_restarts_and_scales()
+
+    print("\n✅ Agent supervisor: ALL TESTS PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())